@@ -36,7 +36,9 @@ def main():
         host=settings.app_host,
         port=settings.app_port,
         reload=settings.app_debug,
-        log_level="info"
+        workers=None if settings.app_debug else settings.app_workers,
+        log_level="info",
+        timeout_graceful_shutdown=settings.app_shutdown_timeout
     )
 
 if __name__ == "__main__":
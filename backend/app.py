@@ -106,6 +106,17 @@ def main():
                 else [os.path.join(current_dir, "backend")]
             ),
             log_level="info",
+            timeout_graceful_shutdown=settings.app_shutdown_timeout,
+        )
+    elif settings.app_workers > 1:
+        # 多 worker 模式：uvicorn 需要字符串路径在每个子进程中导入应用
+        uvicorn.run(
+            f"{app_module_path}.main:app",
+            host=settings.app_host,
+            port=settings.app_port,
+            workers=settings.app_workers,
+            log_level="info",
+            timeout_graceful_shutdown=settings.app_shutdown_timeout,
         )
     else:
         # 非 reload 模式：直接运行
@@ -115,6 +126,7 @@ def main():
             port=settings.app_port,
             reload=False,
             log_level="info",
+            timeout_graceful_shutdown=settings.app_shutdown_timeout,
         )
 
 
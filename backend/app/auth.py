@@ -3,10 +3,12 @@
 import secrets
 import base64
 import hashlib
+import hmac
+import time
+from functools import lru_cache
 from typing import Annotated, Optional
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
@@ -16,17 +18,55 @@ from app.models.api_key import ApiKey
 
 settings = get_settings()
 security = HTTPBasic(auto_error=False)  # 不自动报错，避免浏览器弹窗
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+_pwd_context = None
+
+# 验证成功的 (密码哈希, 明文 HMAC) -> 过期时间：bcrypt 每次验证约 0.2 秒，Basic Auth 每个请求都要验证一次。
+# 明文摘要使用进程启动时随机生成的密钥计算，内存中的键不能用于离线猜测密码；
+# 键包含密码哈希，修改密码后旧记录不会再命中；记录在 TTL 后过期，只缓存成功的验证，错误密码每次都执行 bcrypt
+_verified_passwords: dict = {}
+_VERIFIED_PASSWORDS_MAX = 1024
+_VERIFIED_PASSWORDS_TTL_SECONDS = 300
+_VERIFIED_PASSWORDS_KEY = secrets.token_bytes(32)
+
+
+def _get_pwd_context():
+    """bcrypt 上下文（首次使用时创建，启动时不加载 passlib 和 bcrypt）"""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """验证密码（验证成功的结果在进程内缓存一段时间）"""
+    digest = hmac.new(_VERIFIED_PASSWORDS_KEY, plain_password.encode(), hashlib.sha256).hexdigest()
+    key = (hashed_password, digest)
+    now = time.monotonic()
+    expires_at = _verified_passwords.get(key)
+    if expires_at is not None:
+        if expires_at > now:
+            return True
+        _verified_passwords.pop(key, None)
+    if not _get_pwd_context().verify(plain_password, hashed_password):
+        return False
+    if len(_verified_passwords) >= _VERIFIED_PASSWORDS_MAX:
+        _verified_passwords.clear()
+    _verified_passwords[key] = now + _VERIFIED_PASSWORDS_TTL_SECONDS
+    return True
 
 
 def get_password_hash(password: str) -> str:
     """获取密码哈希"""
-    return pwd_context.hash(password)
+    return _get_pwd_context().hash(password)
+
+
+@lru_cache(maxsize=1)
+def _default_password_hash(password: str) -> str:
+    """配置中默认密码的哈希（每次 bcrypt 约 0.2 秒，只计算一次）"""
+    return get_password_hash(password)
 
 
 def authenticate_user(db: Session, username: str, password: str) -> User | None:
@@ -152,7 +192,7 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
         if username == settings.auth_username and password == settings.auth_password:
             # 返回一个临时用户对象（不保存到数据库）
             temp_user = User(
-                id=0, username=username, password_hash=get_password_hash(password)
+                id=0, username=username, password_hash=_default_password_hash(password)
             )
             return temp_user
 
@@ -164,6 +204,16 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
     return user
 
 
+def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """获取当前管理员用户（配置中的管理员账户，API Key 认证的请求不是管理员）"""
+    if current_user.username != settings.auth_username:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="需要管理员权限",
+        )
+    return current_user
+
+
 def verify_credentials(credentials: HTTPBasicCredentials) -> bool:
     """简单验证凭据（用于兼容 frps 认证）"""
     correct_username = secrets.compare_digest(
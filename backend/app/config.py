@@ -13,9 +13,26 @@ class Settings(BaseSettings):
     app_host: str = "0.0.0.0"
     app_port: int = 8000
     app_debug: bool = False
+    app_workers: int = 1  # uvicorn worker 进程数（大于 1 时由主进程选举保证定时任务只在一个进程中执行）
+    app_shutdown_timeout: int = 10  # 关闭时等待进行中请求的秒数，超时后断开（/api/events 长连接不会自行结束）
 
     # 数据库配置
     database_url: str = "sqlite:///./data/frp_agent.db"
+    db_pool_size: int = 5  # 连接池常驻连接数
+    db_max_overflow: int = 10  # 连接池满时允许额外创建的连接数
+    db_pool_timeout: int = 30  # 等待空闲连接的秒数
+    db_pool_recycle: int = 1800  # 连接使用超过该秒数后重建（-1 表示不重建）
+    sqlite_journal_mode: str = "WAL"  # WAL 模式下读取不会被同步写入阻塞（DELETE 为 SQLite 默认的回滚日志模式）
+    sqlite_synchronous: str = "NORMAL"  # WAL 模式下 NORMAL 不会损坏数据库，只可能丢失断电前最后几次提交
+    sqlite_cache_size_kb: int = 65536  # 每个连接的页缓存大小
+    sqlite_mmap_size_mb: int = 256  # 内存映射读取的大小（0 表示关闭）
+    sqlite_busy_timeout_ms: int = 5000  # 数据库被锁定时等待的毫秒数
+    database_read_url: str = ""  # 只读副本地址（如 PostgreSQL 备库），为空时只读接口读取主库
+    db_read_engine_enabled: bool = True  # 列表、配置下载、历史等只读接口使用独立的只读连接池（SQLite 为 query_only 连接）
+
+    # 数据库迁移配置
+    migrations_auto_run: bool = True  # 启动时自动执行未应用的迁移（关闭后需要手动执行 python -m app.migrations）
+    migration_batch_size: int = 5000  # 改写数据的迁移每批处理的行数（每批单独提交，避免长时间锁住大数据库）
 
     # 认证配置
     auth_username: str = "admin"
@@ -32,6 +49,53 @@ class Settings(BaseSettings):
     # 同步任务配置
     sync_interval_seconds: int = 1800  # 30分钟
 
+    # 多进程部署配置（多个 worker 或容器共用一个数据库时，只有选出的主进程执行定时任务）
+    leader_election_enabled: bool = True  # 关闭后每个进程都执行定时任务（确定只运行一个进程时可以关闭）
+    leader_lease_seconds: int = 60  # 主进程租约时长，主进程异常退出后其他进程最多等待这么久接替
+    leader_renew_interval_seconds: int = 15  # 续约和竞选的间隔，应明显小于租约时长
+    event_relay_interval_seconds: float = 1.0  # 轮询其他进程发布的事件的间隔（/api/events 在从进程上的延迟）
+
+    # 历史记录配置
+    history_hot_days: int = 30  # 历史记录在主表中保留的天数，更早的按月转移到分区表
+    history_retention_days: int = 180  # 原始历史记录保留天数，超过的分区按天汇总后删除（0 表示永久保留）
+    history_daily_retention_days: int = 730  # 按天汇总记录的保留天数（0 表示永久保留）
+    history_maintenance_interval_hours: int = 24  # 历史记录维护任务间隔
+
+    # 流量时序数据配置
+    traffic_capture_enabled: bool = True  # 同步时记录每个代理的流量和连接数
+    traffic_rollup_interval_minutes: int = 5  # 降采样任务间隔
+    traffic_raw_retention_hours: int = 24  # 每次同步的原始采样保留小时数
+    traffic_minute_retention_hours: int = 48  # 1 分钟汇总保留小时数
+    traffic_hour_retention_days: int = 90  # 1 小时汇总保留天数
+    traffic_day_retention_days: int = 730  # 1 天汇总保留天数（0 表示永久保留）
+
+    # 导入配置
+    import_batch_size: int = 1000  # 流式导入每批写入的代理数
+    import_job_dir: str = "./data/import_jobs"  # 后台导入任务上传文件的保存目录
+
+    # 批量导出配置
+    config_bundle_workers: int = 4  # 渲染配置的进程数（0 表示在当前进程中渲染）
+
+    # 监控指标配置
+    metrics_enabled: bool = True  # 是否开放 /metrics 端点（Prometheus 格式）
+    metrics_auth_required: bool = True  # /metrics 是否需要认证（Basic Auth 或 Bearer API Key，与其他接口相同）
+    metrics_proxy_status_enabled: bool = True  # 是否按代理导出在线状态（代理数很多时可关闭以控制序列数）
+
+    # 请求剖析配置（用于排查慢请求和 N+1 查询）
+    profiling_enabled: bool = False  # 是否统计每个请求的 SQL 语句并记录慢请求
+    profiling_sample_rate: float = 0.0  # 做调用栈采样的请求比例（已认证或来自允许地址的请求可用请求头 X-Profile: 1 强制采样）
+    profiling_header_allowed_ips: str = "127.0.0.1,::1"  # 不需要认证即可使用 X-Profile 请求头的客户端地址（逗号分隔）
+    profiling_sample_interval_ms: float = 5.0  # 调用栈采样间隔
+    profiling_slow_request_ms: int = 1000  # 超过该耗时的请求记录摘要
+    profiling_slow_query_ms: int = 200  # 超过该耗时的单条 SQL 写入慢查询日志
+    profiling_repeated_query_threshold: int = 20  # 同一语句在一个请求内执行超过该次数时视为疑似 N+1
+    profiling_history_size: int = 100  # 保留的最近请求摘要条数
+
+    # 临时配置存储
+    temp_config_dir: str = "./data/temp_configs"  # 临时配置内容的磁盘存储目录（按内容哈希寻址）
+    temp_config_cache_max_bytes: int = 64 * 1024 * 1024  # 内存缓存的最大字节数
+    temp_config_cache_max_entries: int = 10000  # 内存缓存的最大条目数
+
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -42,3 +106,13 @@ class Settings(BaseSettings):
 def get_settings() -> Settings:
     """获取配置单例"""
     return Settings()
+
+
+def resolve_data_dir(path: str) -> str:
+    """解析数据目录（相对路径相对于项目根目录）并确保目录存在"""
+    if not os.path.isabs(path):
+        # config.py 在 backend/app/config.py
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        path = os.path.join(project_root, os.path.normpath(path))
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -1,14 +1,21 @@
 """数据库连接管理"""
+import logging
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from app.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
+SQLITE_JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SQLITE_SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
 # 处理 SQLite 数据库路径（确保数据目录存在）
 database_url = settings.database_url
 if "sqlite" in database_url and ":///" in database_url:
@@ -35,21 +42,197 @@ if "sqlite" in database_url and ":///" in database_url:
             full_db_path = full_db_path.replace('\\', '/')
         database_url = f"sqlite:///{full_db_path}"
 
+
+def sync_database_url(url: str) -> str:
+    """同步引擎使用的连接 URL
+
+    PostgreSQL 的 ORM 代码在线程池中同步执行，统一使用 psycopg 驱动；
+    postgres:// 和 postgresql+asyncpg:// 形式的 URL 都会转换过来。
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "postgresql" and parsed.get_driver_name() != "psycopg":
+        parsed = parsed.set(drivername="postgresql+psycopg")
+    return parsed.render_as_string(hide_password=False)
+
+
+def async_database_url(url: str) -> str:
+    """异步引擎使用的连接 URL（PostgreSQL 使用 asyncpg，SQLite 使用 aiosqlite）"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    elif backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    else:
+        raise ValueError(f"不支持异步访问的数据库: {backend}")
+    return parsed.render_as_string(hide_password=False)
+
+
+if database_url.startswith("postgres://"):
+    # Heroku 等平台给出的 postgres:// 不是 SQLAlchemy 认可的方言名称
+    database_url = "postgresql://" + database_url[len("postgres://"):]
+database_url = sync_database_url(database_url)
+
+
+def _engine_options(url: str, read_only: bool = False) -> dict:
+    """根据数据库类型生成连接参数和连接池配置"""
+    if "sqlite" not in url:
+        options = {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+            "pool_recycle": settings.db_pool_recycle,
+            "pool_pre_ping": True,
+        }
+        if read_only and make_url(url).get_backend_name() == "postgresql":
+            # 连接上的事务默认只读，误写入时直接报错而不是写到主库
+            options["connect_args"] = {"options": "-c default_transaction_read_only=on"}
+        return options
+    options = {
+        "connect_args": {
+            "check_same_thread": False,
+            # sqlite3 模块自身的锁等待时间，和 busy_timeout 保持一致
+            "timeout": settings.sqlite_busy_timeout_ms / 1000,
+        }
+    }
+    if make_url(url).database not in (None, "", ":memory:"):
+        # 文件数据库使用 QueuePool，内存数据库由 SQLAlchemy 选择单连接池
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+    return options
+
+
+def sqlite_pragmas() -> list:
+    """每个新连接执行的 PRAGMA 语句"""
+    journal_mode = settings.sqlite_journal_mode.upper()
+    synchronous = settings.sqlite_synchronous.upper()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"不支持的 sqlite_journal_mode: {settings.sqlite_journal_mode}")
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"不支持的 sqlite_synchronous: {settings.sqlite_synchronous}")
+    return [
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        # 负数表示以 KB 为单位
+        f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kb)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size_mb) * 1024 * 1024}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def configure_sqlite(target_engine, read_only: bool = False) -> None:
+    """在连接建立时应用 SQLite 调优参数
+
+    WAL 模式下读连接读取提交前的快照，不再等待同步任务的写事务提交，
+    写入只追加 WAL 文件，配合 synchronous=NORMAL 每次提交不再需要 fsync 主数据库文件。
+    read_only 时连接开启 query_only，任何写入语句都会报错。
+    同时注册搜索服务使用的 similarity 函数。
+    """
+    pragmas = sqlite_pragmas()
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    reported = []
+
+    @event.listens_for(target_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        # 模糊搜索使用与 pg_trgm 同名同义的 similarity 函数（搜索服务依赖模型，延迟导入）
+        from app.services.search_service import trigram_similarity
+
+        dbapi_connection.create_function("similarity", 2, trigram_similarity, deterministic=True)
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            if not reported:
+                # 部分文件系统（如网络存储）不支持 WAL，SQLite 会保持原来的日志模式
+                cursor.execute("PRAGMA journal_mode")
+                journal_mode = cursor.fetchone()[0]
+                reported.append(journal_mode)
+                if journal_mode.upper() != settings.sqlite_journal_mode.upper():
+                    logger.warning(
+                        f"SQLite 日志模式为 {journal_mode}，未能切换到 {settings.sqlite_journal_mode}"
+                    )
+        finally:
+            cursor.close()
+
+
 # 创建数据库引擎
-engine = create_engine(
-    database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in database_url else {}
-)
+engine = create_engine(database_url, **_engine_options(database_url))
+if engine.dialect.name == "sqlite":
+    configure_sqlite(engine)
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _create_read_engine():
+    """只读引擎：配置了只读副本时连接副本，否则用独立的只读连接池访问主库
+
+    轮询较多的读接口不再和同步任务、写接口争用同一个连接池；
+    SQLite 内存数据库无法从另一个连接池访问，继续使用主引擎。
+    """
+    read_url = settings.database_read_url
+    if read_url:
+        if read_url.startswith("postgres://"):
+            read_url = "postgresql://" + read_url[len("postgres://"):]
+        read_url = sync_database_url(read_url)
+    elif not settings.db_read_engine_enabled or (
+        engine.dialect.name == "sqlite" and engine.url.database in (None, "", ":memory:")
+    ):
+        return engine
+    else:
+        read_url = database_url
+    target = create_engine(read_url, **_engine_options(read_url, read_only=True))
+    if target.dialect.name == "sqlite":
+        configure_sqlite(target, read_only=True)
+    return target
+
+
+read_engine = _create_read_engine()
+
+# 只读会话工厂（只读接口使用，不能写入）
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+_async_engine = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    """异步引擎（首次使用时创建，需要安装 asyncpg 或 aiosqlite）"""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        url = async_database_url(database_url)
+        if engine.dialect.name == "sqlite":
+            # aiosqlite 在自己的线程中访问连接，使用 SQLAlchemy 默认的连接池
+            options = {"connect_args": {"timeout": settings.sqlite_busy_timeout_ms / 1000}}
+        else:
+            options = _engine_options(database_url)
+        _async_engine = create_async_engine(url, **options)
+        if engine.dialect.name == "sqlite":
+            configure_sqlite(_async_engine.sync_engine)
+        _async_session_factory = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+def AsyncSessionLocal():
+    """创建异步会话"""
+    get_async_engine()
+    return _async_session_factory()
+
+
 # 创建基类
 Base = declarative_base()
 
 
 def get_db() -> Generator[Session, None, None]:
-    """获取数据库会话"""
+    """获取读写数据库会话（会写入数据的接口使用）"""
     db = SessionLocal()
     try:
         yield db
@@ -57,6 +240,64 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def get_read_db() -> Generator[Session, None, None]:
+    """获取只读数据库会话（列表、配置下载、历史等只读接口使用）
+
+    配置了只读副本时读取副本，可能比主库略有延迟；写入后需要立即读到结果的接口使用 get_db。
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator:
+    """获取异步数据库会话（用于 async 路由，避免在事件循环中执行同步查询）"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _dialect_name(bind) -> str:
+    return bind.get_bind().dialect.name if isinstance(bind, Session) else bind.dialect.name
+
+
+def upsert(bind, table, index_elements, update, source=None):
+    """生成 INSERT ... ON CONFLICT (index_elements) DO UPDATE 语句（SQLite 3.24+ / PostgreSQL）
+
+    Args:
+        bind: 会话或连接，用于判断数据库方言
+        table: 目标表
+        index_elements: 唯一约束包含的列名
+        update: 接收 excluded（冲突时本应插入的行），返回冲突时要更新的列
+        source: (列名列表, select) 时使用 INSERT ... SELECT，否则执行时传入行数据
+
+    Returns:
+        语句；不支持 ON CONFLICT 的数据库返回 None，由调用方使用先查询再写入的方式
+    """
+    dialect = _dialect_name(bind)
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    stmt = dialect_insert(table)
+    if source is not None:
+        stmt = stmt.from_select(*source)
+    return stmt.on_conflict_do_update(index_elements=index_elements, set_=update(stmt.excluded))
+
+
+def greatest(bind, *args):
+    """取最大值的 SQL 函数（SQLite 的多参数 max，PostgreSQL 的 greatest）"""
+    return func.max(*args) if _dialect_name(bind) == "sqlite" else func.greatest(*args)
+
+
+def least(bind, *args):
+    """取最小值的 SQL 函数（SQLite 的多参数 min，PostgreSQL 的 least）"""
+    return func.min(*args) if _dialect_name(bind) == "sqlite" else func.least(*args)
+
+
 def init_db():
     """初始化数据库"""
     Base.metadata.create_all(bind=engine)
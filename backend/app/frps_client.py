@@ -1,7 +1,49 @@
 """frps API 客户端"""
-import httpx
-from typing import List, Dict, Optional
+import logging
+import time
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
 from app.models.frps_server import FrpsServer
+from app.metrics import FRPS_REQUEST_ERRORS, FRPS_REQUEST_SECONDS
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+PROXY_TYPES = ("tcp", "udp", "http", "https")
+
+
+class _ServerSnapshot:
+    """上一次同步时的 serverinfo 指纹和各类型代理列表"""
+    
+    def __init__(self, fingerprint: Tuple, type_counts: Dict[str, int], proxies: Dict[str, List[Dict]]):
+        self.fingerprint = fingerprint
+        self.type_counts = type_counts
+        self.proxies = proxies
+
+
+# 每个服务器最近一次完整获取的代理列表（用于 serverinfo 预检查）
+_snapshots: Dict[int, _ServerSnapshot] = {}
+
+# 预检查复用（skipped）和实际拉取（fetched）的代理类型次数，作为缓存命中率导出
+precheck_stats = {"skipped": 0, "fetched": 0}
+
+
+def _async_client() -> "httpx.AsyncClient":
+    """创建请求 frps 的 HTTP 客户端（httpx 在首次同步时才导入，不计入应用启动时间）"""
+    import httpx
+
+    return httpx.AsyncClient(timeout=10.0)
+
+
+def _server_fingerprint(server_info: Dict) -> Tuple:
+    """serverinfo 中与代理列表内容相关的全局指标（流量、连接数、客户端数）"""
+    return (
+        server_info.get("totalTrafficIn"),
+        server_info.get("totalTrafficOut"),
+        server_info.get("curConns"),
+        server_info.get("clientCounts"),
+    )
 
 
 class FrpsClient:
@@ -16,44 +58,65 @@ class FrpsClient:
         self.server = server
         self.base_url = server.api_base_url.rstrip("/")
         self.auth = (server.auth_username, server.auth_password)
+        # 最近一次 get_all_proxies 获取到的 serverinfo 和跳过拉取的代理类型
+        self.server_info: Optional[Dict] = None
+        self.skipped_types: List[str] = []
     
-    async def get_tcp_proxies(self) -> List[Dict]:
-        """获取 TCP 代理列表
+    async def get_server_info(self, client: Optional["httpx.AsyncClient"] = None) -> Optional[Dict]:
+        """获取服务器全局信息（总流量、连接数、客户端数、各类型代理数）
+        
+        Args:
+            client: 复用的 HTTP 客户端，不传时创建新的客户端
         
         Returns:
-            代理列表
+            serverinfo 数据，获取失败返回 None
         """
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.base_url}/proxy/tcp",
-                    auth=self.auth
-                )
-                response.raise_for_status()
-                data = response.json()
+            if client is not None:
+                return await self._fetch_json(client, "/serverinfo")
+            async with _async_client() as new_client:
+                return await self._fetch_json(new_client, "/serverinfo")
+        except Exception as e:
+            logger.warning(f"获取服务器信息失败: {e}")
+            return None
+    
+    async def _fetch_json(self, client: "httpx.AsyncClient", path: str) -> Dict:
+        endpoint = path.lstrip("/")
+        started = time.perf_counter()
+        try:
+            response = await client.get(f"{self.base_url}{path}", auth=self.auth)
+            response.raise_for_status()
+            return response.json()
+        except Exception:
+            FRPS_REQUEST_ERRORS.labels(self.server.name, endpoint).inc()
+            raise
+        finally:
+            FRPS_REQUEST_SECONDS.labels(self.server.name, endpoint).observe(time.perf_counter() - started)
+    
+    async def _get_proxies(self, proxy_type: str) -> List[Dict]:
+        try:
+            async with _async_client() as client:
+                data = await self._fetch_json(client, f"/proxy/{proxy_type}")
                 return data.get("proxies", [])
         except Exception as e:
-            print(f"获取 TCP 代理失败: {e}")
+            logger.warning(f"获取 {proxy_type.upper()} 代理失败: {e}")
             return []
     
+    async def get_tcp_proxies(self) -> List[Dict]:
+        """获取 TCP 代理列表
+        
+        Returns:
+            代理列表
+        """
+        return await self._get_proxies("tcp")
+    
     async def get_udp_proxies(self) -> List[Dict]:
         """获取 UDP 代理列表
         
         Returns:
             代理列表
         """
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.base_url}/proxy/udp",
-                    auth=self.auth
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data.get("proxies", [])
-        except Exception as e:
-            print(f"获取 UDP 代理失败: {e}")
-            return []
+        return await self._get_proxies("udp")
     
     async def get_http_proxies(self) -> List[Dict]:
         """获取 HTTP 代理列表
@@ -61,18 +124,7 @@ class FrpsClient:
         Returns:
             代理列表
         """
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.base_url}/proxy/http",
-                    auth=self.auth
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data.get("proxies", [])
-        except Exception as e:
-            print(f"获取 HTTP 代理失败: {e}")
-            return []
+        return await self._get_proxies("http")
     
     async def get_https_proxies(self) -> List[Dict]:
         """获取 HTTPS 代理列表
@@ -80,36 +132,60 @@ class FrpsClient:
         Returns:
             代理列表
         """
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{self.base_url}/proxy/https",
-                    auth=self.auth
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data.get("proxies", [])
-        except Exception as e:
-            print(f"获取 HTTPS 代理失败: {e}")
-            return []
+        return await self._get_proxies("https")
     
-    async def get_all_proxies(self) -> Dict[str, List[Dict]]:
+    async def get_all_proxies(self, precheck: bool = False) -> Dict[str, List[Dict]]:
         """获取所有类型的代理
         
+        Args:
+            precheck: 先获取 serverinfo，某类型的代理数和服务器总流量、连接数、客户端数
+                都与上次完整获取时相同，则复用上次的代理列表，不再拉取该类型
+        
         Returns:
             按类型分组的代理字典
         """
-        tcp_proxies = await self.get_tcp_proxies()
-        udp_proxies = await self.get_udp_proxies()
-        http_proxies = await self.get_http_proxies()
-        https_proxies = await self.get_https_proxies()
+        self.skipped_types = []
+        snapshot = _snapshots.get(self.server.id) if precheck else None
+        result = {}
+        failed = False
         
-        return {
-            "tcp": tcp_proxies,
-            "udp": udp_proxies,
-            "http": http_proxies,
-            "https": https_proxies,
-        }
+        async with _async_client() as client:
+            if precheck:
+                # 获取失败时 server_info 为 None，完整拉取代理列表
+                self.server_info = await self.get_server_info(client)
+            
+            fingerprint = _server_fingerprint(self.server_info) if self.server_info else None
+            type_counts = (self.server_info or {}).get("proxyTypeCount") or {}
+            
+            for proxy_type in PROXY_TYPES:
+                if (
+                    snapshot is not None and fingerprint is not None
+                    and snapshot.fingerprint == fingerprint
+                    and snapshot.type_counts.get(proxy_type, 0) == type_counts.get(proxy_type, 0)
+                ):
+                    result[proxy_type] = snapshot.proxies[proxy_type]
+                    self.skipped_types.append(proxy_type)
+                    precheck_stats["skipped"] += 1
+                    continue
+                if precheck:
+                    precheck_stats["fetched"] += 1
+                try:
+                    data = await self._fetch_json(client, f"/proxy/{proxy_type}")
+                    result[proxy_type] = data.get("proxies", [])
+                except Exception as e:
+                    logger.warning(f"获取 {proxy_type.upper()} 代理失败: {e}")
+                    result[proxy_type] = []
+                    failed = True
+        
+        if precheck:
+            if fingerprint is not None and not failed:
+                _snapshots[self.server.id] = _ServerSnapshot(fingerprint, dict(type_counts), result)
+            else:
+                _snapshots.pop(self.server.id, None)
+            if self.skipped_types:
+                logger.info(f"{self.server.name} 的 {', '.join(self.skipped_types)} 代理未变化，跳过拉取")
+        
+        return result
     
     async def get_proxy_by_name(self, name: str, proxy_type: str = "tcp") -> Optional[Dict]:
         """根据名称获取代理信息
@@ -3,12 +3,14 @@ import sys
 import secrets
 import hashlib
 import base64
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.database import engine, SessionLocal, Base
 from app.models import User, FrpsServer, Proxy, PortAllocation, ProxyHistory, ApiKey
 from app.auth import get_password_hash
 from app.config import get_settings
+from app.services.search_service import init_search_index
 
 settings = get_settings()
 
@@ -40,6 +42,10 @@ def init_database():
     Base.metadata.create_all(bind=engine)
     
     print("✓ 数据库表创建成功")
+    
+    # 创建名称搜索索引
+    if init_search_index(engine):
+        print("✓ 搜索索引创建成功")
 
 
 def create_default_user(db: Session):
@@ -58,7 +64,13 @@ def create_default_user(db: Session):
     )
     
     db.add(admin_user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # 多个 worker 同时启动时，其他进程已经先创建了管理员账户
+        db.rollback()
+        print(f"管理员账户 '{settings.auth_username}' 已存在")
+        return
     
     print(f"✓ 创建默认管理员账户: {settings.auth_username}")
 
@@ -0,0 +1,96 @@
+"""定时任务主进程选举
+
+多个进程（uvicorn 多 worker 或多个容器）共用一个数据库时，通过 scheduler_leases 表中的租约行选出一个主进程：
+只有持有未过期租约的进程执行同步、清理等定时任务，所有进程都处理 API 请求。
+主进程定期续约，正常退出时释放租约；异常退出后租约过期，其他进程在下一次竞选时接替。
+租约时间使用各进程的本机时钟（UTC），多台主机部署时需要同步时钟。
+"""
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import engine
+from app.models.scheduler_lease import SchedulerLease
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+LEASE_NAME = "scheduler"
+
+# 当前进程的标识：同一主机上的 worker 进程号不同，随机后缀区分主机名和进程号都相同的容器
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_leases = SchedulerLease.__table__
+
+
+def acquire_or_renew(name: str = LEASE_NAME, holder: str = PROCESS_ID, lease_seconds: Optional[int] = None) -> bool:
+    """取得或续约租约
+
+    已持有时延长截止时间；租约不存在或已过期时由当前进程接替。
+    接替使用带条件的 UPDATE，多个进程同时竞选时数据库只会让其中一个更新成功。
+
+    Returns:
+        当前进程是否持有租约
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=lease_seconds or settings.leader_lease_seconds)
+    with engine.begin() as conn:
+        renewed = conn.execute(
+            update(_leases)
+            .where(_leases.c.name == name, _leases.c.holder == holder)
+            .values(expires_at=expires_at)
+        ).rowcount
+        if renewed:
+            return True
+        taken_over = conn.execute(
+            update(_leases)
+            .where(_leases.c.name == name, _leases.c.expires_at < now)
+            .values(holder=holder, acquired_at=now, expires_at=expires_at)
+        ).rowcount
+        if taken_over:
+            return True
+        if conn.execute(select(_leases.c.name).where(_leases.c.name == name)).first():
+            return False
+
+    # 首次竞选时还没有租约行，主键冲突说明其他进程抢先插入
+    try:
+        with engine.begin() as conn:
+            conn.execute(insert(_leases).values(name=name, holder=holder, acquired_at=now, expires_at=expires_at))
+        return True
+    except IntegrityError:
+        return False
+
+
+def hold_lease(db: Session, name: str = LEASE_NAME, holder: str = PROCESS_ID, lease_seconds: Optional[int] = None) -> bool:
+    """在调用方的事务中确认仍持有未过期的租约，并顺便续约
+
+    定时任务提交结果前调用：更新租约行会锁住该行（SQLite 为整个数据库），
+    其他进程的接替要等这次提交完成后才能执行，因此确认之后、提交之前不会被接替。
+    不再持有时调用方应回滚。
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=lease_seconds or settings.leader_lease_seconds)
+    held = db.execute(
+        update(_leases)
+        .where(_leases.c.name == name, _leases.c.holder == holder, _leases.c.expires_at >= now)
+        .values(expires_at=expires_at)
+    ).rowcount
+    return bool(held)
+
+
+def release(name: str = LEASE_NAME, holder: str = PROCESS_ID) -> bool:
+    """释放当前进程持有的租约（其他进程下一次竞选时立即接替，不用等租约过期）"""
+    with engine.begin() as conn:
+        released = conn.execute(
+            delete(_leases).where(_leases.c.name == name, _leases.c.holder == holder)
+        ).rowcount
+    return bool(released)
+
@@ -2,21 +2,36 @@
 
 后端提供 RESTful API，前端由 Vue + Vite 构建，构建后的静态文件由 FastAPI 服务。
 """
+import time
+
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict
 import logging
 import os
 
+from app.auth import get_current_user
 from app.config import get_settings
-from app.database import init_db, get_db, SessionLocal
-from app.routers import frps_server, proxy, port, config, sync, user_settings, group, frpc_config, config_import, api_key
-from app.scheduler import start_scheduler, shutdown_scheduler
+from app.database import init_db, get_async_db, SessionLocal, engine
+from app.routers import frps_server, proxy, port, config, sync, user_settings, group, frpc_config, config_import, api_key, stats, traffic, events, profiling
+from app.scheduler import get_last_sync_finished_at, get_scheduler_role, start_scheduler, shutdown_scheduler
 from app.init_db import create_default_api_key, create_default_user
-from sqlalchemy.orm import Session
+from app.migrations.runner import pending_migrations, run_migrations
+from app.services.search_service import init_search_index
+from app.services.stats_service import StatsService
+from app.services.import_job_service import start_import_worker, shutdown_import_worker
+from app.services.event_relay import start_event_relay, shutdown_event_relay
+from app.services.config_bundle_service import shutdown_render_pool
+from app.metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, instrument_engine, register_state_collector, render_latest
+from app.profiling import ProfilingMiddleware, install_query_profiler
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 
 # 配置日志
@@ -28,34 +43,93 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+# 启动各步骤耗时（秒），import 为导入应用模块的耗时
+startup_timings: Dict[str, float] = {}
+
+
+@contextmanager
+def _startup_step(name: str):
+    """记录一个启动步骤的耗时"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_timings[name] = round(time.perf_counter() - start, 3)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """应用生命周期管理"""
-    # 启动时初始化数据库
+    """应用生命周期管理
+    
+    启动时只做开始服务前必须完成的工作，首次同步由调度器在后台执行，
+    各步骤耗时记录在日志和 /api/health 中。
+    """
+    started = time.perf_counter()
+    
+    # 启动时初始化数据库并执行未应用的迁移
     logger.info("初始化数据库...")
-    init_db()
+    with _startup_step("migrations"):
+        if settings.migrations_auto_run:
+            run_migrations()
+        else:
+            init_db()
+            pending = pending_migrations()
+            if pending:
+                logger.warning(f"有 {len(pending)} 个迁移未执行，请运行 python -m app.migrations: {', '.join(pending)}")
     
-    # 创建默认用户和 API Key（如果不存在）
+    # 初始化名称搜索索引（SQLite FTS5 / PostgreSQL pg_trgm）
+    with _startup_step("search_index"):
+        init_search_index(engine)
+    
+    # 创建默认用户和 API Key（如果不存在，只有新数据库才会执行 bcrypt 哈希）
     logger.info("检查并创建默认用户和 API Key...")
-    db = SessionLocal()
-    try:
-        create_default_user(db)
-        create_default_api_key(db)
-    except Exception as e:
-        logger.error(f"创建默认用户或 API Key 失败: {e}")
-    finally:
-        db.close()
+    with _startup_step("default_user"):
+        db = SessionLocal()
+        try:
+            create_default_user(db)
+            create_default_api_key(db)
+        except Exception as e:
+            logger.error(f"创建默认用户或 API Key 失败: {e}")
+        finally:
+            db.close()
+    
+    # 首次升级时从现有代理重建统计计数
+    with _startup_step("stats"):
+        db = SessionLocal()
+        try:
+            StatsService(db).ensure_initialized()
+        except Exception as e:
+            logger.error(f"初始化统计计数失败: {e}")
+        finally:
+            db.close()
     
-    # 启动定时任务
+    # 启动定时任务（首次同步在开始服务后于后台执行）
     logger.info("启动定时同步任务...")
-    await start_scheduler()
+    with _startup_step("scheduler"):
+        await start_scheduler()
+    
+    # 启动后台导入任务（继续执行上次未完成的任务；启用主进程选举时当选主进程后才执行）
+    with _startup_step("import_worker"):
+        await start_import_worker(run_jobs=not settings.leader_election_enabled)
+    
+    # 多进程部署时转发其他进程发布的事件
+    with _startup_step("event_relay"):
+        await start_event_relay()
+    
+    startup_timings["total"] = round(time.perf_counter() - started, 3)
+    logger.info(
+        f"启动完成，用时 {startup_timings['total']:.2f} 秒（导入应用 {startup_timings['import']:.2f} 秒）: "
+        + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in startup_timings.items() if name not in ("import", "total"))
+    )
     
     yield
     
     # 关闭时清理资源
     logger.info("关闭定时任务...")
     shutdown_scheduler()
+    shutdown_import_worker()
+    shutdown_event_relay()
+    shutdown_render_pool()
 
 
 # 创建应用
@@ -83,6 +157,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 请求耗时和每个请求的数据库耗时指标
+if settings.metrics_enabled:
+    instrument_engine(engine)
+    register_state_collector()
+    app.add_middleware(MetricsMiddleware)
+
+# 请求剖析：统计每个请求的 SQL 语句，记录慢请求、慢查询和疑似 N+1 查询
+if settings.profiling_enabled:
+    install_query_profiler(engine)
+    app.add_middleware(ProfilingMiddleware)
+
 # 注册路由
 app.include_router(frps_server.router)
 app.include_router(proxy.router)
@@ -94,18 +179,39 @@ app.include_router(user_settings.router)
 app.include_router(group.router)
 app.include_router(frpc_config.router)
 app.include_router(api_key.router)
+app.include_router(stats.router)
+app.include_router(traffic.router)
+app.include_router(events.router)
+app.include_router(profiling.router)
+
+# 导入应用模块（FastAPI、SQLAlchemy、路由注册）的耗时
+startup_timings["import"] = round(time.perf_counter() - _import_started, 3)
 
 # 健康检查端点
 @app.get("/api/health")
-async def health_check(db: Session = Depends(get_db)):
-    """健康检查端点"""
+async def health_check(db: AsyncSession = Depends(get_async_db)):
+    """健康检查端点（使用异步会话，数据库无响应时不占用线程池）
+    
+    ready 表示启动后的首次同步是否已完成：未完成时接口可以正常使用，
+    但代理状态还是上次关闭前的数据。role 表示当前进程是否为执行定时任务的主进程，
+    从进程不执行同步，完成竞选后即为 ready。
+    """
+    last_sync = get_last_sync_finished_at()
+    role = get_scheduler_role()
+    readiness = {
+        "ready": last_sync is not None or role == "follower",
+        "role": role,
+        "last_sync_at": last_sync.isoformat() if last_sync else None,
+        "startup_seconds": startup_timings.get("total"),
+    }
     try:
         # 测试数据库连接
-        db.execute("SELECT 1")
+        await db.execute(text("SELECT 1"))
         return {
             "status": "healthy",
             "service": "frp-agent",
-            "database": "connected"
+            "database": "connected",
+            **readiness
         }
     except Exception as e:
         logger.error(f"健康检查失败: {e}")
@@ -113,9 +219,21 @@ async def health_check(db: Session = Depends(get_db)):
             "status": "unhealthy",
             "service": "frp-agent",
             "database": "disconnected",
-            "error": str(e)
+            "error": str(e),
+            **readiness
         }
 
+# Prometheus 指标端点
+if settings.metrics_enabled:
+    @app.get(
+        "/metrics",
+        include_in_schema=False,
+        dependencies=[Depends(get_current_user)] if settings.metrics_auth_required else [],
+    )
+    def metrics():
+        """导出 Prometheus 文本格式的指标（在线程池中执行，抓取时会查询数据库）"""
+        return Response(render_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
 # 配置静态文件服务（前端构建文件）
 # 检测 dist 目录位置：Docker 环境在 /app/dist，本地开发在项目根目录的 dist
 current_file = os.path.abspath(__file__)
@@ -0,0 +1,269 @@
+"""Prometheus 指标
+
+/metrics 端点以 Prometheus 文本格式导出以下指标：
+- frps API 请求耗时和失败次数（按服务器、接口）
+- 定时同步各阶段耗时（拉取、比对、冲突检测、写入）以及每次同步写入的行数
+- 每个 HTTP 请求的耗时、SQL 语句数和数据库耗时（按路由模板）
+- 缓存命中情况（临时配置 LRU 缓存、serverinfo 预检查复用的代理列表）
+- 每个代理的在线状态和按服务器汇总的状态计数（抓取时从数据库读取）
+"""
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event, func
+from sqlalchemy.engine import Engine
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# 数据库语句耗时通常在毫秒级，使用更细的分桶
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+FRPS_REQUEST_SECONDS = Histogram(
+    "frp_agent_frps_request_seconds",
+    "frps 管理 API 请求耗时",
+    ["server", "endpoint"],
+)
+FRPS_REQUEST_ERRORS = Counter(
+    "frp_agent_frps_request_errors",
+    "frps 管理 API 请求失败次数",
+    ["server", "endpoint"],
+)
+SYNC_PHASE_SECONDS = Histogram(
+    "frp_agent_sync_phase_seconds",
+    "定时同步各阶段耗时（fetch / diff / conflicts / write）",
+    ["server", "phase"],
+    buckets=DB_BUCKETS + (10.0, 30.0),
+)
+SYNC_ROWS_WRITTEN = Counter(
+    "frp_agent_sync_rows_written",
+    "定时同步写入的行数（inserted / updated）",
+    ["server", "kind"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "frp_agent_http_request_seconds",
+    "HTTP 请求耗时",
+    ["method", "route", "status"],
+)
+DB_QUERY_SECONDS = Histogram(
+    "frp_agent_db_query_seconds",
+    "每个 HTTP 请求内 SQL 语句的累计耗时",
+    ["route"],
+    buckets=DB_BUCKETS,
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "frp_agent_db_queries_per_request",
+    "每个 HTTP 请求执行的 SQL 语句数",
+    ["route"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+DB_STATEMENT_SECONDS = Histogram(
+    "frp_agent_db_statement_seconds",
+    "单条 SQL 语句耗时（包括后台任务）",
+    ["operation"],
+    buckets=DB_BUCKETS,
+)
+
+
+class RequestStats:
+    """当前请求内累计的 SQL 语句数和耗时"""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# 同步路由在线程池中执行时会复制上下文，共享同一个 RequestStats 对象
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """获取当前请求的 SQL 统计（不在 HTTP 请求内时返回 None）"""
+    return _request_stats.get()
+
+
+def _statement_operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    if keyword in ("select", "insert", "update", "delete", "with"):
+        return keyword
+    return "other"
+
+
+def instrument_engine(engine: Engine) -> None:
+    """在引擎上注册语句执行事件，记录每条语句的耗时"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start_time")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        DB_STATEMENT_SECONDS.labels(_statement_operation(statement)).observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+
+class MetricsMiddleware:
+    """记录 HTTP 请求耗时和请求内的数据库耗时（ASGI 中间件，不缓冲流式响应）"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = {"code": 500}
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            # 路由模板在路由匹配后写入 scope，未匹配的请求归为一类，避免标签基数膨胀
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route_path, str(status["code"])).observe(
+                time.perf_counter() - started
+            )
+            DB_QUERY_SECONDS.labels(route_path).observe(stats.db_seconds)
+            DB_QUERIES_PER_REQUEST.labels(route_path).observe(stats.queries)
+
+
+class PhaseTimer:
+    """按顺序记录同步各阶段耗时：每次 mark 记录距上一次 mark 的时间"""
+
+    def __init__(self, server: str):
+        self.server = server
+        self._last = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        SYNC_PHASE_SECONDS.labels(self.server, phase).observe(now - self._last)
+        self._last = now
+
+
+class _StateCollector:
+    """抓取时读取缓存命中计数和代理状态"""
+
+    def collect(self) -> Iterable:
+        yield from self._cache_metrics()
+        yield from self._proxy_metrics()
+
+    def describe(self) -> Iterable:
+        # 返回空列表，避免注册时调用 collect 访问数据库
+        return []
+
+    def _cache_metrics(self) -> Iterable:
+        from app.frps_client import precheck_stats
+        from app.services.temp_config_store import get_temp_config_store
+
+        hits = CounterMetricFamily(
+            "frp_agent_cache_hits",
+            "缓存命中次数",
+            labels=["cache"],
+        )
+        misses = CounterMetricFamily(
+            "frp_agent_cache_misses",
+            "缓存未命中次数",
+            labels=["cache"],
+        )
+        cache = get_temp_config_store().cache
+        hits.add_metric(["temp_config"], cache.hits)
+        misses.add_metric(["temp_config"], cache.misses)
+        hits.add_metric(["frps_proxy_list"], precheck_stats["skipped"])
+        misses.add_metric(["frps_proxy_list"], precheck_stats["fetched"])
+        yield hits
+        yield misses
+
+    def _proxy_metrics(self) -> Iterable:
+        from app.database import SessionLocal
+        from app.models.frps_server import FrpsServer
+        from app.models.proxy import Proxy
+        from app.models.proxy_counter import ProxyCounter, SERVER_SCOPE
+
+        db = SessionLocal()
+        try:
+            servers: Dict[int, str] = dict(db.query(FrpsServer.id, FrpsServer.name).all())
+
+            # 从增量维护的计数器表读取（每个服务器只有几行），抓取时不扫描代理表
+            totals = GaugeMetricFamily(
+                "frp_agent_proxies",
+                "按服务器和状态统计的代理数（既不是在线也不是离线的计入 unknown）",
+                labels=["server", "status"],
+            )
+            rows = (
+                db.query(
+                    ProxyCounter.frps_server_id,
+                    func.sum(ProxyCounter.total_count),
+                    func.sum(ProxyCounter.online_count),
+                    func.sum(ProxyCounter.offline_count),
+                )
+                .filter(ProxyCounter.group_name == SERVER_SCOPE)
+                .group_by(ProxyCounter.frps_server_id)
+                .all()
+            )
+            for server_id, total, online, offline in rows:
+                server = servers.get(server_id, str(server_id))
+                totals.add_metric([server, "online"], online or 0)
+                totals.add_metric([server, "offline"], offline or 0)
+                other = (total or 0) - (online or 0) - (offline or 0)
+                if other:
+                    totals.add_metric([server, "unknown"], other)
+            yield totals
+
+            if not settings.metrics_proxy_status_enabled:
+                return
+            status_gauge = GaugeMetricFamily(
+                "frp_agent_proxy_online",
+                "代理是否在线（1 在线，0 离线）",
+                labels=["server", "group", "proxy", "type"],
+            )
+            query = db.query(
+                Proxy.frps_server_id, Proxy.group_name, Proxy.name, Proxy.proxy_type, Proxy.status
+            ).yield_per(1000)
+            for server_id, group_name, name, proxy_type, status in query:
+                status_gauge.add_metric(
+                    [servers.get(server_id, str(server_id)), group_name or "", name, proxy_type or ""],
+                    1 if status == "online" else 0,
+                )
+            yield status_gauge
+        finally:
+            db.close()
+
+
+_state_collector_registered = False
+
+
+def register_state_collector() -> None:
+    """注册缓存和代理状态采集器（重复调用只注册一次）"""
+    global _state_collector_registered
+    if not _state_collector_registered:
+        REGISTRY.register(_StateCollector())
+        _state_collector_registered = True
+
+
+def render_latest() -> bytes:
+    """生成 Prometheus 文本格式的指标"""
+    return generate_latest(REGISTRY)
+
@@ -0,0 +1,29 @@
+"""执行数据库迁移
+
+使用方式（在 backend 目录下运行）:
+    python -m app.migrations            # 执行未应用的迁移
+    python -m app.migrations --status   # 查看每个迁移的执行时间和耗时
+"""
+import argparse
+import logging
+
+from app.migrations.runner import MIGRATIONS, applied_migrations, run_migrations
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="数据库迁移")
+    parser.add_argument("--status", action="store_true", help="只查看迁移状态，不执行")
+    args = parser.parse_args()
+
+    if args.status:
+        applied = applied_migrations()
+        for name in MIGRATIONS:
+            if name in applied:
+                applied_at, duration = applied[name]
+                print(f"  已执行  {name:<40} {applied_at:%Y-%m-%d %H:%M:%S}  {duration:>8.2f}s")
+            else:
+                print(f"  未执行  {name}")
+    else:
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+        print("正在执行数据库迁移...")
+        applied = run_migrations()
+        print(f"迁移完成！共执行 {len(applied)} 个迁移")
@@ -5,18 +5,15 @@
 python -m app.migrations.add_api_key_encrypted_field
 """
 
-from sqlalchemy import create_engine, text
-from app.config import get_settings
+from sqlalchemy import text
+from app.database import engine
+from app.migrations.helpers import column_names
 
 def migrate():
     """执行迁移"""
-    settings = get_settings()
-    engine = create_engine(settings.database_url)
-    
     with engine.connect() as conn:
         # 检查字段是否已存在
-        result = conn.execute(text("PRAGMA table_info(api_keys)"))
-        columns = [row[1] for row in result.fetchall()]
+        columns = column_names(conn, "api_keys")
         
         # 添加 key_encrypted 字段
         if 'key_encrypted' not in columns:
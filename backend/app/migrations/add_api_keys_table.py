@@ -1,23 +1,24 @@
 """创建 API Keys 表的数据库迁移"""
 from sqlalchemy import text
 from app.database import engine
+from app.migrations.helpers import ddl
 
 
 def upgrade():
     """创建 api_keys 表"""
     with engine.connect() as conn:
         # 创建 api_keys 表
-        conn.execute(text("""
+        conn.execute(text(ddl(conn, """
             CREATE TABLE IF NOT EXISTS api_keys (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id {pk},
                 key VARCHAR(64) NOT NULL UNIQUE,
                 description VARCHAR(200) NOT NULL,
                 expires_at TIMESTAMP,
-                is_active BOOLEAN NOT NULL DEFAULT 1,
+                is_active BOOLEAN NOT NULL DEFAULT {true},
                 created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
                 last_used_at TIMESTAMP
             )
-        """))
+        """)))
         
         # 创建索引
         conn.execute(text("""
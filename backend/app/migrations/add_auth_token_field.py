@@ -1,16 +1,14 @@
 """添加 auth_token 字段到 frps_servers 表"""
 from sqlalchemy import Column, String, text
 from app.database import engine
+from app.migrations.helpers import column_names
 
 
 def upgrade():
     """添加 auth_token 字段"""
     with engine.connect() as conn:
         # 检查列是否已存在
-        result = conn.execute(text(
-            "SELECT COUNT(*) FROM pragma_table_info('frps_servers') WHERE name='auth_token'"
-        ))
-        exists = result.scalar() > 0
+        exists = "auth_token" in column_names(conn, "frps_servers")
         
         if not exists:
             print("添加 auth_token 字段到 frps_servers 表...")
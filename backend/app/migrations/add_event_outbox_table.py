@@ -0,0 +1,44 @@
+"""创建跨进程事件转发表的数据库迁移"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import engine
+from app.migrations.helpers import ddl
+
+
+def upgrade():
+    """创建 event_outbox 表"""
+    with engine.connect() as conn:
+        conn.execute(text(ddl(conn, """
+            CREATE TABLE IF NOT EXISTS event_outbox (
+                id {pk},
+                origin VARCHAR(200) NOT NULL,
+                created_at {datetime} NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                payload TEXT NOT NULL
+            )
+        """)))
+
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_event_outbox_created_at ON event_outbox(created_at)
+        """))
+
+        conn.commit()
+        print("✓ event_outbox 表创建成功")
+
+
+def downgrade():
+    """删除 event_outbox 表"""
+    with engine.connect() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS event_outbox"))
+        conn.commit()
+        print("✓ event_outbox 表已删除")
+
+
+if __name__ == "__main__":
+    print("正在创建跨进程事件转发表...")
+    upgrade()
+    print("迁移完成！")
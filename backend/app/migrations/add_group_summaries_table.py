@@ -0,0 +1,60 @@
+"""创建分组统计缓存表的数据库迁移"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import engine, SessionLocal
+from app.migrations.helpers import ddl
+from app.services.stats_service import StatsService
+
+
+def upgrade():
+    """创建 group_summaries 表并从现有代理重建统计"""
+    with engine.connect() as conn:
+        conn.execute(text(ddl(conn, """
+            CREATE TABLE IF NOT EXISTS group_summaries (
+                id {pk},
+                frps_server_id INTEGER NOT NULL,
+                group_name VARCHAR(50) NOT NULL,
+                total_count INTEGER NOT NULL DEFAULT 0,
+                online_count INTEGER NOT NULL DEFAULT 0,
+                offline_count INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (frps_server_id) REFERENCES frps_servers(id) ON DELETE CASCADE,
+                CONSTRAINT uq_group_summary_server_group UNIQUE (frps_server_id, group_name)
+            )
+        """)))
+        
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_group_summaries_frps_server_id ON group_summaries(frps_server_id)
+        """))
+        
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_group_summaries_group_name ON group_summaries(group_name)
+        """))
+        
+        conn.commit()
+    
+    db = SessionLocal()
+    try:
+        count = StatsService(db).rebuild()
+        print(f"✓ group_summaries 表创建成功，已统计 {count} 个分组")
+    finally:
+        db.close()
+
+
+def downgrade():
+    """删除 group_summaries 表"""
+    with engine.connect() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS group_summaries"))
+        conn.commit()
+        print("✓ group_summaries 表已删除")
+
+
+if __name__ == "__main__":
+    print("正在创建 group_summaries 表...")
+    upgrade()
+    print("迁移完成！")
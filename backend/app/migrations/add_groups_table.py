@@ -1,15 +1,16 @@
 """创建分组表的数据库迁移"""
 from sqlalchemy import text
 from app.database import engine
+from app.migrations.helpers import ddl
 
 
 def upgrade():
     """创建 groups 表"""
     with engine.connect() as conn:
         # 创建 groups 表
-        conn.execute(text("""
+        conn.execute(text(ddl(conn, """
             CREATE TABLE IF NOT EXISTS groups (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id {pk},
                 frps_server_id INTEGER NOT NULL,
                 name VARCHAR(50) NOT NULL,
                 description VARCHAR(200),
@@ -18,7 +19,7 @@ def upgrade():
                 FOREIGN KEY (frps_server_id) REFERENCES frps_servers(id) ON DELETE CASCADE,
                 UNIQUE (frps_server_id, name)
             )
-        """))
+        """)))
         
         # 创建索引
         conn.execute(text("""
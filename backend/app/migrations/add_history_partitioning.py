@@ -0,0 +1,72 @@
+"""历史记录分区存储迁移
+
+proxy_history 表的 frps_server_id 单列索引替换为 (frps_server_id, timestamp) 复合索引，
+并创建按天汇总表 proxy_history_daily。按月分区表由历史记录维护任务自动创建。
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import engine
+from app.migrations.helpers import ddl, table_names
+from app.services.history_service import PARTITION_PATTERN
+
+
+def upgrade():
+    """添加复合索引和按天汇总表"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_proxy_history_server_timestamp
+            ON proxy_history(frps_server_id, timestamp)
+        """))
+        conn.execute(text("DROP INDEX IF EXISTS ix_proxy_history_frps_server_id"))
+
+        conn.execute(text(ddl(conn, """
+            CREATE TABLE IF NOT EXISTS proxy_history_daily (
+                id {pk},
+                frps_server_id INTEGER NOT NULL REFERENCES frps_servers(id) ON DELETE CASCADE,
+                proxy_name VARCHAR(100) NOT NULL,
+                action VARCHAR(50) NOT NULL,
+                day DATE NOT NULL,
+                event_count INTEGER NOT NULL DEFAULT 0,
+                first_at {datetime} NOT NULL,
+                last_at {datetime} NOT NULL,
+                CONSTRAINT uq_proxy_history_daily UNIQUE (frps_server_id, proxy_name, action, day)
+            )
+        """)))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_proxy_history_daily_id ON proxy_history_daily(id)
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_proxy_history_daily_server_day
+            ON proxy_history_daily(frps_server_id, day)
+        """))
+
+        conn.commit()
+        print("✓ 历史记录分区存储迁移完成")
+
+
+def downgrade():
+    """把分区中的记录移回主表，删除分区表和按天汇总表（已汇总的记录无法还原）"""
+    with engine.connect() as conn:
+        for name in table_names(conn):
+            if PARTITION_PATTERN.match(name):
+                conn.execute(text(f"INSERT INTO proxy_history SELECT * FROM {name}"))
+                conn.execute(text(f"DROP TABLE {name}"))
+
+        conn.execute(text("DROP TABLE IF EXISTS proxy_history_daily"))
+        conn.execute(text("DROP INDEX IF EXISTS ix_proxy_history_server_timestamp"))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_proxy_history_frps_server_id ON proxy_history(frps_server_id)
+        """))
+        conn.commit()
+        print("✓ 历史记录分区存储已回滚")
+
+
+if __name__ == "__main__":
+    print("正在迁移历史记录分区存储...")
+    upgrade()
+    print("迁移完成！")
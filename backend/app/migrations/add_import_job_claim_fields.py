@@ -0,0 +1,44 @@
+"""添加 claimed_by、claim_expires_at 字段到 import_jobs 表"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import engine
+from app.migrations.helpers import column_names, ddl
+
+NEW_COLUMNS = [
+    ("claimed_by", "VARCHAR(200)"),
+    ("claim_expires_at", "{datetime}"),
+]
+
+
+def upgrade():
+    """添加任务认领字段"""
+    with engine.connect() as conn:
+        existing = column_names(conn, "import_jobs")
+        for column, column_type in NEW_COLUMNS:
+            if column in existing:
+                print(f"{column} 字段已存在，跳过")
+                continue
+            conn.execute(text(ddl(conn, f"ALTER TABLE import_jobs ADD COLUMN {column} {column_type}")))
+            print(f"✓ {column} 字段添加成功")
+        conn.commit()
+
+
+def downgrade():
+    """回滚：删除任务认领字段"""
+    with engine.connect() as conn:
+        for column, _ in NEW_COLUMNS:
+            if column in column_names(conn, "import_jobs"):
+                conn.execute(text(f"ALTER TABLE import_jobs DROP COLUMN {column}"))
+        conn.commit()
+        print("✓ 任务认领字段已删除")
+
+
+if __name__ == "__main__":
+    print("正在添加导入任务认领字段...")
+    upgrade()
+    print("迁移完成！")
@@ -0,0 +1,67 @@
+"""创建后台导入任务表的数据库迁移"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import engine
+from app.migrations.helpers import ddl
+
+
+def upgrade():
+    """创建 import_jobs 表"""
+    with engine.connect() as conn:
+        conn.execute(text(ddl(conn, """
+            CREATE TABLE IF NOT EXISTS import_jobs (
+                id {pk},
+                job_id VARCHAR(32) NOT NULL UNIQUE,
+                frps_server_id INTEGER NOT NULL,
+                format VARCHAR(10) NOT NULL,
+                group_name VARCHAR(50),
+                dry_run BOOLEAN NOT NULL DEFAULT {false},
+                batch_size INTEGER NOT NULL,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                file_path VARCHAR(500) NOT NULL,
+                file_size INTEGER NOT NULL DEFAULT 0,
+                bytes_processed INTEGER NOT NULL DEFAULT 0,
+                processed_count INTEGER NOT NULL DEFAULT 0,
+                created_count INTEGER NOT NULL DEFAULT 0,
+                updated_count INTEGER NOT NULL DEFAULT 0,
+                unchanged_count INTEGER NOT NULL DEFAULT 0,
+                failed_count INTEGER NOT NULL DEFAULT 0,
+                errors TEXT,
+                result TEXT,
+                error_message TEXT,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (frps_server_id) REFERENCES frps_servers(id) ON DELETE CASCADE
+            )
+        """)))
+
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_import_jobs_frps_server_id ON import_jobs(frps_server_id)
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_import_jobs_status ON import_jobs(status)
+        """))
+
+        conn.commit()
+        print("✓ import_jobs 表创建成功")
+
+
+def downgrade():
+    """删除 import_jobs 表"""
+    with engine.connect() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS import_jobs"))
+        conn.commit()
+        print("✓ import_jobs 表已删除")
+
+
+if __name__ == "__main__":
+    print("正在创建 import_jobs 表...")
+    upgrade()
+    print("迁移完成！")
@@ -0,0 +1,58 @@
+"""创建代理统计计数表的数据库迁移"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import engine, SessionLocal
+from app.migrations.helpers import ddl
+from app.services.stats_service import StatsService
+
+
+def upgrade():
+    """创建 proxy_counters 表并从现有代理重建计数"""
+    with engine.connect() as conn:
+        conn.execute(text(ddl(conn, """
+            CREATE TABLE IF NOT EXISTS proxy_counters (
+                id {pk},
+                frps_server_id INTEGER NOT NULL,
+                group_name VARCHAR(50) NOT NULL DEFAULT '',
+                proxy_type VARCHAR(20) NOT NULL,
+                total_count INTEGER NOT NULL DEFAULT 0,
+                online_count INTEGER NOT NULL DEFAULT 0,
+                offline_count INTEGER NOT NULL DEFAULT 0,
+                port_count INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (frps_server_id) REFERENCES frps_servers(id) ON DELETE CASCADE,
+                CONSTRAINT uq_proxy_counter_scope UNIQUE (frps_server_id, group_name, proxy_type)
+            )
+        """)))
+        
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_proxy_counters_frps_server_id ON proxy_counters(frps_server_id)
+        """))
+        
+        conn.commit()
+    
+    db = SessionLocal()
+    try:
+        count = StatsService(db).rebuild()
+        print(f"✓ proxy_counters 表创建成功，已统计 {count} 个分组")
+    finally:
+        db.close()
+
+
+def downgrade():
+    """删除 proxy_counters 表"""
+    with engine.connect() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS proxy_counters"))
+        conn.commit()
+        print("✓ proxy_counters 表已删除")
+
+
+if __name__ == "__main__":
+    print("正在创建 proxy_counters 表...")
+    upgrade()
+    print("迁移完成！")
@@ -7,16 +7,18 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 from sqlalchemy import text
 from app.database import engine
+from app.migrations.helpers import batch_size, column_names, ddl
 
 
 def upgrade():
     """添加 group_name 字段到 proxies 表"""
     with engine.connect() as conn:
         # 添加 group_name 字段
-        conn.execute(text("""
-            ALTER TABLE proxies 
-            ADD COLUMN group_name VARCHAR(50)
-        """))
+        if "group_name" not in column_names(conn, "proxies"):
+            conn.execute(text("""
+                ALTER TABLE proxies 
+                ADD COLUMN group_name VARCHAR(50)
+            """))
         
         # 创建索引
         conn.execute(text("""
@@ -24,21 +26,29 @@ def upgrade():
             ON proxies(group_name)
         """))
         
-        # 从现有代理名称中解析并填充 group_name
-        conn.execute(text("""
+        conn.commit()
+        
+        # 从现有代理名称中解析并填充 group_name（分批更新并逐批提交）
+        update = text(ddl(conn, """
             UPDATE proxies 
             SET group_name = CASE 
                 WHEN name LIKE '%_%' THEN 
                     CASE 
-                        WHEN SUBSTR(name, 1, INSTR(name, '_') - 1) != '' THEN SUBSTR(name, 1, INSTR(name, '_') - 1)
+                        WHEN SUBSTR(name, 1, {instr}(name, '_') - 1) != '' THEN SUBSTR(name, 1, {instr}(name, '_') - 1)
                         ELSE '其他'
                     END
                 ELSE '其他'
             END
-            WHERE group_name IS NULL
+            WHERE id IN (SELECT id FROM proxies WHERE group_name IS NULL ORDER BY id LIMIT :limit)
         """))
-        
-        conn.commit()
+        updated = 0
+        while True:
+            count = conn.execute(update, {"limit": batch_size()}).rowcount
+            conn.commit()
+            if not count:
+                break
+            updated += count
+            print(f"  已填充 {updated} 个代理的 group_name")
         print("✓ 成功添加 group_name 字段并更新现有数据")
 
 
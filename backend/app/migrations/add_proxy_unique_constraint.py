@@ -7,22 +7,30 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 from sqlalchemy import text
 from app.database import engine
+from app.migrations.helpers import batch_size
 
 
 def upgrade():
     """先清理重复数据，再添加唯一约束"""
     with engine.connect() as conn:
         # 1. 清理重复记录：每组 (frps_server_id, name) 保留 id 最大的一条
-        # SQLite 在 DELETE 的子查询中不能直接引用同一表，使用临时表
-        conn.execute(text("DROP TABLE IF EXISTS proxies_keep"))
-        conn.execute(text("""
-            CREATE TEMP TABLE proxies_keep AS
-            SELECT MAX(id) as id FROM proxies GROUP BY frps_server_id, name
-        """))
-        conn.execute(text("""
-            DELETE FROM proxies WHERE id NOT IN (SELECT id FROM proxies_keep)
-        """))
-        conn.execute(text("DROP TABLE IF EXISTS proxies_keep"))
+        # 先只读查询出要删除的 id，再分批删除并逐批提交，避免一个大事务长时间锁住数据库
+        duplicate_ids = [row[0] for row in conn.execute(text("""
+            SELECT p.id FROM proxies p
+            JOIN (
+                SELECT frps_server_id, name, MAX(id) AS keep_id FROM proxies
+                GROUP BY frps_server_id, name HAVING COUNT(*) > 1
+            ) d ON p.frps_server_id = d.frps_server_id AND p.name = d.name AND p.id < d.keep_id
+        """))]
+        conn.commit()
+        size = batch_size()
+        for i in range(0, len(duplicate_ids), size):
+            batch = duplicate_ids[i:i + size]
+            conn.execute(
+                text("DELETE FROM proxies WHERE id IN (" + ", ".join(str(int(row_id)) for row_id in batch) + ")")
+            )
+            conn.commit()
+            print(f"  已删除 {min(i + size, len(duplicate_ids))}/{len(duplicate_ids)} 条重复代理")
         
         # 2. 添加唯一约束（SQLite 使用 CREATE UNIQUE INDEX）
         conn.execute(text("""
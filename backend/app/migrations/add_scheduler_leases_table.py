@@ -0,0 +1,40 @@
+"""创建调度任务租约表的数据库迁移"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import engine
+from app.migrations.helpers import ddl
+
+
+def upgrade():
+    """创建 scheduler_leases 表"""
+    with engine.connect() as conn:
+        conn.execute(text(ddl(conn, """
+            CREATE TABLE IF NOT EXISTS scheduler_leases (
+                name VARCHAR(50) PRIMARY KEY,
+                holder VARCHAR(200) NOT NULL,
+                acquired_at {datetime} NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                expires_at {datetime} NOT NULL
+            )
+        """)))
+
+        conn.commit()
+        print("✓ scheduler_leases 表创建成功")
+
+
+def downgrade():
+    """删除 scheduler_leases 表"""
+    with engine.connect() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS scheduler_leases"))
+        conn.commit()
+        print("✓ scheduler_leases 表已删除")
+
+
+if __name__ == "__main__":
+    print("正在创建调度任务租约表...")
+    upgrade()
+    print("迁移完成！")
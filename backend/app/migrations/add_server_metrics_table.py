@@ -0,0 +1,54 @@
+"""创建 frps 服务器全局指标表的数据库迁移"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import engine
+from app.migrations.helpers import ddl
+
+
+def upgrade():
+    """创建 frps_server_metrics 表"""
+    with engine.connect() as conn:
+        conn.execute(text(ddl(conn, """
+            CREATE TABLE IF NOT EXISTS frps_server_metrics (
+                id {pk},
+                frps_server_id INTEGER NOT NULL,
+                timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                version VARCHAR(50),
+                total_traffic_in BIGINT NOT NULL DEFAULT 0,
+                total_traffic_out BIGINT NOT NULL DEFAULT 0,
+                cur_conns INTEGER NOT NULL DEFAULT 0,
+                client_counts INTEGER NOT NULL DEFAULT 0,
+                proxy_type_counts TEXT,
+                FOREIGN KEY (frps_server_id) REFERENCES frps_servers(id) ON DELETE CASCADE
+            )
+        """)))
+
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_frps_server_metrics_id ON frps_server_metrics(id)
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_frps_server_metrics_server_timestamp
+            ON frps_server_metrics(frps_server_id, timestamp)
+        """))
+
+        conn.commit()
+        print("✓ frps_server_metrics 表创建成功")
+
+
+def downgrade():
+    """删除 frps_server_metrics 表"""
+    with engine.connect() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS frps_server_metrics"))
+        conn.commit()
+        print("✓ frps_server_metrics 表已删除")
+
+
+if __name__ == "__main__":
+    print("正在创建 frps 服务器全局指标表...")
+    upgrade()
+    print("迁移完成！")
@@ -5,18 +5,15 @@
 python -m app.migrations.add_server_test_fields
 """
 
-from sqlalchemy import create_engine, text
-from app.config import get_settings
+from sqlalchemy import text
+from app.database import engine
+from app.migrations.helpers import column_names, ddl
 
 def migrate():
     """执行迁移"""
-    settings = get_settings()
-    engine = create_engine(settings.database_url)
-    
     with engine.connect() as conn:
         # 检查字段是否已存在
-        result = conn.execute(text("PRAGMA table_info(frps_servers)"))
-        columns = [row[1] for row in result.fetchall()]
+        columns = column_names(conn, "frps_servers")
         
         # 添加 last_test_status 字段
         if 'last_test_status' not in columns:
@@ -32,9 +29,9 @@ def migrate():
         # 添加 last_test_time 字段
         if 'last_test_time' not in columns:
             print("添加 last_test_time 字段...")
-            conn.execute(text(
-                "ALTER TABLE frps_servers ADD COLUMN last_test_time DATETIME"
-            ))
+            conn.execute(text(ddl(
+                conn, "ALTER TABLE frps_servers ADD COLUMN last_test_time {datetime}"
+            )))
             conn.commit()
             print("✓ last_test_time 字段添加成功")
         else:
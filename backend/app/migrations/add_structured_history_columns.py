@@ -0,0 +1,136 @@
+"""历史记录结构化字段迁移
+
+proxy_history 表（以及已存在的按月分区表）增加 old_status、new_status、remote_port、
+traffic_in、traffic_out、cur_conns 列和压缩的 payload 列，
+并把旧记录 details 中的 JSON 拆分到这些列中（按主键分批处理）。
+"""
+import sys
+import os
+import json
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import inspect, text
+from app.database import engine
+from app.migrations.helpers import batch_size, ddl
+from app.models.history import encode_payload, decode_payload
+from app.services.history_service import PARTITION_PATTERN
+
+NEW_COLUMNS = [
+    ("old_status", "VARCHAR(20)"),
+    ("new_status", "VARCHAR(20)"),
+    ("remote_port", "INTEGER"),
+    ("traffic_in", "BIGINT"),
+    ("traffic_out", "BIGINT"),
+    ("cur_conns", "INTEGER"),
+    ("payload", "{blob}"),
+]
+
+# 旧 details 中的键 -> 新列
+DETAIL_COLUMNS = {
+    "status": "new_status",
+    "remote_port": "remote_port",
+    "port": "remote_port",
+    "today_traffic_in": "traffic_in",
+    "today_traffic_out": "traffic_out",
+    "cur_conns": "cur_conns",
+}
+
+
+def history_tables():
+    """proxy_history 及所有按月分区表"""
+    names = inspect(engine).get_table_names()
+    return ["proxy_history"] + sorted(name for name in names if PARTITION_PATTERN.match(name))
+
+
+def split_details(action: str, details: str) -> dict:
+    """把旧的 details JSON 拆分为结构化列的值"""
+    try:
+        data = json.loads(details)
+    except ValueError:
+        data = {"details": details}
+    if not isinstance(data, dict):
+        data = {"details": data}
+
+    values = {column: None for column, _ in NEW_COLUMNS}
+    for key, column in DETAIL_COLUMNS.items():
+        if key in data:
+            values[column] = data.pop(key)
+    if values["new_status"] is None and action in ("online", "offline"):
+        values["new_status"] = action
+    # 代理名称与 proxy_name 列重复
+    data.pop("name", None)
+    values["payload"] = encode_payload(data)
+    return values
+
+
+def upgrade():
+    """添加结构化列并转换旧记录"""
+    for table in history_tables():
+        columns = {column["name"] for column in inspect(engine).get_columns(table)}
+        converted = 0
+        with engine.connect() as conn:
+            for name, sql_type in NEW_COLUMNS:
+                if name not in columns:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl(conn, sql_type)}"))
+            conn.commit()
+
+            last_id = 0
+            while True:
+                rows = conn.execute(
+                    text(f"""
+                        SELECT id, action, details FROM {table}
+                        WHERE details IS NOT NULL AND id > :last_id
+                        ORDER BY id LIMIT :limit
+                    """),
+                    {"last_id": last_id, "limit": batch_size()}
+                ).fetchall()
+                if not rows:
+                    break
+                conn.execute(
+                    text(f"""
+                        UPDATE {table} SET
+                            old_status = :old_status, new_status = :new_status, remote_port = :remote_port,
+                            traffic_in = :traffic_in, traffic_out = :traffic_out, cur_conns = :cur_conns,
+                            payload = :payload, details = NULL
+                        WHERE id = :id
+                    """),
+                    [{"id": row_id, **split_details(action, details)} for row_id, action, details in rows]
+                )
+                conn.commit()
+                converted += len(rows)
+                last_id = rows[-1][0]
+        print(f"✓ {table}: 已转换 {converted} 条历史记录")
+    print("提示：转换后可执行 VACUUM 回收数据库文件中的空闲空间")
+
+
+def downgrade():
+    """把结构化列合并回 details JSON 并删除新列（需要 SQLite 3.35+）"""
+    for table in history_tables():
+        with engine.connect() as conn:
+            rows = conn.execute(text(f"""
+                SELECT id, new_status, remote_port, traffic_in, traffic_out, cur_conns, payload, details
+                FROM {table}
+            """)).fetchall()
+            updates = []
+            for row_id, new_status, remote_port, traffic_in, traffic_out, cur_conns, payload, details in rows:
+                data = decode_payload(payload, details) or {}
+                for key, value in (("status", new_status), ("remote_port", remote_port),
+                                   ("today_traffic_in", traffic_in), ("today_traffic_out", traffic_out),
+                                   ("cur_conns", cur_conns)):
+                    if value is not None:
+                        data[key] = value
+                updates.append({"id": row_id, "details": json.dumps(data) if data else None})
+            if updates:
+                conn.execute(text(f"UPDATE {table} SET details = :details WHERE id = :id"), updates)
+            for name, _ in NEW_COLUMNS:
+                conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {name}"))
+            conn.commit()
+        print(f"✓ {table}: 已还原 details 列")
+
+
+if __name__ == "__main__":
+    print("正在迁移历史记录结构化字段...")
+    upgrade()
+    print("迁移完成！")
@@ -1,14 +1,15 @@
 """添加临时配置表"""
 from sqlalchemy import text
 from app.database import engine
+from app.migrations.helpers import ddl
 
 
 def upgrade():
     """创建临时配置表"""
     with engine.connect() as conn:
-        conn.execute(text("""
+        conn.execute(text(ddl(conn, """
             CREATE TABLE IF NOT EXISTS temp_configs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id {pk},
                 config_id VARCHAR(50) UNIQUE NOT NULL,
                 server_name VARCHAR(100) NOT NULL,
                 group_name VARCHAR(100) NOT NULL,
@@ -17,7 +18,7 @@ def upgrade():
                 created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
                 expires_at TIMESTAMP NOT NULL
             )
-        """))
+        """)))
         
         # 创建索引
         conn.execute(text("""
@@ -0,0 +1,67 @@
+"""创建按代理的流量预聚合表的数据库迁移"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import engine
+from app.migrations.helpers import ddl
+
+
+def upgrade():
+    """创建 traffic_rollups 和 traffic_rollup_cursors 表"""
+    with engine.connect() as conn:
+        conn.execute(text(ddl(conn, """
+            CREATE TABLE IF NOT EXISTS traffic_rollups (
+                id {pk},
+                frps_server_id INTEGER NOT NULL,
+                resolution VARCHAR(8) NOT NULL,
+                bucket TIMESTAMP NOT NULL,
+                proxy_name VARCHAR(100) NOT NULL,
+                group_name VARCHAR(50) NOT NULL,
+                bytes_in BIGINT NOT NULL DEFAULT 0,
+                bytes_out BIGINT NOT NULL DEFAULT 0,
+                conns_max INTEGER NOT NULL DEFAULT 0,
+                conns_sum BIGINT NOT NULL DEFAULT 0,
+                samples INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (frps_server_id) REFERENCES frps_servers(id) ON DELETE CASCADE,
+                CONSTRAINT uq_traffic_rollups_proxy UNIQUE (frps_server_id, resolution, bucket, proxy_name)
+            )
+        """)))
+
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_traffic_rollups_id ON traffic_rollups(id)
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_traffic_rollups_group
+            ON traffic_rollups(frps_server_id, resolution, bucket, group_name)
+        """))
+
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS traffic_rollup_cursors (
+                frps_server_id INTEGER PRIMARY KEY,
+                last_sample_at TIMESTAMP NOT NULL,
+                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (frps_server_id) REFERENCES frps_servers(id) ON DELETE CASCADE
+            )
+        """))
+
+        conn.commit()
+        print("✓ traffic_rollups 表创建成功")
+
+
+def downgrade():
+    """删除 traffic_rollups 和 traffic_rollup_cursors 表"""
+    with engine.connect() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS traffic_rollup_cursors"))
+        conn.execute(text("DROP TABLE IF EXISTS traffic_rollups"))
+        conn.commit()
+        print("✓ traffic_rollups 表已删除")
+
+
+if __name__ == "__main__":
+    print("正在创建流量预聚合表...")
+    upgrade()
+    print("迁移完成！")
@@ -0,0 +1,49 @@
+"""创建流量时序表的数据库迁移"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import engine
+from app.migrations.helpers import ddl
+
+
+def upgrade():
+    """创建 traffic_series 表"""
+    with engine.connect() as conn:
+        conn.execute(text(ddl(conn, """
+            CREATE TABLE IF NOT EXISTS traffic_series (
+                id {pk},
+                frps_server_id INTEGER NOT NULL,
+                resolution VARCHAR(8) NOT NULL,
+                bucket TIMESTAMP NOT NULL,
+                proxy_count INTEGER NOT NULL DEFAULT 0,
+                data {blob} NOT NULL,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (frps_server_id) REFERENCES frps_servers(id) ON DELETE CASCADE,
+                CONSTRAINT uq_traffic_series_bucket UNIQUE (frps_server_id, resolution, bucket)
+            )
+        """)))
+
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_traffic_series_id ON traffic_series(id)
+        """))
+
+        conn.commit()
+        print("✓ traffic_series 表创建成功")
+
+
+def downgrade():
+    """删除 traffic_series 表"""
+    with engine.connect() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS traffic_series"))
+        conn.commit()
+        print("✓ traffic_series 表已删除")
+
+
+if __name__ == "__main__":
+    print("正在创建流量时序表...")
+    upgrade()
+    print("迁移完成！")
@@ -0,0 +1,56 @@
+"""迁移脚本使用的方言辅助函数
+
+迁移脚本直接执行原生 SQL，建表语句中与数据库相关的部分写成占位符，由 ddl() 按当前数据库替换：
+- {pk}: 自增主键
+- {datetime}: 日期时间类型
+- {blob}: 二进制类型
+- {true} / {false}: 布尔默认值
+- {instr}: 查找子串位置的函数（SQLite 的 INSTR 和 PostgreSQL 的 STRPOS 参数顺序相同）
+"""
+from typing import List, Set
+
+from sqlalchemy import inspect
+
+from app.config import get_settings
+
+_DDL = {
+    "sqlite": {
+        "pk": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "datetime": "DATETIME",
+        "blob": "BLOB",
+        "true": "1",
+        "false": "0",
+        "instr": "INSTR",
+    },
+    "postgresql": {
+        "pk": "SERIAL PRIMARY KEY",
+        "datetime": "TIMESTAMP",
+        "blob": "BYTEA",
+        "true": "TRUE",
+        "false": "FALSE",
+        "instr": "STRPOS",
+    },
+}
+
+
+def ddl(conn, statement: str) -> str:
+    """替换语句中的方言占位符"""
+    dialect = conn.dialect.name
+    if dialect not in _DDL:
+        raise NotImplementedError(f"迁移脚本不支持 {dialect} 数据库")
+    return statement.format(**_DDL[dialect])
+
+
+def batch_size() -> int:
+    """改写数据的迁移每批处理的行数"""
+    return max(1, get_settings().migration_batch_size)
+
+
+def table_names(conn) -> List[str]:
+    """当前数据库中的表名"""
+    return inspect(conn).get_table_names()
+
+
+def column_names(conn, table: str) -> Set[str]:
+    """表中已有的列名"""
+    return {column["name"] for column in inspect(conn).get_columns(table)}
@@ -0,0 +1,85 @@
+"""把临时配置内容从数据库迁移到磁盘存储
+
+temp_configs 表增加 content_hash、size 列，已有的 config_content 写入
+按内容哈希寻址的磁盘存储后删除该列（需要 SQLite 3.35+ 的 DROP COLUMN）。
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import inspect, text
+from app.database import engine
+from app.migrations.helpers import batch_size
+from app.services.temp_config_store import get_temp_config_store
+
+
+def upgrade():
+    """迁移 config_content 到磁盘存储"""
+    columns = {column["name"] for column in inspect(engine).get_columns("temp_configs")}
+    store = get_temp_config_store()
+
+    with engine.connect() as conn:
+        if "content_hash" not in columns:
+            conn.execute(text("ALTER TABLE temp_configs ADD COLUMN content_hash VARCHAR(64) NOT NULL DEFAULT ''"))
+        if "size" not in columns:
+            conn.execute(text("ALTER TABLE temp_configs ADD COLUMN size INTEGER NOT NULL DEFAULT 0"))
+
+        conn.commit()
+
+        migrated = 0
+        if "config_content" in columns:
+            # 按主键分批写入磁盘存储并逐批提交（内容按哈希寻址，中断后重新执行不会重复占用空间）
+            last_id = 0
+            while True:
+                rows = conn.execute(
+                    text("SELECT id, config_content FROM temp_configs WHERE id > :last_id ORDER BY id LIMIT :limit"),
+                    {"last_id": last_id, "limit": batch_size()}
+                ).fetchall()
+                if not rows:
+                    break
+                conn.execute(
+                    text("UPDATE temp_configs SET content_hash = :hash, size = :size WHERE id = :id"),
+                    [
+                        {"hash": store.content.put(data), "size": len(data), "id": row_id}
+                        for row_id, data in ((row_id, (content or "").encode("utf-8")) for row_id, content in rows)
+                    ]
+                )
+                conn.commit()
+                migrated += len(rows)
+                last_id = rows[-1][0]
+            conn.execute(text("ALTER TABLE temp_configs DROP COLUMN config_content"))
+
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_temp_configs_content_hash ON temp_configs(content_hash)
+        """))
+
+        conn.commit()
+        print(f"✓ 已迁移 {migrated} 个临时配置的内容到 {store.content.root}")
+
+
+def downgrade():
+    """把磁盘存储中的内容写回 config_content 列"""
+    store = get_temp_config_store()
+
+    with engine.connect() as conn:
+        conn.execute(text("ALTER TABLE temp_configs ADD COLUMN config_content TEXT NOT NULL DEFAULT ''"))
+        rows = conn.execute(text("SELECT id, content_hash FROM temp_configs")).fetchall()
+        for row_id, content_hash in rows:
+            data = store.content.get(content_hash) or b""
+            conn.execute(
+                text("UPDATE temp_configs SET config_content = :content WHERE id = :id"),
+                {"content": data.decode("utf-8"), "id": row_id}
+            )
+        conn.execute(text("DROP INDEX IF EXISTS ix_temp_configs_content_hash"))
+        conn.execute(text("ALTER TABLE temp_configs DROP COLUMN size"))
+        conn.execute(text("ALTER TABLE temp_configs DROP COLUMN content_hash"))
+        conn.commit()
+        print("✓ 临时配置内容已写回数据库")
+
+
+if __name__ == "__main__":
+    print("正在迁移临时配置内容到磁盘存储...")
+    upgrade()
+    print("迁移完成！")
@@ -0,0 +1,167 @@
+"""数据库迁移执行器
+
+已执行的迁移记录在 schema_migrations 表中（名称、执行时间、耗时），启动时只执行未记录的迁移。
+迁移脚本中的 SQL 通过 helpers.ddl() 兼容 SQLite 和 PostgreSQL，每个 upgrade 都会先检查表和列是否已存在，
+因此没有 schema_migrations 表的旧数据库会把全部迁移执行一遍并补齐记录；
+新数据库直接按模型创建全部表，所有迁移记为已执行。
+"""
+import importlib
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import Column, DateTime, Float, MetaData, String, Table, insert, select, text
+
+from app import models  # noqa: F401  注册全部模型，init_db() 才能创建缺少的表
+from app.models import temp_config  # noqa: F401
+from app.database import engine, init_db
+from app.migrations.helpers import table_names
+
+logger = logging.getLogger(__name__)
+
+# 按添加顺序排列（后面的迁移依赖前面的表和列），新迁移追加到末尾
+MIGRATIONS = [
+    "add_api_keys_table",
+    "add_api_key_encrypted_field",
+    "add_temp_configs_table",
+    "add_groups_table",
+    "add_proxy_group_name",
+    "add_server_test_fields",
+    "add_auth_token_field",
+    "add_proxy_unique_constraint",
+    "add_group_summaries_table",
+    "add_proxy_counters_table",
+    "add_import_jobs_table",
+    "move_temp_config_content_to_store",
+    "add_history_partitioning",
+    "add_structured_history_columns",
+    "add_traffic_series_table",
+    "add_traffic_rollups_table",
+    "add_server_metrics_table",
+    "add_scheduler_leases_table",
+    "add_import_job_claim_fields",
+    "add_event_outbox_table",
+]
+
+# PostgreSQL 上多个进程同时启动时，用咨询锁保证只有一个进程执行迁移
+_ADVISORY_LOCK_KEY = 7281001
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("name", String(100), primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+    Column("duration_seconds", Float, nullable=False, default=0.0),
+)
+
+
+def applied_migrations() -> Dict[str, Tuple[datetime, float]]:
+    """已执行的迁移：名称 -> (执行时间, 耗时秒数)"""
+    with engine.connect() as conn:
+        if schema_migrations.name not in table_names(conn):
+            return {}
+        rows = conn.execute(select(
+            schema_migrations.c.name, schema_migrations.c.applied_at, schema_migrations.c.duration_seconds
+        ))
+        return {name: (applied_at, duration) for name, applied_at, duration in rows}
+
+
+def pending_migrations() -> List[str]:
+    """未执行的迁移（按执行顺序）"""
+    applied = applied_migrations()
+    return [name for name in MIGRATIONS if name not in applied]
+
+
+def _record(names: List[str], durations: Dict[str, float]) -> None:
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(schema_migrations), [
+            {"name": name, "applied_at": now, "duration_seconds": round(durations.get(name, 0.0), 3)}
+            for name in names
+        ])
+
+
+def _apply_pending() -> List[Tuple[str, float]]:
+    with engine.connect() as conn:
+        existing = set(table_names(conn))
+    fresh = "proxies" not in existing
+    # 先按模型补建缺少的表（包括 schema_migrations），迁移只需要处理已有表的列、索引和数据
+    init_db()
+    schema_migrations.create(engine, checkfirst=True)
+
+    if fresh:
+        _record(MIGRATIONS, {})
+        logger.info(f"新数据库（{engine.dialect.name}），已按模型创建全部表，{len(MIGRATIONS)} 个迁移记为已执行")
+        return []
+
+    pending = pending_migrations()
+    if pending and schema_migrations.name not in existing:
+        logger.info("数据库没有迁移记录，将检查并执行全部迁移（已应用的迁移会自动跳过）")
+
+    applied = []
+    for name in pending:
+        module = importlib.import_module(f"app.migrations.{name}")
+        logger.info(f"执行迁移 {name}...")
+        start = time.perf_counter()
+        # 早期的迁移脚本入口名为 migrate()
+        (getattr(module, "upgrade", None) or module.migrate)()
+        elapsed = time.perf_counter() - start
+        # 每个迁移完成后立即记录，中途失败时重启只会从失败的迁移继续
+        _record([name], {name: elapsed})
+        logger.info(f"迁移 {name} 完成，用时 {elapsed:.2f} 秒")
+        applied.append((name, elapsed))
+    return applied
+
+
+@contextmanager
+def _sqlite_migration_lock():
+    """SQLite 上多个 worker 同时启动时，用数据库文件旁的锁文件保证只有一个进程执行迁移
+
+    没有 fcntl 的平台（Windows）和内存数据库不加锁。
+    """
+    database = engine.url.database
+    if fcntl is None or not database or database == ":memory:":
+        yield
+        return
+    with open(f"{database}.migrate.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def run_migrations() -> List[Tuple[str, float]]:
+    """创建缺少的表并执行未记录的迁移
+
+    Returns:
+        本次执行的迁移及耗时（秒）
+    """
+    start = time.perf_counter()
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as lock_conn:
+            lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+            try:
+                applied = _apply_pending()
+            finally:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+                lock_conn.commit()
+    else:
+        with _sqlite_migration_lock():
+            applied = _apply_pending()
+
+    if applied:
+        logger.info(f"共执行 {len(applied)} 个迁移，总用时 {time.perf_counter() - start:.2f} 秒")
+    return applied
@@ -3,9 +3,15 @@ from app.models.user import User
 from app.models.frps_server import FrpsServer
 from app.models.proxy import Proxy
 from app.models.port import PortAllocation
-from app.models.history import ProxyHistory
+from app.models.history import ProxyHistory, ProxyHistoryDaily
 from app.models.group import Group
 from app.models.api_key import ApiKey
+from app.models.group_summary import GroupSummary
+from app.models.proxy_counter import ProxyCounter
+from app.models.import_job import ImportJob
+from app.models.traffic import TrafficSeries, TrafficRollup, TrafficRollupCursor, ServerMetric
+from app.models.scheduler_lease import SchedulerLease
+from app.models.event_outbox import EventOutbox
 
-__all__ = ["User", "FrpsServer", "Proxy", "PortAllocation", "ProxyHistory", "Group", "ApiKey"]
+__all__ = ["User", "FrpsServer", "Proxy", "PortAllocation", "ProxyHistory", "ProxyHistoryDaily", "Group", "ApiKey", "GroupSummary", "ProxyCounter", "ImportJob", "TrafficSeries", "TrafficRollup", "TrafficRollupCursor", "ServerMetric", "SchedulerLease", "EventOutbox"]
 
@@ -0,0 +1,17 @@
+"""跨进程事件转发模型"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from app.database import Base
+
+
+class EventOutbox(Base):
+    """事件转发表（多进程部署时，发布事件的进程写入，其他进程轮询后发布到本进程的事件总线）"""
+    __tablename__ = "event_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    origin = Column(String(200), nullable=False)  # 写入事件的进程标识，该进程已在本地发布，轮询时跳过
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    payload = Column(Text, nullable=False)  # 一次提交产生的事件列表（JSON）
+
+    def __repr__(self):
+        return f"<EventOutbox(id={self.id}, origin='{self.origin}')>"
@@ -0,0 +1,25 @@
+"""分组统计缓存模型"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from app.database import Base
+
+
+class GroupSummary(Base):
+    """分组统计缓存表（按服务器 + 分组汇总代理数量，由代理写入时增量维护）"""
+    __tablename__ = "group_summaries"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    frps_server_id = Column(Integer, ForeignKey("frps_servers.id", ondelete="CASCADE"), nullable=False, index=True)
+    group_name = Column(String(50), nullable=False, index=True)
+    total_count = Column(Integer, default=0, nullable=False)
+    online_count = Column(Integer, default=0, nullable=False)
+    offline_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    # 唯一约束：同一服务器下每个分组一条统计
+    __table_args__ = (
+        UniqueConstraint('frps_server_id', 'group_name', name='uq_group_summary_server_group'),
+    )
+    
+    def __repr__(self):
+        return f"<GroupSummary(server_id={self.frps_server_id}, group='{self.group_name}', total={self.total_count})>"
@@ -1,24 +1,126 @@
 """代理历史记录模型"""
+import json
+import zlib
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from typing import Any, Dict, Optional
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Date, DateTime, LargeBinary, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
+def encode_payload(extra: Optional[Dict[str, Any]]) -> Optional[bytes]:
+    """把附加信息编码为 zlib 压缩的紧凑 JSON，没有附加信息时返回 None"""
+    if not extra:
+        return None
+    return zlib.compress(json.dumps(extra, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_payload(payload: Optional[bytes], details: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """解码附加信息，兼容迁移前以 JSON 文本保存在 details 中的旧记录"""
+    if payload:
+        return json.loads(zlib.decompress(payload))
+    if details:
+        try:
+            return json.loads(details)
+        except ValueError:
+            return {"details": details}
+    return None
+
+
 class ProxyHistory(Base):
-    """代理历史记录表"""
+    """代理历史记录表（近期记录，更早的记录按月转移到 proxy_history_YYYYMM 分区表）"""
     __tablename__ = "proxy_history"
     
     id = Column(Integer, primary_key=True, index=True)
-    frps_server_id = Column(Integer, ForeignKey("frps_servers.id"), nullable=False, index=True)
+    frps_server_id = Column(Integer, ForeignKey("frps_servers.id"), nullable=False)
     proxy_name = Column(String(100), nullable=False, index=True)
-    action = Column(String(50), nullable=False)  # online, offline, conflict, port_allocated, port_released
+    action = Column(String(50), nullable=False)  # online, offline, discovered, conflict, port_allocated, port_released
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
-    details = Column(Text, nullable=True)  # JSON 格式的详细信息
+    old_status = Column(String(20), nullable=True)  # 变化前的状态
+    new_status = Column(String(20), nullable=True)  # 变化后的状态
+    remote_port = Column(Integer, nullable=True)
+    traffic_in = Column(BigInteger, nullable=True)  # 当天入流量（字节）
+    traffic_out = Column(BigInteger, nullable=True)  # 当天出流量（字节）
+    cur_conns = Column(Integer, nullable=True)  # 当前连接数
+    payload = Column(LargeBinary, nullable=True)  # 其他附加信息（zlib 压缩的 JSON）
+    details = Column(Text, nullable=True)  # 旧版本 JSON 格式的详细信息，新记录不再写入
+    
+    # 按服务器查询历史并按时间排序
+    __table_args__ = (
+        Index('ix_proxy_history_server_timestamp', 'frps_server_id', 'timestamp'),
+    )
     
     # 关系
     frps_server = relationship("FrpsServer", back_populates="proxy_histories")
     
+    @property
+    def extra(self) -> Optional[Dict[str, Any]]:
+        """附加信息"""
+        return decode_payload(self.payload, self.details)
+    
+    @staticmethod
+    def event_values(
+        frps_server_id: int,
+        proxy_name: str,
+        action: str,
+        proxy_info: Optional[Dict[str, Any]] = None,
+        old_status: Optional[str] = None,
+        new_status: Optional[str] = None,
+        remote_port: Optional[int] = None,
+        extra: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """构造一条历史记录的列值（所有记录的键相同，可直接用于批量插入）
+        
+        Args:
+            proxy_info: frps_client.parse_proxy_info 解析出的代理信息，提供新状态、端口和流量
+            old_status: 变化前的状态
+            new_status: 变化后的状态（未提供 proxy_info 时使用）
+            remote_port: 端口（未提供 proxy_info 时使用）
+            extra: 其他附加信息，压缩后保存
+        """
+        info = proxy_info or {}
+        return {
+            "frps_server_id": frps_server_id,
+            "proxy_name": proxy_name,
+            "action": action,
+            "timestamp": timestamp or datetime.utcnow(),
+            "old_status": old_status,
+            "new_status": info.get("status", new_status),
+            "remote_port": info.get("remote_port", remote_port),
+            "traffic_in": info.get("today_traffic_in"),
+            "traffic_out": info.get("today_traffic_out"),
+            "cur_conns": info.get("cur_conns"),
+            "payload": encode_payload(extra),
+            "details": None,
+        }
+    
+    @classmethod
+    def create_event(cls, *args, **kwargs) -> "ProxyHistory":
+        """创建历史记录，参数同 event_values"""
+        return cls(**cls.event_values(*args, **kwargs))
+    
     def __repr__(self):
         return f"<ProxyHistory(id={self.id}, proxy='{self.proxy_name}', action='{self.action}')>"
 
+
+class ProxyHistoryDaily(Base):
+    """历史记录按天汇总表（超过保留期的分区降采样后写入此表）"""
+    __tablename__ = "proxy_history_daily"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    frps_server_id = Column(Integer, ForeignKey("frps_servers.id", ondelete="CASCADE"), nullable=False)
+    proxy_name = Column(String(100), nullable=False)
+    action = Column(String(50), nullable=False)
+    day = Column(Date, nullable=False)
+    event_count = Column(Integer, default=0, nullable=False)
+    first_at = Column(DateTime, nullable=False)  # 当天第一条记录的时间
+    last_at = Column(DateTime, nullable=False)  # 当天最后一条记录的时间
+    
+    __table_args__ = (
+        UniqueConstraint('frps_server_id', 'proxy_name', 'action', 'day', name='uq_proxy_history_daily'),
+        Index('ix_proxy_history_daily_server_day', 'frps_server_id', 'day'),
+    )
+    
+    def __repr__(self):
+        return f"<ProxyHistoryDaily(proxy='{self.proxy_name}', action='{self.action}', day={self.day}, count={self.event_count})>"
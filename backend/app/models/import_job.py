@@ -0,0 +1,47 @@
+"""后台导入任务模型"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from app.database import Base
+
+
+class ImportJob(Base):
+    """后台导入任务表（上传的配置文件保存在磁盘，任务在后台按批次导入）"""
+    __tablename__ = "import_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String(32), unique=True, nullable=False, index=True)  # 随机生成的任务ID
+    frps_server_id = Column(Integer, ForeignKey("frps_servers.id", ondelete="CASCADE"), nullable=False, index=True)
+    format = Column(String(10), nullable=False)  # ini 或 toml
+    group_name = Column(String(50), nullable=True)  # 指定分组，为空则从代理名称解析
+    dry_run = Column(Boolean, default=False, nullable=False)
+    batch_size = Column(Integer, nullable=False)
+    status = Column(String(20), default="pending", nullable=False, index=True)  # pending, running, completed, failed
+    file_path = Column(String(500), nullable=False)  # 上传文件的保存路径
+    file_size = Column(Integer, default=0, nullable=False)
+    bytes_processed = Column(Integer, default=0, nullable=False)  # 已提交批次读到的文件位置
+    processed_count = Column(Integer, default=0, nullable=False)  # 已提交的代理条目数（恢复时跳过）
+    created_count = Column(Integer, default=0, nullable=False)
+    updated_count = Column(Integer, default=0, nullable=False)
+    unchanged_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+    errors = Column(Text, nullable=True)  # JSON 格式的代理错误列表
+    result = Column(Text, nullable=True)  # JSON 格式的最终统计（dry_run 时包含差异）
+    error_message = Column(Text, nullable=True)  # 任务失败原因
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    claimed_by = Column(String(200), nullable=True)  # 正在执行任务的进程标识（多进程部署时防止重复执行）
+    claim_expires_at = Column(DateTime, nullable=True)  # 认领截止时间（UTC），每个批次提交时延长，过期后其他进程可以接替
+    
+    @property
+    def progress(self) -> float:
+        """按文件读取位置估算的进度（0-100）"""
+        if self.status == "completed":
+            return 100.0
+        if not self.file_size:
+            return 0.0
+        return round(min(self.bytes_processed / self.file_size, 1.0) * 100, 1)
+    
+    def __repr__(self):
+        return f"<ImportJob(job_id={self.job_id}, server_id={self.frps_server_id}, status='{self.status}')>"
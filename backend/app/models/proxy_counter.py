@@ -0,0 +1,31 @@
+"""代理状态计数器模型"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from app.database import Base
+
+
+# group_name 为空字符串的行表示整个服务器的计数（不区分分组）
+SERVER_SCOPE = ""
+
+
+class ProxyCounter(Base):
+    """代理状态计数器表（按服务器 / 分组 / 代理类型汇总，由代理写入时增量维护）"""
+    __tablename__ = "proxy_counters"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    frps_server_id = Column(Integer, ForeignKey("frps_servers.id", ondelete="CASCADE"), nullable=False, index=True)
+    group_name = Column(String(50), nullable=False, default=SERVER_SCOPE)  # 空字符串表示服务器级计数
+    proxy_type = Column(String(20), nullable=False)
+    total_count = Column(Integer, default=0, nullable=False)
+    online_count = Column(Integer, default=0, nullable=False)
+    offline_count = Column(Integer, default=0, nullable=False)
+    port_count = Column(Integer, default=0, nullable=False)  # 设置了远程端口的代理数
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    # 唯一约束：同一服务器 + 分组 + 类型一条计数
+    __table_args__ = (
+        UniqueConstraint('frps_server_id', 'group_name', 'proxy_type', name='uq_proxy_counter_scope'),
+    )
+    
+    def __repr__(self):
+        return f"<ProxyCounter(server_id={self.frps_server_id}, group='{self.group_name}', type='{self.proxy_type}', total={self.total_count})>"
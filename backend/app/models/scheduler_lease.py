@@ -0,0 +1,17 @@
+"""调度任务租约模型"""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from app.database import Base
+
+
+class SchedulerLease(Base):
+    """调度任务租约表（多个进程共用数据库时，持有未过期租约的进程执行定时任务）"""
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(50), primary_key=True)  # 租约名称（目前只有 scheduler）
+    holder = Column(String(200), nullable=False)  # 持有者进程标识：主机名:进程号:随机后缀
+    acquired_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # 当前持有者取得租约的时间
+    expires_at = Column(DateTime, nullable=False)  # 持有者续约截止时间（UTC），过期后其他进程可以接替
+
+    def __repr__(self):
+        return f"<SchedulerLease(name='{self.name}', holder='{self.holder}', expires_at={self.expires_at})>"
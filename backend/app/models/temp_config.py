@@ -1,18 +1,22 @@
 """临时配置模型"""
 from datetime import datetime, timedelta
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, DateTime
 from app.database import Base
 
 
 class TempConfig(Base):
-    """临时配置表（用于存储选择代理生成的临时配置）"""
+    """临时配置表（用于存储选择代理生成的临时配置）
+    
+    只保存元数据，配置内容按 content_hash 保存在磁盘存储中，见 TempConfigStore。
+    """
     __tablename__ = "temp_configs"
     
     id = Column(Integer, primary_key=True, index=True)
     config_id = Column(String(50), unique=True, nullable=False, index=True)  # 随机生成的配置ID
     server_name = Column(String(100), nullable=False)
     group_name = Column(String(100), nullable=False)  # 实际上是临时组名（包含随机ID）
-    config_content = Column(Text, nullable=False)  # 配置文件内容
+    content_hash = Column(String(64), nullable=False, index=True)  # 配置内容的 sha256
+    size = Column(Integer, default=0, nullable=False)  # 配置内容字节数
     format = Column(String(10), default="ini", nullable=False)  # ini 或 toml
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     expires_at = Column(DateTime, nullable=False)  # 过期时间
@@ -26,13 +30,14 @@ class TempConfig(Base):
         return datetime.utcnow() > self.expires_at
     
     @classmethod
-    def create_temp_config(cls, server_name: str, group_name: str, config_content: str, format: str = "ini", hours: int = 24):
-        """创建临时配置
+    def create_temp_config(cls, server_name: str, group_name: str, content_hash: str, size: int, format: str = "ini", hours: int = 24):
+        """创建临时配置元数据
         
         Args:
             server_name: 服务器名称
             group_name: 临时分组名称（包含随机ID）
-            config_content: 配置内容
+            content_hash: 配置内容的 sha256
+            size: 配置内容字节数
             format: 配置格式
             hours: 有效期（小时）
             
@@ -47,7 +52,8 @@ class TempConfig(Base):
             config_id=config_id,
             server_name=server_name,
             group_name=group_name,
-            config_content=config_content,
+            content_hash=content_hash,
+            size=size,
             format=format,
             expires_at=expires_at
         )
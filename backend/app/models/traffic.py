@@ -0,0 +1,85 @@
+"""流量时序数据模型"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, LargeBinary, ForeignKey, Index, UniqueConstraint
+from app.database import Base
+
+
+class TrafficSeries(Base):
+    """代理流量时序表（列式存储）
+    
+    每行保存一个服务器在一个时间桶内所有代理的指标：代理名称列表和各指标的整数数组
+    一起压缩在 data 中（编码见 app.services.traffic_service.TrafficFrame）。
+    resolution 为 raw 时是一次同步的原始采样，1m/1h/1d 为降采样后的汇总。
+    """
+    __tablename__ = "traffic_series"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    frps_server_id = Column(Integer, ForeignKey("frps_servers.id", ondelete="CASCADE"), nullable=False)
+    resolution = Column(String(8), nullable=False)  # raw, 1m, 1h, 1d
+    bucket = Column(DateTime, nullable=False)  # 采样时间或时间桶起点（UTC）
+    proxy_count = Column(Integer, default=0, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('frps_server_id', 'resolution', 'bucket', name='uq_traffic_series_bucket'),
+    )
+    
+    def __repr__(self):
+        return f"<TrafficSeries(server={self.frps_server_id}, resolution='{self.resolution}', bucket={self.bucket})>"
+
+
+class TrafficRollup(Base):
+    """按代理预聚合的流量汇总表（1h / 1d），由调度器根据原始采样增量维护，用于排行和速率查询"""
+    __tablename__ = "traffic_rollups"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    frps_server_id = Column(Integer, ForeignKey("frps_servers.id", ondelete="CASCADE"), nullable=False)
+    resolution = Column(String(8), nullable=False)  # 1h, 1d
+    bucket = Column(DateTime, nullable=False)  # 时间桶起点（UTC）
+    proxy_name = Column(String(100), nullable=False)
+    group_name = Column(String(50), nullable=False)
+    bytes_in = Column(BigInteger, default=0, nullable=False)
+    bytes_out = Column(BigInteger, default=0, nullable=False)
+    conns_max = Column(Integer, default=0, nullable=False)
+    conns_sum = Column(BigInteger, default=0, nullable=False)
+    samples = Column(Integer, default=0, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('frps_server_id', 'resolution', 'bucket', 'proxy_name', name='uq_traffic_rollups_proxy'),
+        Index('ix_traffic_rollups_group', 'frps_server_id', 'resolution', 'bucket', 'group_name'),
+    )
+    
+    def __repr__(self):
+        return f"<TrafficRollup(proxy='{self.proxy_name}', resolution='{self.resolution}', bucket={self.bucket})>"
+
+
+class TrafficRollupCursor(Base):
+    """每个服务器已汇总到 traffic_rollups 的最新原始采样时间"""
+    __tablename__ = "traffic_rollup_cursors"
+    
+    frps_server_id = Column(Integer, ForeignKey("frps_servers.id", ondelete="CASCADE"), primary_key=True)
+    last_sample_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class ServerMetric(Base):
+    """frps 服务器全局指标（每次同步从 /api/serverinfo 记录一次）"""
+    __tablename__ = "frps_server_metrics"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    frps_server_id = Column(Integer, ForeignKey("frps_servers.id", ondelete="CASCADE"), nullable=False)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    version = Column(String(50), nullable=True)
+    total_traffic_in = Column(BigInteger, default=0, nullable=False)  # 当天累计入流量（字节）
+    total_traffic_out = Column(BigInteger, default=0, nullable=False)  # 当天累计出流量（字节）
+    cur_conns = Column(Integer, default=0, nullable=False)
+    client_counts = Column(Integer, default=0, nullable=False)
+    proxy_type_counts = Column(Text, nullable=True)  # JSON 格式的各类型代理数
+    
+    __table_args__ = (
+        Index('ix_frps_server_metrics_server_timestamp', 'frps_server_id', 'timestamp'),
+    )
+    
+    def __repr__(self):
+        return f"<ServerMetric(server={self.frps_server_id}, timestamp={self.timestamp})>"
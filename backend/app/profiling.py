@@ -0,0 +1,342 @@
+"""请求剖析和慢查询日志（默认关闭，通过 PROFILING_ENABLED 开启）
+
+开启后每个请求都会统计 SQL 语句数和耗时（按语句文本归并，重复执行多次的同一语句
+通常就是 N+1 查询），并在响应头 Server-Timing 中返回数据库和总耗时。
+请求超过耗时阈值或出现大量重复语句时，把摘要写入日志并保存在最近记录中（/api/profiling/requests）。
+
+按采样率选中的请求还会做调用栈采样：后台线程定期读取所有线程的调用栈，统计叶子函数和
+app 内函数的出现比例。同步路由在线程池中执行，cProfile 只能剖析当前线程，所以这里采用
+与 pyinstrument 相同的统计采样方式，不依赖额外的包。
+只统计属于被采样请求的调用栈：事件循环线程上调用栈包含该请求的中间件帧时计入，
+线程池线程正在执行的上下文属于该请求时计入，并发执行的其他请求不会混入结果。
+请求头 X-Profile: 1 可以强制采样，只对已认证或来自 PROFILING_HEADER_ALLOWED_IPS 的请求生效。
+采样过的请求即使没有超过阈值，摘要也会保存在最近记录中。同一时间只采样一个请求。
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# app 包所在目录，用于在调用栈中筛选本项目的函数
+APP_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+# 叶子帧位于这些模块时视为空闲线程（等待任务、等待 IO），不计入采样
+IDLE_MODULES = ("threading.py", "queue.py", "selectors.py", "concurrent/futures/thread.py")
+
+# 在线程调用栈最外层的这么多帧中查找正在执行的上下文（线程池线程在最外层帧中执行 context.run）
+CONTEXT_SEARCH_DEPTH = 4
+
+# 摘要中保留的语句文本长度和条目数
+STATEMENT_PREVIEW_LENGTH = 300
+SUMMARY_TOP_STATEMENTS = 5
+SUMMARY_TOP_FUNCTIONS = 15
+
+
+class RequestProfile:
+    """单个请求内的 SQL 语句统计"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.queries = 0
+        self.db_seconds = 0.0
+        # 语句文本 -> [执行次数, 累计耗时]
+        self.statements: Dict[str, List[float]] = {}
+        self.slow_queries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        with self._lock:
+            self.queries += 1
+            self.db_seconds += elapsed
+            entry = self.statements.get(statement)
+            if entry is None:
+                self.statements[statement] = [1, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+
+    def top_statements(self, limit: int = SUMMARY_TOP_STATEMENTS) -> List[Dict[str, Any]]:
+        """按执行次数排序的语句（次数相同按累计耗时）"""
+        ranked = sorted(self.statements.items(), key=lambda item: (item[1][0], item[1][1]), reverse=True)
+        return [
+            {
+                "statement": statement[:STATEMENT_PREVIEW_LENGTH],
+                "count": int(count),
+                "total_ms": round(seconds * 1000, 2),
+            }
+            for statement, (count, seconds) in ranked[:limit]
+        ]
+
+    @property
+    def max_repeats(self) -> int:
+        return max((int(entry[0]) for entry in self.statements.values()), default=0)
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def install_query_profiler(engine: Engine) -> None:
+    """在引擎上注册语句执行事件，把语句耗时计入当前请求并记录慢查询"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_profile.get() is not None:
+            conn.info.setdefault("profile_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _current_profile.get()
+        starts = conn.info.get("profile_start_time")
+        if profile is None or not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        profile.record(statement, elapsed)
+        if elapsed * 1000 >= settings.profiling_slow_query_ms:
+            preview = " ".join(statement.split())[:STATEMENT_PREVIEW_LENGTH]
+            profile.slow_queries.append({"statement": preview, "ms": round(elapsed * 1000, 2)})
+            logger.warning(f"慢查询 {elapsed * 1000:.1f}ms ({profile.method} {profile.path}): {preview}")
+
+
+class StackSampler(threading.Thread):
+    """定期读取属于指定请求的线程调用栈的统计采样器"""
+
+    def __init__(self, interval: float, profile: "RequestProfile", request_frame):
+        super().__init__(name="request-profiler", daemon=True)
+        self.interval = interval
+        self.samples = 0
+        # 叶子函数（自身耗时）和 app 内函数（包含子调用的耗时）的采样次数
+        self.leaf_counts: Counter = Counter()
+        self.app_counts: Counter = Counter()
+        self._profile = profile
+        self._request_frame = request_frame
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+        self._request_frame = None
+
+    def _sample(self) -> None:
+        own_ident = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident or frame.f_code.co_filename.endswith(IDLE_MODULES):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame)
+                frame = frame.f_back
+            if not self._belongs_to_request(stack):
+                continue
+            self.samples += 1
+            self.leaf_counts[_frame_key(stack[0])] += 1
+            seen = set()
+            for frame in stack:
+                if frame.f_code.co_filename.startswith(APP_DIR):
+                    key = _function_key(frame)
+                    if key not in seen:
+                        seen.add(key)
+                        self.app_counts[key] += 1
+
+    def _belongs_to_request(self, stack: List[Any]) -> bool:
+        """调用栈是否属于被采样的请求
+
+        事件循环线程正在执行该请求时，调用栈中包含中间件的协程帧；
+        线程池线程在最外层帧中通过 context.run 执行复制自请求的上下文，上下文中的剖析记录就是该请求的。
+        """
+        if any(frame is self._request_frame for frame in stack):
+            return True
+        for frame in stack[-CONTEXT_SEARCH_DEPTH:]:
+            for value in frame.f_locals.values():
+                if isinstance(value, contextvars.Context) and value.get(_current_profile) is self._profile:
+                    return True
+        return False
+
+    def summary(self, limit: int = SUMMARY_TOP_FUNCTIONS) -> Dict[str, Any]:
+        def ranked(counts: Counter) -> List[Dict[str, Any]]:
+            return [
+                {"function": key, "samples": count, "percent": round(count * 100 / self.samples, 1)}
+                for key, count in counts.most_common(limit)
+            ]
+
+        return {
+            "samples": self.samples,
+            "interval_ms": round(self.interval * 1000, 2),
+            "self": ranked(self.leaf_counts) if self.samples else [],
+            "app": ranked(self.app_counts) if self.samples else [],
+        }
+
+
+def _frame_key(frame) -> str:
+    code = frame.f_code
+    return f"{_short_path(code.co_filename)}:{frame.f_lineno} {code.co_name}"
+
+
+def _function_key(frame) -> str:
+    code = frame.f_code
+    return f"{_short_path(code.co_filename)}:{code.co_firstlineno} {code.co_name}"
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(APP_DIR):
+        return "app/" + filename[len(APP_DIR):]
+    for path in sorted(sys.path, key=len, reverse=True):
+        if path and filename.startswith(path + os.sep):
+            return filename[len(path) + 1:]
+    return filename
+
+
+# 同一时间只允许一个请求做调用栈采样
+_sampler_lock = threading.Lock()
+_recent_profiles: Deque[Dict[str, Any]] = deque(maxlen=max(settings.profiling_history_size, 1))
+
+
+def recent_profiles() -> List[Dict[str, Any]]:
+    """最近超过阈值的请求摘要（新的在前）"""
+    return list(reversed(_recent_profiles))
+
+
+def _header_allowed(scope) -> bool:
+    """请求是否可以使用 X-Profile 请求头（来自允许的地址或通过认证，在线程中调用）"""
+    client = scope.get("client")
+    allowed_ips = {ip.strip() for ip in settings.profiling_header_allowed_ips.split(",") if ip.strip()}
+    if client and client[0] in allowed_ips:
+        return True
+
+    from fastapi import HTTPException
+    from starlette.requests import Request
+
+    from app.auth import get_current_user
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        get_current_user(Request(scope), db)
+        return True
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+
+async def _should_sample(scope) -> bool:
+    if not settings.profiling_enabled:
+        return False
+    for name, value in scope.get("headers", []):
+        if name == b"x-profile":
+            if await asyncio.to_thread(_header_allowed, scope):
+                return value == b"1"
+            break
+    return random.random() < settings.profiling_sample_rate
+
+
+class ProfilingMiddleware:
+    """统计请求内的 SQL 语句，超过阈值时记录摘要（ASGI 中间件，不缓冲流式响应）"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        token = _current_profile.set(profile)
+        sampler: Optional[StackSampler] = None
+        if await _should_sample(scope) and _sampler_lock.acquire(blocking=False):
+            sampler = StackSampler(settings.profiling_sample_interval_ms / 1000, profile, sys._getframe())
+            sampler.start()
+        status = {"code": 500}
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={profile.db_seconds * 1000:.2f};desc="{profile.queries} queries", '
+                    f"app;dur={elapsed_ms:.2f}".encode("latin-1"),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
+            if sampler is not None:
+                try:
+                    await asyncio.to_thread(sampler.stop)
+                finally:
+                    _sampler_lock.release()
+            self._finish(scope, profile, sampler, status["code"], time.perf_counter() - started)
+
+    def _finish(
+        self,
+        scope,
+        profile: RequestProfile,
+        sampler: Optional[StackSampler],
+        status_code: int,
+        elapsed: float
+    ) -> None:
+        elapsed_ms = elapsed * 1000
+        reasons = []
+        if elapsed_ms >= settings.profiling_slow_request_ms:
+            reasons.append("slow")
+        if profile.max_repeats >= settings.profiling_repeated_query_threshold:
+            reasons.append("repeated_queries")
+        if not reasons and sampler is None:
+            return
+
+        route = scope.get("route")
+        summary = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "method": profile.method,
+            "path": profile.path,
+            "route": getattr(route, "path", None),
+            "status": status_code,
+            "duration_ms": round(elapsed_ms, 2),
+            "queries": profile.queries,
+            "db_ms": round(profile.db_seconds * 1000, 2),
+            "reasons": reasons,
+            "top_statements": profile.top_statements(),
+            "slow_queries": profile.slow_queries[:SUMMARY_TOP_STATEMENTS],
+            "stack_samples": sampler.summary() if sampler is not None else None,
+        }
+        _recent_profiles.append(summary)
+
+        if reasons:
+            lines = [
+                f"请求 {profile.method} {profile.path} 耗时 {elapsed_ms:.1f}ms，"
+                f"执行 {profile.queries} 条 SQL（{profile.db_seconds * 1000:.1f}ms）[{', '.join(reasons)}]"
+            ]
+            for item in summary["top_statements"]:
+                statement = " ".join(item["statement"].split())
+                lines.append(f"  {item['count']} 次 / {item['total_ms']}ms: {statement}")
+            if sampler is not None:
+                for item in summary["stack_samples"]["app"]:
+                    lines.append(f"  {item['percent']}% {item['function']}")
+            logger.warning("\n".join(lines))
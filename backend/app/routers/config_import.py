@@ -1,21 +1,32 @@
 """配置文件导入路由"""
-from typing import Dict, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Body, Request
+from typing import AsyncIterator, Dict, Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Body, Request, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from datetime import datetime
+import codecs
+import json
 import os
+import tempfile
 from pydantic import BaseModel
 
-from app.database import get_db
+from app.config import get_settings
+from app.database import get_db, SessionLocal
 from app.auth import get_current_user
 from app.models.user import User
-from app.models.proxy import Proxy
 from app.models.frps_server import FrpsServer
-from app.services.config_parser import ConfigParser
-from app.services.port_service import PortService
+from app.services.config_parser import ConfigParser, StreamingConfigParser
+from app.services.import_service import ProxyImportService
+from app.services.import_job_service import ImportJobService, enqueue_import_job, get_job_dir
+from app.schemas.import_job import ImportJobResponse, ImportJobSummary
 
 router = APIRouter(prefix="/api/config", tags=["配置导入"])
 
+# 流式读取上传文件的块大小
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# 请求体超过该大小时写入磁盘临时文件
+UPLOAD_SPOOL_SIZE = 1024 * 1024
+
 
 class ConfigImportRequest(BaseModel):
     """配置导入请求"""
@@ -23,6 +34,143 @@ class ConfigImportRequest(BaseModel):
     format: str  # 'ini' 或 'toml'
     frps_server_id: int
     group_name: Optional[str] = None
+    dry_run: bool = False  # 只返回差异，不写入数据库
+
+
+def _run_import(
+    db: Session,
+    frps_server_id: int,
+    content: str,
+    file_extension: str,
+    group_name: Optional[str],
+    dry_run: bool
+) -> Dict[str, Any]:
+    """解析配置内容并批量导入（三个导入接口共用）"""
+    # 解析配置文件
+    try:
+        parser = ConfigParser()
+        proxy_configs = parser.parse_config(content, file_extension)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not proxy_configs:
+        raise HTTPException(status_code=400, detail="配置文件中没有找到有效的代理配置")
+    
+    import_service = ProxyImportService(db)
+    try:
+        stats = import_service.import_proxies(
+            frps_server_id, proxy_configs, group_name=group_name, dry_run=dry_run
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"保存数据失败: {str(e)}")
+    
+    return {
+        "success": True,
+        "dry_run": dry_run,
+        "message": _import_message(stats, dry_run),
+        "stats": stats
+    }
+
+
+def _import_message(stats: Dict[str, Any], dry_run: bool) -> str:
+    """导入结果摘要"""
+    prefix = "预览完成" if dry_run else "导入完成"
+    return (
+        f"{prefix}：新增 {stats['created']} 个，更新 {stats['updated']} 个，"
+        f"未变化 {stats['unchanged']} 个，失败 {stats['failed']} 个"
+    )
+
+
+def _job_accepted(job) -> Dict[str, Any]:
+    """创建任务后的响应"""
+    return {
+        "success": True,
+        "job_id": job.job_id,
+        "status": job.status,
+        "message": "导入任务已创建，请通过 /api/config/import/jobs/{job_id} 查询进度"
+    }
+
+
+async def _read_spool(spool) -> AsyncIterator[bytes]:
+    """从头按块读取临时文件，读完后关闭"""
+    try:
+        spool.seek(0)
+        while True:
+            chunk = spool.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        spool.close()
+
+
+async def _stream_import(
+    chunks: AsyncIterator[bytes],
+    frps_server_id: int,
+    file_extension: str,
+    group_name: Optional[str],
+    dry_run: bool,
+    batch_size: int
+) -> AsyncIterator[str]:
+    """边读取边解析配置，按批次导入，并以 NDJSON 输出进度
+    
+    每写入一个批次输出一行 {"event": "progress", ...}，
+    结束时输出 {"event": "done", ...}，出错时输出 {"event": "error", ...}。
+    出错前已提交的批次不会回滚。
+    """
+    def event(payload: Dict[str, Any]) -> str:
+        return json.dumps(payload, ensure_ascii=False) + "\n"
+    
+    # 依赖注入的会话在响应开始前就会关闭，流式响应需要自己管理会话
+    db = SessionLocal()
+    try:
+        import_service = ProxyImportService(db)
+        state = await run_in_threadpool(import_service.prepare, frps_server_id, group_name, dry_run)
+        parser = StreamingConfigParser(file_extension)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        batch = []
+        
+        async def flush_batch():
+            await run_in_threadpool(import_service.import_batch, state, batch[:])
+            batch.clear()
+            return event({
+                "event": "progress",
+                "processed": state.stats["total"],
+                **{key: state.stats[key] for key in ("created", "updated", "unchanged", "failed")}
+            })
+        
+        async for chunk in chunks:
+            batch.extend(parser.feed(decoder.decode(chunk)))
+            while len(batch) >= batch_size:
+                rest = batch[batch_size:]
+                del batch[batch_size:]
+                yield await flush_batch()
+                batch.extend(rest)
+        batch.extend(parser.feed(decoder.decode(b"", final=True)))
+        batch.extend(parser.close())
+        if batch:
+            yield await flush_batch()
+        
+        if state.stats["total"] == 0:
+            yield event({"event": "error", "detail": "配置文件中没有找到有效的代理配置"})
+            return
+        
+        stats = state.result()
+        yield event({
+            "event": "done",
+            "success": True,
+            "dry_run": dry_run,
+            "message": _import_message(stats, dry_run),
+            "stats": stats
+        })
+    except UnicodeDecodeError as e:
+        yield event({"event": "error", "detail": f"读取文件失败: {str(e)}"})
+    except ValueError as e:
+        yield event({"event": "error", "detail": str(e)})
+    except Exception as e:
+        yield event({"event": "error", "detail": f"保存数据失败: {str(e)}"})
+    finally:
+        db.close()
 
 
 @router.post("/import")
@@ -30,6 +178,7 @@ async def import_config(
     file: UploadFile = File(..., description="frpc 配置文件（.ini 或 .toml）"),
     frps_server_id: int = Form(..., description="frps 服务器 ID"),
     group_name: str = Form(None, description="分组名称（可选，优先使用此分组）"),
+    dry_run: bool = Form(False, description="只返回差异，不写入数据库"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
@@ -38,6 +187,7 @@ async def import_config(
     支持 INI 和 TOML 格式的配置文件。
     对于已存在的代理（按 name + frps_server_id 判断），将完全覆盖更新。
     对于不存在的代理，将创建新记录。
+    dry_run 为 true 时只返回计算出的差异，不写入数据库。
     """
     # 验证服务器是否存在
     server = db.query(FrpsServer).filter(FrpsServer.id == frps_server_id).first()
@@ -61,143 +211,7 @@ async def import_config(
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"读取文件失败: {str(e)}")
     
-    # 解析配置文件
-    try:
-        parser = ConfigParser()
-        proxy_configs = parser.parse_config(content_str, file_extension)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    
-    if not proxy_configs:
-        raise HTTPException(status_code=400, detail="配置文件中没有找到有效的代理配置")
-    
-    # 导入统计
-    stats = {
-        "total": len(proxy_configs),
-        "created": 0,
-        "updated": 0,
-        "failed": 0,
-        "errors": []
-    }
-    
-    port_service = PortService(db)
-    
-    # 处理每个代理配置
-    for proxy_config in proxy_configs:
-        try:
-            proxy_name = proxy_config['name']
-            
-            # 检查代理是否已存在
-            existing_proxy = db.query(Proxy).filter(
-                Proxy.frps_server_id == frps_server_id,
-                Proxy.name == proxy_name
-            ).first()
-            
-            # 确定分组名称：优先使用用户指定的分组，否则自动解析
-            proxy_group_name = group_name if group_name else Proxy.parse_group_name(proxy_name)
-            
-            if existing_proxy:
-                # 完全覆盖更新现有代理
-                old_remote_port = existing_proxy.remote_port
-                
-                # 如果远程端口发生变化，需要释放旧端口并分配新端口
-                new_remote_port = proxy_config.get('remote_port')
-                if new_remote_port and old_remote_port != new_remote_port:
-                    # 释放旧端口
-                    if old_remote_port:
-                        try:
-                            port_service.release_port(frps_server_id, old_remote_port)
-                        except:
-                            pass  # 忽略释放失败
-                    
-                    # 检查新端口是否可用
-                    if not port_service.is_port_available(frps_server_id, new_remote_port):
-                        stats["failed"] += 1
-                        stats["errors"].append({
-                            "proxy_name": proxy_name,
-                            "error": f"端口 {new_remote_port} 已被占用"
-                        })
-                        continue
-                    
-                    # 分配新端口
-                    try:
-                        port_service.allocate_port(frps_server_id, new_remote_port, proxy_name)
-                    except ValueError as e:
-                        stats["failed"] += 1
-                        stats["errors"].append({
-                            "proxy_name": proxy_name,
-                            "error": str(e)
-                        })
-                        continue
-                
-                # 更新所有字段
-                existing_proxy.proxy_type = proxy_config['proxy_type']
-                existing_proxy.local_ip = proxy_config['local_ip']
-                existing_proxy.local_port = proxy_config['local_port']
-                existing_proxy.remote_port = proxy_config.get('remote_port')
-                existing_proxy.group_name = proxy_group_name
-                existing_proxy.updated_at = datetime.utcnow()
-                
-                stats["updated"] += 1
-                
-            else:
-                # 创建新代理
-                new_remote_port = proxy_config.get('remote_port')
-                
-                # 如果有远程端口，检查是否可用并分配
-                if new_remote_port:
-                    if not port_service.is_port_available(frps_server_id, new_remote_port):
-                        stats["failed"] += 1
-                        stats["errors"].append({
-                            "proxy_name": proxy_name,
-                            "error": f"端口 {new_remote_port} 已被占用"
-                        })
-                        continue
-                    
-                    try:
-                        port_service.allocate_port(frps_server_id, new_remote_port, proxy_name)
-                    except ValueError as e:
-                        stats["failed"] += 1
-                        stats["errors"].append({
-                            "proxy_name": proxy_name,
-                            "error": str(e)
-                        })
-                        continue
-                
-                # 创建新代理记录
-                new_proxy = Proxy(
-                    frps_server_id=frps_server_id,
-                    name=proxy_name,
-                    group_name=proxy_group_name,
-                    proxy_type=proxy_config['proxy_type'],
-                    local_ip=proxy_config['local_ip'],
-                    local_port=proxy_config['local_port'],
-                    remote_port=proxy_config.get('remote_port'),
-                    status='offline'  # 默认为离线状态
-                )
-                
-                db.add(new_proxy)
-                stats["created"] += 1
-        
-        except Exception as e:
-            stats["failed"] += 1
-            stats["errors"].append({
-                "proxy_name": proxy_config.get('name', 'unknown'),
-                "error": str(e)
-            })
-    
-    # 提交数据库事务
-    try:
-        db.commit()
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"保存数据失败: {str(e)}")
-    
-    return {
-        "success": True,
-        "message": f"导入完成：新增 {stats['created']} 个，更新 {stats['updated']} 个，失败 {stats['failed']} 个",
-        "stats": stats
-    }
+    return _run_import(db, frps_server_id, content_str, file_extension, group_name, dry_run)
 
 
 @router.post("/import/{format}/{server_name}")
@@ -205,6 +219,7 @@ async def import_config_by_names(
     format: str,
     server_name: str,
     request: Request,
+    dry_run: bool = Query(False, description="只返回差异，不写入数据库"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
@@ -247,143 +262,7 @@ async def import_config_by_names(
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"读取文件失败: {str(e)}")
     
-    # 解析配置文件
-    try:
-        parser = ConfigParser()
-        proxy_configs = parser.parse_config(content_str, f".{format}")
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    
-    if not proxy_configs:
-        raise HTTPException(status_code=400, detail="配置文件中没有找到有效的代理配置")
-    
-    # 导入统计
-    stats = {
-        "total": len(proxy_configs),
-        "created": 0,
-        "updated": 0,
-        "failed": 0,
-        "errors": []
-    }
-    
-    port_service = PortService(db)
-    
-    # 处理每个代理配置
-    for proxy_config in proxy_configs:
-        try:
-            proxy_name = proxy_config['name']
-            
-            # 检查代理是否已存在
-            existing_proxy = db.query(Proxy).filter(
-                Proxy.frps_server_id == server_id,
-                Proxy.name == proxy_name
-            ).first()
-            
-            # 确定分组名称：优先使用用户指定的分组，否则自动解析
-            proxy_group_name = group_name if group_name else Proxy.parse_group_name(proxy_name)
-            
-            if existing_proxy:
-                # 完全覆盖更新现有代理
-                old_remote_port = existing_proxy.remote_port
-                
-                # 如果远程端口发生变化，需要释放旧端口并分配新端口
-                new_remote_port = proxy_config.get('remote_port')
-                if new_remote_port and old_remote_port != new_remote_port:
-                    # 释放旧端口
-                    if old_remote_port:
-                        try:
-                            port_service.release_port(server_id, old_remote_port)
-                        except:
-                            pass  # 忽略释放失败
-                    
-                    # 检查新端口是否可用
-                    if not port_service.is_port_available(server_id, new_remote_port):
-                        stats["failed"] += 1
-                        stats["errors"].append({
-                            "proxy_name": proxy_name,
-                            "error": f"端口 {new_remote_port} 已被占用"
-                        })
-                        continue
-                    
-                    # 分配新端口
-                    try:
-                        port_service.allocate_port(server_id, new_remote_port, proxy_name)
-                    except ValueError as e:
-                        stats["failed"] += 1
-                        stats["errors"].append({
-                            "proxy_name": proxy_name,
-                            "error": str(e)
-                        })
-                        continue
-                
-                # 更新所有字段
-                existing_proxy.proxy_type = proxy_config['proxy_type']
-                existing_proxy.local_ip = proxy_config['local_ip']
-                existing_proxy.local_port = proxy_config['local_port']
-                existing_proxy.remote_port = proxy_config.get('remote_port')
-                existing_proxy.group_name = proxy_group_name
-                existing_proxy.updated_at = datetime.utcnow()
-                
-                stats["updated"] += 1
-                
-            else:
-                # 创建新代理
-                new_remote_port = proxy_config.get('remote_port')
-                
-                # 如果有远程端口，检查是否可用并分配
-                if new_remote_port:
-                    if not port_service.is_port_available(server_id, new_remote_port):
-                        stats["failed"] += 1
-                        stats["errors"].append({
-                            "proxy_name": proxy_name,
-                            "error": f"端口 {new_remote_port} 已被占用"
-                        })
-                        continue
-                    
-                    try:
-                        port_service.allocate_port(server_id, new_remote_port, proxy_name)
-                    except ValueError as e:
-                        stats["failed"] += 1
-                        stats["errors"].append({
-                            "proxy_name": proxy_name,
-                            "error": str(e)
-                        })
-                        continue
-                
-                # 创建新代理记录
-                new_proxy = Proxy(
-                    frps_server_id=server_id,
-                    name=proxy_name,
-                    group_name=proxy_group_name,
-                    proxy_type=proxy_config['proxy_type'],
-                    local_ip=proxy_config['local_ip'],
-                    local_port=proxy_config['local_port'],
-                    remote_port=proxy_config.get('remote_port'),
-                    status='offline'  # 默认为离线状态
-                )
-                
-                db.add(new_proxy)
-                stats["created"] += 1
-        
-        except Exception as e:
-            stats["failed"] += 1
-            stats["errors"].append({
-                "proxy_name": proxy_config.get('name', 'unknown'),
-                "error": str(e)
-            })
-    
-    # 提交数据库事务
-    try:
-        db.commit()
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"保存数据失败: {str(e)}")
-    
-    return {
-        "success": True,
-        "message": f"导入完成：新增 {stats['created']} 个，更新 {stats['updated']} 个，失败 {stats['failed']} 个",
-        "stats": stats
-    }
+    return _run_import(db, server_id, content_str, f".{format}", group_name, dry_run)
 
 
 @router.post("/import/text")
@@ -436,141 +315,229 @@ async def import_config_text(
     if not server:
         raise HTTPException(status_code=404, detail="服务器不存在")
     
-    # 解析配置文件
+    return _run_import(
+        db, request.frps_server_id, request.content, f".{request.format}",
+        request.group_name, request.dry_run
+    )
+
+
+@router.post("/import/stream")
+async def import_config_stream(
+    file: UploadFile = File(..., description="frpc 配置文件（.ini 或 .toml）"),
+    frps_server_id: int = Form(..., description="frps 服务器 ID"),
+    group_name: str = Form(None, description="分组名称（可选，优先使用此分组）"),
+    dry_run: bool = Form(False, description="只返回差异，不写入数据库"),
+    batch_size: Optional[int] = Form(None, ge=1, description="每批写入的代理数，默认使用配置项 import_batch_size"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> StreamingResponse:
+    """流式导入 frpc 配置文件（适用于大文件）
+    
+    边读取边解析，按批次写入数据库，响应为 NDJSON 格式的进度事件。
+    每个批次单独提交，出错时之前的批次已经生效。
+    """
+    server = db.query(FrpsServer).filter(FrpsServer.id == frps_server_id).first()
+    if not server:
+        raise HTTPException(status_code=404, detail="服务器不存在")
+    
+    file_extension = os.path.splitext(file.filename or "")[1].lower()
+    if file_extension not in ['.ini', '.toml']:
+        raise HTTPException(
+            status_code=400,
+            detail=f"不支持的文件格式: {file_extension}，仅支持 .ini 和 .toml 文件"
+        )
+    
+    # 上传文件在响应开始前就会被关闭，复制到自己管理的临时文件中
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE)
     try:
-        parser = ConfigParser()
-        proxy_configs = parser.parse_config(request.content, f".{request.format}")
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            spool.write(chunk)
+    except Exception as e:
+        spool.close()
+        raise HTTPException(status_code=400, detail=f"读取文件失败: {str(e)}")
     
-    if not proxy_configs:
-        raise HTTPException(status_code=400, detail="配置文件中没有找到有效的代理配置")
+    return StreamingResponse(
+        _stream_import(
+            _read_spool(spool), frps_server_id, file_extension, group_name, dry_run,
+            batch_size or get_settings().import_batch_size
+        ),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post("/import/stream/{format}/{server_name}")
+async def import_config_stream_by_names(
+    format: str,
+    server_name: str,
+    request: Request,
+    group_name: Optional[str] = Query(None, description="分组名称（可选，优先使用此分组）"),
+    dry_run: bool = Query(False, description="只返回差异，不写入数据库"),
+    batch_size: Optional[int] = Query(None, ge=1, description="每批写入的代理数"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> StreamingResponse:
+    """直接上传配置文件流式导入（适用于大文件）
     
-    # 导入统计
-    stats = {
-        "total": len(proxy_configs),
-        "created": 0,
-        "updated": 0,
-        "failed": 0,
-        "errors": []
-    }
+    请求体先写入临时文件（不整体读入内存），再边解析边按批次写入，响应为 NDJSON 格式的进度事件。
     
-    port_service = PortService(db)
-    
-    # 处理每个代理配置
-    for proxy_config in proxy_configs:
-        try:
-            proxy_name = proxy_config['name']
-            
-            # 检查代理是否已存在
-            existing_proxy = db.query(Proxy).filter(
-                Proxy.frps_server_id == request.frps_server_id,
-                Proxy.name == proxy_name
-            ).first()
-            
-            # 确定分组名称：优先使用用户指定的分组，否则自动解析
-            proxy_group_name = request.group_name if request.group_name else Proxy.parse_group_name(proxy_name)
-            
-            if existing_proxy:
-                # 完全覆盖更新现有代理
-                old_remote_port = existing_proxy.remote_port
-                
-                # 如果远程端口发生变化，需要释放旧端口并分配新端口
-                new_remote_port = proxy_config.get('remote_port')
-                if new_remote_port and old_remote_port != new_remote_port:
-                    # 释放旧端口
-                    if old_remote_port:
-                        try:
-                            port_service.release_port(request.frps_server_id, old_remote_port)
-                        except:
-                            pass  # 忽略释放失败
-                    
-                    # 检查新端口是否可用
-                    if not port_service.is_port_available(request.frps_server_id, new_remote_port):
-                        stats["failed"] += 1
-                        stats["errors"].append({
-                            "proxy_name": proxy_name,
-                            "error": f"端口 {new_remote_port} 已被占用"
-                        })
-                        continue
-                    
-                    # 分配新端口
-                    try:
-                        port_service.allocate_port(request.frps_server_id, new_remote_port, proxy_name)
-                    except ValueError as e:
-                        stats["failed"] += 1
-                        stats["errors"].append({
-                            "proxy_name": proxy_name,
-                            "error": str(e)
-                        })
-                        continue
-                
-                # 更新所有字段
-                existing_proxy.proxy_type = proxy_config['proxy_type']
-                existing_proxy.local_ip = proxy_config['local_ip']
-                existing_proxy.local_port = proxy_config['local_port']
-                existing_proxy.remote_port = proxy_config.get('remote_port')
-                existing_proxy.group_name = proxy_group_name
-                existing_proxy.updated_at = datetime.utcnow()
-                
-                stats["updated"] += 1
-                
-            else:
-                # 创建新代理
-                new_remote_port = proxy_config.get('remote_port')
-                
-                # 如果有远程端口，检查是否可用并分配
-                if new_remote_port:
-                    if not port_service.is_port_available(request.frps_server_id, new_remote_port):
-                        stats["failed"] += 1
-                        stats["errors"].append({
-                            "proxy_name": proxy_name,
-                            "error": f"端口 {new_remote_port} 已被占用"
-                        })
-                        continue
-                    
-                    try:
-                        port_service.allocate_port(request.frps_server_id, new_remote_port, proxy_name)
-                    except ValueError as e:
-                        stats["failed"] += 1
-                        stats["errors"].append({
-                            "proxy_name": proxy_name,
-                            "error": str(e)
-                        })
-                        continue
-                
-                # 创建新代理记录
-                new_proxy = Proxy(
-                    frps_server_id=request.frps_server_id,
-                    name=proxy_name,
-                    group_name=proxy_group_name,
-                    proxy_type=proxy_config['proxy_type'],
-                    local_ip=proxy_config['local_ip'],
-                    local_port=proxy_config['local_port'],
-                    remote_port=proxy_config.get('remote_port'),
-                    status='offline'  # 默认为离线状态
-                )
-                
-                db.add(new_proxy)
-                stats["created"] += 1
-        
-        except Exception as e:
-            stats["failed"] += 1
-            stats["errors"].append({
-                "proxy_name": proxy_config.get('name', 'unknown'),
-                "error": str(e)
-            })
+    使用示例（curl）:
+    ```bash
+    curl -u admin:admin -X POST -N \\
+      -H "Content-Type: text/plain" \\
+      -T frpc.toml \\
+      http://localhost:8000/api/config/import/stream/toml/prod_server
+    ```
+    """
+    if format.lower() not in ['ini', 'toml']:
+        raise HTTPException(
+            status_code=400,
+            detail=f"不支持的格式: {format}，仅支持 ini 和 toml"
+        )
     
-    # 提交数据库事务
+    server = db.query(FrpsServer).filter(FrpsServer.name == server_name).first()
+    if not server:
+        raise HTTPException(status_code=404, detail=f"服务器 '{server_name}' 不存在")
+    
+    # StreamingResponse 在发送期间会占用 receive 通道监听断开，
+    # 因此先把请求体写入临时文件（超过阈值落盘，不占用内存），再流式解析
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE)
     try:
-        db.commit()
+        async for chunk in request.stream():
+            spool.write(chunk)
     except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"保存数据失败: {str(e)}")
+        spool.close()
+        raise HTTPException(status_code=400, detail=f"读取文件失败: {str(e)}")
     
-    return {
-        "success": True,
-        "message": f"导入完成：新增 {stats['created']} 个，更新 {stats['updated']} 个，失败 {stats['failed']} 个",
-        "stats": stats
-    }
+    return StreamingResponse(
+        _stream_import(
+            _read_spool(spool), server.id, f".{format}", group_name, dry_run,
+            batch_size or get_settings().import_batch_size
+        ),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post("/import/jobs", status_code=202)
+async def create_import_job(
+    file: UploadFile = File(..., description="frpc 配置文件（.ini 或 .toml）"),
+    frps_server_id: int = Form(..., description="frps 服务器 ID"),
+    group_name: str = Form(None, description="分组名称（可选，优先使用此分组）"),
+    dry_run: bool = Form(False, description="只返回差异，不写入数据库"),
+    batch_size: Optional[int] = Form(None, ge=1, description="每批写入的代理数，默认使用配置项 import_batch_size"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """创建后台导入任务
+    
+    上传文件保存到磁盘后立即返回任务ID，由后台任务按批次导入，
+    通过 GET /api/config/import/jobs/{job_id} 查询进度和结果。
+    服务重启后未完成的任务会从最后提交的批次继续执行。
+    """
+    server = db.query(FrpsServer).filter(FrpsServer.id == frps_server_id).first()
+    if not server:
+        raise HTTPException(status_code=404, detail="服务器不存在")
+    
+    file_extension = os.path.splitext(file.filename or "")[1].lower()
+    if file_extension not in ['.ini', '.toml']:
+        raise HTTPException(
+            status_code=400,
+            detail=f"不支持的文件格式: {file_extension}，仅支持 .ini 和 .toml 文件"
+        )
+    
+    tmp = tempfile.NamedTemporaryFile(dir=get_job_dir(), suffix=".upload", delete=False)
+    try:
+        with tmp:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                tmp.write(chunk)
+        job = ImportJobService(db).create_job(
+            frps_server_id, file_extension, tmp.name, group_name, dry_run, batch_size
+        )
+    except Exception as e:
+        if os.path.exists(tmp.name):
+            os.remove(tmp.name)
+        raise HTTPException(status_code=400, detail=f"读取文件失败: {str(e)}")
+    
+    enqueue_import_job(job.job_id)
+    return _job_accepted(job)
+
+
+@router.post("/import/jobs/{format}/{server_name}", status_code=202)
+async def create_import_job_by_names(
+    format: str,
+    server_name: str,
+    request: Request,
+    group_name: Optional[str] = Query(None, description="分组名称（可选，优先使用此分组）"),
+    dry_run: bool = Query(False, description="只返回差异，不写入数据库"),
+    batch_size: Optional[int] = Query(None, ge=1, description="每批写入的代理数"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """直接上传配置文件创建后台导入任务
+    
+    使用示例（curl）:
+    ```bash
+    curl -u admin:admin -X POST \\
+      -H "Content-Type: text/plain" \\
+      -T frpc.toml \\
+      http://localhost:8000/api/config/import/jobs/toml/prod_server
+    
+    # 查询任务进度
+    curl -u admin:admin http://localhost:8000/api/config/import/jobs/<job_id>
+    ```
+    """
+    if format.lower() not in ['ini', 'toml']:
+        raise HTTPException(
+            status_code=400,
+            detail=f"不支持的格式: {format}，仅支持 ini 和 toml"
+        )
+    
+    server = db.query(FrpsServer).filter(FrpsServer.name == server_name).first()
+    if not server:
+        raise HTTPException(status_code=404, detail=f"服务器 '{server_name}' 不存在")
+    
+    tmp = tempfile.NamedTemporaryFile(dir=get_job_dir(), suffix=".upload", delete=False)
+    try:
+        with tmp:
+            async for chunk in request.stream():
+                tmp.write(chunk)
+        job = ImportJobService(db).create_job(
+            server.id, format, tmp.name, group_name, dry_run, batch_size
+        )
+    except Exception as e:
+        if os.path.exists(tmp.name):
+            os.remove(tmp.name)
+        raise HTTPException(status_code=400, detail=f"读取文件失败: {str(e)}")
+    
+    enqueue_import_job(job.job_id)
+    return _job_accepted(job)
+
 
+@router.get("/import/jobs", response_model=List[ImportJobSummary])
+async def list_import_jobs(
+    frps_server_id: Optional[int] = Query(None, description="按服务器过滤"),
+    status: Optional[str] = Query(None, description="按状态过滤：pending/running/completed/failed"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """查询最近的后台导入任务"""
+    return ImportJobService(db).list_jobs(frps_server_id, status, limit)
+
+
+@router.get("/import/jobs/{job_id}", response_model=ImportJobResponse)
+async def get_import_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """查询后台导入任务的进度和结果"""
+    job = ImportJobService(db).get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="导入任务不存在")
+    return job
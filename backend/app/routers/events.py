@@ -0,0 +1,67 @@
+"""实时事件推送路由（Server-Sent Events）"""
+import asyncio
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from app.auth import get_current_user
+from app.models.user import User
+from app.services.event_bus import get_event_bus
+
+router = APIRouter(prefix="/api/events", tags=["实时事件"])
+
+# 没有事件时发送心跳的间隔（秒），避免代理服务器断开空闲连接
+HEARTBEAT_SECONDS = 15
+
+
+def _format_sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    frps_server_id: Optional[int] = Query(None, description="只接收指定服务器的事件"),
+    group_name: Optional[str] = Query(None, description="只接收指定分组的事件"),
+    current_user: User = Depends(get_current_user)
+):
+    """订阅代理状态变化、新发现的代理和端口冲突事件（text/event-stream）
+    
+    事件类型为 online / offline / discovered / conflict 等；
+    订阅者消费过慢导致事件被丢弃时发送 lagged 事件，客户端应重新拉取列表。
+    """
+    bus = get_event_bus()
+    subscription = bus.subscribe(frps_server_id, group_name)
+    
+    async def event_stream():
+        reported_dropped = 0
+        try:
+            yield _format_sse("ready", {"frps_server_id": frps_server_id, "group_name": group_name})
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                
+                if subscription.dropped > reported_dropped:
+                    yield _format_sse("lagged", {"dropped": subscription.dropped - reported_dropped})
+                    reported_dropped = subscription.dropped
+                yield _format_sse(event["type"], event, event.get("id"))
+        finally:
+            bus.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,25 +1,35 @@
 """frpc 配置生成路由"""
-from typing import List
+from typing import Iterator, List
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.auth import get_current_user, get_auth_from_header, authenticate_user
 from app.models.user import User
 from app.models.frps_server import FrpsServer
-from app.models.temp_config import TempConfig
 from app.models.group import Group
 from app.models.proxy import Proxy
 from app.services.frpc_config_service import FrpcConfigService
+from app.services.config_bundle_service import BUNDLE_FORMATS, ConfigBundleService
+from app.services.temp_config_store import TempConfigExpired, get_temp_config_store
 from app.services.port_service import PortService
 from app.config import get_settings
 from datetime import datetime
+import codecs
+import tempfile
+from urllib.parse import quote
 
 router = APIRouter(prefix="/api/frpc", tags=["frpc配置生成"])
 settings = get_settings()
 
+# 流式转换读取请求体的块大小
+CONVERT_CHUNK_SIZE = 64 * 1024
+# 请求体超过该大小时写入磁盘临时文件
+CONVERT_SPOOL_SIZE = 1024 * 1024
+
 
 class GenerateTokenRequest(BaseModel):
     """生成访问令牌请求"""
@@ -111,8 +121,9 @@ def generate_config_by_proxies(
         random_id = secrets.token_urlsafe(8)
         temp_group = f"temp_sel_{random_id}"
         
-        # 创建临时配置
-        temp_config = TempConfig.create_temp_config(
+        # 创建临时配置（内容写入磁盘存储，数据库只保存元数据）
+        temp_config = get_temp_config_store().save(
+            db,
             server_name=server.name,
             group_name=temp_group,
             config_content=config,
@@ -120,10 +131,6 @@ def generate_config_by_proxies(
             hours=24
         )
         
-        db.add(temp_config)
-        db.commit()
-        db.refresh(temp_config)
-        
         return {
             "config": config,
             "temp_id": temp_config.config_id,
@@ -322,7 +329,7 @@ def get_config_by_group(
     frps_server_id: int = Query(..., description="frps 服务器 ID"),
     client_name: str = Query(None, description="客户端名称（可选）"),
     format: str = Query("ini", description="配置格式：ini 或 toml"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """根据分组获取 frpc 配置文件（GET 方法）
@@ -416,20 +423,16 @@ def get_temp_config(
     用于访问选择代理生成的临时配置。
     临时配置24小时后自动失效。
     """
-    # 查找临时配置
-    temp_config = db.query(TempConfig).filter(TempConfig.config_id == config_id).first()
+    # 查找临时配置（优先从内存缓存读取）
+    try:
+        content = get_temp_config_store().get_content(db, config_id)
+    except TempConfigExpired:
+        raise HTTPException(status_code=410, detail="临时配置已过期（24小时有效期）")
     
-    if not temp_config:
+    if content is None:
         raise HTTPException(status_code=404, detail="临时配置不存在或已过期")
     
-    # 检查是否过期
-    if temp_config.is_expired:
-        # 删除过期配置
-        db.delete(temp_config)
-        db.commit()
-        raise HTTPException(status_code=410, detail="临时配置已过期（24小时有效期）")
-    
-    return temp_config.config_content
+    return content
 
 
 class ConvertIniToTomlRequest(BaseModel):
@@ -494,6 +497,8 @@ async def convert_ini_to_toml_direct(
     """将INI格式的frpc配置转换为TOML格式（直接接收原始文本）
     
     仅支持 API Key 认证。
+    整个请求体读入内存后一次转换，任何格式错误都返回 400；
+    大文件请使用 /convert/ini-to-toml/stream（逐段输出，输出开始后的错误以注释结尾）。
     
     使用方法（通过curl）:
     ```bash
@@ -553,6 +558,96 @@ async def convert_ini_to_toml_direct(
         raise HTTPException(status_code=500, detail=error_detail)
 
 
+def _iter_spool_text(spool) -> Iterator[str]:
+    """从头按块读取临时文件并解码为文本，读完后关闭"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        spool.seek(0)
+        while True:
+            chunk = spool.read(CONVERT_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+    finally:
+        spool.close()
+
+
+def _iter_converted(first: str, pieces: Iterator[str]) -> Iterator[str]:
+    """输出转换结果；中途出错时输出注释说明并结束（响应状态码已发送）"""
+    yield first
+    try:
+        yield from pieces
+    except (ValueError, UnicodeDecodeError) as e:
+        yield f"\n# 转换中断: {str(e)}\n"
+
+
+async def _stream_ini_to_toml(request: Request, db: Session) -> StreamingResponse:
+    """流式转换请求体中的 INI 配置（各 /stream 路由共用）"""
+    # StreamingResponse 在发送期间会占用 receive 通道，先把请求体写入临时文件
+    spool = tempfile.SpooledTemporaryFile(max_size=CONVERT_SPOOL_SIZE)
+    try:
+        async for chunk in request.stream():
+            spool.write(chunk)
+    except Exception as e:
+        spool.close()
+        raise HTTPException(status_code=400, detail=f"读取请求体失败: {str(e)}")
+    
+    spool.seek(0)
+    raw_head = spool.read(1024)
+    head = raw_head.decode('utf-8', errors='ignore').strip()
+    if head.startswith('<!DOCTYPE') or head.startswith('<html'):
+        spool.close()
+        raise HTTPException(
+            status_code=400,
+            detail="请求体内容无效：收到的是 HTML 页面而不是 INI 配置。请检查认证信息是否正确，或确认请求是否被重定向。"
+        )
+    if not head and len(raw_head) < 1024:
+        spool.close()
+        raise HTTPException(
+            status_code=400,
+            detail="请求体为空，请提供有效的 INI 配置内容"
+        )
+    
+    service = FrpcConfigService(db)
+    pieces = service.iter_ini_to_toml(_iter_spool_text(spool))
+    # 先转换出第一段，使开头的格式错误能以 400 返回
+    try:
+        first = await run_in_threadpool(next, pieces)
+    except (ValueError, UnicodeDecodeError) as e:
+        pieces.close()
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # 同步生成器由 StreamingResponse 放到线程池中迭代
+    return StreamingResponse(
+        _iter_converted(first, pieces),
+        media_type="text/plain; charset=utf-8"
+    )
+
+
+@router.post("/convert/ini-to-toml/stream")
+async def convert_ini_to_toml_stream(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """将INI格式的frpc配置流式转换为TOML格式（适用于大文件）
+    
+    请求体先写入临时文件（不整体读入内存），然后逐个 section 转换并立即输出。
+    开头部分的格式错误返回 400；输出开始后出现的错误以 `# 转换中断: ...` 注释结尾。
+    
+    使用方法（通过curl）:
+    ```bash
+    curl -X POST -N \
+      -H "Content-Type: text/plain" \
+      -H "Authorization: Bearer YOUR_API_KEY" \
+      -T frpc.ini \
+      http://your-api/api/frpc/convert/ini-to-toml/stream -o frpc.toml
+    ```
+    """
+    return await _stream_ini_to_toml(request, db)
+
+
 @router.post("/convert/to-toml/direct", response_class=PlainTextResponse)
 async def convert_to_toml_direct_alias(
     request: Request,
@@ -562,28 +657,30 @@ async def convert_to_toml_direct_alias(
     """将INI格式的frpc配置转换为TOML格式（直接接收原始文本）- 简短别名
     
     这是 /convert/ini-to-toml/direct 的简短别名，功能完全相同。
-    仅支持 API Key 认证。
+    仅支持 API Key 认证。大文件请使用 /convert/to-toml/stream。
     """
     # 直接调用主函数
     return await convert_ini_to_toml_direct(request, db, current_user)
 
 
-@router.post("/convert/to-toml/{api_key}", response_class=PlainTextResponse)
-async def convert_to_toml_with_path_key(
-    api_key: str,
+@router.post("/convert/to-toml/stream")
+async def convert_to_toml_stream_alias(
     request: Request,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
 ):
-    """将INI格式的frpc配置转换为TOML格式（支持路径参数形式的 API Key）
+    """将INI格式的frpc配置流式转换为TOML格式 - 简短别名
     
-    这是为了方便使用而提供的兼容路由，API Key 可以作为路径参数。
-    推荐使用查询参数形式：/convert/to-toml/direct?api_key=YOUR_API_KEY
+    这是 /convert/ini-to-toml/stream 的简短别名，功能完全相同。
     """
+    return await _stream_ini_to_toml(request, db)
+
+
+def _path_api_key_user(db: Session, api_key: str) -> User:
+    """验证路径参数中的 API Key，返回对应的临时用户对象"""
     from app.auth import verify_api_key
-    from app.models.user import User
-    from fastapi import HTTPException, status
+    from fastapi import status
     
-    # 验证 API Key
     api_key_obj = verify_api_key(db, api_key)
     if not api_key_obj:
         raise HTTPException(
@@ -591,17 +688,45 @@ async def convert_to_toml_with_path_key(
             detail="API Key 无效或已过期"
         )
     
-    # 创建临时用户对象
-    temp_user = User(
+    return User(
         id=-api_key_obj.id,
         username=f"api_key_{api_key_obj.id}",
         password_hash="",
     )
+
+
+@router.post("/convert/to-toml/{api_key}", response_class=PlainTextResponse)
+async def convert_to_toml_with_path_key(
+    api_key: str,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """将INI格式的frpc配置转换为TOML格式（支持路径参数形式的 API Key）
+    
+    这是为了方便使用而提供的兼容路由，API Key 可以作为路径参数。
+    推荐使用查询参数形式：/convert/to-toml/direct?api_key=YOUR_API_KEY
+    大文件请使用 /convert/to-toml/{api_key}/stream。
+    """
+    temp_user = _path_api_key_user(db, api_key)
     
     # 调用主函数
     return await convert_ini_to_toml_direct(request, db, temp_user)
 
 
+@router.post("/convert/to-toml/{api_key}/stream")
+async def convert_to_toml_stream_with_path_key(
+    api_key: str,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """将INI格式的frpc配置流式转换为TOML格式（支持路径参数形式的 API Key）
+    
+    与 /convert/ini-to-toml/stream 相同，API Key 作为路径参数。
+    """
+    _path_api_key_user(db, api_key)
+    return await _stream_ini_to_toml(request, db)
+
+
 @router.get("/config/direct/{server_name}/{group_name}/{filename}", response_class=PlainTextResponse)
 def get_config_direct(
     server_name: str,
@@ -610,7 +735,7 @@ def get_config_direct(
     token: str = Query(None, description="访问令牌（可选，base64编码的username:password）"),
     client_name: str = Query(None, description="客户端名称（可选）"),
     request: Request = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """直接获取 frpc 配置文件（支持 Basic Auth 或 Token 认证）
     
@@ -732,7 +857,7 @@ def get_config_by_server_and_group(
     group: str,
     format: str = Query("ini", description="配置格式：ini 或 toml"),
     client_name: str = Query(None, description="客户端名称（可选）"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """根据服务器和分组获取 frpc 配置文件（支持 API Key 认证）
@@ -840,3 +965,73 @@ def get_config_by_server_and_group(
 
 
 
+
+
+@router.get("/bundle/{server}")
+def export_config_bundle(
+    server: str,
+    format: str = Query("all", description="配置格式：ini、toml 或 all（两种都导出）"),
+    archive: str = Query("zip", description="归档格式：zip 或 tar（tar.gz）"),
+    groups: str = Query(None, description="只导出这些分组（逗号分隔，默认全部分组）"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """批量导出服务器下所有分组的 frpc 配置（支持 API Key 认证）
+    
+    每个分组生成 `{分组}/frpc.ini` 和/或 `{分组}/frpc.toml`（清理后目录名重复时追加分组名称的短哈希），
+    归档末尾的 `manifest.json` 以分组名称为键，记录各分组的目录、代理数量以及每个文件的路径、sha256 和大小。
+    归档以流的形式返回，边渲染边下载。
+    
+    使用示例:
+    ```bash
+    # 导出全部分组（zip）
+    curl "http://your-api/api/frpc/bundle/test_server?api_key=YOUR_API_KEY" -o configs.zip
+    
+    # 只导出指定分组的 TOML 配置（tar.gz）
+    curl -H "Authorization: Bearer YOUR_API_KEY" \
+      "http://your-api/api/frpc/bundle/test_server?format=toml&archive=tar&groups=web,db" \
+      -o configs.tar.gz
+    ```
+    """
+    format = format.lower()
+    if format == "all":
+        formats = BUNDLE_FORMATS
+    elif format in BUNDLE_FORMATS:
+        formats = (format,)
+    else:
+        raise HTTPException(status_code=400, detail=f"不支持的格式: {format}，仅支持 ini、toml 和 all")
+    
+    archive = archive.lower()
+    if archive not in ("zip", "tar"):
+        raise HTTPException(status_code=400, detail=f"不支持的归档格式: {archive}，仅支持 zip 和 tar")
+    
+    # 查找服务器（先尝试按名称查找，如果失败再尝试按ID）
+    server_obj = db.query(FrpsServer).filter(FrpsServer.name == server).first()
+    if not server_obj and server.isdigit():
+        server_obj = db.query(FrpsServer).filter(FrpsServer.id == int(server)).first()
+    
+    if not server_obj:
+        raise HTTPException(status_code=404, detail=f"服务器 '{server}' 不存在")
+    
+    if not server_obj.is_active:
+        raise HTTPException(status_code=404, detail=f"服务器 '{server}' 未激活")
+    
+    group_names = [name.strip() for name in groups.split(",") if name.strip()] if groups else None
+    
+    service = ConfigBundleService(db)
+    group_proxies = service.load_groups(server_obj, group_names)
+    if not group_proxies:
+        raise HTTPException(status_code=404, detail=f"服务器 '{server}' 中没有可导出的分组")
+    
+    # 数据已全部取出，流式响应期间不再访问数据库
+    snapshot = ConfigBundleService.server_snapshot(server_obj)
+    if archive == "zip":
+        media_type, filename = "application/zip", f"{server_obj.name}_frpc_configs.zip"
+    else:
+        media_type, filename = "application/gzip", f"{server_obj.name}_frpc_configs.tar.gz"
+    
+    return StreamingResponse(
+        service.iter_bundle(snapshot, group_proxies, formats, archive),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
+    )
@@ -9,6 +9,8 @@ from app.models.user import User
 from app.models.frps_server import FrpsServer
 from app.schemas.frps_server import FrpsServerCreate, FrpsServerUpdate, FrpsServerResponse
 from app.scheduler import sync_server
+from app.services.history_service import HistoryService
+from app.services.traffic_service import TrafficService
 
 router = APIRouter(prefix="/api/servers", tags=["frps服务器管理"])
 
@@ -88,6 +90,8 @@ def delete_server(
     if not server:
         raise HTTPException(status_code=404, detail="服务器不存在")
     
+    HistoryService(db).delete_server_history(server_id)
+    TrafficService(db).delete_server_series(server_id)
     db.delete(server)
     db.commit()
     return None
@@ -2,16 +2,20 @@
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
+from sqlalchemy import func, case, select, union, and_
 from pydantic import BaseModel
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.auth import get_current_user
 from app.models.user import User
 from app.models.proxy import Proxy
 from app.models.frps_server import FrpsServer
 from app.models.group import Group
+from app.models.group_summary import GroupSummary
+from app.models.proxy_counter import ProxyCounter
 from app.services.port_service import PortService
+from app.services.search_service import SearchService
+from app.services.stats_service import StatsService
 
 router = APIRouter(prefix="/api/groups", tags=["分组管理"])
 
@@ -49,7 +53,7 @@ class DeleteGroupRequest(BaseModel):
 @router.get("/list")
 def get_groups_list(
     frps_server_id: Optional[int] = Query(None, description="按服务器ID过滤"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """获取所有分组名称列表（用于下拉选择）
@@ -98,99 +102,78 @@ def get_groups(
     search: Optional[str] = Query(None, description="搜索分组名称"),
     page: int = Query(1, ge=1, description="页码，从1开始"),
     page_size: int = Query(10, ge=1, le=100, description="每页数量"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """获取代理分组列表及统计信息（支持分页和搜索）
     
     返回所有分组及其代理数量、在线数量等统计信息
-    合并 Group 表（已创建的空分组）和 Proxy 表（有代理的分组）的数据
+    合并 Group 表（已创建的空分组）和分组统计缓存表（有代理的分组）的数据，
+    合并、搜索、排序和分页都在一条 SQL 中完成
     """
-    groups_dict = {}
-    
-    # 1. 从 Group 表获取已创建的分组（包括空分组）
-    group_query = db.query(Group)
-    if frps_server_id:
-        group_query = group_query.filter(Group.frps_server_id == frps_server_id)
+    search_service = SearchService(db)
     
-    created_groups = group_query.all()
-    for group in created_groups:
-        groups_dict[f"{group.frps_server_id}_{group.name}"] = {
-            "group_name": group.name,
-            "frps_server_id": group.frps_server_id,
-            "total_count": 0,
-            "online_count": 0,
-            "offline_count": 0
-        }
-    
-    # 2. 从 Proxy 表统计代理数量
-    proxy_query = db.query(
-        Proxy.group_name,
-        Proxy.frps_server_id,
-        func.count(Proxy.id).label("total_count"),
-        func.sum(case((Proxy.status == "online", 1), else_=0)).label("online_count"),
-        func.sum(case((Proxy.status == "offline", 1), else_=0)).label("offline_count")
-    ).filter(
-        Proxy.group_name.isnot(None),
-        Proxy.group_name != ""
-    ).group_by(Proxy.group_name, Proxy.frps_server_id)
+    # 1. Group 表中已创建的分组（包括空分组）
+    created_names = select(Group.frps_server_id, Group.name.label("group_name"))
+    # 2. 统计缓存中有代理的分组
+    proxy_names = select(GroupSummary.frps_server_id, GroupSummary.group_name).where(
+        GroupSummary.total_count > 0
+    )
     
     if frps_server_id:
-        proxy_query = proxy_query.filter(Proxy.frps_server_id == frps_server_id)
+        created_names = created_names.where(Group.frps_server_id == frps_server_id)
+        proxy_names = proxy_names.where(GroupSummary.frps_server_id == frps_server_id)
     
-    proxy_results = proxy_query.all()
+    # 搜索过滤（使用搜索索引，在数据库中完成）
+    if search:
+        created_names = created_names.where(search_service.group_name_clause(search, Group))
+        proxy_names = proxy_names.where(GroupSummary.group_name.in_(
+            select(Proxy.group_name).where(search_service.group_name_clause(search, Proxy))
+        ))
     
-    # 合并或添加代理统计数据
-    for result in proxy_results:
-        key = f"{result.frps_server_id}_{result.group_name}"
-        if key in groups_dict:
-            # 更新已存在的分组统计
-            groups_dict[key]["total_count"] = result.total_count
-            groups_dict[key]["online_count"] = result.online_count
-            groups_dict[key]["offline_count"] = result.offline_count
-        else:
-            # 添加未在 Group 表中的分组（从代理中发现的）
-            groups_dict[key] = {
-                "group_name": result.group_name,
-                "frps_server_id": result.frps_server_id,
-                "total_count": result.total_count,
-                "online_count": result.online_count,
-                "offline_count": result.offline_count
-            }
+    names = union(created_names, proxy_names).subquery("group_names")
     
-    # 获取服务器信息
-    server_map = {}
-    if groups_dict:
-        server_ids = list(set([g["frps_server_id"] for g in groups_dict.values()]))
-        servers = db.query(FrpsServer).filter(FrpsServer.id.in_(server_ids)).all()
-        server_map = {s.id: s.name for s in servers}
-    
-    # 构建返回结果
-    groups = []
-    for group_data in groups_dict.values():
-        groups.append({
-            "group_name": group_data["group_name"],
-            "frps_server_id": group_data["frps_server_id"],
-            "frps_server_name": server_map.get(group_data["frps_server_id"], "未知"),
-            "total_count": group_data["total_count"],
-            "online_count": group_data["online_count"],
-            "offline_count": group_data["offline_count"]
-        })
-    
-    # 按分组名称排序
-    groups.sort(key=lambda x: x["group_name"])
+    # 计算总数
+    total = db.execute(select(func.count()).select_from(names)).scalar()
     
-    # 搜索过滤
+    # 按分组名称排序；搜索时完全匹配、前缀匹配的分组排在前面
+    order_by = [names.c.group_name]
     if search:
-        search_pattern = search.lower()
-        groups = [g for g in groups if search_pattern in g["group_name"].lower()]
+        order_by.insert(0, SearchService.name_rank(names.c.group_name, search))
     
-    # 计算总数
-    total = len(groups)
-    
-    # 应用分页
+    # 关联统计和服务器名称，并应用分页
     offset = (page - 1) * page_size
-    paginated_groups = groups[offset:offset + page_size]
+    rows = db.execute(
+        select(
+            names.c.group_name,
+            names.c.frps_server_id,
+            FrpsServer.name.label("frps_server_name"),
+            func.coalesce(GroupSummary.total_count, 0).label("total_count"),
+            func.coalesce(GroupSummary.online_count, 0).label("online_count"),
+            func.coalesce(GroupSummary.offline_count, 0).label("offline_count"),
+        )
+        .select_from(names)
+        .outerjoin(GroupSummary, and_(
+            GroupSummary.frps_server_id == names.c.frps_server_id,
+            GroupSummary.group_name == names.c.group_name,
+        ))
+        .outerjoin(FrpsServer, FrpsServer.id == names.c.frps_server_id)
+        .order_by(*order_by)
+        .offset(offset)
+        .limit(page_size)
+    ).all()
+    
+    paginated_groups = [
+        {
+            "group_name": row.group_name,
+            "frps_server_id": row.frps_server_id,
+            "frps_server_name": row.frps_server_name or "未知",
+            "total_count": row.total_count,
+            "online_count": row.online_count,
+            "offline_count": row.offline_count
+        }
+        for row in rows
+    ]
     
     return {
         "items": paginated_groups,
@@ -204,7 +187,7 @@ def get_groups(
 def get_group_proxies(
     group_name: str,
     frps_server_id: Optional[int] = Query(None, description="按服务器ID过滤"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """获取指定分组的所有代理"""
@@ -238,50 +221,51 @@ def get_group_proxies(
 def get_group_summary(
     group_name: str,
     frps_server_id: Optional[int] = Query(None, description="按服务器ID过滤"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取分组的详细统计信息"""
-    query = db.query(Proxy).filter(Proxy.group_name == group_name)
-    
-    if frps_server_id:
-        query = query.filter(Proxy.frps_server_id == frps_server_id)
+    """获取分组的详细统计信息（读取增量维护的计数表）"""
+    stats_service = StatsService(db)
+    stats = stats_service.get_group_stats(group_name, frps_server_id)
     
-    proxies = query.all()
-    
-    if not proxies:
+    if not stats["total"]:
         raise HTTPException(status_code=404, detail=f"分组 '{group_name}' 不存在")
     
-    # 按类型统计
-    type_stats = {}
-    for proxy in proxies:
-        ptype = proxy.proxy_type
-        if ptype not in type_stats:
-            type_stats[ptype] = {"total": 0, "online": 0, "offline": 0}
-        type_stats[ptype]["total"] += 1
-        if proxy.status == "online":
-            type_stats[ptype]["online"] += 1
-        else:
-            type_stats[ptype]["offline"] += 1
+    # 按类型统计（与原来逐个代理统计时一致：不在线的都计为离线）
+    type_stats = {
+        ptype: {"total": counts["total"], "online": counts["online"], "offline": counts["total"] - counts["online"]}
+        for ptype, counts in stats["by_type"].items()
+    }
     
-    # 端口范围
-    ports = [p.remote_port for p in proxies if p.remote_port]
+    # 端口范围（按 group_name 索引聚合，不加载代理行）
     port_range = None
-    if ports:
+    if stats["port_count"]:
+        port_query = db.query(
+            func.min(Proxy.remote_port), func.max(Proxy.remote_port)
+        ).filter(Proxy.group_name == group_name, Proxy.remote_port.isnot(None))
+        if frps_server_id:
+            port_query = port_query.filter(Proxy.frps_server_id == frps_server_id)
+        min_port, max_port = port_query.one()
         port_range = {
-            "min": min(ports),
-            "max": max(ports),
-            "count": len(ports)
+            "min": min_port,
+            "max": max_port,
+            "count": stats["port_count"]
         }
     
+    servers_query = db.query(ProxyCounter.frps_server_id).filter(
+        ProxyCounter.group_name == group_name
+    ).distinct()
+    if frps_server_id:
+        servers_query = servers_query.filter(ProxyCounter.frps_server_id == frps_server_id)
+    
     return {
         "group_name": group_name,
-        "total_proxies": len(proxies),
-        "online_proxies": sum(1 for p in proxies if p.status == "online"),
-        "offline_proxies": sum(1 for p in proxies if p.status == "offline"),
+        "total_proxies": stats["total"],
+        "online_proxies": stats["online"],
+        "offline_proxies": stats["offline"],
         "type_statistics": type_stats,
         "port_range": port_range,
-        "servers": list(set([p.frps_server_id for p in proxies]))
+        "servers": [row[0] for row in servers_query.all()]
     }
 
 
@@ -605,7 +589,7 @@ def auto_analyze_groups(
 def check_default_proxies(
     group_name: str,
     frps_server_id: int = Query(..., description="frps 服务器 ID"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """检查分组需要添加哪些默认代理
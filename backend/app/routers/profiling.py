@@ -0,0 +1,25 @@
+"""请求剖析路由"""
+from fastapi import APIRouter, Depends, Query
+
+from app.auth import get_current_user
+from app.config import get_settings
+from app.models.user import User
+from app.profiling import recent_profiles
+
+router = APIRouter(prefix="/api/profiling", tags=["请求剖析"])
+settings = get_settings()
+
+
+@router.get("/requests")
+def list_profiled_requests(
+    limit: int = Query(20, ge=1, le=1000, description="返回条数"),
+    current_user: User = Depends(get_current_user)
+):
+    """最近的慢请求、疑似 N+1 查询的请求和调用栈采样结果（新的在前）
+    
+    需要设置 PROFILING_ENABLED=true，未开启时返回空列表。
+    """
+    return {
+        "enabled": settings.profiling_enabled,
+        "requests": recent_profiles()[:limit]
+    }
@@ -5,13 +5,14 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.auth import get_current_user
 from app.models.user import User
 from app.models.proxy import Proxy
 from app.models.frps_server import FrpsServer
 from app.schemas.proxy import ProxyCreate, ProxyUpdate, ProxyResponse
 from app.services.port_service import PortService
+from app.services.search_service import SearchService
 from app.frps_client import FrpsClient
 
 router = APIRouter(prefix="/api/proxies", tags=["代理管理"])
@@ -26,7 +27,8 @@ async def get_proxies(
     page: int = Query(1, ge=1, description="页码，从1开始"),
     page_size: int = Query(10, ge=1, le=1000, description="每页数量"),
     sync_from_frps: bool = Query(False, description="是否从frps实时拉取数据进行对比"),
-    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
+    write_db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """获取代理列表，支持分页和搜索，可选择从frps实时拉取并对比分析
@@ -34,6 +36,9 @@ async def get_proxies(
     本程序的数据库是最全的主数据源，frps可能会丢失数据。
     当sync_from_frps=True时，会从frps拉取数据并进行对比分析。
     """
+    # 普通列表查询走只读会话；从frps同步时要写入并立即读回结果，使用读写会话
+    # （会话在首次查询时才建立连接，未使用的会话不占用连接）
+    db = write_db if sync_from_frps and frps_server_id else read_db
     result: Dict[str, Any] = {
         "items": [],
         "page": page,
@@ -54,13 +59,9 @@ async def get_proxies(
     if status_filter:
         query = query.filter(Proxy.status == status_filter)
     
-    # 搜索功能：搜索代理名称或分组
-    if search:
-        search_pattern = f"%{search}%"
-        query = query.filter(
-            (Proxy.name.like(search_pattern)) | 
-            (Proxy.group_name.like(search_pattern))
-        )
+    # 搜索功能：搜索代理名称或分组（使用搜索索引，结果按相关度排序）
+    search_service = SearchService(db)
+    query, search_order = search_service.apply_proxy_search(query, search)
     
     # 如果需要从frps同步，先进行同步（在分页之前）
     if sync_from_frps and frps_server_id:
@@ -174,12 +175,7 @@ async def get_proxies(
                 if status_filter:
                     query = query.filter(Proxy.status == status_filter)
                 
-                if search:
-                    search_pattern = f"%{search}%"
-                    query = query.filter(
-                        (Proxy.name.like(search_pattern)) | 
-                        (Proxy.group_name.like(search_pattern))
-                    )
+                query, search_order = search_service.apply_proxy_search(query, search)
                 
             except Exception as e:
                 result["analysis"] = {
@@ -197,10 +193,6 @@ async def get_proxies(
         keep_ids_subq = keep_ids_subq.filter(Proxy.group_name == group_name)
     if status_filter:
         keep_ids_subq = keep_ids_subq.filter(Proxy.status == status_filter)
-    if search:
-        keep_ids_subq = keep_ids_subq.filter(
-            (Proxy.name.like(search_pattern)) | (Proxy.group_name.like(search_pattern))
-        )
     keep_ids_subq = keep_ids_subq.subquery()
     query = query.filter(Proxy.id.in_(db.query(keep_ids_subq.c.keep_id)))
 
@@ -209,7 +201,7 @@ async def get_proxies(
 
     # 应用分页
     offset = (page - 1) * page_size
-    db_proxies = query.order_by(Proxy.created_at.desc()).offset(offset).limit(page_size).all()
+    db_proxies = query.order_by(*search_order, Proxy.created_at.desc()).offset(offset).limit(page_size).all()
 
     # 返回代理列表（转换为响应格式）
     result["items"] = [
@@ -262,7 +254,7 @@ def clean_duplicate_proxies(
 @router.get("/{proxy_id}", response_model=ProxyResponse)
 def get_proxy(
     proxy_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """获取代理详情"""
@@ -0,0 +1,58 @@
+"""代理统计路由"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db, get_read_db
+from app.auth import get_admin_user, get_current_user
+from app.models.user import User
+from app.models.frps_server import FrpsServer
+from app.services.stats_service import StatsService
+
+router = APIRouter(prefix="/api/stats", tags=["统计"])
+
+
+@router.get("")
+def get_stats(
+    frps_server_id: Optional[int] = Query(None, description="按服务器ID过滤"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """获取各服务器的代理统计（总数/在线/离线/端口数/按类型）
+    
+    数据来自代理写入时增量维护的计数表，无需扫描代理记录。
+    """
+    if frps_server_id:
+        server = db.query(FrpsServer).filter(FrpsServer.id == frps_server_id).first()
+        if not server:
+            raise HTTPException(status_code=404, detail="服务器不存在")
+    
+    stats_service = StatsService(db)
+    return stats_service.get_server_stats(frps_server_id)
+
+
+@router.get("/groups/{group_name}")
+def get_group_stats(
+    group_name: str,
+    frps_server_id: Optional[int] = Query(None, description="按服务器ID过滤"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """获取单个分组的代理统计"""
+    stats_service = StatsService(db)
+    stats = stats_service.get_group_stats(group_name, frps_server_id)
+    if not stats["total"]:
+        raise HTTPException(status_code=404, detail=f"分组 '{group_name}' 不存在")
+    return stats
+
+
+@router.post("/rebuild")
+def rebuild_stats(
+    frps_server_id: Optional[int] = Query(None, description="只重建指定服务器"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """从代理记录全量重建统计计数（需要管理员权限，重建期间会扫描全部代理）"""
+    stats_service = StatsService(db)
+    count = stats_service.rebuild(frps_server_id)
+    return {"success": True, "message": f"已重建 {count} 个分组的统计"}
@@ -1,10 +1,10 @@
 """数据对比分析路由"""
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from datetime import datetime
-import json
+from datetime import date, datetime
+from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.auth import get_current_user
 from app.models.user import User
 from app.models.frps_server import FrpsServer
@@ -12,6 +12,10 @@ from app.models.proxy import Proxy
 from app.models.history import ProxyHistory
 from app.frps_client import FrpsClient
 from app.services.port_service import PortService
+from app.services.history_service import HistoryService
+from app.services.event_bus import get_event_bus, history_event
+from app.services.event_relay import stage_events
+from app.schemas.history import ProxyHistoryResponse, ProxyHistoryDailyResponse
 
 router = APIRouter(prefix="/api/analysis", tags=["数据分析"])
 
@@ -56,7 +60,8 @@ async def compare_proxies(
     db_proxies = db.query(Proxy).filter(Proxy.frps_server_id == frps_server_id).all()
     db_proxy_map = {proxy.name: proxy for proxy in db_proxies}
     
-    # 更新或创建代理
+    # 更新或创建代理（状态变化、新代理和冲突在提交后发布到事件总线）
+    events = []
     active_proxy_names = set()
     for proxy_info in all_proxies:
         proxy_name = proxy_info["name"]
@@ -73,14 +78,15 @@ async def compare_proxies(
             
             # 如果状态改变，记录历史
             if old_status != proxy_info["status"]:
-                history = ProxyHistory(
-                    frps_server_id=frps_server_id,
-                    proxy_name=proxy_name,
-                    action=proxy_info["status"],
-                    timestamp=datetime.utcnow(),
-                    details=json.dumps(proxy_info)
+                history = ProxyHistory.create_event(
+                    frps_server_id,
+                    proxy_name,
+                    proxy_info["status"],
+                    proxy_info=proxy_info,
+                    old_status=old_status
                 )
                 db.add(history)
+                events.append(history_event(history, db_proxy.group_name))
             
             updated_count += 1
         else:
@@ -100,14 +106,15 @@ async def compare_proxies(
                 db.add(new_proxy)
                 
                 # 记录历史
-                history = ProxyHistory(
-                    frps_server_id=frps_server_id,
-                    proxy_name=proxy_name,
-                    action="discovered",
-                    timestamp=datetime.utcnow(),
-                    details=json.dumps(proxy_info)
+                history = ProxyHistory.create_event(
+                    frps_server_id,
+                    proxy_name,
+                    "discovered",
+                    proxy_info=proxy_info,
+                    extra={key: proxy_info.get(key) for key in ("proxy_type", "local_ip", "client_version")}
                 )
                 db.add(history)
+                events.append(history_event(history, parsed_group))
                 
                 new_count += 1
     
@@ -117,14 +124,17 @@ async def compare_proxies(
             db_proxy.status = "offline"
             
             # 记录历史
-            history = ProxyHistory(
-                frps_server_id=frps_server_id,
-                proxy_name=proxy_name,
-                action="offline",
-                timestamp=datetime.utcnow(),
-                details=json.dumps({"reason": "not_found_in_sync"})
+            history = ProxyHistory.create_event(
+                frps_server_id,
+                proxy_name,
+                "offline",
+                old_status="online",
+                new_status="offline",
+                remote_port=db_proxy.remote_port,
+                extra={"reason": "not_found_in_sync"}
             )
             db.add(history)
+            events.append(history_event(history, db_proxy.group_name))
             
             offline_count += 1
     
@@ -134,16 +144,20 @@ async def compare_proxies(
     
     # 记录冲突
     for conflict in conflicts:
-        history = ProxyHistory(
-            frps_server_id=frps_server_id,
-            proxy_name=conflict.get("proxy_name", "unknown"),
-            action="conflict",
-            timestamp=datetime.utcnow(),
-            details=json.dumps(conflict)
+        history = ProxyHistory.create_event(
+            frps_server_id,
+            conflict.get("proxy_name", "unknown"),
+            "conflict",
+            remote_port=conflict.get("port"),
+            extra={key: value for key, value in conflict.items() if key not in ("port", "proxy_name")}
         )
         db.add(history)
+        conflict_proxy = db_proxy_map.get(history.proxy_name)
+        events.append(history_event(history, conflict_proxy.group_name if conflict_proxy else None))
     
+    stage_events(db, events)
     db.commit()
+    get_event_bus().publish(events)
     
     return {
         "success": True,
@@ -158,17 +172,36 @@ async def compare_proxies(
     }
 
 
-@router.get("/history")
+@router.get("/history", response_model=List[ProxyHistoryResponse])
 def get_analysis_history(
     frps_server_id: int = Query(..., description="frps 服务器 ID"),
     limit: int = Query(50, description="返回记录数量"),
-    db: Session = Depends(get_db),
+    before: Optional[datetime] = Query(None, description="只返回早于该时间的记录（翻页）"),
+    proxy_name: Optional[str] = Query(None, description="代理名称"),
+    action: Optional[str] = Query(None, description="动作（online、offline、discovered、conflict 等）"),
+    status: Optional[str] = Query(None, description="变化后的状态"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取对比分析历史记录"""
-    histories = db.query(ProxyHistory).filter(
-        ProxyHistory.frps_server_id == frps_server_id
-    ).order_by(ProxyHistory.timestamp.desc()).limit(limit).all()
-    
-    return histories
+    """获取对比分析历史记录（近期记录在主表，更早的记录从按月分区中读取）"""
+    return HistoryService(db).query(
+        frps_server_id,
+        limit=limit,
+        before=before,
+        proxy_name=proxy_name,
+        action=action,
+        status=status
+    )
 
+
+@router.get("/history/daily", response_model=List[ProxyHistoryDailyResponse])
+def get_daily_history(
+    frps_server_id: int = Query(..., description="frps 服务器 ID"),
+    proxy_name: Optional[str] = Query(None, description="代理名称"),
+    since: Optional[date] = Query(None, description="起始日期"),
+    limit: int = Query(500, description="返回记录数量"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """获取超过保留期后按天汇总的历史记录"""
+    return HistoryService(db).query_daily(frps_server_id, proxy_name=proxy_name, since=since, limit=limit)
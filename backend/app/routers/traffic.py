@@ -0,0 +1,102 @@
+"""代理流量统计路由"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_read_db
+from app.auth import get_current_user
+from app.models.user import User
+from app.models.frps_server import FrpsServer
+from app.services.traffic_service import TrafficService, TOP_METRICS, RESOLUTION_SECONDS
+
+router = APIRouter(prefix="/api/traffic", tags=["流量统计"])
+
+
+def _check_server(db: Session, frps_server_id: int) -> None:
+    server = db.query(FrpsServer).filter(FrpsServer.id == frps_server_id).first()
+    if not server:
+        raise HTTPException(status_code=404, detail="服务器不存在")
+
+
+@router.get("/top")
+def get_top_proxies(
+    frps_server_id: int = Query(..., description="frps 服务器 ID"),
+    hours: int = Query(1, ge=1, description="统计最近多少小时"),
+    metric: str = Query("bytes_total", description="排序指标: " + ", ".join(TOP_METRICS)),
+    limit: int = Query(20, ge=1, le=1000, description="返回代理数量"),
+    group_name: Optional[str] = Query(None, description="只统计指定分组"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """获取时间窗口内流量或连接数最高的代理
+    
+    数据来自调度器增量维护的按代理预聚合表，查询开销与原始采样保留时长无关。
+    """
+    if metric not in TOP_METRICS:
+        raise HTTPException(status_code=400, detail=f"不支持的排序指标: {metric}")
+    _check_server(db, frps_server_id)
+    
+    service = TrafficService(db)
+    return service.top_proxies(frps_server_id, hours=hours, metric=metric, limit=limit, group_name=group_name)
+
+
+@router.get("/groups")
+def get_group_traffic(
+    frps_server_id: int = Query(..., description="frps 服务器 ID"),
+    hours: int = Query(24, ge=1, description="统计最近多少小时"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """获取时间窗口内各分组的流量合计"""
+    _check_server(db, frps_server_id)
+    
+    service = TrafficService(db)
+    return service.group_totals(frps_server_id, hours=hours)
+
+
+@router.get("/rates")
+def get_traffic_rates(
+    frps_server_id: int = Query(..., description="frps 服务器 ID"),
+    hours: int = Query(1, ge=1, description="统计最近多少小时"),
+    limit: int = Query(20, ge=1, le=1000, description="返回代理数量"),
+    group_name: Optional[str] = Query(None, description="只统计指定分组"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """获取时间窗口内的平均每秒流量和平均并发连接数"""
+    _check_server(db, frps_server_id)
+    
+    service = TrafficService(db)
+    return service.rates(frps_server_id, hours=hours, limit=limit, group_name=group_name)
+
+
+@router.get("/series")
+def get_proxy_series(
+    frps_server_id: int = Query(..., description="frps 服务器 ID"),
+    proxy_name: str = Query(..., description="代理名称"),
+    resolution: str = Query("1h", description="时间粒度: 1m, 1h, 1d"),
+    hours: int = Query(24, ge=1, description="最近多少小时"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """获取单个代理的流量时间序列"""
+    if resolution not in RESOLUTION_SECONDS:
+        raise HTTPException(status_code=400, detail=f"不支持的时间粒度: {resolution}")
+    _check_server(db, frps_server_id)
+    
+    service = TrafficService(db)
+    return service.proxy_series(frps_server_id, proxy_name, resolution=resolution, hours=hours)
+
+
+@router.get("/server")
+def get_server_metrics(
+    frps_server_id: int = Query(..., description="frps 服务器 ID"),
+    hours: int = Query(24, ge=1, description="最近多少小时"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """获取服务器全局指标（总流量、连接数、客户端数、各类型代理数）"""
+    _check_server(db, frps_server_id)
+    
+    service = TrafficService(db)
+    return service.server_metrics(frps_server_id, hours=hours)
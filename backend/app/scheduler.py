@@ -1,11 +1,11 @@
 """定时任务调度器"""
 import asyncio
 import logging
+from datetime import datetime
+from typing import Dict, List, Optional
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy.orm import Session
-from datetime import datetime
-import json
 
 from app.database import SessionLocal
 from app.config import get_settings
@@ -13,7 +13,11 @@ from app.models.frps_server import FrpsServer
 from app.models.proxy import Proxy
 from app.models.history import ProxyHistory
 from app.frps_client import FrpsClient
+from app.metrics import PhaseTimer, SYNC_ROWS_WRITTEN
 from app.services.port_service import PortService
+from app.services.traffic_service import TrafficService
+from app.services.event_bus import get_event_bus, history_event, proxy_event
+from app.services.event_relay import cleanup_outbox, stage_events
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -21,9 +25,25 @@ settings = get_settings()
 # 全局调度器实例
 scheduler: AsyncIOScheduler = None
 
+# 只在主进程执行的定时任务
+LEADER_JOB_IDS = (
+    "sync_all_servers", "cleanup_temp_configs", "maintain_history", "rollup_traffic", "cleanup_event_outbox"
+)
+
+# 当前进程的角色：leader / follower，尚未完成首次竞选时为 None
+scheduler_role: Optional[str] = None
 
-async def sync_all_servers():
-    """同步所有活跃的 frps 服务器"""
+# 最近一次同步完成的时间（启动后首次同步完成前为 None，/api/health 据此返回 ready）
+last_sync_finished_at: Optional[datetime] = None
+
+
+async def sync_all_servers(require_lease: bool = False):
+    """同步所有活跃的 frps 服务器
+    
+    Args:
+        require_lease: 每个服务器提交前确认仍持有主进程租约（启用主进程选举时由定时任务传入）
+    """
+    global last_sync_finished_at
     db: Session = SessionLocal()
     
     try:
@@ -38,7 +58,7 @@ async def sync_all_servers():
         
         for server in servers:
             try:
-                await sync_server(db, server)
+                await sync_server(db, server, require_lease=require_lease)
             except Exception as e:
                 logger.error(f"同步服务器 {server.name} 失败: {e}")
         
@@ -48,22 +68,28 @@ async def sync_all_servers():
         logger.error(f"同步任务失败: {e}")
     finally:
         db.close()
+        last_sync_finished_at = datetime.utcnow()
 
 
-async def sync_server(db: Session, server: FrpsServer):
+async def sync_server(db: Session, server: FrpsServer, require_lease: bool = False):
     """同步单个服务器的代理状态
     
+    从 frps 获取代理在事件循环中异步执行，写入数据库的部分在线程中执行，
+    代理较多时不会阻塞 API 请求和主进程续约。
+    
     Args:
         db: 数据库会话
         server: frps 服务器配置
+        require_lease: 提交前确认仍持有主进程租约，失去租约时回滚本次同步
     """
     logger.info(f"同步服务器: {server.name}")
     
-    # 创建客户端
+    # 创建客户端（各阶段耗时导出到 /metrics）
     client = FrpsClient(server)
+    timer = PhaseTimer(server.name)
     
-    # 获取所有代理
-    all_proxies_data = await client.get_all_proxies()
+    # 获取所有代理（先用 serverinfo 预检查，跳过未变化的代理类型）
+    all_proxies_data = await client.get_all_proxies(precheck=True)
     
     # 合并所有类型的代理
     all_proxies = []
@@ -74,12 +100,39 @@ async def sync_server(db: Session, server: FrpsServer):
             all_proxies.append(parsed)
     
     logger.info(f"从 {server.name} 获取到 {len(all_proxies)} 个代理")
+    timer.mark("fetch")
+    
+    events = await asyncio.to_thread(_apply_sync, db, server, all_proxies, client.server_info, timer, require_lease)
+    get_event_bus().publish(events)
+
+
+def _apply_sync(
+    db: Session,
+    server: FrpsServer,
+    all_proxies: List[Dict],
+    server_info: Optional[Dict],
+    timer: PhaseTimer,
+    require_lease: bool
+) -> List[Dict]:
+    """把一次同步获取到的代理写入数据库（在线程中执行）
+    
+    Returns:
+        提交后需要发布到事件总线的事件（回滚时为空）
+    """
+    # 记录流量和连接数采样
+    if settings.traffic_capture_enabled:
+        traffic_service = TrafficService(db)
+        traffic_service.record_sample(server.id, all_proxies)
+        if server_info:
+            traffic_service.record_server_info(server.id, server_info)
+        timer.mark("traffic")
     
     # 获取数据库中的所有代理
     db_proxies = db.query(Proxy).filter(Proxy.frps_server_id == server.id).all()
     db_proxy_map = {proxy.name: proxy for proxy in db_proxies}
     
-    # 更新或创建代理
+    # 更新或创建代理（状态变化、新代理和冲突在提交后发布到事件总线）
+    events = []
     active_proxy_names = set()
     for proxy_info in all_proxies:
         proxy_name = proxy_info["name"]
@@ -100,15 +153,26 @@ async def sync_server(db: Session, server: FrpsServer):
             
             # 如果状态从离线变为在线，记录历史
             if old_status == "offline" and proxy_info["status"] == "online":
-                history = ProxyHistory(
-                    frps_server_id=server.id,
-                    proxy_name=proxy_name,
-                    action="online",
-                    timestamp=datetime.utcnow(),
-                    details=json.dumps(proxy_info)
+                history = ProxyHistory.create_event(
+                    server.id,
+                    proxy_name,
+                    "online",
+                    proxy_info=proxy_info,
+                    old_status=old_status
                 )
                 db.add(history)
+                events.append(history_event(history, db_proxy.group_name))
                 logger.info(f"代理 {proxy_name} 上线")
+            elif old_status != proxy_info["status"]:
+                events.append(proxy_event(
+                    proxy_info["status"],
+                    server.id,
+                    proxy_name,
+                    group_name=db_proxy.group_name,
+                    old_status=old_status,
+                    new_status=proxy_info["status"],
+                    remote_port=db_proxy.remote_port
+                ))
         else:
             # 发现新代理
             group_name = Proxy.parse_group_name(proxy_name)
@@ -124,14 +188,15 @@ async def sync_server(db: Session, server: FrpsServer):
             )
             db.add(new_proxy)
             
-            history = ProxyHistory(
-                frps_server_id=server.id,
-                proxy_name=proxy_name,
-                action="discovered",
-                timestamp=datetime.utcnow(),
-                details=json.dumps(proxy_info)
+            history = ProxyHistory.create_event(
+                server.id,
+                proxy_name,
+                "discovered",
+                proxy_info=proxy_info,
+                extra={key: proxy_info.get(key) for key in ("proxy_type", "local_ip", "client_version")}
             )
             db.add(history)
+            events.append(history_event(history, group_name))
             logger.info(f"发现新代理 {proxy_name}")
     
     # 标记不在活跃列表中的代理为离线
@@ -139,15 +204,19 @@ async def sync_server(db: Session, server: FrpsServer):
         if proxy_name not in active_proxy_names and db_proxy.status == "online":
             db_proxy.status = "offline"
             
-            history = ProxyHistory(
-                frps_server_id=server.id,
-                proxy_name=proxy_name,
-                action="offline",
-                timestamp=datetime.utcnow(),
-                details=json.dumps({"reason": "not_found_in_sync"})
+            history = ProxyHistory.create_event(
+                server.id,
+                proxy_name,
+                "offline",
+                old_status="online",
+                new_status="offline",
+                remote_port=db_proxy.remote_port,
+                extra={"reason": "not_found_in_sync"}
             )
             db.add(history)
+            events.append(history_event(history, db_proxy.group_name))
             logger.warning(f"代理 {proxy_name} 下线")
+    timer.mark("diff")
     
     # 检测冲突
     port_service = PortService(db)
@@ -157,16 +226,33 @@ async def sync_server(db: Session, server: FrpsServer):
         logger.warning(f"检测到 {len(conflicts)} 个端口冲突")
         for conflict in conflicts:
             # 记录冲突
-            history = ProxyHistory(
-                frps_server_id=server.id,
-                proxy_name=conflict.get("proxy_name", "unknown"),
-                action="conflict",
-                timestamp=datetime.utcnow(),
-                details=json.dumps(conflict)
+            history = ProxyHistory.create_event(
+                server.id,
+                conflict.get("proxy_name", "unknown"),
+                "conflict",
+                remote_port=conflict.get("port"),
+                extra={key: value for key, value in conflict.items() if key not in ("port", "proxy_name")}
             )
             db.add(history)
+            conflict_proxy = db_proxy_map.get(history.proxy_name)
+            events.append(history_event(history, conflict_proxy.group_name if conflict_proxy else None))
+    timer.mark("conflicts")
     
+    if require_lease:
+        from app.leader import hold_lease
+        if not hold_lease(db):
+            # 同步期间失去了租约，新的主进程会重新同步，丢弃本次结果避免重复写入历史和流量
+            db.rollback()
+            logger.warning(f"当前进程已不是主进程，放弃服务器 {server.name} 的同步结果")
+            return []
+    
+    SYNC_ROWS_WRITTEN.labels(server.name, "inserted").inc(len(db.new))
+    SYNC_ROWS_WRITTEN.labels(server.name, "updated").inc(sum(1 for obj in db.dirty if db.is_modified(obj)))
+    # 事件与同步结果一起提交，其他进程从转发表读取
+    stage_events(db, events)
     db.commit()
+    timer.mark("write")
+    return events
 
 
 async def cleanup_expired_temp_configs():
@@ -174,17 +260,13 @@ async def cleanup_expired_temp_configs():
     db: Session = SessionLocal()
     
     try:
-        from app.models.temp_config import TempConfig
-        
-        # 删除所有过期的临时配置
-        expired_count = db.query(TempConfig).filter(
-            TempConfig.expires_at < datetime.utcnow()
-        ).delete()
+        from app.services.temp_config_store import get_temp_config_store
         
-        db.commit()
+        # 删除过期的临时配置元数据、缓存条目和不再被引用的内容文件
+        expired_count, removed_files = get_temp_config_store().cleanup(db)
         
-        if expired_count > 0:
-            logger.info(f"已清理 {expired_count} 个过期的临时配置")
+        if expired_count > 0 or removed_files > 0:
+            logger.info(f"已清理 {expired_count} 个过期的临时配置，删除 {removed_files} 个内容文件")
         
     except Exception as e:
         logger.error(f"清理过期临时配置失败: {e}")
@@ -193,19 +275,71 @@ async def cleanup_expired_temp_configs():
         db.close()
 
 
-async def start_scheduler():
-    """启动调度器"""
-    global scheduler
-    
-    scheduler = AsyncIOScheduler()
-    
-    # 添加定时同步任务
+def _maintain_history() -> dict:
+    db: Session = SessionLocal()
+    try:
+        from app.services.history_service import HistoryService
+        return HistoryService(db).maintain()
+    finally:
+        db.close()
+
+
+async def maintain_history():
+    """历史记录维护：转移旧记录到按月分区，汇总并删除超过保留期的分区"""
+    try:
+        # 大批量 INSERT ... SELECT / DROP 在线程中执行，避免阻塞事件循环
+        stats = await asyncio.to_thread(_maintain_history)
+        if any(stats.values()):
+            logger.info(
+                f"历史记录维护完成：转移 {stats['moved']} 条，删除分区 {stats['dropped_partitions']} 个，"
+                f"删除过期汇总 {stats['removed_daily']} 条"
+            )
+    except Exception as e:
+        logger.error(f"历史记录维护失败: {e}")
+
+
+def _rollup_traffic() -> tuple:
+    db: Session = SessionLocal()
+    try:
+        service = TrafficService(db)
+        return service.update_rollups(), service.rollup(), service.apply_retention()
+    finally:
+        db.close()
+
+
+async def rollup_traffic():
+    """流量时序降采样：增量更新按代理的预聚合表，汇总已结束的时间桶并清理过期数据"""
+    try:
+        processed, created, removed = await asyncio.to_thread(_rollup_traffic)
+        if processed or created or removed:
+            logger.info(
+                f"流量降采样完成：预聚合 {processed} 次采样，新增汇总 {created} 条，清理过期数据 {removed} 条"
+            )
+    except Exception as e:
+        logger.error(f"流量降采样失败: {e}")
+
+
+async def cleanup_event_outbox():
+    """清理转发表中过期的事件"""
+    try:
+        await asyncio.to_thread(cleanup_outbox)
+    except Exception as e:
+        logger.error(f"清理事件转发表失败: {e}")
+
+
+def _add_leader_jobs():
+    """添加只在主进程执行的定时任务"""
+    # 添加定时同步任务（立即执行第一次，之后按间隔执行）
     scheduler.add_job(
         sync_all_servers,
+        kwargs={"require_lease": settings.leader_election_enabled},
         trigger=IntervalTrigger(seconds=settings.sync_interval_seconds),
         id="sync_all_servers",
         name="同步所有 frps 服务器",
-        replace_existing=True
+        replace_existing=True,
+        next_run_time=datetime.now(),
+        # 启动期间事件循环被占用时第一次执行会延后，不能因为错过时间而被跳过
+        misfire_grace_time=None
     )
     
     # 添加清理过期临时配置任务（每小时一次）
@@ -217,19 +351,139 @@ async def start_scheduler():
         replace_existing=True
     )
     
-    scheduler.start()
+    # 添加历史记录维护任务
+    scheduler.add_job(
+        maintain_history,
+        trigger=IntervalTrigger(hours=settings.history_maintenance_interval_hours),
+        id="maintain_history",
+        name="历史记录分区维护",
+        replace_existing=True
+    )
+    
+    # 添加流量降采样任务
+    scheduler.add_job(
+        rollup_traffic,
+        trigger=IntervalTrigger(minutes=settings.traffic_rollup_interval_minutes),
+        id="rollup_traffic",
+        name="流量时序降采样",
+        replace_existing=True
+    )
+    
+    # 添加事件转发表清理任务（多进程部署时）
+    if settings.leader_election_enabled:
+        scheduler.add_job(
+            cleanup_event_outbox,
+            trigger=IntervalTrigger(minutes=10),
+            id="cleanup_event_outbox",
+            name="清理事件转发表",
+            replace_existing=True
+        )
+    
     logger.info(f"定时同步任务已启动，间隔: {settings.sync_interval_seconds} 秒")
     logger.info("临时配置清理任务已启动，间隔: 1 小时")
+    logger.info(f"历史记录维护任务已启动，间隔: {settings.history_maintenance_interval_hours} 小时")
+    logger.info(f"流量降采样任务已启动，间隔: {settings.traffic_rollup_interval_minutes} 分钟")
+
+
+def _remove_leader_jobs():
+    """移除只在主进程执行的定时任务（正在执行的任务会执行完当前这一次）"""
+    for job_id in LEADER_JOB_IDS:
+        if scheduler.get_job(job_id):
+            scheduler.remove_job(job_id)
+
+
+async def elect_leader():
+    """竞选或续约主进程租约，按结果添加或移除定时任务
     
-    # 立即执行一次同步
-    await sync_all_servers()
+    导入任务也只在主进程执行：每次续约后取出其他进程创建的和前任主进程中断的任务。
+    """
+    global scheduler_role
+    from app.leader import PROCESS_ID, acquire_or_renew
+    from app.services.import_job_service import pause_import_jobs, resume_import_jobs
+    
+    try:
+        acquired = await asyncio.to_thread(acquire_or_renew)
+    except Exception as e:
+        # 数据库暂时不可用时按未取得处理，租约过期后由其他进程接替，避免两个进程同时同步
+        logger.error(f"竞选主进程失败: {e}")
+        acquired = False
+    
+    if acquired:
+        if scheduler_role != "leader":
+            logger.info(f"当前进程 {PROCESS_ID} 成为主进程，开始执行定时任务")
+            scheduler_role = "leader"
+            _add_leader_jobs()
+        try:
+            resume_import_jobs()
+        except Exception as e:
+            logger.error(f"恢复导入任务失败: {e}")
+    else:
+        if scheduler_role == "leader":
+            logger.warning(f"当前进程 {PROCESS_ID} 失去主进程租约，停止执行定时任务")
+            _remove_leader_jobs()
+            pause_import_jobs()
+        elif scheduler_role is None:
+            logger.info(f"当前进程 {PROCESS_ID} 作为从进程运行，只处理 API 请求")
+        scheduler_role = "follower"
+
+
+async def start_scheduler():
+    """启动调度器
+    
+    首次同步作为同步任务的第一次执行，在应用开始服务后于后台进行，
+    不再阻塞启动（服务器较多或 frps 响应慢时，启动原本要等一次完整同步）。
+    启用主进程选举时，同步和清理等任务只在持有租约的进程中添加；
+    其他进程按续约间隔继续竞选，主进程退出或租约过期后自动接替。
+    """
+    global scheduler, scheduler_role
+    
+    scheduler = AsyncIOScheduler()
+    
+    if settings.leader_election_enabled:
+        scheduler.add_job(
+            elect_leader,
+            trigger=IntervalTrigger(seconds=settings.leader_renew_interval_seconds),
+            id="elect_leader",
+            name="竞选主进程",
+            replace_existing=True,
+            next_run_time=datetime.now(),
+            misfire_grace_time=None,
+            coalesce=True
+        )
+        logger.info(
+            f"主进程选举已启用，租约 {settings.leader_lease_seconds} 秒，"
+            f"续约间隔 {settings.leader_renew_interval_seconds} 秒"
+        )
+    else:
+        scheduler_role = "leader"
+        _add_leader_jobs()
+    
+    scheduler.start()
+
+
+def get_last_sync_finished_at() -> Optional[datetime]:
+    """最近一次同步完成的时间（UTC），启动后尚未完成同步时返回 None"""
+    return last_sync_finished_at
+
+
+def get_scheduler_role() -> Optional[str]:
+    """当前进程的角色：leader 执行定时任务，follower 只处理 API 请求，尚未完成首次竞选时为 None"""
+    return scheduler_role
 
 
 def shutdown_scheduler():
-    """关闭调度器"""
-    global scheduler
+    """关闭调度器，主进程同时释放租约，让其他进程立即接替"""
+    global scheduler, scheduler_role
     
     if scheduler and scheduler.running:
         scheduler.shutdown()
         logger.info("定时任务调度器已关闭")
-
+    
+    if settings.leader_election_enabled and scheduler_role == "leader":
+        from app.leader import release
+        try:
+            if release():
+                logger.info("已释放主进程租约")
+        except Exception as e:
+            logger.error(f"释放主进程租约失败: {e}")
+    scheduler_role = None
@@ -4,7 +4,7 @@ from app.schemas.frps_server import FrpsServerCreate, FrpsServerUpdate, FrpsServ
 from app.schemas.proxy import ProxyCreate, ProxyUpdate, ProxyResponse
 from app.schemas.port import PortAllocationResponse, PortAllocateRequest
 from app.schemas.config import ConfigGenerateRequest, ConfigGenerateResponse
-from app.schemas.history import ProxyHistoryResponse
+from app.schemas.history import ProxyHistoryResponse, ProxyHistoryDailyResponse
 
 __all__ = [
     "UserCreate",
@@ -20,5 +20,6 @@ __all__ = [
     "ConfigGenerateRequest",
     "ConfigGenerateResponse",
     "ProxyHistoryResponse",
+    "ProxyHistoryDailyResponse",
 ]
 
@@ -1,7 +1,10 @@
 """历史记录相关 schemas"""
-from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, model_validator
+
+from app.models.history import decode_payload
 
 
 class ProxyHistoryResponse(BaseModel):
@@ -11,8 +14,41 @@ class ProxyHistoryResponse(BaseModel):
     proxy_name: str
     action: str
     timestamp: datetime
-    details: Optional[str]
+    old_status: Optional[str] = None
+    new_status: Optional[str] = None
+    remote_port: Optional[int] = None
+    traffic_in: Optional[int] = None
+    traffic_out: Optional[int] = None
+    cur_conns: Optional[int] = None
+    extra: Optional[Dict[str, Any]] = None
+    details: Optional[str] = None  # 兼容旧接口：extra 的 JSON 文本
     
     class Config:
         from_attributes = True
+    
+    @model_validator(mode="before")
+    @classmethod
+    def decode_extra(cls, data: Any) -> Any:
+        """解码压缩的附加信息（同时支持 ORM 对象和分区表查询返回的行）"""
+        if isinstance(data, dict):
+            return data
+        values = {name: getattr(data, name, None) for name in cls.model_fields if name not in ("extra", "details")}
+        values["extra"] = decode_payload(getattr(data, "payload", None), getattr(data, "details", None))
+        if values["extra"] is not None:
+            values["details"] = json.dumps(values["extra"], ensure_ascii=False)
+        return values
+
 
+
+class ProxyHistoryDailyResponse(BaseModel):
+    """按天汇总的历史记录响应"""
+    frps_server_id: int
+    proxy_name: str
+    action: str
+    day: date
+    event_count: int
+    first_at: datetime
+    last_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,64 @@
+"""后台导入任务相关 schemas"""
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, field_validator
+
+
+class ImportJobResponse(BaseModel):
+    """导入任务响应"""
+    job_id: str
+    frps_server_id: int
+    format: str
+    group_name: Optional[str]
+    dry_run: bool
+    status: str
+    progress: float
+    file_size: int
+    bytes_processed: int
+    processed_count: int
+    created_count: int
+    updated_count: int
+    unchanged_count: int
+    failed_count: int
+    errors: List[Dict[str, Any]] = []
+    result: Optional[Dict[str, Any]] = None
+    error_message: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    
+    @field_validator("errors", mode="before")
+    @classmethod
+    def parse_errors(cls, value):
+        if isinstance(value, str):
+            return json.loads(value)
+        return value or []
+    
+    @field_validator("result", mode="before")
+    @classmethod
+    def parse_result(cls, value):
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+    
+    class Config:
+        from_attributes = True
+
+
+class ImportJobSummary(BaseModel):
+    """导入任务列表项（不含错误明细与结果）"""
+    job_id: str
+    frps_server_id: int
+    format: str
+    dry_run: bool
+    status: str
+    progress: float
+    processed_count: int
+    failed_count: int
+    error_message: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
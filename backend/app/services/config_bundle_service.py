@@ -0,0 +1,289 @@
+"""批量导出 frpc 配置服务
+
+一次查询取出服务器下所有（或指定）分组的代理，按分组渲染 frpc.ini / frpc.toml，
+以 zip 或 tar.gz 流的形式输出，最后附上包含各文件 sha256 的 manifest.json。
+分组较多时在进程池中并行渲染，进程池在首次使用时创建，所有请求共用，应用关闭时释放。
+"""
+import hashlib
+import io
+import json
+import tarfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from itertools import groupby
+from multiprocessing import get_context
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.frps_server import FrpsServer
+from app.models.proxy import Proxy
+from app.services.frpc_config_service import FrpcConfigService
+
+settings = get_settings()
+
+# 支持的配置格式与归档格式
+BUNDLE_FORMATS = ("ini", "toml")
+ARCHIVE_TYPES = ("zip", "tar")
+
+# 分组数达到该值时才使用进程池（进程启动与数据序列化有固定开销）
+PARALLEL_MIN_GROUPS = 200
+# 每个渲染任务包含的分组数
+RENDER_CHUNK_GROUPS = 100
+
+# 共用的渲染进程池
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+# (分组名称, 代理列表)
+GroupProxies = Tuple[str, List[SimpleNamespace]]
+# (文件内容, 分组名称, 格式, 代理数量)
+RenderedFile = Tuple[bytes, str, str, int]
+
+
+def _get_render_pool(workers: int) -> ProcessPoolExecutor:
+    """获取共用的渲染进程池（首次调用时按 workers 创建）
+
+    工作进程使用 spawn 启动：应用进程中有调度器、线程池等多个线程，
+    fork 会把其他线程持有的锁一起复制到子进程中，可能导致子进程死锁。
+    """
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        return _render_pool
+
+
+def _discard_render_pool(pool: ProcessPoolExecutor) -> None:
+    """工作进程异常退出后丢弃进程池，下次使用时重新创建"""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_render_pool() -> None:
+    """关闭渲染进程池（应用关闭时调用）"""
+    global _render_pool
+    with _render_pool_lock:
+        pool, _render_pool = _render_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _archive_dir(group_name: str, used_dirs: Set[str]) -> str:
+    """分组配置在归档中的目录名（不与 used_dirs 中已分配的目录重复，分配后加入 used_dirs）
+
+    路径分隔符替换为下划线、去掉首尾的点和空格，a/b、a\\b 与 a_b 会得到相同的名称，
+    重复时追加原始分组名称的短哈希。
+    """
+    safe_name = group_name.replace("/", "_").replace("\\", "_").strip(". ") or "_"
+    directory = safe_name
+    if directory in used_dirs:
+        hashed = f"{safe_name}_{hashlib.sha256(group_name.encode('utf-8')).hexdigest()[:8]}"
+        directory, suffix = hashed, 2
+        # 其他分组的名称恰好是“名称_哈希”时再追加序号
+        while directory in used_dirs:
+            directory, suffix = f"{hashed}-{suffix}", suffix + 1
+    used_dirs.add(directory)
+    return directory
+
+
+def _render_groups(
+    server: SimpleNamespace,
+    groups: List[GroupProxies],
+    formats: Sequence[str]
+) -> List[RenderedFile]:
+    """渲染一批分组的配置（在工作进程中执行，参数均为可序列化的普通对象）"""
+    service = FrpcConfigService(None)
+    rendered = []
+    for group_name, proxies in groups:
+        for format in formats:
+            content = service.render_config(server, proxies, group_name, group_name, format)
+            rendered.append((content.encode("utf-8"), group_name, format, len(proxies)))
+    return rendered
+
+
+class _StreamBuffer(io.RawIOBase):
+    """只写缓冲区：归档写入的数据暂存于此，由生成器取出后输出"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ConfigBundleService:
+    """批量导出 frpc 配置服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load_groups(
+        self,
+        server: FrpsServer,
+        group_names: Optional[List[str]] = None
+    ) -> List[GroupProxies]:
+        """一次查询取出服务器下各分组的代理（不含未分组的代理），按分组名称排序
+
+        Args:
+            server: 服务器
+            group_names: 只导出这些分组，为空则导出全部
+
+        Returns:
+            [(分组名称, 代理列表)]，代理为只含渲染所需字段的普通对象
+        """
+        query = self.db.query(
+            Proxy.group_name, Proxy.name, Proxy.proxy_type,
+            Proxy.local_ip, Proxy.local_port, Proxy.remote_port
+        ).filter(
+            Proxy.frps_server_id == server.id,
+            Proxy.group_name.isnot(None),
+            Proxy.group_name != ""
+        )
+        if group_names:
+            query = query.filter(Proxy.group_name.in_(group_names))
+        rows = query.order_by(Proxy.group_name, Proxy.name).all()
+
+        return [
+            (group_name, [
+                SimpleNamespace(
+                    name=row.name, proxy_type=row.proxy_type, local_ip=row.local_ip,
+                    local_port=row.local_port, remote_port=row.remote_port
+                )
+                for row in group_rows
+            ])
+            for group_name, group_rows in groupby(rows, key=lambda row: row.group_name)
+        ]
+
+    @staticmethod
+    def server_snapshot(server: FrpsServer) -> SimpleNamespace:
+        """渲染所需的服务器字段（脱离会话，可传给工作进程）"""
+        return SimpleNamespace(
+            id=server.id,
+            name=server.name,
+            server_addr=server.server_addr,
+            server_port=server.server_port,
+            auth_token=server.auth_token,
+            auth_username=server.auth_username,
+            auth_password=server.auth_password,
+        )
+
+    def iter_bundle(
+        self,
+        server: SimpleNamespace,
+        groups: List[GroupProxies],
+        formats: Sequence[str] = BUNDLE_FORMATS,
+        archive: str = "zip",
+        workers: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """渲染分组配置并逐块输出归档数据
+
+        Args:
+            server: server_snapshot() 返回的服务器字段
+            groups: load_groups() 返回的分组代理
+            formats: 导出的配置格式
+            archive: 归档格式，zip 或 tar（gzip 压缩）
+            workers: 渲染进程数（0 表示在当前进程中渲染，进程池按首次使用时的值创建），默认使用配置项 config_bundle_workers
+
+        Yields:
+            归档文件的数据块
+        """
+        if archive not in ARCHIVE_TYPES:
+            raise ValueError(f"不支持的归档格式: {archive}，仅支持 zip 和 tar")
+        workers = settings.config_bundle_workers if workers is None else workers
+
+        buffer = _StreamBuffer()
+        if archive == "zip":
+            bundle = zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            bundle = tarfile.open(fileobj=buffer, mode="w|gz")
+        now = time.time()
+
+        def add_file(path: str, content: bytes) -> None:
+            if archive == "zip":
+                info = zipfile.ZipInfo(path, date_time=time.localtime(now)[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                bundle.writestr(info, content)
+            else:
+                info = tarfile.TarInfo(path)
+                info.size = len(content)
+                info.mtime = int(now)
+                bundle.addfile(info, io.BytesIO(content))
+
+        # 以原始分组名称为键，归档内的目录名可能因清理或去重与分组名称不同
+        manifest_groups: Dict[str, Dict[str, Any]] = {}
+        used_dirs: Set[str] = set()
+        for rendered in self._render(server, groups, formats, workers):
+            for content, group_name, format, proxy_count in rendered:
+                entry = manifest_groups.get(group_name)
+                if entry is None:
+                    entry = manifest_groups[group_name] = {
+                        "directory": _archive_dir(group_name, used_dirs),
+                        "proxy_count": proxy_count,
+                        "files": {},
+                    }
+                path = f"{entry['directory']}/frpc.{format}"
+                add_file(path, content)
+                entry["files"][format] = {
+                    "path": path,
+                    "size": len(content),
+                    "sha256": hashlib.sha256(content).hexdigest(),
+                }
+            yield buffer.take()
+
+        manifest = {
+            "server": server.name,
+            "frps_server_id": server.id,
+            "generated_at": datetime.utcnow().isoformat() + "Z",
+            "group_count": len(groups),
+            "formats": list(formats),
+            "groups": manifest_groups,
+        }
+        add_file("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+        bundle.close()
+        yield buffer.take()
+
+    @staticmethod
+    def _render(
+        server: SimpleNamespace,
+        groups: List[GroupProxies],
+        formats: Sequence[str],
+        workers: int
+    ) -> Iterator[List[RenderedFile]]:
+        """按块渲染分组，保持分组顺序；分组较多时使用进程池"""
+        chunks = [groups[i:i + RENDER_CHUNK_GROUPS] for i in range(0, len(groups), RENDER_CHUNK_GROUPS)]
+        if workers <= 0 or len(groups) < PARALLEL_MIN_GROUPS:
+            for chunk in chunks:
+                yield _render_groups(server, chunk, formats)
+            return
+
+        pool = _get_render_pool(workers)
+        futures = [pool.submit(_render_groups, server, chunk, formats) for chunk in chunks]
+        try:
+            for future in futures:
+                yield future.result()
+        except BrokenProcessPool:
+            _discard_render_pool(pool)
+            raise
+        finally:
+            # 客户端断开时不再等待剩余的渲染任务
+            for future in futures:
+                future.cancel()
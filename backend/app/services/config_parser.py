@@ -1,13 +1,113 @@
 """frpc 配置文件解析服务"""
-import configparser
-import toml
-from typing import List, Dict, Any
-from io import StringIO
+import re
+from typing import Any, Dict, List, Mapping, Optional
+
+from app.services.frpc_parser import IniScanner, iter_ini_sections, load_toml
 
 
 class ConfigParser:
     """配置文件解析器"""
     
+    @staticmethod
+    def ini_section_to_proxy(section: str, options: Mapping[str, str]) -> Optional[Dict[str, Any]]:
+        """把一个 INI section 转换为代理配置
+        
+        Args:
+            section: section 名称（即代理名称）
+            options: section 中的配置项（键为小写）
+            
+        Returns:
+            代理配置，common section 或无效配置返回 None
+        """
+        if section.lower() == 'common':
+            return None
+        
+        proxy_data = {
+            'name': section,
+            'proxy_type': options.get('type', 'tcp'),
+            'local_ip': options.get('local_ip', '127.0.0.1'),
+            'local_port': None,
+            'remote_port': None,
+            'custom_domains': None,
+        }
+        
+        # 解析 local_port（必需）
+        if 'local_port' not in options:
+            return None  # 没有 local_port 的配置无效
+        try:
+            proxy_data['local_port'] = int(options['local_port'])
+        except ValueError:
+            return None  # 跳过无效的端口配置
+        
+        # 解析 remote_port（可选，TCP/UDP 类型需要）
+        if 'remote_port' in options:
+            try:
+                proxy_data['remote_port'] = int(options['remote_port'])
+            except ValueError:
+                pass
+        
+        # 解析 custom_domains（可选，HTTP/HTTPS 类型）
+        if 'custom_domains' in options:
+            proxy_data['custom_domains'] = options['custom_domains']
+        
+        # 解析 subdomain（可选，HTTP/HTTPS 类型）
+        if 'subdomain' in options:
+            proxy_data['subdomain'] = options['subdomain']
+        
+        return proxy_data
+    
+    @staticmethod
+    def toml_table_to_proxy(proxy: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """把一个 TOML [[proxies]] 表转换为代理配置
+        
+        Args:
+            proxy: 解析后的代理表
+            
+        Returns:
+            代理配置，无效配置返回 None
+        """
+        # 获取代理名称
+        name = proxy.get('name')
+        if not name:
+            return None
+        
+        # 解析 local_port（必需）
+        local_port = proxy.get('localPort') or proxy.get('local_port')
+        if not local_port:
+            return None  # 没有 local_port 的配置无效
+        
+        proxy_data = {
+            'name': name,
+            'proxy_type': proxy.get('type', 'tcp'),
+            'local_ip': proxy.get('localIP') or proxy.get('local_ip', '127.0.0.1'),
+            'local_port': int(local_port),
+            'remote_port': None,
+            'custom_domains': None,
+        }
+        
+        # 解析 remote_port（可选，TCP/UDP 类型需要）
+        remote_port = proxy.get('remotePort') or proxy.get('remote_port')
+        if remote_port:
+            try:
+                proxy_data['remote_port'] = int(remote_port)
+            except ValueError:
+                pass
+        
+        # 解析 customDomains（可选，HTTP/HTTPS 类型）
+        custom_domains = proxy.get('customDomains') or proxy.get('custom_domains')
+        if custom_domains:
+            if isinstance(custom_domains, list):
+                proxy_data['custom_domains'] = ','.join(custom_domains)
+            else:
+                proxy_data['custom_domains'] = str(custom_domains)
+        
+        # 解析 subdomain（可选，HTTP/HTTPS 类型）
+        subdomain = proxy.get('subdomain')
+        if subdomain:
+            proxy_data['subdomain'] = subdomain
+        
+        return proxy_data
+    
     @staticmethod
     def parse_ini_config(content: str) -> List[Dict[str, Any]]:
         """解析 INI 格式的 frpc 配置文件
@@ -21,48 +121,11 @@ class ConfigParser:
         proxies = []
         
         try:
-            config = configparser.ConfigParser()
-            config.read_string(content)
-            
             # 遍历所有 section（除了 common）
-            for section in config.sections():
-                if section.lower() == 'common':
-                    continue
-                
-                proxy_data = {
-                    'name': section,
-                    'proxy_type': config.get(section, 'type', fallback='tcp'),
-                    'local_ip': config.get(section, 'local_ip', fallback='127.0.0.1'),
-                    'local_port': None,
-                    'remote_port': None,
-                    'custom_domains': None,
-                }
-                
-                # 解析 local_port（必需）
-                if config.has_option(section, 'local_port'):
-                    try:
-                        proxy_data['local_port'] = int(config.get(section, 'local_port'))
-                    except ValueError:
-                        continue  # 跳过无效的端口配置
-                else:
-                    continue  # 没有 local_port 的配置无效
-                
-                # 解析 remote_port（可选，TCP/UDP 类型需要）
-                if config.has_option(section, 'remote_port'):
-                    try:
-                        proxy_data['remote_port'] = int(config.get(section, 'remote_port'))
-                    except ValueError:
-                        pass
-                
-                # 解析 custom_domains（可选，HTTP/HTTPS 类型）
-                if config.has_option(section, 'custom_domains'):
-                    proxy_data['custom_domains'] = config.get(section, 'custom_domains')
-                
-                # 解析 subdomain（可选，HTTP/HTTPS 类型）
-                if config.has_option(section, 'subdomain'):
-                    proxy_data['subdomain'] = config.get(section, 'subdomain')
-                
-                proxies.append(proxy_data)
+            for section, options in iter_ini_sections(content):
+                proxy_data = ConfigParser.ini_section_to_proxy(section, options)
+                if proxy_data:
+                    proxies.append(proxy_data)
                 
         except Exception as e:
             raise ValueError(f"解析 INI 配置文件失败: {str(e)}")
@@ -82,53 +145,15 @@ class ConfigParser:
         proxies = []
         
         try:
-            config = toml.loads(content)
+            config = load_toml(content)
             
             # TOML 格式中代理配置在 proxies 数组中
             proxy_list = config.get('proxies', [])
             
             for proxy in proxy_list:
-                # 获取代理名称
-                name = proxy.get('name')
-                if not name:
-                    continue
-                
-                # 解析 local_port（必需）
-                local_port = proxy.get('localPort') or proxy.get('local_port')
-                if not local_port:
-                    continue  # 没有 local_port 的配置无效
-                
-                proxy_data = {
-                    'name': name,
-                    'proxy_type': proxy.get('type', 'tcp'),
-                    'local_ip': proxy.get('localIP') or proxy.get('local_ip', '127.0.0.1'),
-                    'local_port': int(local_port),
-                    'remote_port': None,
-                    'custom_domains': None,
-                }
-                
-                # 解析 remote_port（可选，TCP/UDP 类型需要）
-                remote_port = proxy.get('remotePort') or proxy.get('remote_port')
-                if remote_port:
-                    try:
-                        proxy_data['remote_port'] = int(remote_port)
-                    except ValueError:
-                        pass
-                
-                # 解析 customDomains（可选，HTTP/HTTPS 类型）
-                custom_domains = proxy.get('customDomains') or proxy.get('custom_domains')
-                if custom_domains:
-                    if isinstance(custom_domains, list):
-                        proxy_data['custom_domains'] = ','.join(custom_domains)
-                    else:
-                        proxy_data['custom_domains'] = str(custom_domains)
-                
-                # 解析 subdomain（可选，HTTP/HTTPS 类型）
-                subdomain = proxy.get('subdomain')
-                if subdomain:
-                    proxy_data['subdomain'] = subdomain
-                
-                proxies.append(proxy_data)
+                proxy_data = ConfigParser.toml_table_to_proxy(proxy)
+                if proxy_data:
+                    proxies.append(proxy_data)
                 
         except Exception as e:
             raise ValueError(f"解析 TOML 配置文件失败: {str(e)}")
@@ -155,3 +180,109 @@ class ConfigParser:
         else:
             raise ValueError(f"不支持的配置文件格式: {file_extension}，仅支持 ini 和 toml")
 
+
+# TOML 表头：[table] / [[array.of.tables]]
+_TOML_HEADER_RE = re.compile(r'^\[\[?\s*([A-Za-z0-9_.\-"\' ]+?)\s*\]\]?\s*(#.*)?$')
+
+
+class StreamingConfigParser:
+    """增量解析 frpc 配置文件
+    
+    按行扫描 INI section / TOML [[proxies]] 表，每读完一个代理就返回，
+    不需要把整个文件读入内存。用法：反复调用 feed() 传入文本块，最后调用 close()。
+    INI 不支持插值语法（%(name)s），TOML 只识别 [[proxies]] 表形式的代理。
+    """
+    
+    def __init__(self, file_extension: str):
+        file_extension = file_extension.lower().strip('.')
+        if file_extension not in ('ini', 'toml'):
+            raise ValueError(f"不支持的配置文件格式: {file_extension}，仅支持 ini 和 toml")
+        self.format = file_extension
+        self._pending = ''
+        self._line_no = 0
+        # INI 状态
+        self._ini = IniScanner()
+        # TOML 状态：当前 [[proxies]] 表的原始行
+        self._table_lines: Optional[List[str]] = None
+        self._table_start = 0
+        self._in_multiline: Optional[str] = None
+    
+    def feed(self, data: str) -> List[Dict[str, Any]]:
+        """输入一段文本，返回其中已完整解析的代理配置"""
+        data = self._pending + data
+        lines = data.split('\n')
+        self._pending = lines.pop()
+        return self._feed_lines(lines)
+    
+    def close(self) -> List[Dict[str, Any]]:
+        """输入结束，返回剩余的代理配置"""
+        proxies = []
+        if self._pending:
+            proxies.extend(self._feed_lines([self._pending]))
+            self._pending = ''
+        if self.format == 'ini':
+            proxies.extend(self._ini_proxies(self._ini.close()))
+        else:
+            proxy = self._finish_toml_table()
+            if proxy:
+                proxies.append(proxy)
+        return proxies
+    
+    def _feed_lines(self, lines: List[str]) -> List[Dict[str, Any]]:
+        if self.format == 'ini':
+            return self._ini_proxies(self._ini.scan(lines))
+        proxies = []
+        for line in lines:
+            self._line_no += 1
+            proxy = self._feed_toml_line(line.rstrip('\r'))
+            if proxy:
+                proxies.append(proxy)
+        return proxies
+    
+    @staticmethod
+    def _ini_proxies(sections) -> List[Dict[str, Any]]:
+        proxies = []
+        try:
+            for section, options in sections:
+                proxy = ConfigParser.ini_section_to_proxy(section, options)
+                if proxy:
+                    proxies.append(proxy)
+        except ValueError as e:
+            raise ValueError(f"解析 INI 配置文件失败: {str(e)}")
+        return proxies
+    
+    def _feed_toml_line(self, line: str) -> Optional[Dict[str, Any]]:
+        proxy = None
+        stripped = line.strip()
+        
+        # 多行字符串中的内容不做表头判断
+        if self._in_multiline is None:
+            match = _TOML_HEADER_RE.match(stripped)
+            if match:
+                table = match.group(1).strip()
+                if stripped.startswith('[[') and table == 'proxies':
+                    proxy = self._finish_toml_table()
+                    self._table_lines = []
+                    self._table_start = self._line_no
+                elif not table.startswith('proxies.'):
+                    # 其他顶层表（[auth]、[[visitors]] 等）结束当前代理
+                    proxy = self._finish_toml_table()
+        
+        for quote in ('"""', "'''"):
+            if self._in_multiline in (None, quote) and line.count(quote) % 2 == 1:
+                self._in_multiline = None if self._in_multiline else quote
+        
+        if self._table_lines is not None:
+            self._table_lines.append(line)
+        return proxy
+    
+    def _finish_toml_table(self) -> Optional[Dict[str, Any]]:
+        if self._table_lines is None:
+            return None
+        content = '\n'.join(self._table_lines)
+        self._table_lines = None
+        try:
+            tables = load_toml(content).get('proxies', [])
+        except Exception as e:
+            raise ValueError(f"解析 TOML 配置文件失败（第 {self._table_start} 行开始的代理）: {str(e)}")
+        return ConfigParser.toml_table_to_proxy(tables[0]) if tables else None
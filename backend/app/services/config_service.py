@@ -1,6 +1,5 @@
 """配置生成服务"""
 from typing import List, Optional
-import toml
 from sqlalchemy.orm import Session
 
 from app.models.frps_server import FrpsServer
@@ -79,7 +78,8 @@ class ConfigService:
         
         config["proxies"] = proxies_config
         
-        # 转换为 TOML 格式
+        # 转换为 TOML 格式（toml 包只在这里使用，用到时才导入）
+        import toml
         toml_content = toml.dumps(config)
         
         return toml_content
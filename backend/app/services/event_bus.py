@@ -0,0 +1,144 @@
+"""进程内事件总线
+
+同步（定时同步和手动对比分析）在提交数据库后，把代理状态变化、新发现的代理和端口冲突
+发布到总线，/api/events 的订阅者按服务器和分组过滤后实时收到事件。
+总线只在当前进程内分发：每个订阅者一个有界队列，消费过慢时丢弃新事件并记录丢弃数。
+"""
+import asyncio
+import itertools
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from app.models.history import ProxyHistory
+
+# 每个订阅者最多缓存的事件数
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+class Subscription:
+    """一个订阅者：按服务器、分组过滤的事件队列"""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        frps_server_id: Optional[int] = None,
+        group_name: Optional[str] = None
+    ):
+        self.loop = loop
+        self.frps_server_id = frps_server_id
+        self.group_name = group_name
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.dropped = 0
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.frps_server_id is not None and event.get("frps_server_id") != self.frps_server_id:
+            return False
+        if self.group_name is not None and event.get("group_name") != self.group_name:
+            return False
+        return True
+
+    def _put(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+
+class EventBus:
+    """进程内发布/订阅总线（可从事件循环或其他线程发布）"""
+
+    def __init__(self):
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, frps_server_id: Optional[int] = None, group_name: Optional[str] = None) -> Subscription:
+        """在当前事件循环中创建订阅"""
+        subscription = Subscription(asyncio.get_running_loop(), frps_server_id, group_name)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, events: List[Dict[str, Any]]) -> None:
+        """发布事件，为每个事件分配递增的 id"""
+        if not events:
+            return
+        for event in events:
+            event.setdefault("id", next(self._ids))
+            event.setdefault("timestamp", datetime.utcnow())
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+
+        for subscription in subscribers:
+            matched = [event for event in events if subscription.matches(event)]
+            if not matched:
+                continue
+            if subscription.loop is current_loop:
+                for event in matched:
+                    subscription._put(event)
+            elif not subscription.loop.is_closed():
+                for event in matched:
+                    subscription.loop.call_soon_threadsafe(subscription._put, event)
+
+
+def proxy_event(
+    event_type: str,
+    frps_server_id: int,
+    proxy_name: str,
+    group_name: Optional[str] = None,
+    old_status: Optional[str] = None,
+    new_status: Optional[str] = None,
+    remote_port: Optional[int] = None,
+    extra: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """构造代理事件"""
+    event = {
+        "type": event_type,
+        "frps_server_id": frps_server_id,
+        "proxy_name": proxy_name,
+        "group_name": group_name,
+        "old_status": old_status,
+        "new_status": new_status,
+        "remote_port": remote_port,
+    }
+    if extra:
+        event["extra"] = extra
+    return event
+
+
+def history_event(history: ProxyHistory, group_name: Optional[str] = None) -> Dict[str, Any]:
+    """把一条历史记录转换为事件"""
+    event = proxy_event(
+        history.action,
+        history.frps_server_id,
+        history.proxy_name,
+        group_name=group_name,
+        old_status=history.old_status,
+        new_status=history.new_status,
+        remote_port=history.remote_port,
+        extra=history.extra
+    )
+    event["timestamp"] = history.timestamp
+    return event
+
+
+_event_bus = EventBus()
+
+
+def get_event_bus() -> EventBus:
+    """获取全局事件总线"""
+    return _event_bus
@@ -0,0 +1,146 @@
+"""跨进程事件转发
+
+事件总线只在当前进程内分发。启用主进程选举（多个 worker 或容器）时，
+同步在提交前把本次产生的事件写入 event_outbox 表（与同步结果在同一事务中提交），
+每个进程定期读取其他进程写入的新事件并发布到本进程的总线，
+因此 /api/events 连接到任何一个进程都能收到事件（从进程有一个轮询间隔的延迟）。
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.leader import PROCESS_ID
+from app.models.event_outbox import EventOutbox
+from app.services.event_bus import get_event_bus
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# 转发表中事件的保留时间，超过的由主进程清理
+OUTBOX_RETENTION_MINUTES = 10
+
+# 每次轮询最多读取的行数（每行是一次提交的全部事件）
+RELAY_BATCH_ROWS = 500
+
+# PostgreSQL 的自增 id 按分配顺序而不是提交顺序可见，每次轮询回看最近这么多个 id，
+# 补上晚提交的较小 id（已转发的 id 记录在 _relayed_ids 中跳过）
+RELAY_LOOKBACK_IDS = 100
+
+# 本进程已转发到的最大 id（首次轮询时从当前最大值开始，不重放启动前的事件）
+_last_relayed_id: Optional[int] = None
+_relayed_ids: Set[int] = set()
+
+_relay_task: Optional[asyncio.Task] = None
+
+
+def relay_enabled() -> bool:
+    """是否需要跨进程转发事件（只有启用主进程选举时才可能有多个进程）"""
+    return settings.leader_election_enabled
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def stage_events(db: Session, events: List[Dict[str, Any]]) -> None:
+    """把事件写入转发表（不提交，由调用方与产生事件的数据一起提交）"""
+    if not events or not relay_enabled():
+        return
+    payload = json.dumps(
+        [{key: value for key, value in event.items() if key != "id"} for event in events],
+        default=_encode,
+        ensure_ascii=False
+    )
+    db.add(EventOutbox(origin=PROCESS_ID, payload=payload))
+
+
+def relay_events() -> int:
+    """读取其他进程写入的新事件并发布到本进程的事件总线（在线程中调用）
+
+    Returns:
+        转发的事件数
+    """
+    global _last_relayed_id, _relayed_ids
+    db = SessionLocal()
+    try:
+        if _last_relayed_id is None:
+            _last_relayed_id = db.query(func.max(EventOutbox.id)).scalar() or 0
+            _relayed_ids = {
+                row_id for (row_id,) in db.query(EventOutbox.id).filter(
+                    EventOutbox.id > _last_relayed_id - RELAY_LOOKBACK_IDS
+                )
+            }
+            return 0
+
+        rows = db.query(EventOutbox.id, EventOutbox.origin, EventOutbox.payload).filter(
+            EventOutbox.id > _last_relayed_id - RELAY_LOOKBACK_IDS
+        ).order_by(EventOutbox.id).limit(RELAY_LOOKBACK_IDS + RELAY_BATCH_ROWS).all()
+    finally:
+        db.close()
+
+    events = []
+    for row_id, origin, payload in rows:
+        if row_id in _relayed_ids:
+            continue
+        _relayed_ids.add(row_id)
+        _last_relayed_id = max(_last_relayed_id, row_id)
+        if origin != PROCESS_ID:
+            events.extend(json.loads(payload))
+    _relayed_ids = {row_id for row_id in _relayed_ids if row_id > _last_relayed_id - RELAY_LOOKBACK_IDS}
+
+    get_event_bus().publish(events)
+    return len(events)
+
+
+def cleanup_outbox() -> int:
+    """删除超过保留时间的转发事件（由主进程定期执行）
+
+    Returns:
+        删除的行数
+    """
+    db = SessionLocal()
+    try:
+        removed = db.query(EventOutbox).filter(
+            EventOutbox.created_at < datetime.utcnow() - timedelta(minutes=OUTBOX_RETENTION_MINUTES)
+        ).delete(synchronize_session=False)
+        db.commit()
+        return removed
+    finally:
+        db.close()
+
+
+async def _relay_loop():
+    """按间隔转发其他进程发布的事件"""
+    while True:
+        try:
+            await asyncio.to_thread(relay_events)
+        except Exception as e:
+            logger.error(f"转发事件失败: {e}")
+        await asyncio.sleep(settings.event_relay_interval_seconds)
+
+
+async def start_event_relay():
+    """启动事件转发（未启用主进程选举时不需要）"""
+    global _relay_task, _last_relayed_id
+    if not relay_enabled():
+        return
+    _last_relayed_id = None
+    _relay_task = asyncio.create_task(_relay_loop())
+    logger.info(f"事件转发已启动，间隔: {settings.event_relay_interval_seconds} 秒")
+
+
+def shutdown_event_relay():
+    """停止事件转发"""
+    global _relay_task
+    if _relay_task:
+        _relay_task.cancel()
+        _relay_task = None
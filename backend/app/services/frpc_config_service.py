@@ -1,8 +1,9 @@
 """frpc 配置生成服务"""
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
 from sqlalchemy.orm import Session
 from app.models.proxy import Proxy
 from app.models.frps_server import FrpsServer
+from app.services.frpc_parser import IniScanner, iter_ini_sections
 
 
 class FrpcConfigService:
@@ -37,11 +38,11 @@ class FrpcConfigService:
         if not server:
             raise ValueError(f"服务器 ID {frps_server_id} 不存在")
         
-        # 获取该分组的所有代理
+        # 获取该分组的所有代理（按名称排序，与批量导出的顺序一致）
         proxies = self.db.query(Proxy).filter(
             Proxy.group_name == group_name,
             Proxy.frps_server_id == frps_server_id
-        ).all()
+        ).order_by(Proxy.name).all()
         
         if not proxies:
             raise ValueError(f"分组 '{group_name}' 在服务器 {server.name} 中没有代理")
@@ -51,10 +52,7 @@ class FrpcConfigService:
             client_name = group_name
         
         # 根据格式生成配置
-        if format.lower() == "toml":
-            return self._generate_toml_config(server, proxies, group_name, client_name)
-        else:
-            return self._generate_ini_config(server, proxies, group_name, client_name)
+        return self.render_config(server, proxies, group_name, client_name, format)
     
     def generate_config_for_proxies(
         self,
@@ -91,10 +89,32 @@ class FrpcConfigService:
         
         # 根据格式生成配置
         group_name = proxies[0].group_name if proxies else "selected"
+        return self.render_config(server, proxies, group_name, None, format)
+    
+    def render_config(
+        self,
+        server: FrpsServer,
+        proxies: List[Proxy],
+        group_name: str,
+        client_name: str = None,
+        format: str = "ini"
+    ) -> str:
+        """渲染 frpc 配置文件（不访问数据库）
+        
+        Args:
+            server: 服务器（只需要 name/server_addr/server_port/auth_* 属性）
+            proxies: 代理列表（只需要 name/proxy_type/local_ip/local_port/remote_port 属性）
+            group_name: 分组名称
+            client_name: 客户端名称（可选）
+            format: 配置格式，支持 'ini' 或 'toml'
+            
+        Returns:
+            frpc 配置文件内容
+        """
         if format.lower() == "toml":
-            return self._generate_toml_config(server, proxies, group_name, None)
+            return self._generate_toml_config(server, proxies, group_name, client_name)
         else:
-            return self._generate_ini_config(server, proxies, group_name, None)
+            return self._generate_ini_config(server, proxies, group_name, client_name)
     
     def _generate_ini_config(self, server: FrpsServer, proxies: List[Proxy], group_name: str, client_name: str = None) -> str:
         """生成 INI 格式的配置文件
@@ -245,13 +265,9 @@ class FrpcConfigService:
         Returns:
             TOML格式的配置内容
         """
-        import configparser
-        from io import StringIO
-        
         try:
-            # 解析INI配置
-            config = configparser.ConfigParser()
-            config.read_string(ini_content)
+            # 解析INI配置（单遍扫描，section 按文件中的顺序保存）
+            sections = dict(iter_ini_sections(ini_content))
             
             toml_lines = []
             toml_lines.append("# frpc 配置文件 (TOML 格式)")
@@ -260,74 +276,143 @@ class FrpcConfigService:
             toml_lines.append("")
             
             # 处理 [common] 部分
-            if 'common' in config:
-                common = config['common']
-                
-                # 服务器地址和端口
-                if 'server_addr' in common:
-                    toml_lines.append(f"serverAddr = \"{common['server_addr']}\"")
-                if 'server_port' in common:
-                    toml_lines.append(f"serverPort = {common['server_port']}")
-                
-                # 认证
-                if 'auth_token' in common or 'token' in common:
-                    token = common.get('auth_token') or common.get('token')
-                    toml_lines.append(f"auth.token = \"{token}\"")
-                elif 'user' in common:
-                    toml_lines.append(f"# 原配置使用用户名认证，新版本推荐使用 token")
-                    toml_lines.append(f"# auth.method = \"token\"")
-                
-                # 其他常见配置
-                if 'login_fail_exit' in common:
-                    toml_lines.append(f"loginFailExit = {common['login_fail_exit'].lower()}")
-                if 'protocol' in common:
-                    toml_lines.append(f"transport.protocol = \"{common['protocol']}\"")
-                if 'tls_enable' in common:
-                    toml_lines.append(f"transport.tls.enable = {common['tls_enable'].lower()}")
-                
-                toml_lines.append("")
+            if 'common' in sections:
+                toml_lines.extend(self._common_to_toml_lines(sections['common']))
             
             # 处理代理配置
-            for section in config.sections():
+            for section, proxy in sections.items():
                 if section == 'common':
                     continue
-                
-                proxy = config[section]
-                toml_lines.append("[[proxies]]")
-                toml_lines.append(f"name = \"{section}\"")
-                
-                # 代理类型
-                if 'type' in proxy:
-                    toml_lines.append(f"type = \"{proxy['type']}\"")
-                
-                # 本地配置
-                if 'local_ip' in proxy:
-                    toml_lines.append(f"localIP = \"{proxy['local_ip']}\"")
-                if 'local_port' in proxy:
-                    toml_lines.append(f"localPort = {proxy['local_port']}")
-                
-                # 远程端口
-                if 'remote_port' in proxy:
-                    toml_lines.append(f"remotePort = {proxy['remote_port']}")
-                
-                # HTTP/HTTPS 特有配置
-                if 'custom_domains' in proxy:
-                    domains = proxy['custom_domains'].split(',')
-                    domains_str = ', '.join([f'\"{d.strip()}\"' for d in domains])
-                    toml_lines.append(f"customDomains = [{domains_str}]")
-                
-                if 'subdomain' in proxy:
-                    toml_lines.append(f"subdomain = \"{proxy['subdomain']}\"")
-                
-                # 其他配置
-                if 'use_encryption' in proxy:
-                    toml_lines.append(f"transport.useEncryption = {proxy['use_encryption'].lower()}")
-                if 'use_compression' in proxy:
-                    toml_lines.append(f"transport.useCompression = {proxy['use_compression'].lower()}")
-                
-                toml_lines.append("")
+                toml_lines.extend(self._proxy_to_toml_lines(section, proxy))
             
             return "\n".join(toml_lines)
             
         except Exception as e:
             raise ValueError(f"INI 转换失败: {str(e)}")
+    
+    def iter_ini_to_toml(self, ini_chunks: Iterable[str]) -> Iterator[str]:
+        """逐段将INI格式的frpc配置转换为TOML格式
+        
+        每解析完一个 section 就输出对应的 TOML 片段，内存占用与文件大小无关。
+        [common] 位于代理之前时（常见情况），输出与 convert_ini_to_toml 相同；
+        位于代理之后时，TOML 中已无法再定义顶层配置，以注释形式输出在对应位置。
+        
+        Args:
+            ini_chunks: INI配置内容的文本块（任意切分）
+            
+        Yields:
+            TOML格式的配置片段，依次拼接即为完整配置
+        """
+        header = [
+            "# frpc 配置文件 (TOML 格式)",
+            "# 由 INI 格式自动转换",
+            f"# 转换时间: {self._get_current_time()}",
+            "",
+        ]
+        scanner = IniScanner()
+        pending = ''
+        # 第一段输出带上文件头，后续每段以换行开头
+        started = False
+        has_proxy = False
+        
+        def convert(sections) -> Iterator[str]:
+            nonlocal started, has_proxy
+            for section, options in sections:
+                if section != 'common':
+                    has_proxy = True
+                    lines = self._proxy_to_toml_lines(section, options)
+                elif not has_proxy:
+                    lines = self._common_to_toml_lines(options)
+                else:
+                    lines = ["# 警告: [common] 位于代理配置之后，以下配置需要手动移动到文件开头"]
+                    lines.extend(
+                        f"# {line}" for line in self._common_to_toml_lines(options) if line
+                    )
+                    lines.append("")
+                if started:
+                    yield "\n" + "\n".join(lines)
+                else:
+                    started = True
+                    yield "\n".join(header + lines)
+        
+        try:
+            for chunk in ini_chunks:
+                lines = (pending + chunk).split('\n')
+                pending = lines.pop()
+                yield from convert(scanner.scan(lines))
+            yield from convert(scanner.scan([pending]))
+            yield from convert(scanner.close())
+        except ValueError as e:
+            raise ValueError(f"INI 转换失败: {str(e)}")
+        
+        if not started:
+            yield "\n".join(header)
+    
+    @staticmethod
+    def _common_to_toml_lines(common: Dict[str, str]) -> List[str]:
+        """把 INI [common] 转换为 TOML 顶层配置行"""
+        toml_lines = []
+        
+        # 服务器地址和端口
+        if 'server_addr' in common:
+            toml_lines.append(f"serverAddr = \"{common['server_addr']}\"")
+        if 'server_port' in common:
+            toml_lines.append(f"serverPort = {common['server_port']}")
+        
+        # 认证
+        if 'auth_token' in common or 'token' in common:
+            token = common.get('auth_token') or common.get('token')
+            toml_lines.append(f"auth.token = \"{token}\"")
+        elif 'user' in common:
+            toml_lines.append(f"# 原配置使用用户名认证，新版本推荐使用 token")
+            toml_lines.append(f"# auth.method = \"token\"")
+        
+        # 其他常见配置
+        if 'login_fail_exit' in common:
+            toml_lines.append(f"loginFailExit = {common['login_fail_exit'].lower()}")
+        if 'protocol' in common:
+            toml_lines.append(f"transport.protocol = \"{common['protocol']}\"")
+        if 'tls_enable' in common:
+            toml_lines.append(f"transport.tls.enable = {common['tls_enable'].lower()}")
+        
+        toml_lines.append("")
+        return toml_lines
+    
+    @staticmethod
+    def _proxy_to_toml_lines(section: str, proxy: Dict[str, str]) -> List[str]:
+        """把一个 INI 代理 section 转换为 TOML [[proxies]] 表"""
+        toml_lines = []
+        toml_lines.append("[[proxies]]")
+        toml_lines.append(f"name = \"{section}\"")
+        
+        # 代理类型
+        if 'type' in proxy:
+            toml_lines.append(f"type = \"{proxy['type']}\"")
+        
+        # 本地配置
+        if 'local_ip' in proxy:
+            toml_lines.append(f"localIP = \"{proxy['local_ip']}\"")
+        if 'local_port' in proxy:
+            toml_lines.append(f"localPort = {proxy['local_port']}")
+        
+        # 远程端口
+        if 'remote_port' in proxy:
+            toml_lines.append(f"remotePort = {proxy['remote_port']}")
+        
+        # HTTP/HTTPS 特有配置
+        if 'custom_domains' in proxy:
+            domains = proxy['custom_domains'].split(',')
+            domains_str = ', '.join([f'\"{d.strip()}\"' for d in domains])
+            toml_lines.append(f"customDomains = [{domains_str}]")
+        
+        if 'subdomain' in proxy:
+            toml_lines.append(f"subdomain = \"{proxy['subdomain']}\"")
+        
+        # 其他配置
+        if 'use_encryption' in proxy:
+            toml_lines.append(f"transport.useEncryption = {proxy['use_encryption'].lower()}")
+        if 'use_compression' in proxy:
+            toml_lines.append(f"transport.useCompression = {proxy['use_compression'].lower()}")
+        
+        toml_lines.append("")
+        return toml_lines
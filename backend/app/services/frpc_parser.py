@@ -0,0 +1,137 @@
+"""frpc 配置文件快速解析
+
+INI：单遍行扫描，只支持 frpc 用到的子集（section、key = value / key: value、
+整行注释、缩进续行、[DEFAULT] 默认值），不支持 configparser 的 %(name)s 插值。
+重复的 section 或配置项与 configparser 一样视为错误。
+
+TOML：使用标准库 tomllib（Python 3.11+），低版本使用 tomli，都不可用时退回 toml 包。
+"""
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+try:
+    import tomllib as _toml_lib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as _toml_lib
+    except ImportError:
+        _toml_lib = None
+
+if _toml_lib is None:
+    import toml as _toml_fallback
+
+# 与 configparser.DEFAULTSECT 相同
+DEFAULT_SECTION = 'DEFAULT'
+
+_COMMENT_PREFIXES = ('#', ';')
+
+IniSection = Tuple[str, Dict[str, str]]
+
+
+def load_toml(content: str) -> Dict[str, Any]:
+    """解析 TOML 文档
+
+    Raises:
+        ValueError: TOML 格式错误
+    """
+    if _toml_lib is not None:
+        # tomllib.TOMLDecodeError 是 ValueError 的子类
+        return _toml_lib.loads(content)
+    try:
+        return _toml_fallback.loads(content)
+    except _toml_fallback.TomlDecodeError as e:
+        raise ValueError(str(e))
+
+
+class IniScanner:
+    """单遍扫描 INI 行，每个 section 结束时产出 (section 名称, 配置项)
+
+    配置项的键为小写，并已合并 [DEFAULT] 中的默认值。
+    可以多次调用 scan() 分块输入，最后调用 close() 取得最后一个 section。
+    """
+
+    def __init__(self):
+        self.line_no = 0
+        self._section: Optional[str] = None
+        self._options: Dict[str, str] = {}
+        self._defaults: Dict[str, str] = {}
+        self._last_key: Optional[str] = None
+        self._seen: Set[str] = set()
+
+    def scan(self, lines: Iterable[str]) -> Iterator[IniSection]:
+        """扫描若干行（行尾的 \r 会被忽略）"""
+        line_no = self.line_no
+        section = self._section
+        options = self._options
+        last_key = self._last_key
+        try:
+            for line in lines:
+                line_no += 1
+                stripped = line.strip()
+                if not stripped or stripped.startswith(_COMMENT_PREFIXES):
+                    continue
+
+                if stripped[0] == '[':
+                    end = stripped.rfind(']')
+                    if end > 1:
+                        finished = self._finish(section, options)
+                        if finished is not None:
+                            yield finished
+                        section = stripped[1:end]
+                        if section in self._seen:
+                            raise ValueError(f"第 {line_no} 行: section '{section}' 重复")
+                        self._seen.add(section)
+                        options = self._defaults if section == DEFAULT_SECTION else {}
+                        last_key = None
+                        continue
+
+                # 缩进行是上一个配置项的续行
+                if line[0] in ' \t' and last_key is not None:
+                    options[last_key] += '\n' + stripped
+                    continue
+
+                if section is None:
+                    raise ValueError(f"第 {line_no} 行不在任何 section 中")
+
+                eq = stripped.find('=')
+                colon = stripped.find(':')
+                index = eq if colon < 0 or 0 <= eq < colon else colon
+                if index <= 0:
+                    raise ValueError(f"第 {line_no} 行格式错误: {stripped}")
+                key = stripped[:index].rstrip().lower()
+                if key in options:
+                    raise ValueError(f"第 {line_no} 行: section '{section}' 中的配置项 '{key}' 重复")
+                options[key] = stripped[index + 1:].lstrip()
+                last_key = key
+        finally:
+            self.line_no = line_no
+            self._section = section
+            self._options = options
+            self._last_key = last_key
+
+    def close(self) -> Iterator[IniSection]:
+        """输入结束，产出最后一个 section"""
+        finished = self._finish(self._section, self._options)
+        self._section = None
+        self._options = {}
+        self._last_key = None
+        if finished is not None:
+            yield finished
+
+    def _finish(self, section: Optional[str], options: Dict[str, str]) -> Optional[IniSection]:
+        if section is None or section == DEFAULT_SECTION:
+            return None
+        if self._defaults:
+            options = {**self._defaults, **options}
+        return section, options
+
+
+def iter_ini_sections(content: str) -> Iterator[IniSection]:
+    """按顺序产出 INI 文档中的所有 section（包括 common，不包括 DEFAULT）
+
+    Raises:
+        ValueError: 格式错误
+    """
+    scanner = IniScanner()
+    yield from scanner.scan(content.split('\n'))
+    yield from scanner.close()
+
@@ -0,0 +1,254 @@
+"""代理历史记录存储服务
+
+proxy_history 主表只保存最近 history_hot_days 天的记录，写入和常用查询都落在这张小表上；
+维护任务把更早的记录按月转移到 proxy_history_YYYYMM 分区表（与主表同库、同结构）。
+超过 history_retention_days 的整月分区先按 (服务器, 代理, 动作, 天) 汇总到
+proxy_history_daily，再整表 DROP，避免大批量 DELETE 带来的锁表和碎片。
+"""
+import logging
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Column, Index, MetaData, Table, delete, func, insert, inspect, select, true
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import greatest, least, upsert
+from app.models.history import ProxyHistory, ProxyHistoryDaily
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# 分区表名：proxy_history_YYYYMM
+PARTITION_PATTERN = re.compile(r"^proxy_history_(\d{4})(\d{2})$")
+
+
+def month_start(value: datetime) -> datetime:
+    """所在月份的第一天零点"""
+    return datetime(value.year, value.month, 1)
+
+
+def next_month(value: datetime) -> datetime:
+    """下个月的第一天零点"""
+    if value.month == 12:
+        return datetime(value.year + 1, 1, 1)
+    return datetime(value.year, value.month + 1, 1)
+
+
+def partition_name(month: datetime) -> str:
+    """月份对应的分区表名"""
+    return f"proxy_history_{month.year:04d}{month.month:02d}"
+
+
+def partition_table(name: str) -> Table:
+    """构造分区表定义：复制主表的列（不带外键），按服务器和时间建索引"""
+    columns = [
+        Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+        for column in ProxyHistory.__table__.columns
+    ]
+    return Table(
+        name,
+        MetaData(),
+        *columns,
+        Index(f"ix_{name}_server_timestamp", "frps_server_id", "timestamp"),
+    )
+
+
+class HistoryService:
+    """代理历史记录的分区转移、降采样和跨分区查询"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list_partitions(self) -> List[Tuple[datetime, str]]:
+        """列出已存在的分区表，按月份从新到旧排序"""
+        partitions = []
+        for name in inspect(self.db.get_bind()).get_table_names():
+            match = PARTITION_PATTERN.match(name)
+            if match:
+                partitions.append((datetime(int(match.group(1)), int(match.group(2)), 1), name))
+        partitions.sort(reverse=True)
+        return partitions
+
+    def query(
+        self,
+        frps_server_id: int,
+        limit: int = 50,
+        before: Optional[datetime] = None,
+        proxy_name: Optional[str] = None,
+        action: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> list:
+        """按时间倒序查询历史记录，主表不足 limit 条时依次读取更早的分区
+
+        Args:
+            frps_server_id: frps 服务器 ID
+            limit: 返回记录数量
+            before: 只返回早于该时间的记录（用于翻页）
+            proxy_name: 只返回指定代理的记录
+            action: 只返回指定动作的记录
+            status: 只返回变化后为该状态的记录
+        """
+        query = self.db.query(ProxyHistory).filter(ProxyHistory.frps_server_id == frps_server_id)
+        if before is not None:
+            query = query.filter(ProxyHistory.timestamp < before)
+        if proxy_name:
+            query = query.filter(ProxyHistory.proxy_name == proxy_name)
+        if action:
+            query = query.filter(ProxyHistory.action == action)
+        if status:
+            query = query.filter(ProxyHistory.new_status == status)
+        results = list(query.order_by(ProxyHistory.timestamp.desc()).limit(limit).all())
+
+        for month, name in self.list_partitions():
+            if len(results) >= limit:
+                break
+            if before is not None and month >= before:
+                continue
+            table = partition_table(name)
+            stmt = select(table).where(table.c.frps_server_id == frps_server_id)
+            if before is not None:
+                stmt = stmt.where(table.c.timestamp < before)
+            if proxy_name:
+                stmt = stmt.where(table.c.proxy_name == proxy_name)
+            if action:
+                stmt = stmt.where(table.c.action == action)
+            if status:
+                stmt = stmt.where(table.c.new_status == status)
+            stmt = stmt.order_by(table.c.timestamp.desc()).limit(limit - len(results))
+            results.extend(self.db.execute(stmt).all())
+
+        return results
+
+    def query_daily(
+        self,
+        frps_server_id: int,
+        proxy_name: Optional[str] = None,
+        since: Optional[date] = None,
+        limit: int = 500
+    ) -> List[ProxyHistoryDaily]:
+        """查询按天汇总的历史记录"""
+        query = self.db.query(ProxyHistoryDaily).filter(ProxyHistoryDaily.frps_server_id == frps_server_id)
+        if proxy_name:
+            query = query.filter(ProxyHistoryDaily.proxy_name == proxy_name)
+        if since is not None:
+            query = query.filter(ProxyHistoryDaily.day >= since)
+        return query.order_by(ProxyHistoryDaily.day.desc(), ProxyHistoryDaily.proxy_name).limit(limit).all()
+
+    def rollover(self, now: Optional[datetime] = None) -> int:
+        """把早于 history_hot_days 的记录按月转移到分区表，每个月一个事务
+
+        Returns:
+            转移的记录数
+        """
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(days=settings.history_hot_days)
+        source = ProxyHistory.__table__
+        column_names = [column.name for column in source.columns]
+        moved = 0
+        while True:
+            # 每次从剩余最早的记录所在月份开始，跳过没有记录的月份
+            oldest = self.db.query(func.min(ProxyHistory.timestamp)).scalar()
+            if oldest is None or oldest >= cutoff:
+                return moved
+            month = month_start(oldest)
+            condition = (source.c.timestamp >= month) & (source.c.timestamp < min(next_month(month), cutoff))
+            try:
+                table = self._ensure_partition(month)
+                self.db.execute(
+                    insert(table).from_select(column_names, select(source).where(condition))
+                )
+                result = self.db.execute(delete(source).where(condition))
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            logger.info(f"已转移 {result.rowcount} 条历史记录到 {table.name}")
+            moved += result.rowcount
+
+    def apply_retention(self, now: Optional[datetime] = None) -> Tuple[int, int]:
+        """把超过保留期的整月分区按天汇总后删除，并清理过期的汇总记录
+
+        Returns:
+            (删除的分区数, 删除的汇总记录数)
+        """
+        now = now or datetime.utcnow()
+        dropped = 0
+        if settings.history_retention_days > 0:
+            cutoff = now - timedelta(days=settings.history_retention_days)
+            for month, name in self.list_partitions():
+                if next_month(month) <= cutoff:
+                    self._downsample_and_drop(partition_table(name))
+                    dropped += 1
+
+        removed_daily = 0
+        if settings.history_daily_retention_days > 0:
+            daily_cutoff = (now - timedelta(days=settings.history_daily_retention_days)).date()
+            removed_daily = self.db.query(ProxyHistoryDaily).filter(
+                ProxyHistoryDaily.day < daily_cutoff
+            ).delete(synchronize_session=False)
+            self.db.commit()
+        return dropped, removed_daily
+
+    def maintain(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """执行一次完整的历史记录维护"""
+        now = now or datetime.utcnow()
+        moved = self.rollover(now)
+        dropped, removed_daily = self.apply_retention(now)
+        return {"moved": moved, "dropped_partitions": dropped, "removed_daily": removed_daily}
+
+    def delete_server_history(self, frps_server_id: int) -> None:
+        """删除服务器在各分区表和汇总表中的历史记录（主表记录由 ORM 级联删除）"""
+        self.db.query(ProxyHistoryDaily).filter(
+            ProxyHistoryDaily.frps_server_id == frps_server_id
+        ).delete(synchronize_session=False)
+        for _, name in self.list_partitions():
+            table = partition_table(name)
+            self.db.execute(delete(table).where(table.c.frps_server_id == frps_server_id))
+
+    def _ensure_partition(self, month: datetime) -> Table:
+        table = partition_table(partition_name(month))
+        table.create(self.db.connection(), checkfirst=True)
+        return table
+
+    def _downsample_and_drop(self, table: Table) -> None:
+        """把分区按天汇总写入 proxy_history_daily 后删除分区，在同一事务中完成"""
+        day = func.date(table.c.timestamp)
+        # SQLite 要求 INSERT ... SELECT ... ON CONFLICT 中的 SELECT 带 WHERE 子句
+        summary = select(
+            table.c.frps_server_id,
+            table.c.proxy_name,
+            table.c.action,
+            day,
+            func.count(),
+            func.min(table.c.timestamp),
+            func.max(table.c.timestamp),
+        ).where(true()).group_by(
+            table.c.frps_server_id, table.c.proxy_name, table.c.action, day
+        )
+        columns = ["frps_server_id", "proxy_name", "action", "day", "event_count", "first_at", "last_at"]
+        try:
+            self.db.execute(self._daily_upsert(columns, summary))
+            table.drop(self.db.connection())
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        logger.info(f"已汇总并删除历史分区 {table.name}")
+
+    def _daily_upsert(self, columns: List[str], summary):
+        """同一天的汇总已存在时（分区被重新创建过）累加计数"""
+        daily = ProxyHistoryDaily.__table__
+        stmt = upsert(
+            self.db, daily, ["frps_server_id", "proxy_name", "action", "day"],
+            lambda excluded: {
+                "event_count": daily.c.event_count + excluded.event_count,
+                "first_at": least(self.db, daily.c.first_at, excluded.first_at),
+                "last_at": greatest(self.db, daily.c.last_at, excluded.last_at),
+            },
+            source=(columns, summary),
+        )
+        if stmt is None:
+            return insert(daily).from_select(columns, summary)
+        return stmt
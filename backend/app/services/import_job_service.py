@@ -0,0 +1,437 @@
+"""后台导入任务服务
+
+上传的配置文件先保存到 import_job_dir，接口立即返回任务ID；
+后台 worker 逐个取出任务，在线程中流式解析文件并按批次导入。
+每个批次与任务进度在同一事务中提交，因此服务重启后可以跳过已提交的条目继续导入；
+上传文件丢失的任务会被标记为失败。
+启用主进程选举时只有主进程执行任务：其他进程只创建任务记录，由主进程定期取出执行。
+执行前先认领任务（claimed_by / claim_expires_at），每个批次提交时在同一事务中确认并延长认领，
+失去主进程租约的旧进程和接替的新进程不会同时导入同一批次。
+"""
+import asyncio
+import codecs
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings, resolve_data_dir
+from app.database import SessionLocal
+from app.leader import PROCESS_ID
+from app.models.import_job import ImportJob
+from app.services.config_parser import StreamingConfigParser
+from app.services.import_service import ImportState, ProxyImportService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# 读取任务文件的块大小
+READ_CHUNK_SIZE = 64 * 1024
+
+# 任务记录中保存的代理错误条数上限（failed_count 仍为准确值）
+MAX_JOB_ERRORS = 1000
+
+# 未结束的任务状态
+ACTIVE_STATUSES = ("pending", "running")
+
+# 全局任务队列与 worker
+_queue: Optional[asyncio.Queue] = None
+_worker_task: Optional[asyncio.Task] = None
+# 已加入本进程队列、尚未执行完的任务（主进程定期恢复任务时跳过）
+_queued_job_ids: Set[str] = set()
+# 本进程是否执行任务（启用主进程选举时只有主进程执行）
+_accepting_jobs = False
+_stop_event = threading.Event()
+
+
+class ClaimLostError(Exception):
+    """任务已被其他进程接替，本进程停止执行"""
+
+
+def get_job_dir() -> str:
+    """任务文件保存目录（相对路径相对于项目根目录）"""
+    return resolve_data_dir(settings.import_job_dir)
+
+
+class ImportJobService:
+    """后台导入任务服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_job(
+        self,
+        frps_server_id: int,
+        format: str,
+        source_path: str,
+        group_name: Optional[str] = None,
+        dry_run: bool = False,
+        batch_size: Optional[int] = None
+    ) -> ImportJob:
+        """创建导入任务，把上传文件移动到任务目录
+
+        Args:
+            frps_server_id: frps 服务器 ID
+            format: 配置格式（ini / toml）
+            source_path: 已写入磁盘的上传文件（与任务目录位于同一文件系统）
+            group_name: 指定分组
+            dry_run: 只计算差异，不写入数据库
+            batch_size: 每批写入的代理数
+
+        Returns:
+            新建的任务
+        """
+        job_id = uuid.uuid4().hex
+        format = format.lower().strip('.')
+        file_path = os.path.join(get_job_dir(), f"{job_id}.{format}")
+        os.replace(source_path, file_path)
+
+        job = ImportJob(
+            job_id=job_id,
+            frps_server_id=frps_server_id,
+            format=format,
+            group_name=group_name,
+            dry_run=dry_run,
+            batch_size=batch_size or settings.import_batch_size,
+            status="pending",
+            file_path=file_path,
+            file_size=os.path.getsize(file_path),
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[ImportJob]:
+        """按任务ID查询任务"""
+        return self.db.query(ImportJob).filter(ImportJob.job_id == job_id).first()
+
+    def list_jobs(
+        self,
+        frps_server_id: Optional[int] = None,
+        status: Optional[str] = None,
+        limit: int = 50
+    ) -> List[ImportJob]:
+        """查询最近的任务"""
+        query = self.db.query(ImportJob)
+        if frps_server_id:
+            query = query.filter(ImportJob.frps_server_id == frps_server_id)
+        if status:
+            query = query.filter(ImportJob.status == status)
+        return query.order_by(ImportJob.created_at.desc(), ImportJob.id.desc()).limit(limit).all()
+
+    def run_job(self, job_id: str, stop_event: Optional[threading.Event] = None) -> None:
+        """执行（或继续执行）导入任务，在后台线程中调用
+
+        Args:
+            job_id: 任务ID
+            stop_event: 置位后在当前批次提交后停止，任务保持 running 状态，下次启动时继续
+        """
+        job = self.get_job(job_id)
+        if job is None or job.status not in ACTIVE_STATUSES:
+            return
+
+        if not self._claim(job):
+            logger.info(f"导入任务 {job_id} 正由其他进程执行，跳过")
+            return
+        if job.status not in ACTIVE_STATUSES:
+            # 认领前原来的进程刚好执行完
+            self._release_claim(job)
+            return
+
+        if not os.path.exists(job.file_path):
+            self._fail(job, "上传文件不存在，无法继续导入")
+            return
+
+        try:
+            self._run(job, stop_event)
+        except ClaimLostError:
+            self.db.rollback()
+            logger.warning(f"导入任务 {job_id} 已被其他进程接替，停止执行")
+        except Exception as e:
+            logger.error(f"导入任务 {job_id} 失败: {e}")
+            self.db.rollback()
+            self._fail(job, str(e))
+        finally:
+            self._release_claim(job)
+
+    def _claim(self, job: ImportJob) -> bool:
+        """认领任务：未被认领、由本进程认领或认领已过期时成功
+
+        未启用主进程选举时只有一个进程，直接认领（异常退出前的认领不用等过期）。
+        """
+        now = datetime.utcnow()
+        query = update(ImportJob).where(ImportJob.job_id == job.job_id)
+        if settings.leader_election_enabled:
+            query = query.where(or_(
+                ImportJob.claimed_by.is_(None),
+                ImportJob.claimed_by == PROCESS_ID,
+                ImportJob.claim_expires_at < now
+            ))
+        claimed = self.db.execute(
+            query.values(claimed_by=PROCESS_ID, claim_expires_at=self._claim_deadline(now)),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+        self.db.commit()
+        self.db.refresh(job)
+        return bool(claimed)
+
+    def _renew_claim(self, job: ImportJob) -> None:
+        """在批次事务中确认仍由本进程认领并延长认领，已被接替时抛出 ClaimLostError"""
+        renewed = self.db.execute(
+            update(ImportJob)
+            .where(ImportJob.job_id == job.job_id, ImportJob.claimed_by == PROCESS_ID)
+            .values(claim_expires_at=self._claim_deadline(datetime.utcnow())),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+        if not renewed:
+            raise ClaimLostError(job.job_id)
+
+    def _release_claim(self, job: ImportJob) -> None:
+        """释放本进程的认领，暂停后接替的进程不用等认领过期"""
+        try:
+            self.db.execute(
+                update(ImportJob)
+                .where(ImportJob.job_id == job.job_id, ImportJob.claimed_by == PROCESS_ID)
+                .values(claimed_by=None, claim_expires_at=None),
+                execution_options={"synchronize_session": False}
+            )
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"释放导入任务 {job.job_id} 的认领失败: {e}")
+            self.db.rollback()
+
+    @staticmethod
+    def _claim_deadline(now: datetime) -> datetime:
+        # 与主进程租约时长一致：旧主进程失去租约后，认领也在同样的时间内过期
+        return now + timedelta(seconds=settings.leader_lease_seconds)
+
+    def _run(self, job: ImportJob, stop_event: Optional[threading.Event]) -> None:
+        import_service = ProxyImportService(self.db)
+        state = import_service.prepare(job.frps_server_id, job.group_name, job.dry_run)
+
+        if job.dry_run:
+            # 预览不写入数据，直接从头开始
+            job.processed_count = 0
+            job.created_count = job.updated_count = job.unchanged_count = job.failed_count = 0
+            job.bytes_processed = 0
+            job.errors = None
+        else:
+            # 恢复已提交批次的统计，跳过已处理的条目
+            state.stats.update({
+                "total": job.processed_count,
+                "created": job.created_count,
+                "updated": job.updated_count,
+                "unchanged": job.unchanged_count,
+                "failed": job.failed_count,
+                "errors": json.loads(job.errors) if job.errors else [],
+            })
+        skip = job.processed_count
+        if skip:
+            logger.info(f"继续导入任务 {job.job_id}，跳过已提交的 {skip} 条代理")
+
+        job.status = "running"
+        job.started_at = job.started_at or datetime.utcnow()
+        self.db.commit()
+
+        parser = StreamingConfigParser(job.format)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        batch = []
+        seen = 0
+        bytes_read = 0
+
+        def add(proxies):
+            nonlocal seen
+            for proxy in proxies:
+                seen += 1
+                if seen > skip:
+                    batch.append(proxy)
+
+        with open(job.file_path, "rb") as f:
+            while True:
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                bytes_read += len(chunk)
+                add(parser.feed(decoder.decode(chunk)))
+                while len(batch) >= job.batch_size:
+                    self._commit_batch(job, import_service, state, batch[:job.batch_size], bytes_read)
+                    del batch[:job.batch_size]
+                    if stop_event is not None and stop_event.is_set():
+                        logger.info(f"导入任务 {job.job_id} 已暂停，下次启动时继续")
+                        return
+            add(parser.feed(decoder.decode(b"", final=True)))
+            add(parser.close())
+
+        if batch:
+            self._commit_batch(job, import_service, state, batch, bytes_read)
+
+        if seen == 0:
+            self._fail(job, "配置文件中没有找到有效的代理配置")
+            return
+
+        job.status = "completed"
+        job.bytes_processed = job.file_size
+        job.result = json.dumps(state.result(), ensure_ascii=False)
+        job.finished_at = datetime.utcnow()
+        self._renew_claim(job)
+        self.db.commit()
+        self._remove_file(job)
+        logger.info(
+            f"导入任务 {job.job_id} 完成：新增 {job.created_count} 个，更新 {job.updated_count} 个，"
+            f"未变化 {job.unchanged_count} 个，失败 {job.failed_count} 个"
+        )
+
+    def _commit_batch(
+        self,
+        job: ImportJob,
+        import_service: ProxyImportService,
+        state: ImportState,
+        batch: list,
+        bytes_read: int
+    ) -> None:
+        """导入一个批次，并与任务进度在同一事务中提交"""
+        import_service.import_batch(state, batch, commit=False)
+        stats = state.stats
+        job.processed_count = stats["total"]
+        job.created_count = stats["created"]
+        job.updated_count = stats["updated"]
+        job.unchanged_count = stats["unchanged"]
+        job.failed_count = stats["failed"]
+        job.errors = json.dumps(stats["errors"][:MAX_JOB_ERRORS], ensure_ascii=False)
+        job.bytes_processed = bytes_read
+        self._renew_claim(job)
+        self.db.commit()
+
+    def _fail(self, job: ImportJob, message: str) -> None:
+        job.status = "failed"
+        job.error_message = message
+        job.finished_at = datetime.utcnow()
+        self.db.commit()
+        self._remove_file(job)
+
+    @staticmethod
+    def _remove_file(job: ImportJob) -> None:
+        try:
+            os.remove(job.file_path)
+        except OSError:
+            pass
+
+
+def _run_job_in_thread(job_id: str) -> None:
+    db = SessionLocal()
+    try:
+        ImportJobService(db).run_job(job_id, _stop_event)
+    finally:
+        db.close()
+
+
+async def _worker():
+    """逐个执行队列中的导入任务（串行执行，避免并发写入冲突）"""
+    while True:
+        job_id = await _queue.get()
+        try:
+            await asyncio.to_thread(_run_job_in_thread, job_id)
+        except Exception as e:
+            logger.error(f"执行导入任务 {job_id} 出错: {e}")
+        finally:
+            _queued_job_ids.discard(job_id)
+            _queue.task_done()
+
+
+def enqueue_import_job(job_id: str) -> None:
+    """把任务加入后台队列"""
+    if _queue is None:
+        logger.warning(f"导入任务 worker 未启动，任务 {job_id} 将在下次启动时执行")
+        return
+    if not _accepting_jobs:
+        logger.info(f"导入任务 {job_id} 已创建，将由主进程执行")
+        return
+    _queued_job_ids.add(job_id)
+    _queue.put_nowait(job_id)
+
+
+def resume_import_jobs() -> int:
+    """开始在本进程执行任务，并把未完成的导入任务加入队列
+
+    单进程部署在启动时调用一次；启用主进程选举时由主进程每次续约后调用，
+    取出其他进程创建的任务和前任主进程中断的任务。已在本进程队列中的任务会被跳过。
+
+    Returns:
+        加入队列的任务数
+    """
+    global _accepting_jobs
+    if _queue is None:
+        return 0
+
+    _accepting_jobs = True
+    _stop_event.clear()
+    db = SessionLocal()
+    try:
+        jobs = [
+            job for job in db.query(ImportJob).filter(
+                ImportJob.status.in_(ACTIVE_STATUSES)
+            ).order_by(ImportJob.id).all()
+            if job.job_id not in _queued_job_ids
+        ]
+        for job in jobs:
+            enqueue_import_job(job.job_id)
+        if jobs:
+            logger.info(f"恢复 {len(jobs)} 个未完成的导入任务")
+        return len(jobs)
+    finally:
+        db.close()
+
+
+def pause_import_jobs() -> None:
+    """停止在本进程执行任务（失去主进程租约时调用）
+
+    清空队列，正在执行的任务在当前批次提交后暂停，由新的主进程继续。
+    """
+    global _accepting_jobs
+    _accepting_jobs = False
+    _stop_event.set()
+    if _queue is not None:
+        while not _queue.empty():
+            _queued_job_ids.discard(_queue.get_nowait())
+            _queue.task_done()
+
+
+async def start_import_worker(run_jobs: bool = True):
+    """启动导入任务 worker
+
+    Args:
+        run_jobs: 是否立即在本进程执行任务并恢复上次未完成的任务；
+            启用主进程选举时为 False，当选主进程后再调用 resume_import_jobs()
+    """
+    global _queue, _worker_task, _accepting_jobs
+
+    _stop_event.clear()
+    _accepting_jobs = False
+    _queue = asyncio.Queue()
+
+    if run_jobs:
+        resume_import_jobs()
+
+    _worker_task = asyncio.create_task(_worker())
+    logger.info("导入任务 worker 已启动")
+
+
+def shutdown_import_worker():
+    """停止导入任务 worker（正在执行的任务在当前批次提交后暂停）"""
+    global _queue, _worker_task, _accepting_jobs
+
+    _stop_event.set()
+    _accepting_jobs = False
+    _queued_job_ids.clear()
+    if _worker_task:
+        _worker_task.cancel()
+        _worker_task = None
+        logger.info("导入任务 worker 已关闭")
+    _queue = None
@@ -0,0 +1,300 @@
+"""代理批量导入服务
+
+预取服务器下已占用的端口，按批次查询已有代理，在内存中完成校验并计算差异，
+然后每个批次在单个事务中批量写入新增/更新的代理、端口分配与释放以及历史记录。
+dry_run 模式只返回计算出的差异，不修改数据库。
+
+一次性导入使用 import_proxies()；流式导入先调用 prepare()，
+再对每个批次调用 import_batch()，最后从 ImportState.result() 取得统计。
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.history import ProxyHistory
+from app.models.port import PortAllocation
+from app.models.proxy import Proxy
+from app.services.stats_service import record_bulk_insert
+
+# 导入时会覆盖的代理字段
+IMPORT_FIELDS = ("proxy_type", "local_ip", "local_port", "remote_port", "group_name")
+
+# 按名称查询已有代理时每条 IN 语句的最大参数数
+LOOKUP_CHUNK_SIZE = 500
+
+
+class ImportState:
+    """一次导入过程中跨批次保持的状态"""
+
+    def __init__(self, frps_server_id: int, group_name: Optional[str], dry_run: bool):
+        self.frps_server_id = frps_server_id
+        self.group_name = group_name
+        self.dry_run = dry_run
+        # 已分配（PortAllocation）的端口
+        self.occupied_ports: Set[int] = set()
+        # 端口 -> 使用该端口的代理名称集合（随导入过程在内存中更新）
+        self.proxy_ports: Dict[int, Set[str]] = {}
+        # 待写入的端口分配（端口 -> 代理名称）与待释放的端口
+        self.allocated: Dict[int, str] = {}
+        self.released: Set[int] = set()
+        # dry_run 时保存已预览代理的字段值，供后续批次中重复出现的代理比较
+        self.previewed: Dict[str, Dict[str, Any]] = {}
+        self.stats: Dict[str, Any] = {
+            "total": 0,
+            "created": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "failed": 0,
+            "errors": []
+        }
+        self.diff: List[Dict[str, Any]] = []
+
+    def result(self) -> Dict[str, Any]:
+        """导入统计，dry_run 时包含 diff 列表"""
+        stats = dict(self.stats)
+        if self.dry_run:
+            stats["diff"] = self.diff
+            stats["port_allocations"] = sorted(self.allocated)
+            stats["port_releases"] = sorted(self.released)
+        return stats
+
+
+class ProxyImportService:
+    """代理批量导入服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def import_proxies(
+        self,
+        frps_server_id: int,
+        proxy_configs: Iterable[Dict[str, Any]],
+        group_name: Optional[str] = None,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """在单个事务中导入代理配置
+
+        对于已存在的代理（按 name + frps_server_id 判断），将完全覆盖更新；
+        对于不存在的代理，将创建新记录。端口冲突的代理记为失败，不影响其他代理。
+
+        Args:
+            frps_server_id: frps 服务器 ID
+            proxy_configs: ConfigParser 解析出的代理配置
+            group_name: 指定分组，不传则从代理名称解析
+            dry_run: 只计算差异，不写入数据库
+
+        Returns:
+            导入统计，dry_run 时包含 diff 列表
+        """
+        state = self.prepare(frps_server_id, group_name, dry_run)
+        self.import_batch(state, list(proxy_configs))
+        return state.result()
+
+    def prepare(
+        self,
+        frps_server_id: int,
+        group_name: Optional[str] = None,
+        dry_run: bool = False
+    ) -> ImportState:
+        """预取服务器的端口占用情况，创建导入状态"""
+        state = ImportState(frps_server_id, group_name, dry_run)
+        state.occupied_ports = {
+            port for (port,) in self.db.query(PortAllocation.port).filter(
+                PortAllocation.frps_server_id == frps_server_id,
+                PortAllocation.is_allocated == True
+            )
+        }
+        for port, name in self.db.query(Proxy.remote_port, Proxy.name).filter(
+            Proxy.frps_server_id == frps_server_id,
+            Proxy.remote_port.isnot(None)
+        ):
+            state.proxy_ports.setdefault(port, set()).add(name)
+        return state
+
+    def _load_existing(self, frps_server_id: int, names: List[str]) -> Dict[str, Proxy]:
+        """按名称批量查询已有代理"""
+        existing = {}
+        for i in range(0, len(names), LOOKUP_CHUNK_SIZE):
+            for proxy in self.db.query(Proxy).filter(
+                Proxy.frps_server_id == frps_server_id,
+                Proxy.name.in_(names[i:i + LOOKUP_CHUNK_SIZE])
+            ):
+                existing[proxy.name] = proxy
+        return existing
+
+    def import_batch(
+        self,
+        state: ImportState,
+        proxy_configs: List[Dict[str, Any]],
+        commit: bool = True
+    ) -> None:
+        """导入一个批次：校验、计算差异，非 dry_run 时写入数据库
+
+        Args:
+            state: prepare() 返回的导入状态
+            proxy_configs: 本批次的代理配置
+            commit: 是否提交事务（为 False 时由调用方与其他修改一起提交）
+        """
+        stats = state.stats
+        names = list({config['name'] for config in proxy_configs if config.get('name')})
+        existing = self._load_existing(state.frps_server_id, names)
+        # 代理名称 -> 本批次最终写入的字段值及是否需要写入
+        planned: Dict[str, Dict[str, Any]] = {}
+
+        for proxy_config in proxy_configs:
+            stats["total"] += 1
+            proxy_name = proxy_config.get('name', 'unknown')
+            try:
+                values = {
+                    "proxy_type": proxy_config['proxy_type'],
+                    "local_ip": proxy_config['local_ip'],
+                    "local_port": proxy_config['local_port'],
+                    "remote_port": proxy_config.get('remote_port'),
+                    "group_name": state.group_name or Proxy.parse_group_name(proxy_name),
+                }
+            except KeyError as e:
+                stats["failed"] += 1
+                stats["errors"].append({"proxy_name": proxy_name, "error": f"缺少字段: {e}"})
+                continue
+
+            # 重复出现的代理，基于前一次导入后的值比较
+            plan = planned.get(proxy_name)
+            if plan is not None:
+                current = plan["values"]
+            elif proxy_name in state.previewed:
+                current = state.previewed[proxy_name]
+            elif proxy_name in existing:
+                current = {field: getattr(existing[proxy_name], field) for field in IMPORT_FIELDS}
+            else:
+                current = None
+
+            old_port = current["remote_port"] if current else None
+            new_port = values["remote_port"]
+
+            # 远程端口发生变化时，校验新端口并释放旧端口
+            if new_port and old_port != new_port:
+                if new_port in state.occupied_ports or state.proxy_ports.get(new_port, set()) - {proxy_name}:
+                    stats["failed"] += 1
+                    stats["errors"].append({
+                        "proxy_name": proxy_name,
+                        "error": f"端口 {new_port} 已被占用"
+                    })
+                    continue
+
+                if old_port:
+                    if old_port in state.allocated:
+                        del state.allocated[old_port]
+                    elif old_port in state.occupied_ports:
+                        state.released.add(old_port)
+                    state.occupied_ports.discard(old_port)
+                state.occupied_ports.add(new_port)
+                state.allocated[new_port] = proxy_name
+
+            if old_port is not None and old_port != new_port:
+                state.proxy_ports.get(old_port, set()).discard(proxy_name)
+            if new_port is not None:
+                state.proxy_ports.setdefault(new_port, set()).add(proxy_name)
+
+            if current is None:
+                action = "create"
+                changes = {field: [None, value] for field, value in values.items()}
+            else:
+                changes = {
+                    field: [current[field], value]
+                    for field, value in values.items()
+                    if current[field] != value
+                }
+                action = "update" if changes else "unchanged"
+            stats[{"create": "created", "update": "updated", "unchanged": "unchanged"}[action]] += 1
+            if state.dry_run:
+                state.diff.append({"proxy_name": proxy_name, "action": action, "changes": changes})
+
+            planned[proxy_name] = {
+                "values": values,
+                "changed": bool(changes) or (plan is not None and plan["changed"]),
+            }
+
+        if state.dry_run:
+            state.previewed.update({name: plan["values"] for name, plan in planned.items()})
+            return
+
+        self._apply(state, existing, planned, commit)
+        state.allocated.clear()
+        state.released.clear()
+
+    def _apply(
+        self,
+        state: ImportState,
+        existing: Dict[str, Proxy],
+        planned: Dict[str, Dict[str, Any]],
+        commit: bool = True
+    ) -> None:
+        """在单个事务中写入一个批次的导入结果"""
+        frps_server_id = state.frps_server_id
+        now = datetime.utcnow()
+        proxy_rows = []
+        port_rows = []
+        history_rows = []
+
+        for proxy_name, plan in planned.items():
+            proxy = existing.get(proxy_name)
+            if proxy is None:
+                proxy_rows.append({
+                    "frps_server_id": frps_server_id,
+                    "name": proxy_name,
+                    "status": "offline",  # 默认为离线状态
+                    "created_at": now,
+                    "updated_at": now,
+                    **plan["values"]
+                })
+            elif plan["changed"]:
+                for field, value in plan["values"].items():
+                    setattr(proxy, field, value)
+                proxy.updated_at = now
+
+        if state.released:
+            for allocation in self.db.query(PortAllocation).filter(
+                PortAllocation.frps_server_id == frps_server_id,
+                PortAllocation.port.in_(list(state.released)),
+                PortAllocation.is_allocated == True
+            ):
+                allocation.is_allocated = False
+                history_rows.append(ProxyHistory.event_values(
+                    frps_server_id,
+                    allocation.allocated_to or "unknown",
+                    "port_released",
+                    remote_port=allocation.port,
+                    timestamp=now
+                ))
+
+        for port, proxy_name in state.allocated.items():
+            port_rows.append({
+                "frps_server_id": frps_server_id,
+                "port": port,
+                "is_allocated": True,
+                "allocated_to": proxy_name,
+                "allocated_at": now
+            })
+            history_rows.append(ProxyHistory.event_values(
+                frps_server_id,
+                proxy_name,
+                "port_allocated",
+                remote_port=port,
+                timestamp=now
+            ))
+
+        try:
+            # 先 flush 更新，再用 executemany 批量插入（ORM add_all 在 SQLite 上需要逐行 RETURNING 主键）
+            self.db.flush()
+            for model, rows in ((Proxy, proxy_rows), (PortAllocation, port_rows), (ProxyHistory, history_rows)):
+                if rows:
+                    self.db.execute(insert(model.__table__), rows)
+            if proxy_rows:
+                record_bulk_insert(self.db, proxy_rows)
+            if commit:
+                self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
@@ -2,7 +2,6 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from datetime import datetime
-import json
 
 from app.models.port import PortAllocation
 from app.models.proxy import Proxy
@@ -53,12 +52,11 @@ class PortService:
         self.db.add(allocation)
         
         # 记录历史
-        history = ProxyHistory(
-            frps_server_id=frps_server_id,
-            proxy_name=allocated_to,
-            action="port_allocated",
-            timestamp=datetime.utcnow(),
-            details=json.dumps({"port": port})
+        history = ProxyHistory.create_event(
+            frps_server_id,
+            allocated_to,
+            "port_allocated",
+            remote_port=port
         )
         self.db.add(history)
         
@@ -96,12 +94,11 @@ class PortService:
         allocation.is_allocated = False
         
         # 记录历史
-        history = ProxyHistory(
-            frps_server_id=frps_server_id,
-            proxy_name=allocated_to or "unknown",
-            action="port_released",
-            timestamp=datetime.utcnow(),
-            details=json.dumps({"port": port})
+        history = ProxyHistory.create_event(
+            frps_server_id,
+            allocated_to or "unknown",
+            "port_released",
+            remote_port=port
         )
         self.db.add(history)
         
@@ -203,18 +200,14 @@ class PortService:
                     "message": f"端口 {port} 被多个代理使用: {', '.join(proxy_names)}"
                 })
         
-        # 检测数据库记录与实际运行不一致
+        # 检测数据库记录与实际运行不一致（按名称集合查找，代理较多时避免逐个遍历）
+        online_names = {
+            proxy_data.get("name") for proxy_data in active_proxies if proxy_data.get("status") == "online"
+        }
         for db_proxy in db_proxies:
             if db_proxy.status == "online":
                 # 检查是否真的在线
-                found = False
-                for proxy_data in active_proxies:
-                    if (proxy_data.get("name") == db_proxy.name and
-                        proxy_data.get("status") == "online"):
-                        found = True
-                        break
-                
-                if not found:
+                if db_proxy.name not in online_names:
                     conflicts.append({
                         "port": db_proxy.remote_port,
                         "conflict_type": "status_mismatch",
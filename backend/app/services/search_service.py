@@ -0,0 +1,309 @@
+"""代理/分组名称索引搜索服务
+
+SQLite 使用 FTS5 trigram 虚拟表（通过触发器与 proxies / groups 表保持同步），
+PostgreSQL 使用 pg_trgm GIN 索引。两者都支持子串/前缀匹配，
+在精确子串没有命中时退化为基于 trigram 的模糊匹配，并返回排序后的结果。
+"""
+import logging
+import re
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import Float, Integer, and_, bindparam, case, func, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session
+
+from app.models.group import Group
+from app.models.proxy import Proxy
+
+logger = logging.getLogger(__name__)
+
+# 当前可用的搜索后端：fts5 / pg_trgm / None（退化为 LIKE 扫描）
+_search_backend: Optional[str] = None
+
+# trigram 索引要求搜索词至少 3 个字符
+MIN_TRIGRAM_LENGTH = 3
+
+# 模糊匹配的相似度阈值（pg_trgm 与 FTS5 共用，见 trigram_similarity）
+PG_SIMILARITY_THRESHOLD = 0.3
+
+SQLITE_FTS_DDL = [
+    # 代理名称 + 分组名称索引（外部内容表，rowid 对应 proxies.id）
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS proxy_fts USING fts5(
+        name, group_name, content='proxies', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS proxies_fts_ai AFTER INSERT ON proxies BEGIN
+        INSERT INTO proxy_fts(rowid, name, group_name) VALUES (new.id, new.name, new.group_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS proxies_fts_ad AFTER DELETE ON proxies BEGIN
+        INSERT INTO proxy_fts(proxy_fts, rowid, name, group_name)
+        VALUES ('delete', old.id, old.name, old.group_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS proxies_fts_au AFTER UPDATE OF name, group_name ON proxies BEGIN
+        INSERT INTO proxy_fts(proxy_fts, rowid, name, group_name)
+        VALUES ('delete', old.id, old.name, old.group_name);
+        INSERT INTO proxy_fts(rowid, name, group_name) VALUES (new.id, new.name, new.group_name);
+    END
+    """,
+    # 分组名称索引（rowid 对应 groups.id）
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS group_fts USING fts5(
+        name, content='groups', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS groups_fts_ai AFTER INSERT ON groups BEGIN
+        INSERT INTO group_fts(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS groups_fts_ad AFTER DELETE ON groups BEGIN
+        INSERT INTO group_fts(group_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS groups_fts_au AFTER UPDATE OF name ON groups BEGIN
+        INSERT INTO group_fts(group_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO group_fts(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+]
+
+POSTGRES_TRGM_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_proxies_name_trgm ON proxies USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_proxies_group_name_trgm ON proxies USING gin (group_name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_groups_name_trgm ON groups USING gin (name gin_trgm_ops)",
+]
+
+
+def init_search_index(engine: Engine) -> Optional[str]:
+    """创建搜索索引（幂等），首次创建时从现有数据重建索引
+
+    Args:
+        engine: 数据库引擎
+
+    Returns:
+        启用的搜索后端名称，不支持时返回 None
+    """
+    global _search_backend
+
+    dialect = engine.dialect.name
+    try:
+        if dialect == "sqlite":
+            with engine.begin() as conn:
+                existing = {
+                    row[0] for row in conn.execute(text(
+                        "SELECT name FROM sqlite_master WHERE name IN ('proxy_fts', 'group_fts')"
+                    ))
+                }
+                for statement in SQLITE_FTS_DDL:
+                    conn.execute(text(statement))
+                # 新建的外部内容索引需要从源表重建一次
+                if "proxy_fts" not in existing:
+                    conn.execute(text("INSERT INTO proxy_fts(proxy_fts) VALUES ('rebuild')"))
+                if "group_fts" not in existing:
+                    conn.execute(text("INSERT INTO group_fts(group_fts) VALUES ('rebuild')"))
+            _search_backend = "fts5"
+        elif dialect == "postgresql":
+            with engine.begin() as conn:
+                for statement in POSTGRES_TRGM_DDL:
+                    conn.execute(text(statement))
+            _search_backend = "pg_trgm"
+        else:
+            _search_backend = None
+    except Exception as e:
+        # 旧版本 SQLite（< 3.34）不支持 trigram 分词器，退化为 LIKE 搜索
+        logger.warning(f"搜索索引初始化失败，将使用 LIKE 搜索: {e}")
+        _search_backend = None
+
+    if _search_backend:
+        logger.info(f"搜索索引已启用: {_search_backend}")
+    return _search_backend
+
+
+def get_search_backend() -> Optional[str]:
+    """获取当前启用的搜索后端"""
+    return _search_backend
+
+
+def _fts_phrase(term: str) -> str:
+    """将搜索词转义为 FTS5 短语"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _fts_fuzzy(term: str) -> str:
+    """将搜索词拆分为 trigram，任一 trigram 命中即为候选（再由 _similarity_clause 按相似度过滤）"""
+    term = term.lower()
+    trigrams = []
+    for i in range(len(term) - MIN_TRIGRAM_LENGTH + 1):
+        trigram = term[i:i + MIN_TRIGRAM_LENGTH]
+        if trigram not in trigrams:
+            trigrams.append(trigram)
+    return " OR ".join(_fts_phrase(t) for t in trigrams)
+
+
+@lru_cache(maxsize=65536)
+def _word_trigrams(value: str) -> FrozenSet[str]:
+    """与 pg_trgm 相同的 trigram 集合：按非字母数字字符切分单词，每个单词前补两个空格、后补一个空格"""
+    trigrams = set()
+    for word in re.findall(r"[^\W_]+", value.lower()):
+        padded = f"  {word} "
+        trigrams.update(padded[i:i + MIN_TRIGRAM_LENGTH] for i in range(len(padded) - MIN_TRIGRAM_LENGTH + 1))
+    return frozenset(trigrams)
+
+
+def trigram_similarity(value: Optional[str], term: Optional[str]) -> float:
+    """pg_trgm similarity() 的实现：共同 trigram 数 / 两边 trigram 并集大小
+
+    注册为 SQLite 连接上的 similarity 函数（见 database.configure_sqlite），
+    FTS5 模糊匹配与 pg_trgm 使用同一个阈值过滤候选结果。
+    """
+    if not value or not term:
+        return 0.0
+    left, right = _word_trigrams(value), _word_trigrams(term)
+    if not left or not right:
+        return 0.0
+    shared = len(left & right)
+    return shared / (len(left) + len(right) - shared)
+
+
+def _similarity_clause(columns: List, term: str):
+    """任一列与搜索词的相似度超过 PG_SIMILARITY_THRESHOLD
+
+    MATCH 中的 OR 表达式只能表示“至少命中一个 trigram”，bm25 只影响排序，
+    不加这个条件时只共享一个 trigram 的名称也会计入结果和分页总数。
+    """
+    return or_(*(func.similarity(column, term) > PG_SIMILARITY_THRESHOLD for column in columns))
+
+
+class SearchService:
+    """名称搜索服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def name_rank(column, term: str):
+        """名称排序表达式：完全匹配 > 前缀匹配 > 其他"""
+        return case(
+            (func.lower(column) == term.lower(), 0),
+            (column.ilike(f"{term}%"), 1),
+            else_=2,
+        )
+
+    def _fts_has_match(self, table: str, expression: str) -> bool:
+        """检查 FTS 表中是否存在匹配项"""
+        hit = self.db.execute(
+            text(f"SELECT 1 FROM {table} WHERE {table} MATCH :q LIMIT 1"),
+            {"q": expression},
+        ).first()
+        return hit is not None
+
+    @staticmethod
+    def _match_param(expression: str):
+        """MATCH 参数（同一语句中可能出现多个 MATCH，参数名需唯一）"""
+        return bindparam("q", value=expression, unique=True)
+
+    def _proxy_match_expression(self, term: str, column: Optional[str] = None) -> Tuple[str, bool]:
+        """构建 proxy_fts 的 MATCH 表达式（精确子串优先，退化为模糊）
+
+        Returns:
+            (MATCH 表达式, 是否为模糊匹配)
+        """
+        prefix = f"{column} : " if column else ""
+        exact = f"{prefix}{_fts_phrase(term)}"
+        if self._fts_has_match("proxy_fts", exact):
+            return exact, False
+        return f"{prefix}({_fts_fuzzy(term)})", True
+
+    def apply_proxy_search(self, query: Query, term: Optional[str]) -> Tuple[Query, List]:
+        """为代理查询加上名称/分组搜索条件
+
+        Args:
+            query: Proxy 查询
+            term: 搜索词
+
+        Returns:
+            (过滤后的查询, 排序表达式列表)
+        """
+        term = (term or "").strip()
+        if not term:
+            return query, []
+
+        if _search_backend == "fts5" and len(term) >= MIN_TRIGRAM_LENGTH:
+            expression, fuzzy = self._proxy_match_expression(term)
+            matches = text(
+                "SELECT rowid AS id, rank AS rank FROM proxy_fts WHERE proxy_fts MATCH :q"
+            ).bindparams(self._match_param(expression)).columns(
+                id=Integer, rank=Float
+            ).subquery("proxy_match")
+            query = query.join(matches, matches.c.id == Proxy.id)
+            if fuzzy:
+                query = query.filter(_similarity_clause([Proxy.name, Proxy.group_name], term))
+            return query, [self.name_rank(Proxy.name, term), matches.c.rank]
+
+        if _search_backend == "pg_trgm":
+            pattern = f"%{term}%"
+            substring = or_(Proxy.name.ilike(pattern), Proxy.group_name.ilike(pattern))
+            has_substring = self.db.query(Proxy.id).filter(substring).first() is not None
+            if has_substring:
+                query = query.filter(substring)
+            else:
+                query = query.filter(or_(
+                    func.similarity(Proxy.name, term) > PG_SIMILARITY_THRESHOLD,
+                    func.similarity(Proxy.group_name, term) > PG_SIMILARITY_THRESHOLD,
+                ))
+            similarity = func.greatest(
+                func.similarity(Proxy.name, term),
+                func.coalesce(func.similarity(Proxy.group_name, term), 0),
+            )
+            return query, [self.name_rank(Proxy.name, term), similarity.desc()]
+
+        pattern = f"%{term}%"
+        query = query.filter(Proxy.name.like(pattern) | Proxy.group_name.like(pattern))
+        return query, [self.name_rank(Proxy.name, term)]
+
+    def group_name_clause(self, term: str, model=Group):
+        """分组名称搜索条件
+
+        Args:
+            term: 搜索词
+            model: Group（按 groups.name 搜索）或 Proxy（按 proxies.group_name 搜索）
+
+        Returns:
+            可用于 filter 的条件表达式
+        """
+        term = term.strip()
+        column = model.name if model is Group else Proxy.group_name
+
+        if _search_backend == "fts5" and len(term) >= MIN_TRIGRAM_LENGTH:
+            if model is Group:
+                exact = _fts_phrase(term)
+                fuzzy = not self._fts_has_match("group_fts", exact)
+                expression = _fts_fuzzy(term) if fuzzy else exact
+                ids = text("SELECT rowid FROM group_fts WHERE group_fts MATCH :q").bindparams(
+                    self._match_param(expression)
+                )
+                clause = Group.id.in_(ids)
+            else:
+                expression, fuzzy = self._proxy_match_expression(term, column="group_name")
+                ids = text("SELECT rowid FROM proxy_fts WHERE proxy_fts MATCH :q").bindparams(
+                    self._match_param(expression)
+                )
+                clause = Proxy.id.in_(ids)
+            if fuzzy:
+                clause = and_(clause, _similarity_clause([column], term))
+            return clause
+
+        if _search_backend == "pg_trgm":
+            return or_(column.ilike(f"%{term}%"), func.similarity(column, term) > PG_SIMILARITY_THRESHOLD)
+
+        return column.ilike(f"%{term}%")
@@ -0,0 +1,342 @@
+"""代理统计计数服务
+
+proxy_counters 表按 (服务器, 分组, 代理类型) 保存代理总数/在线数/离线数/已分配端口数，
+group_name 为空字符串的行是服务器级计数（包含未分组的代理）；
+group_summaries 表按 (服务器, 分组) 保存分组列表所需的汇总。
+
+代理的新增、删除以及服务器/分组/类型/状态/端口变更在 ORM flush 时计算增量，
+并在同一事务中写入两张计数表，因此同步任务和各个 CRUD 接口都无需额外处理。
+绕过 ORM 的批量 INSERT 调用 record_bulk_insert() 记账，其他批量写入需要调用
+StatsService.rebuild() 重新统计。
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import case, delete, event, func, inspect, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.database import upsert
+from app.models.frps_server import FrpsServer
+from app.models.group_summary import GroupSummary
+from app.models.proxy import Proxy
+from app.models.proxy_counter import ProxyCounter, SERVER_SCOPE
+
+logger = logging.getLogger(__name__)
+
+# session.info 中保存待写入增量的键
+_PENDING_KEY = "proxy_counter_deltas"
+
+# 影响计数的代理属性
+_TRACKED_ATTRS = ("frps_server_id", "group_name", "proxy_type", "status", "remote_port")
+
+# 计数列（与增量列表的下标一一对应）
+_COUNT_COLUMNS = ("total_count", "online_count", "offline_count", "port_count")
+
+
+def _track_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+# 代理对象可能在中途 commit 后过期（如 PortService 分配端口），
+# 开启 active_history 让赋值前先加载旧值，保证 flush 时能拿到变更前的值
+for _attr in _TRACKED_ATTRS:
+    event.listen(getattr(Proxy, _attr), "set", _track_old_value, active_history=True, retval=True)
+
+
+def _new_value(attr: str, value):
+    """新增代理在 INSERT 前可能尚未应用列默认值"""
+    if value is None:
+        default = Proxy.__table__.c[attr].default
+        if default is not None and not callable(default.arg):
+            return default.arg
+    return value
+
+
+def _old_value(state, attr: str):
+    """获取属性在本次 flush 之前的值"""
+    history = state.attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(state.object, attr)
+
+
+def _add(deltas: Dict, values: Dict[str, Any], sign: int):
+    """累加一条代理对计数的影响"""
+    server_id = values["frps_server_id"]
+    if not server_id:
+        return
+    status = values["status"]
+    counts = (
+        1,
+        int(status == "online"),
+        int(status == "offline"),
+        int(values["remote_port"] is not None),
+    )
+    scopes = [SERVER_SCOPE]
+    if values["group_name"]:
+        scopes.append(values["group_name"])
+    for scope in scopes:
+        delta = deltas[(server_id, scope, values["proxy_type"])]
+        for i, count in enumerate(counts):
+            delta[i] += sign * count
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_counter_deltas(session: Session, flush_context, instances):
+    """收集本次 flush 中代理变更带来的计数增量"""
+    deltas = session.info.setdefault(_PENDING_KEY, defaultdict(lambda: [0, 0, 0, 0]))
+
+    for obj in session.new:
+        if isinstance(obj, Proxy):
+            _add(deltas, {attr: _new_value(attr, getattr(obj, attr)) for attr in _TRACKED_ATTRS}, 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Proxy):
+            state = inspect(obj)
+            _add(deltas, {attr: _old_value(state, attr) for attr in _TRACKED_ATTRS}, -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Proxy) or obj in session.deleted:
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[attr].history.has_changes() for attr in _TRACKED_ATTRS):
+            continue
+        _add(deltas, {attr: _old_value(state, attr) for attr in _TRACKED_ATTRS}, -1)
+        _add(deltas, {attr: getattr(obj, attr) for attr in _TRACKED_ATTRS}, 1)
+
+
+def _upsert_counts(conn, model, keys: Dict[str, Any], delta: List[int], now: datetime):
+    """按增量更新一行计数，不存在时插入，减为 0 时删除"""
+    columns = _COUNT_COLUMNS[:len(delta)]
+    where = [getattr(model, name) == value for name, value in keys.items()]
+    stmt = upsert(conn, model.__table__, list(keys), lambda excluded: {
+        "updated_at": excluded.updated_at,
+        **{column: getattr(model, column) + getattr(excluded, column) for column in columns},
+    })
+    if stmt is not None:
+        # 一条 INSERT ... ON CONFLICT 完成，并发写入同一分组时不会出现两边都插入的冲突
+        conn.execute(stmt, [{"updated_at": now, **keys, **dict(zip(columns, delta))}])
+        if delta[0] < 0:
+            conn.execute(delete(model).where(*where, model.total_count <= 0))
+        return
+
+    result = conn.execute(
+        update(model)
+        .where(*where)
+        .values(
+            updated_at=now,
+            **{column: getattr(model, column) + value for column, value in zip(columns, delta)},
+        )
+    )
+    if result.rowcount == 0:
+        conn.execute(insert(model).values(updated_at=now, **keys, **dict(zip(columns, delta))))
+    elif delta[0] < 0:
+        conn.execute(delete(model).where(*where, model.total_count <= 0))
+
+
+def _write_deltas(conn, deltas: Dict) -> None:
+    """把增量写入 proxy_counters / group_summaries"""
+    now = datetime.utcnow()
+    group_deltas = defaultdict(lambda: [0, 0, 0])
+    for (server_id, group_name, proxy_type), delta in deltas.items():
+        if not any(delta):
+            continue
+        _upsert_counts(conn, ProxyCounter, {
+            "frps_server_id": server_id,
+            "group_name": group_name,
+            "proxy_type": proxy_type,
+        }, delta, now)
+        if group_name != SERVER_SCOPE:
+            group_delta = group_deltas[(server_id, group_name)]
+            for i in range(3):
+                group_delta[i] += delta[i]
+
+    for (server_id, group_name), delta in group_deltas.items():
+        if not any(delta):
+            continue
+        _upsert_counts(conn, GroupSummary, {
+            "frps_server_id": server_id,
+            "group_name": group_name,
+        }, delta, now)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_counter_deltas(session: Session, flush_context):
+    """在同一事务中把增量写入计数表"""
+    deltas = session.info.pop(_PENDING_KEY, None)
+    if deltas:
+        _write_deltas(session.connection(), deltas)
+
+
+def record_bulk_insert(session: Session, rows: Iterable[Dict[str, Any]]) -> None:
+    """批量 INSERT 代理（不经过 ORM flush）后，在同一事务中更新计数
+
+    Args:
+        session: 执行 INSERT 的会话
+        rows: 插入的代理字段字典
+    """
+    deltas = defaultdict(lambda: [0, 0, 0, 0])
+    for row in rows:
+        _add(deltas, {attr: _new_value(attr, row.get(attr)) for attr in _TRACKED_ATTRS}, 1)
+    _write_deltas(session.connection(), deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_counter_deltas(session: Session):
+    """事务回滚时丢弃未写入的增量"""
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _empty_counts() -> Dict[str, int]:
+    return {"total": 0, "online": 0, "offline": 0, "port_count": 0}
+
+
+class StatsService:
+    """代理统计计数服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def rebuild(self, frps_server_id: Optional[int] = None) -> int:
+        """从 proxies 表全量重建计数表
+
+        Args:
+            frps_server_id: 只重建指定服务器，不传则重建全部
+
+        Returns:
+            重建后的分组统计行数
+        """
+        online = func.sum(case((Proxy.status == "online", 1), else_=0))
+        offline = func.sum(case((Proxy.status == "offline", 1), else_=0))
+        ports = func.count(Proxy.remote_port)
+        grouped = (Proxy.group_name.isnot(None), Proxy.group_name != "")
+
+        server_counts = select(
+            Proxy.frps_server_id,
+            literal(SERVER_SCOPE),
+            Proxy.proxy_type,
+            func.count(Proxy.id), online, offline, ports,
+            func.max(Proxy.updated_at),
+        ).group_by(Proxy.frps_server_id, Proxy.proxy_type)
+        group_type_counts = select(
+            Proxy.frps_server_id,
+            Proxy.group_name,
+            Proxy.proxy_type,
+            func.count(Proxy.id), online, offline, ports,
+            func.max(Proxy.updated_at),
+        ).where(*grouped).group_by(Proxy.frps_server_id, Proxy.group_name, Proxy.proxy_type)
+        group_counts = select(
+            Proxy.frps_server_id,
+            Proxy.group_name,
+            func.count(Proxy.id), online, offline,
+            func.max(Proxy.updated_at),
+        ).where(*grouped).group_by(Proxy.frps_server_id, Proxy.group_name)
+
+        clear_counters = delete(ProxyCounter)
+        clear_groups = delete(GroupSummary)
+        if frps_server_id:
+            clear_counters = clear_counters.where(ProxyCounter.frps_server_id == frps_server_id)
+            clear_groups = clear_groups.where(GroupSummary.frps_server_id == frps_server_id)
+            server_counts = server_counts.where(Proxy.frps_server_id == frps_server_id)
+            group_type_counts = group_type_counts.where(Proxy.frps_server_id == frps_server_id)
+            group_counts = group_counts.where(Proxy.frps_server_id == frps_server_id)
+
+        counter_columns = ["frps_server_id", "group_name", "proxy_type", *_COUNT_COLUMNS, "updated_at"]
+        self.db.execute(clear_counters)
+        self.db.execute(clear_groups)
+        self.db.execute(insert(ProxyCounter).from_select(counter_columns, server_counts))
+        self.db.execute(insert(ProxyCounter).from_select(counter_columns, group_type_counts))
+        result = self.db.execute(
+            insert(GroupSummary).from_select(
+                ["frps_server_id", "group_name", "total_count", "online_count", "offline_count", "updated_at"],
+                group_counts,
+            )
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def ensure_initialized(self) -> None:
+        """计数表为空但已有代理时（首次升级）执行一次全量重建"""
+        has_counter = self.db.query(ProxyCounter.id).first() is not None
+        has_proxy = self.db.query(Proxy.id).first() is not None
+        if has_proxy and not has_counter:
+            count = self.rebuild()
+            logger.info(f"已重建代理统计计数: {count} 个分组")
+
+    def _collect(self, rows) -> Dict[str, Any]:
+        """把计数行汇总为 {total, online, offline, port_count, by_type}"""
+        summary = _empty_counts()
+        summary["by_type"] = {}
+        for row in rows:
+            summary["total"] += row.total_count
+            summary["online"] += row.online_count
+            summary["offline"] += row.offline_count
+            summary["port_count"] += row.port_count
+            summary["by_type"][row.proxy_type] = {
+                "total": row.total_count,
+                "online": row.online_count,
+                "offline": row.offline_count,
+                "port_count": row.port_count,
+            }
+        return summary
+
+    def get_server_stats(self, frps_server_id: Optional[int] = None) -> Dict[str, Any]:
+        """获取服务器级统计
+
+        Args:
+            frps_server_id: 只统计指定服务器，不传则统计全部
+
+        Returns:
+            {"servers": [...], "total": {...}}
+        """
+        servers_query = self.db.query(FrpsServer.id, FrpsServer.name).order_by(FrpsServer.id)
+        counters_query = self.db.query(ProxyCounter).filter(ProxyCounter.group_name == SERVER_SCOPE)
+        if frps_server_id:
+            servers_query = servers_query.filter(FrpsServer.id == frps_server_id)
+            counters_query = counters_query.filter(ProxyCounter.frps_server_id == frps_server_id)
+
+        rows_by_server = defaultdict(list)
+        for row in counters_query.all():
+            rows_by_server[row.frps_server_id].append(row)
+
+        servers = []
+        for server_id, server_name in servers_query.all():
+            stats = self._collect(rows_by_server.get(server_id, []))
+            stats.update({"frps_server_id": server_id, "frps_server_name": server_name})
+            servers.append(stats)
+
+        total = self._collect([])
+        for stats in servers:
+            for key in ("total", "online", "offline", "port_count"):
+                total[key] += stats[key]
+            for proxy_type, counts in stats["by_type"].items():
+                merged = total["by_type"].setdefault(proxy_type, _empty_counts())
+                for key, value in counts.items():
+                    merged[key] += value
+
+        return {"servers": servers, "total": total}
+
+    def get_group_stats(self, group_name: str, frps_server_id: Optional[int] = None) -> Dict[str, Any]:
+        """获取分组级统计（跨服务器汇总）
+
+        Args:
+            group_name: 分组名称
+            frps_server_id: 只统计指定服务器，不传则统计全部
+        """
+        query = self.db.query(
+            ProxyCounter.proxy_type,
+            func.sum(ProxyCounter.total_count).label("total_count"),
+            func.sum(ProxyCounter.online_count).label("online_count"),
+            func.sum(ProxyCounter.offline_count).label("offline_count"),
+            func.sum(ProxyCounter.port_count).label("port_count"),
+        ).filter(ProxyCounter.group_name == group_name)
+        if frps_server_id:
+            query = query.filter(ProxyCounter.frps_server_id == frps_server_id)
+
+        stats = self._collect(query.group_by(ProxyCounter.proxy_type).all())
+        stats["group_name"] = group_name
+        return stats
@@ -0,0 +1,250 @@
+"""临时配置存储
+
+配置内容按 sha256 保存在磁盘目录中（相同内容只存一份），数据库 temp_configs 表只保存元数据。
+读取时先查内存中按字节数和条目数限制的 LRU 缓存，缓存条目在临时配置过期时失效。
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings, resolve_data_dir
+from app.models.temp_config import TempConfig
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# 未被引用的内容文件至少保留的时间（秒）
+UNREFERENCED_GRACE_SECONDS = 600
+
+
+class TempConfigExpired(Exception):
+    """临时配置已过期"""
+
+
+class LRUCache:
+    """按字节数和条目数限制大小、带过期时间的 LRU 缓存（线程安全）"""
+
+    def __init__(self, max_bytes: int, max_entries: int):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, int, datetime]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """取出未过期的值，过期的条目直接淘汰"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, expires_at = entry
+            if datetime.utcnow() > expires_at:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: str, size: int, expires_at: datetime) -> None:
+        """写入缓存，超过上限时淘汰最久未使用的条目（单个值超过总上限时不缓存）"""
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def purge_expired(self) -> int:
+        """淘汰所有已过期的条目"""
+        now = datetime.utcnow()
+        with self._lock:
+            expired = [key for key, (_, _, expires_at) in self._entries.items() if now > expires_at]
+            for key in expired:
+                self._remove(key)
+        return len(expired)
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+class ContentStore:
+    """按内容 sha256 寻址的磁盘存储：{root}/{hash[:2]}/{hash}"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, content_hash: str) -> str:
+        return os.path.join(self.root, content_hash[:2], content_hash)
+
+    def put(self, data: bytes) -> str:
+        """保存内容（已存在则跳过），返回 sha256"""
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self.path(content_hash)
+        if os.path.exists(path):
+            # 刷新修改时间，避免清理任务在元数据提交前删除它
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再原子替换，避免读到写了一半的内容
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return content_hash
+
+    def get(self, content_hash: str) -> Optional[bytes]:
+        try:
+            with open(self.path(content_hash), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def remove_unreferenced(self, referenced: Set[str], min_age_seconds: int = UNREFERENCED_GRACE_SECONDS) -> int:
+        """删除不再被引用的内容文件，返回删除的文件数
+
+        最近写入的文件可能属于尚未提交的临时配置，保留 min_age_seconds 秒后再删除。
+        """
+        removed = 0
+        deadline = time.time() - min_age_seconds
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if name in referenced:
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) > deadline:
+                        continue
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+
+class TempConfigStore:
+    """临时配置存储：数据库元数据 + 磁盘内容 + 内存 LRU 缓存"""
+
+    def __init__(self, root: str, max_bytes: int, max_entries: int):
+        self.content = ContentStore(root)
+        self.cache = LRUCache(max_bytes, max_entries)
+
+    def save(
+        self,
+        db: Session,
+        server_name: str,
+        group_name: str,
+        config_content: str,
+        format: str = "ini",
+        hours: int = 24
+    ) -> TempConfig:
+        """保存临时配置并提交
+
+        Returns:
+            临时配置元数据
+        """
+        data = config_content.encode("utf-8")
+        content_hash = self.content.put(data)
+        temp_config = TempConfig.create_temp_config(
+            server_name=server_name,
+            group_name=group_name,
+            content_hash=content_hash,
+            size=len(data),
+            format=format,
+            hours=hours
+        )
+        db.add(temp_config)
+        db.commit()
+        db.refresh(temp_config)
+        self.cache.put(temp_config.config_id, config_content, len(data), temp_config.expires_at)
+        return temp_config
+
+    def get_content(self, db: Session, config_id: str) -> Optional[str]:
+        """读取临时配置内容，缓存未命中时查询元数据并从磁盘读取
+
+        Returns:
+            配置内容，不存在时返回 None
+
+        Raises:
+            TempConfigExpired: 已过期（同时删除元数据）
+        """
+        content = self.cache.get(config_id)
+        if content is not None:
+            return content
+
+        temp_config = db.query(TempConfig).filter(TempConfig.config_id == config_id).first()
+        if not temp_config:
+            return None
+
+        if temp_config.is_expired:
+            # 内容文件可能被其他临时配置共享，由定时清理任务统一删除
+            db.delete(temp_config)
+            db.commit()
+            raise TempConfigExpired(config_id)
+
+        data = self.content.get(temp_config.content_hash)
+        if data is None:
+            logger.warning(f"临时配置 {config_id} 的内容文件不存在: {temp_config.content_hash}")
+            return None
+
+        content = data.decode("utf-8")
+        self.cache.put(config_id, content, len(data), temp_config.expires_at)
+        return content
+
+    def cleanup(self, db: Session) -> Tuple[int, int]:
+        """删除过期的元数据、缓存条目和不再被引用的内容文件
+
+        Returns:
+            (删除的临时配置数, 删除的内容文件数)
+        """
+        expired_count = db.query(TempConfig).filter(
+            TempConfig.expires_at < datetime.utcnow()
+        ).delete()
+        db.commit()
+        self.cache.purge_expired()
+
+        referenced = {content_hash for (content_hash,) in db.query(TempConfig.content_hash).distinct()}
+        removed_files = self.content.remove_unreferenced(referenced)
+        return expired_count, removed_files
+
+
+_store: Optional[TempConfigStore] = None
+_store_lock = threading.Lock()
+
+
+def get_temp_config_store() -> TempConfigStore:
+    """获取临时配置存储单例"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TempConfigStore(
+                    resolve_data_dir(settings.temp_config_dir),
+                    settings.temp_config_cache_max_bytes,
+                    settings.temp_config_cache_max_entries,
+                )
+    return _store
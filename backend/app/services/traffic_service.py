@@ -0,0 +1,651 @@
+"""代理流量时序服务
+
+每次同步把 frps 返回的 today_traffic_in/out 和 cur_conns 保存为一行原始采样（raw），
+流量计数器是当天累计值，采样时换算为与上一次采样之间的增量（计数器回绕时取当前值）。
+降采样任务把完整的时间桶逐级汇总为 1m → 1h → 1d，各级数据按各自的保留期清理。
+同时把新的原始采样按代理累加到 traffic_rollups（1h / 1d），排行和速率查询只读这张预聚合表。
+服务器全局指标（frps /api/serverinfo）每次同步记录一行到 frps_server_metrics。
+
+每行数据是一个按列编码的帧：代理名称列表 + 每个指标一个 int64 数组，整体 zlib 压缩。
+"""
+import json
+import logging
+import struct
+import sys
+import zlib
+from array import array
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Float, cast, event, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import greatest, upsert
+from app.models.proxy import Proxy
+from app.models.traffic import ServerMetric, TrafficRollup, TrafficRollupCursor, TrafficSeries
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+RAW = "raw"
+
+# 汇总级别：(名称, 时间桶秒数, 数据来源级别)
+ROLLUPS = (
+    ("1m", 60, RAW),
+    ("1h", 3600, "1m"),
+    ("1d", 86400, "1h"),
+)
+RESOLUTION_SECONDS = {name: seconds for name, seconds, _ in ROLLUPS}
+
+# 所有帧共有的指标列：流量增量（字节）、最大连接数、连接数之和、采样次数（平均连接数 = conns_sum / samples）
+METRIC_COLUMNS = ("bytes_in", "bytes_out", "conns_max", "conns_sum", "samples")
+# 原始采样额外保存的累计计数器，用于计算下一次采样的增量
+COUNTER_COLUMNS = ("counter_in", "counter_out")
+
+# 按代理预聚合的级别：(名称, 时间桶秒数)
+PROXY_ROLLUPS = (
+    ("1h", 3600),
+    ("1d", 86400),
+)
+
+# 排行支持的指标
+TOP_METRICS = ("bytes_total", "bytes_in", "bytes_out", "conns_max", "conns_avg")
+
+_EPOCH = datetime(1970, 1, 1)
+
+# 每个服务器最近一次已提交采样的累计计数器（进程重启后从最新的原始采样恢复）
+_last_counters: Dict[int, Dict[str, Tuple[int, int]]] = {}
+
+# session.info 中保存本事务内采样的累计计数器的键，事务提交后才更新 _last_counters，
+# 同步回滚时下一次采样仍以已提交的采样为基准
+_PENDING_COUNTERS_KEY = "traffic_pending_counters"
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_counters(session: Session):
+    """事务提交后把本事务内的采样计数器作为下一次采样的基准"""
+    pending = session.info.pop(_PENDING_COUNTERS_KEY, None)
+    if pending:
+        _last_counters.update(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_counters(session: Session):
+    """事务回滚时丢弃未提交的采样计数器"""
+    session.info.pop(_PENDING_COUNTERS_KEY, None)
+
+
+def floor_time(value: datetime, seconds: int) -> datetime:
+    """向下取整到时间桶起点"""
+    elapsed = int((value - _EPOCH).total_seconds())
+    return _EPOCH + timedelta(seconds=elapsed - elapsed % seconds)
+
+
+class TrafficFrame:
+    """一个时间桶内所有代理的列式指标"""
+
+    def __init__(self, names: List[str], columns: Dict[str, array]):
+        self.names = names
+        self.columns = columns
+
+    def pack(self) -> bytes:
+        """编码为：4 字节头长度 + JSON 头（代理名称和列名）+ 各列 int64 数组，整体 zlib 压缩"""
+        header = json.dumps(
+            {"names": self.names, "columns": list(self.columns)},
+            ensure_ascii=False,
+            separators=(",", ":")
+        ).encode("utf-8")
+        parts = [struct.pack("<I", len(header)), header]
+        for values in self.columns.values():
+            if sys.byteorder == "big":
+                values = array("q", values)
+                values.byteswap()
+            parts.append(values.tobytes())
+        return zlib.compress(b"".join(parts))
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "TrafficFrame":
+        raw = zlib.decompress(data)
+        (header_size,) = struct.unpack_from("<I", raw)
+        header = json.loads(raw[4:4 + header_size])
+        names = header["names"]
+        width = len(names) * 8
+        offset = 4 + header_size
+        columns = {}
+        for column in header["columns"]:
+            values = array("q")
+            values.frombytes(raw[offset:offset + width])
+            if sys.byteorder == "big":
+                values.byteswap()
+            columns[column] = values
+            offset += width
+        return cls(names, columns)
+
+
+def _merge_metrics(totals: Dict, key, values: List[int]) -> None:
+    """把一组指标（顺序同 METRIC_COLUMNS）合并到 totals[key]"""
+    current = totals.get(key)
+    if current is None:
+        totals[key] = list(values)
+        return
+    current[0] += values[0]
+    current[1] += values[1]
+    current[2] = max(current[2], values[2])
+    current[3] += values[3]
+    current[4] += values[4]
+
+
+class _Accumulator:
+    """按代理合并多个帧的指标"""
+
+    def __init__(self):
+        self.values: Dict[str, List[int]] = {}
+
+    def add(self, frame: TrafficFrame) -> None:
+        columns = [frame.columns[column] for column in METRIC_COLUMNS]
+        for index, name in enumerate(frame.names):
+            _merge_metrics(self.values, name, [values[index] for values in columns])
+
+    def to_frame(self) -> TrafficFrame:
+        names = sorted(self.values)
+        columns = {
+            column: array("q", (self.values[name][position] for name in names))
+            for position, column in enumerate(METRIC_COLUMNS)
+        }
+        return TrafficFrame(names, columns)
+
+
+def _metric_row(name: str, values: List[int]) -> Dict:
+    bytes_in, bytes_out, conns_max, conns_sum, samples = values
+    return {
+        "proxy_name": name,
+        "bytes_in": bytes_in,
+        "bytes_out": bytes_out,
+        "bytes_total": bytes_in + bytes_out,
+        "conns_max": conns_max,
+        "conns_avg": round(conns_sum / samples, 2) if samples else 0,
+    }
+
+
+class TrafficService:
+    """流量采样、降采样和查询"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_sample(
+        self,
+        frps_server_id: int,
+        proxies: List[Dict],
+        timestamp: Optional[datetime] = None
+    ) -> Optional[TrafficSeries]:
+        """记录一次同步的原始采样（不提交，由调用方与同步结果一起提交）
+
+        Args:
+            frps_server_id: frps 服务器 ID
+            proxies: frps_client.parse_proxy_info 解析出的代理信息列表
+            timestamp: 采样时间
+        """
+        if not proxies:
+            return None
+
+        previous = self._previous_counters(frps_server_id)
+        latest = {}
+        for proxy_info in proxies:
+            latest[proxy_info["name"]] = proxy_info
+        names = sorted(latest)
+
+        columns = {column: array("q") for column in METRIC_COLUMNS + COUNTER_COLUMNS}
+        counters = {}
+        for name in names:
+            proxy_info = latest[name]
+            counter_in = int(proxy_info.get("today_traffic_in") or 0)
+            counter_out = int(proxy_info.get("today_traffic_out") or 0)
+            conns = int(proxy_info.get("cur_conns") or 0)
+            last_in, last_out = previous.get(name, (counter_in, counter_out))
+            # 计数器每天清零：当前值小于上次值时，当前值就是清零后的增量
+            columns["bytes_in"].append(counter_in - last_in if counter_in >= last_in else counter_in)
+            columns["bytes_out"].append(counter_out - last_out if counter_out >= last_out else counter_out)
+            columns["conns_max"].append(conns)
+            columns["conns_sum"].append(conns)
+            columns["samples"].append(1)
+            columns["counter_in"].append(counter_in)
+            columns["counter_out"].append(counter_out)
+            counters[name] = (counter_in, counter_out)
+
+        sample = TrafficSeries(
+            frps_server_id=frps_server_id,
+            resolution=RAW,
+            bucket=timestamp or datetime.utcnow(),
+            proxy_count=len(names),
+            data=TrafficFrame(names, columns).pack()
+        )
+        self.db.add(sample)
+        self.db.info.setdefault(_PENDING_COUNTERS_KEY, {})[frps_server_id] = counters
+        return sample
+
+    def record_server_info(
+        self,
+        frps_server_id: int,
+        server_info: Dict,
+        timestamp: Optional[datetime] = None
+    ) -> ServerMetric:
+        """记录一次 serverinfo 全局指标（不提交）"""
+        metric = ServerMetric(
+            frps_server_id=frps_server_id,
+            timestamp=timestamp or datetime.utcnow(),
+            version=server_info.get("version"),
+            total_traffic_in=int(server_info.get("totalTrafficIn") or 0),
+            total_traffic_out=int(server_info.get("totalTrafficOut") or 0),
+            cur_conns=int(server_info.get("curConns") or 0),
+            client_counts=int(server_info.get("clientCounts") or 0),
+            proxy_type_counts=json.dumps(server_info.get("proxyTypeCount") or {})
+        )
+        self.db.add(metric)
+        return metric
+
+    def server_metrics(self, frps_server_id: int, hours: int = 24) -> List[Dict]:
+        """时间窗口内的服务器全局指标"""
+        rows = self.db.query(ServerMetric).filter(
+            ServerMetric.frps_server_id == frps_server_id,
+            ServerMetric.timestamp >= datetime.utcnow() - timedelta(hours=hours)
+        ).order_by(ServerMetric.timestamp).all()
+        return [
+            {
+                "timestamp": row.timestamp,
+                "version": row.version,
+                "total_traffic_in": row.total_traffic_in,
+                "total_traffic_out": row.total_traffic_out,
+                "cur_conns": row.cur_conns,
+                "client_counts": row.client_counts,
+                "proxy_type_counts": json.loads(row.proxy_type_counts or "{}"),
+            }
+            for row in rows
+        ]
+
+    def _previous_counters(self, frps_server_id: int) -> Dict[str, Tuple[int, int]]:
+        counters = self.db.info.get(_PENDING_COUNTERS_KEY, {}).get(frps_server_id)
+        if counters is None:
+            counters = _last_counters.get(frps_server_id)
+        if counters is not None:
+            return counters
+
+        latest = self.db.query(TrafficSeries).filter(
+            TrafficSeries.frps_server_id == frps_server_id,
+            TrafficSeries.resolution == RAW
+        ).order_by(TrafficSeries.bucket.desc()).first()
+        if latest is None:
+            return {}
+        frame = TrafficFrame.unpack(latest.data)
+        return dict(zip(frame.names, zip(frame.columns["counter_in"], frame.columns["counter_out"])))
+
+    def rollup(self, now: Optional[datetime] = None) -> int:
+        """把已结束的时间桶逐级汇总（每个时间桶只汇总一次）
+
+        Returns:
+            新写入的汇总行数
+        """
+        now = now or datetime.utcnow()
+        created = 0
+        for resolution, seconds, source in ROLLUPS:
+            end = floor_time(now, seconds)
+            server_ids = [
+                server_id for (server_id,) in self.db.query(TrafficSeries.frps_server_id).filter(
+                    TrafficSeries.resolution == source
+                ).distinct()
+            ]
+            for server_id in server_ids:
+                last_bucket = self.db.query(func.max(TrafficSeries.bucket)).filter(
+                    TrafficSeries.frps_server_id == server_id,
+                    TrafficSeries.resolution == resolution
+                ).scalar()
+                query = self.db.query(TrafficSeries).filter(
+                    TrafficSeries.frps_server_id == server_id,
+                    TrafficSeries.resolution == source,
+                    TrafficSeries.bucket < end
+                )
+                if last_bucket is not None:
+                    query = query.filter(TrafficSeries.bucket >= last_bucket + timedelta(seconds=seconds))
+
+                buckets: Dict[datetime, _Accumulator] = defaultdict(_Accumulator)
+                for row in query.order_by(TrafficSeries.bucket):
+                    buckets[floor_time(row.bucket, seconds)].add(TrafficFrame.unpack(row.data))
+
+                for bucket, accumulator in sorted(buckets.items()):
+                    frame = accumulator.to_frame()
+                    self.db.add(TrafficSeries(
+                        frps_server_id=server_id,
+                        resolution=resolution,
+                        bucket=bucket,
+                        proxy_count=len(frame.names),
+                        data=frame.pack()
+                    ))
+                    created += 1
+            # 下一级汇总依赖本级结果，逐级提交
+            self.db.commit()
+        return created
+
+    def apply_retention(self, now: Optional[datetime] = None) -> int:
+        """按各级保留期删除过期的时序数据"""
+        now = now or datetime.utcnow()
+        retention = {
+            RAW: timedelta(hours=settings.traffic_raw_retention_hours),
+            "1m": timedelta(hours=settings.traffic_minute_retention_hours),
+            "1h": timedelta(days=settings.traffic_hour_retention_days),
+            "1d": timedelta(days=settings.traffic_day_retention_days),
+        }
+        removed = 0
+        for resolution, keep in retention.items():
+            if keep.total_seconds() <= 0:
+                continue
+            removed += self.db.query(TrafficSeries).filter(
+                TrafficSeries.resolution == resolution,
+                TrafficSeries.bucket < now - keep
+            ).delete(synchronize_session=False)
+            if resolution in dict(PROXY_ROLLUPS):
+                removed += self.db.query(TrafficRollup).filter(
+                    TrafficRollup.resolution == resolution,
+                    TrafficRollup.bucket < now - keep
+                ).delete(synchronize_session=False)
+        if settings.traffic_hour_retention_days > 0:
+            # 服务器全局指标每次同步一行，与 1 小时汇总保留相同的天数
+            removed += self.db.query(ServerMetric).filter(
+                ServerMetric.timestamp < now - timedelta(days=settings.traffic_hour_retention_days)
+            ).delete(synchronize_session=False)
+        self.db.commit()
+        return removed
+
+    def update_rollups(self) -> int:
+        """把游标之后的原始采样按代理累加到 1h / 1d 预聚合行，每个服务器一个事务
+
+        Returns:
+            处理的原始采样数
+        """
+        cursors = {cursor.frps_server_id: cursor for cursor in self.db.query(TrafficRollupCursor)}
+        server_ids = [
+            server_id for (server_id,) in self.db.query(TrafficSeries.frps_server_id).filter(
+                TrafficSeries.resolution == RAW
+            ).distinct()
+        ]
+        processed = 0
+        for server_id in server_ids:
+            cursor = cursors.get(server_id)
+            query = self.db.query(TrafficSeries).filter(
+                TrafficSeries.frps_server_id == server_id,
+                TrafficSeries.resolution == RAW
+            )
+            if cursor is not None:
+                query = query.filter(TrafficSeries.bucket > cursor.last_sample_at)
+            samples = query.order_by(TrafficSeries.bucket).all()
+            if not samples:
+                continue
+
+            deltas: Dict[Tuple[str, datetime, str], List[int]] = {}
+            for sample in samples:
+                frame = TrafficFrame.unpack(sample.data)
+                columns = [frame.columns[column] for column in METRIC_COLUMNS]
+                for resolution, seconds in PROXY_ROLLUPS:
+                    bucket = floor_time(sample.bucket, seconds)
+                    for index, name in enumerate(frame.names):
+                        _merge_metrics(deltas, (resolution, bucket, name), [values[index] for values in columns])
+
+            try:
+                self._apply_rollup_deltas(server_id, deltas)
+                if cursor is None:
+                    cursor = TrafficRollupCursor(frps_server_id=server_id, last_sample_at=samples[-1].bucket)
+                    self.db.add(cursor)
+                else:
+                    cursor.last_sample_at = samples[-1].bucket
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            processed += len(samples)
+        return processed
+
+    def _apply_rollup_deltas(self, frps_server_id: int, deltas: Dict[Tuple[str, datetime, str], List[int]]) -> None:
+        """累加到已有的预聚合行，不存在的行批量插入"""
+        rollups = TrafficRollup.__table__
+        stmt = upsert(
+            self.db, rollups, ["frps_server_id", "resolution", "bucket", "proxy_name"],
+            lambda excluded: {
+                "bytes_in": rollups.c.bytes_in + excluded.bytes_in,
+                "bytes_out": rollups.c.bytes_out + excluded.bytes_out,
+                "conns_max": greatest(self.db, rollups.c.conns_max, excluded.conns_max),
+                "conns_sum": rollups.c.conns_sum + excluded.conns_sum,
+                "samples": rollups.c.samples + excluded.samples,
+            }
+        )
+        if stmt is not None:
+            # 支持 ON CONFLICT 的数据库一次批量写入，不需要先查询已有的行
+            if not deltas:
+                return
+            groups = self._group_map(frps_server_id)
+            self.db.execute(stmt, [
+                {
+                    "frps_server_id": frps_server_id,
+                    "resolution": resolution,
+                    "bucket": bucket,
+                    "proxy_name": name,
+                    "group_name": groups.get(name) or Proxy.parse_group_name(name),
+                    "bytes_in": bytes_in,
+                    "bytes_out": bytes_out,
+                    "conns_max": conns_max,
+                    "conns_sum": conns_sum,
+                    "samples": samples,
+                }
+                for (resolution, bucket, name), (bytes_in, bytes_out, conns_max, conns_sum, samples) in deltas.items()
+            ])
+            return
+
+        existing = {}
+        for resolution, bucket in {(resolution, bucket) for resolution, bucket, _ in deltas}:
+            for row in self.db.query(TrafficRollup).filter(
+                TrafficRollup.frps_server_id == frps_server_id,
+                TrafficRollup.resolution == resolution,
+                TrafficRollup.bucket == bucket
+            ):
+                existing[(resolution, bucket, row.proxy_name)] = row
+
+        groups = self._group_map(frps_server_id)
+        new_rows = []
+        for key, (bytes_in, bytes_out, conns_max, conns_sum, samples) in deltas.items():
+            row = existing.get(key)
+            if row is not None:
+                row.bytes_in += bytes_in
+                row.bytes_out += bytes_out
+                row.conns_max = max(row.conns_max, conns_max)
+                row.conns_sum += conns_sum
+                row.samples += samples
+                continue
+            resolution, bucket, name = key
+            new_rows.append({
+                "frps_server_id": frps_server_id,
+                "resolution": resolution,
+                "bucket": bucket,
+                "proxy_name": name,
+                "group_name": groups.get(name) or Proxy.parse_group_name(name),
+                "bytes_in": bytes_in,
+                "bytes_out": bytes_out,
+                "conns_max": conns_max,
+                "conns_sum": conns_sum,
+                "samples": samples,
+            })
+        self.db.flush()
+        if new_rows:
+            self.db.execute(insert(TrafficRollup.__table__), new_rows)
+
+    def _group_map(self, frps_server_id: int) -> Dict[str, str]:
+        return {
+            name: group_name or Proxy.parse_group_name(name)
+            for name, group_name in self.db.query(Proxy.name, Proxy.group_name).filter(
+                Proxy.frps_server_id == frps_server_id
+            )
+        }
+
+    def _window(self, hours: int) -> Tuple[str, datetime, float]:
+        """时间窗口对应的预聚合级别、起始时间桶和实际覆盖的秒数
+
+        窗口起点向下取整到时间桶，因此覆盖范围最多比 hours 多出一个时间桶。
+        """
+        now = datetime.utcnow()
+        if hours <= settings.traffic_hour_retention_days * 24:
+            resolution, seconds = "1h", 3600
+        else:
+            resolution, seconds = "1d", 86400
+        since = floor_time(now - timedelta(hours=hours), seconds)
+        return resolution, since, max((now - since).total_seconds(), 1.0)
+
+    def _proxy_aggregates(self, frps_server_id: int, resolution: str, since: datetime, group_name: Optional[str] = None):
+        """按代理聚合预聚合行的子查询"""
+        stmt = select(
+            TrafficRollup.proxy_name.label("proxy_name"),
+            func.max(TrafficRollup.group_name).label("group_name"),
+            func.sum(TrafficRollup.bytes_in).label("bytes_in"),
+            func.sum(TrafficRollup.bytes_out).label("bytes_out"),
+            func.max(TrafficRollup.conns_max).label("conns_max"),
+            (cast(func.sum(TrafficRollup.conns_sum), Float) / func.sum(TrafficRollup.samples)).label("conns_avg"),
+        ).where(
+            TrafficRollup.frps_server_id == frps_server_id,
+            TrafficRollup.resolution == resolution,
+            TrafficRollup.bucket >= since
+        ).group_by(TrafficRollup.proxy_name)
+        if group_name:
+            stmt = stmt.where(TrafficRollup.group_name == group_name)
+        return stmt.subquery()
+
+    def top_proxies(
+        self,
+        frps_server_id: int,
+        hours: int = 1,
+        metric: str = "bytes_total",
+        limit: int = 20,
+        group_name: Optional[str] = None
+    ) -> List[Dict]:
+        """时间窗口内按指标排序的代理排行（读取预聚合表，由数据库排序和截断）"""
+        resolution, since, seconds = self._window(hours)
+        totals = self._proxy_aggregates(frps_server_id, resolution, since, group_name)
+        bytes_total = (totals.c.bytes_in + totals.c.bytes_out).label("bytes_total")
+        order = {
+            "bytes_total": bytes_total,
+            "bytes_in": totals.c.bytes_in,
+            "bytes_out": totals.c.bytes_out,
+            "conns_max": totals.c.conns_max,
+            "conns_avg": totals.c.conns_avg,
+        }[metric]
+        rows = self.db.execute(
+            select(totals, bytes_total).order_by(order.desc(), totals.c.proxy_name).limit(limit)
+        ).all()
+        return [
+            {
+                "proxy_name": row.proxy_name,
+                "group_name": row.group_name,
+                "bytes_in": row.bytes_in,
+                "bytes_out": row.bytes_out,
+                "bytes_total": row.bytes_total,
+                "conns_max": row.conns_max,
+                "conns_avg": round(row.conns_avg or 0, 2),
+                "bytes_in_per_second": round(row.bytes_in / seconds, 2),
+                "bytes_out_per_second": round(row.bytes_out / seconds, 2),
+            }
+            for row in rows
+        ]
+
+    def group_totals(self, frps_server_id: int, hours: int = 24) -> List[Dict]:
+        """时间窗口内按分组汇总的流量和连接数（conns_max / conns_avg 为组内各代理之和）"""
+        resolution, since, _ = self._window(hours)
+        totals = self._proxy_aggregates(frps_server_id, resolution, since)
+        bytes_total = func.sum(totals.c.bytes_in + totals.c.bytes_out)
+        rows = self.db.execute(
+            select(
+                totals.c.group_name,
+                func.count().label("proxy_count"),
+                func.sum(totals.c.bytes_in).label("bytes_in"),
+                func.sum(totals.c.bytes_out).label("bytes_out"),
+                bytes_total.label("bytes_total"),
+                func.sum(totals.c.conns_max).label("conns_max"),
+                func.sum(totals.c.conns_avg).label("conns_avg"),
+            ).group_by(totals.c.group_name).order_by(bytes_total.desc(), totals.c.group_name)
+        ).all()
+        return [
+            {
+                "group_name": row.group_name,
+                "proxy_count": row.proxy_count,
+                "bytes_in": row.bytes_in,
+                "bytes_out": row.bytes_out,
+                "bytes_total": row.bytes_total,
+                "conns_max": row.conns_max,
+                "conns_avg": round(row.conns_avg or 0, 2),
+            }
+            for row in rows
+        ]
+
+    def rates(
+        self,
+        frps_server_id: int,
+        hours: int = 1,
+        limit: int = 20,
+        group_name: Optional[str] = None
+    ) -> Dict:
+        """时间窗口内的平均速率：服务器（或分组）合计与速率最高的代理
+
+        frps 只提供当前连接数，连接指标为窗口内的平均并发连接数。
+        """
+        resolution, since, seconds = self._window(hours)
+        totals = self._proxy_aggregates(frps_server_id, resolution, since, group_name)
+        row = self.db.execute(
+            select(
+                func.count().label("proxy_count"),
+                func.coalesce(func.sum(totals.c.bytes_in), 0).label("bytes_in"),
+                func.coalesce(func.sum(totals.c.bytes_out), 0).label("bytes_out"),
+                func.coalesce(func.sum(totals.c.conns_avg), 0).label("conns_avg"),
+            )
+        ).one()
+        return {
+            "resolution": resolution,
+            "since": since,
+            "window_seconds": int(seconds),
+            "proxy_count": row.proxy_count,
+            "bytes_in_per_second": round(row.bytes_in / seconds, 2),
+            "bytes_out_per_second": round(row.bytes_out / seconds, 2),
+            "avg_connections": round(row.conns_avg, 2),
+            "proxies": self.top_proxies(frps_server_id, hours, "bytes_total", limit, group_name),
+        }
+
+    def proxy_series(
+        self,
+        frps_server_id: int,
+        proxy_name: str,
+        resolution: str = "1h",
+        hours: int = 24
+    ) -> List[Dict]:
+        """单个代理在指定级别上的时间序列"""
+        rows = self.db.query(TrafficSeries).filter(
+            TrafficSeries.frps_server_id == frps_server_id,
+            TrafficSeries.resolution == resolution,
+            TrafficSeries.bucket >= datetime.utcnow() - timedelta(hours=hours)
+        ).order_by(TrafficSeries.bucket).all()
+
+        series = []
+        for row in rows:
+            frame = TrafficFrame.unpack(row.data)
+            try:
+                index = frame.names.index(proxy_name)
+            except ValueError:
+                continue
+            values = [frame.columns[column][index] for column in METRIC_COLUMNS]
+            point = _metric_row(proxy_name, values)
+            point.pop("proxy_name")
+            point["bucket"] = row.bucket
+            series.append(point)
+        return series
+
+    def delete_server_series(self, frps_server_id: int) -> None:
+        """删除服务器的所有时序数据（不提交）"""
+        for model in (TrafficSeries, TrafficRollup, TrafficRollupCursor, ServerMetric):
+            self.db.query(model).filter(
+                model.frps_server_id == frps_server_id
+            ).delete(synchronize_session=False)
+        _last_counters.pop(frps_server_id, None)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+代理列表和搜索接口性能测试
+
+向临时数据库写入 N 个代理后，通过 TestClient 调用接口（经过完整的路由、认证和序列化），
+统计每个用例的 p50 / p95 / 最大耗时：
+- 代理列表：首页、深分页、按分组过滤
+- 搜索：精确子串、前缀、拼写错误的模糊匹配
+- 分组列表（带搜索）、统计接口
+- auth_basic: 使用 Basic 认证调用统计接口（其余用例使用 API Key），对比密码校验的开销
+
+使用方式（在 backend 目录下运行）:
+    python -m benchmarks.bench_api
+    python -m benchmarks.bench_api --sizes 10000 --requests 200
+"""
+
+import argparse
+import base64
+import time
+from typing import Dict, List
+
+from benchmarks.common import (
+    API_KEY, add_common_arguments, cleanup_environment, create_api_key, create_server, percentile, prepare_environment,
+    reset_database, seed_proxies, write_results,
+)
+
+def _create_admin() -> None:
+    from app.database import SessionLocal
+    from app.init_db import create_default_user
+
+    db = SessionLocal()
+    try:
+        create_default_user(db)
+    finally:
+        db.close()
+
+
+def run(sizes: List[int], requests: int = 100) -> List[Dict]:
+    from fastapi.testclient import TestClient
+
+    from app.config import get_settings
+    from app.main import app
+
+    settings = get_settings()
+    basic_token = base64.b64encode(f"{settings.auth_username}:{settings.auth_password}".encode()).decode()
+    # 不进入 lifespan，避免启动定时同步和导入任务
+    client = TestClient(app)
+    bearer = {"Authorization": f"Bearer {API_KEY}"}
+
+    results = []
+    for size in sizes:
+        reset_database()
+        server_id = create_server()
+        seed_proxies(server_id, size)
+        create_api_key()
+        _create_admin()
+
+        middle = size // 2
+        cases = [
+            ("list_first_page", "/api/proxies", {"page": 1, "page_size": 50}, bearer, requests),
+            ("list_deep_page", "/api/proxies", {"page": max(1, size // 100), "page_size": 50}, bearer, requests),
+            ("list_group", "/api/proxies", {"group_name": "group7", "page_size": 50}, bearer, requests),
+            ("search_substring", "/api/proxies", {"search": f"proxy{middle}", "page_size": 50}, bearer, requests),
+            ("search_prefix", "/api/proxies", {"search": "group7_", "page_size": 50}, bearer, requests),
+            ("search_fuzzy", "/api/proxies", {"search": f"grup7_proxi{middle}", "page_size": 50}, bearer, requests),
+            ("groups_search", "/api/groups", {"search": "group1", "page_size": 50}, bearer, requests),
+            ("stats", "/api/stats", {"frps_server_id": server_id}, bearer, requests),
+            ("auth_basic", "/api/stats", {"frps_server_id": server_id},
+             {"Authorization": f"Basic {basic_token}"}, max(1, requests // 10)),
+        ]
+        for case, path, params, headers, count in cases:
+            samples = []
+            for _ in range(count):
+                start = time.perf_counter()
+                response = client.get(path, params=params, headers=headers)
+                samples.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{case}: {path} 返回 {response.status_code}: {response.text[:200]}")
+            body = response.json()
+            result = {
+                "suite": "api",
+                "case": case,
+                "size": size,
+                "requests": count,
+                "p50_ms": round(percentile(samples, 50) * 1000, 3),
+                "p95_ms": round(percentile(samples, 95) * 1000, 3),
+                "max_ms": round(max(samples) * 1000, 3),
+                "total": body.get("total") if isinstance(body, dict) and isinstance(body.get("total"), int) else None,
+            }
+            results.append(result)
+            print(
+                f"api   {size:>7} 代理  {case:<18} p50 {result['p50_ms']:>9.3f}ms"
+                f"  p95 {result['p95_ms']:>9.3f}ms  命中 {result['total']}"
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="代理列表和搜索接口性能测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="代理数量")
+    parser.add_argument("--requests", type=int, default=100, help="每个用例的请求次数")
+    add_common_arguments(parser)
+    args = parser.parse_args()
+
+    prepare_environment(args.database_url, args.verbose)
+    try:
+        results = run(args.sizes, args.requests)
+    finally:
+        cleanup_environment()
+    write_results("api", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
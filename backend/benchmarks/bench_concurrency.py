@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+同步期间并发读写性能测试
+
+同步任务按比例切换模拟 frps 上代理的在线状态后循环同步（写入代理状态、历史和流量记录），
+同时 N 个读进程按代理列表接口的查询方式（只读会话，计数 + 分页）反复读取，持续指定秒数，统计：
+- <profile>_reads: 读请求吞吐、p50 / p95 / 最大耗时、数据库被锁定的错误数
+- <profile>_sync: 同步次数和平均每次同步耗时
+
+SQLite 参数在导入 app 时读取，所以每组参数在独立的子进程中运行：
+- legacy: 调优前的 SQLite 默认行为（回滚日志、synchronous=FULL、2MB 页缓存、不使用 mmap）
+- tuned: Settings 中的默认调优参数（WAL、synchronous=NORMAL、64MB 页缓存、mmap）
+
+使用方式（在 backend 目录下运行）:
+    python -m benchmarks.bench_concurrency
+    python -m benchmarks.bench_concurrency --sizes 5000 --readers 8 --duration 20 --profiles tuned
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.common import (
+    BACKEND_DIR, add_common_arguments, cleanup_environment, percentile, prepare_environment, reset_database,
+    write_results,
+)
+from benchmarks.fake_frps import FakeFrpsServer, build_servers
+
+# 每组参数对应的环境变量（不设置的项使用 Settings 默认值）
+PROFILES = {
+    "legacy": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_CACHE_SIZE_KB": "2000",
+        "SQLITE_MMAP_SIZE_MB": "0",
+    },
+    "tuned": {},
+}
+
+
+def _reader(server_id: int, size: int, ready, stop, queue, seed: int) -> None:
+    """读进程：按代理列表接口的方式读取（先计数再取一页），结束后把耗时和错误放入队列"""
+    from sqlalchemy import func
+    from sqlalchemy.exc import OperationalError
+
+    from app.database import ReadSessionLocal
+    from app.models.proxy import Proxy
+
+    rng = random.Random(seed)
+    samples: List[float] = []
+    errors: List[str] = []
+    # 建立连接后通知主进程，导入和建连不计入测量
+    ReadSessionLocal().close()
+    ready.put(seed)
+    while not stop.is_set():
+        start = time.perf_counter()
+        db = ReadSessionLocal()
+        try:
+            query = db.query(Proxy).filter(Proxy.frps_server_id == server_id)
+            if rng.random() < 0.5:
+                query = query.filter(Proxy.status == "online")
+            query.with_entities(func.count(Proxy.id)).scalar()
+            query.order_by(Proxy.id).offset(rng.randrange(max(1, size - 50))).limit(50).all()
+            samples.append(time.perf_counter() - start)
+        except OperationalError as e:
+            errors.append(str(e.orig))
+        finally:
+            db.close()
+    queue.put((samples, errors))
+
+
+def _writer(states, churn_ratio: float, stop: threading.Event, durations: List[float], errors: List[str]) -> None:
+    """循环切换代理状态并同步"""
+    from app.scheduler import sync_all_servers
+
+    while not stop.is_set():
+        for state in states:
+            state.churn(churn_ratio)
+        start = time.perf_counter()
+        try:
+            asyncio.run(sync_all_servers())
+            durations.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(str(e))
+
+
+def run(
+    sizes: List[int],
+    profile: str,
+    readers: int = 4,
+    duration: float = 15.0,
+    churn_ratio: float = 0.1,
+    port: int = 17500
+) -> List[Dict]:
+    """在当前进程中运行一组参数（SQLite 参数由导入 app 前的环境变量决定）"""
+    from sqlalchemy import text
+
+    from app.database import SessionLocal, engine
+    from app.models.frps_server import FrpsServer
+    from app.scheduler import sync_all_servers
+
+    results = []
+    for size in sizes:
+        reset_database()
+        states = build_servers([size])
+        with FakeFrpsServer(states, port=port) as fake:
+            db = SessionLocal()
+            server = FrpsServer(
+                name="bench-s0",
+                server_addr="127.0.0.1",
+                server_port=7000,
+                api_base_url=fake.api_base_url(0),
+                auth_username="admin",
+                auth_password="admin",
+                is_active=True
+            )
+            db.add(server)
+            db.commit()
+            server_id = server.id
+            db.close()
+            # 首次同步写入全部代理，不计入测量
+            asyncio.run(sync_all_servers())
+
+            journal_mode = None
+            if engine.dialect.name == "sqlite":
+                with engine.connect() as conn:
+                    journal_mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+
+            # 读取在独立进程中进行（相当于多个 API 进程），避免和同步线程争抢 GIL 掩盖数据库锁等待
+            context = multiprocessing.get_context("spawn")
+            ready = context.Queue()
+            stop = context.Event()
+            queue = context.Queue()
+            processes = [
+                context.Process(target=_reader, args=(server_id, size, ready, stop, queue, index), daemon=True)
+                for index in range(readers)
+            ]
+            for process in processes:
+                process.start()
+            for _ in processes:
+                ready.get()
+            sync_stop = threading.Event()
+            sync_durations: List[float] = []
+            sync_errors: List[str] = []
+            writer = threading.Thread(
+                target=_writer, args=(states, churn_ratio, sync_stop, sync_durations, sync_errors), daemon=True
+            )
+            start = time.perf_counter()
+            writer.start()
+            time.sleep(duration)
+            stop.set()
+            sync_stop.set()
+            reader_results = [queue.get() for _ in processes]
+            elapsed = time.perf_counter() - start
+            writer.join()
+            for process in processes:
+                process.join()
+
+        samples = [sample for per_reader, _ in reader_results for sample in per_reader]
+        read_errors = [error for _, per_reader in reader_results for error in per_reader]
+        common = {"suite": "concurrency", "size": size, "profile": profile, "journal_mode": journal_mode}
+        reads = {
+            **common,
+            "case": f"{profile}_reads",
+            "readers": readers,
+            "reads": len(samples),
+            "reads_per_second": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(samples, 50) * 1000, 3) if samples else None,
+            "p95_ms": round(percentile(samples, 95) * 1000, 3) if samples else None,
+            "max_ms": round(max(samples) * 1000, 3) if samples else None,
+            "errors": len(read_errors),
+        }
+        sync = {
+            **common,
+            "case": f"{profile}_sync",
+            "syncs": len(sync_durations),
+            "seconds": round(sum(sync_durations) / len(sync_durations), 4) if sync_durations else None,
+            "errors": len(sync_errors),
+        }
+        results += [reads, sync]
+        print(
+            f"concurrency {size:>7} 代理  {profile:<7} 读 {reads['reads_per_second']:>9.1f}/秒"
+            f"  p50 {reads['p50_ms'] or 0:>8.3f}ms  p95 {reads['p95_ms'] or 0:>8.3f}ms  max {reads['max_ms'] or 0:>9.3f}ms"
+            f"  锁定错误 {reads['errors']}  同步 {sync['syncs']} 次 平均 {sync['seconds'] or 0:.3f}s"
+        )
+    return results
+
+
+def run_isolated(
+    sizes: List[int],
+    profiles: Optional[List[str]] = None,
+    readers: int = 4,
+    duration: float = 15.0,
+    churn_ratio: float = 0.1,
+    port: int = 17500,
+    database_url: Optional[str] = None
+) -> List[Dict]:
+    """每组参数在一个子进程中运行，返回合并后的结果（可以在已导入 app 的进程中调用）"""
+    results = []
+    for profile in profiles or list(PROFILES):
+        fd, output = tempfile.mkstemp(prefix="bench-concurrency-", suffix=".json")
+        os.close(fd)
+        command = [
+            sys.executable, "-m", "benchmarks.bench_concurrency", "--profiles", profile,
+            "--sizes", *map(str, sizes), "--readers", str(readers), "--duration", str(duration),
+            "--churn", str(churn_ratio), "--port", str(port), "--output", output,
+        ]
+        if database_url:
+            command += ["--database-url", database_url]
+        env = {key: value for key, value in os.environ.items() if key not in ("DATABASE_URL", "TEMP_CONFIG_DIR", "IMPORT_JOB_DIR")}
+        env.update(PROFILES[profile])
+        try:
+            subprocess.run(command, cwd=BACKEND_DIR, env=env, check=True)
+            with open(output, encoding="utf-8") as f:
+                results += json.load(f)["results"]
+        finally:
+            os.remove(output)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="同步期间并发读写性能测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000], help="代理数量")
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES), help="要对比的 SQLite 参数")
+    parser.add_argument("--readers", type=int, default=4, help="读进程数")
+    parser.add_argument("--duration", type=float, default=15.0, help="每个场景持续秒数")
+    parser.add_argument("--churn", type=float, default=0.1, help="每次同步前切换在线状态的代理比例")
+    parser.add_argument("--port", type=int, default=17500, help="模拟 frps 面板监听端口")
+    add_common_arguments(parser)
+    args = parser.parse_args()
+
+    if len(args.profiles) > 1:
+        results = run_isolated(
+            args.sizes, args.profiles, args.readers, args.duration, args.churn, args.port, args.database_url
+        )
+    else:
+        os.environ.update(PROFILES[args.profiles[0]])
+        prepare_environment(args.database_url, args.verbose)
+        try:
+            results = run(args.sizes, args.profiles[0], args.readers, args.duration, args.churn, args.port)
+        finally:
+            cleanup_environment()
+    write_results("concurrency", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+frpc 配置解析性能测试
+
+对比旧实现（configparser / toml 包）与 app.services.frpc_parser 在
+1k / 10k / 100k 个代理的配置上的解析吞吐量，并校验两者解析结果一致。
+
+使用方式（在 backend 目录下运行）:
+    python -m benchmarks.bench_config_parser
+    python -m benchmarks.bench_config_parser --sizes 1000 10000 --repeat 5
+"""
+
+import argparse
+import configparser
+import os
+import sys
+import time
+
+import toml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.config_parser import ConfigParser, StreamingConfigParser
+from app.services.frpc_config_service import FrpcConfigService
+from benchmarks.datasets import generate_ini, generate_toml
+
+
+def legacy_parse_ini(content: str):
+    """旧实现：标准库 configparser"""
+    config = configparser.ConfigParser()
+    config.read_string(content)
+    return [
+        proxy for section in config.sections()
+        if (proxy := ConfigParser.ini_section_to_proxy(section, config[section]))
+    ]
+
+
+def legacy_parse_toml(content: str):
+    """旧实现：toml 包"""
+    return [
+        proxy for table in toml.loads(content).get('proxies', [])
+        if (proxy := ConfigParser.toml_table_to_proxy(table))
+    ]
+
+
+def streaming_parse(content: str, file_extension: str, chunk_size: int = 64 * 1024):
+    """流式解析（按 64KB 分块输入）"""
+    parser = StreamingConfigParser(file_extension)
+    proxies = []
+    for i in range(0, len(content), chunk_size):
+        proxies.extend(parser.feed(content[i:i + chunk_size]))
+    proxies.extend(parser.close())
+    return proxies
+
+
+def measure(func, content: str, repeat: int):
+    """返回最快一次的耗时（秒）和结果"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="frpc 配置解析性能测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="代理数量")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数（取最快一次）")
+    args = parser.parse_args()
+
+    converter = FrpcConfigService(None)
+    cases = [
+        ("ini", generate_ini, [
+            ("configparser", legacy_parse_ini),
+            ("frpc_parser", ConfigParser.parse_ini_config),
+            ("streaming", lambda c: streaming_parse(c, "ini")),
+        ]),
+        ("toml", generate_toml, [
+            ("toml", legacy_parse_toml),
+            ("frpc_parser", ConfigParser.parse_toml_config),
+            ("streaming", lambda c: streaming_parse(c, "toml")),
+        ]),
+    ]
+
+    print(f"{'格式':<6}{'代理数':>8}  {'实现':<14}{'耗时(s)':>10}{'代理/秒':>12}{'MB/s':>8}{'加速比':>8}")
+    for size in args.sizes:
+        for fmt, generate, implementations in cases:
+            content = generate(size)
+            megabytes = len(content.encode("utf-8")) / 1024 / 1024
+            baseline_time, baseline = None, None
+            for name, func in implementations:
+                elapsed, result = measure(func, content, args.repeat)
+                if baseline is None:
+                    baseline_time, baseline = elapsed, result
+                elif result != baseline:
+                    print(f"错误: {fmt} {name} 的解析结果与 {implementations[0][0]} 不一致", file=sys.stderr)
+                    sys.exit(1)
+                print(
+                    f"{fmt:<6}{size:>8}  {name:<14}{elapsed:>10.3f}{size / elapsed:>12.0f}"
+                    f"{megabytes / elapsed:>8.1f}{baseline_time / elapsed:>7.1f}x"
+                )
+
+        elapsed, _ = measure(converter.convert_ini_to_toml, generate_ini(size), args.repeat)
+        print(f"{'conv':<6}{size:>8}  {'ini->toml':<14}{elapsed:>10.3f}{size / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
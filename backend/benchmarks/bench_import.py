@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+大配置文件导入性能测试
+
+生成包含 N 个代理的 frpc 配置，按后台导入任务的实际路径（ImportJobService.run_job：
+流式解析、分批写入）测量：
+- job_ini_new / job_toml_new: 空数据库中导入
+- job_ini_unchanged: 再次导入相同配置（只做差异比对，不写入）
+- job_ini_dry_run: 只计算差异
+- text_ini_new: 一次性解析后在单个事务中导入（/import/text 的路径）
+
+使用方式（在 backend 目录下运行）:
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --sizes 1000 10000 --batch-size 2000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.common import add_common_arguments, cleanup_environment, create_server, prepare_environment, reset_database, write_results
+from benchmarks.datasets import generate_ini, generate_toml
+
+
+def _run_job(frps_server_id: int, format: str, content: str, dry_run: bool, batch_size: Optional[int]) -> Dict:
+    """写入上传文件、创建并同步执行导入任务，返回任务统计"""
+    from app.database import SessionLocal
+    from app.services.import_job_service import ImportJobService, get_job_dir
+
+    fd, path = tempfile.mkstemp(dir=get_job_dir(), suffix=".upload")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(content)
+
+    db = SessionLocal()
+    try:
+        service = ImportJobService(db)
+        job = service.create_job(frps_server_id, format, path, dry_run=dry_run, batch_size=batch_size)
+        service.run_job(job.job_id)
+        job = service.get_job(job.job_id)
+        if job.status != "completed":
+            raise RuntimeError(f"导入任务状态为 {job.status}: {job.error_message}")
+        return {
+            "created": job.created_count,
+            "updated": job.updated_count,
+            "unchanged": job.unchanged_count,
+            "failed": job.failed_count,
+        }
+    finally:
+        db.close()
+
+
+def run(sizes: List[int], batch_size: Optional[int] = None) -> List[Dict]:
+    from app.database import SessionLocal
+    from app.services.config_parser import ConfigParser
+    from app.services.import_service import ProxyImportService
+
+    results = []
+    for size in sizes:
+        ini_content = generate_ini(size)
+        toml_content = generate_toml(size)
+
+        def record(case: str, elapsed: float, content: str, **extra) -> None:
+            result = {
+                "suite": "import",
+                "case": case,
+                "size": size,
+                "batch_size": batch_size,
+                "bytes": len(content.encode("utf-8")),
+                "seconds": round(elapsed, 4),
+                "proxies_per_second": round(size / elapsed, 1) if elapsed else None,
+                **extra,
+            }
+            results.append(result)
+            print(f"import {size:>7} 代理  {case:<20}{elapsed:>9.3f}s{result['proxies_per_second'] or 0:>12.0f} 代理/秒")
+
+        def timed_job(case: str, server_id: int, format: str, content: str, dry_run: bool = False) -> None:
+            start = time.perf_counter()
+            stats = _run_job(server_id, format, content, dry_run, batch_size)
+            record(case, time.perf_counter() - start, content, **stats)
+
+        reset_database()
+        server_id = create_server()
+        timed_job("job_ini_new", server_id, "ini", ini_content)
+        timed_job("job_ini_unchanged", server_id, "ini", ini_content)
+        timed_job("job_ini_dry_run", server_id, "ini", ini_content, dry_run=True)
+
+        reset_database()
+        server_id = create_server()
+        timed_job("job_toml_new", server_id, "toml", toml_content)
+
+        reset_database()
+        server_id = create_server()
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            proxies = ConfigParser.parse_ini_config(ini_content)
+            stats = ProxyImportService(db).import_proxies(server_id, proxies)
+            record("text_ini_new", time.perf_counter() - start, ini_content, created=stats.get("created"))
+        finally:
+            db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="大配置文件导入性能测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="代理数量")
+    parser.add_argument("--batch-size", type=int, help="每批写入的代理数（默认使用配置项 import_batch_size）")
+    add_common_arguments(parser)
+    args = parser.parse_args()
+
+    prepare_environment(args.database_url, args.verbose)
+    try:
+        results = run(args.sizes, args.batch_size)
+    finally:
+        cleanup_environment()
+    write_results("import", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+端口分配和冲突检测性能测试
+
+向临时数据库写入 N 个代理（tcp 代理占用 10000 起的远程端口），测量：
+- next_available_port: 查找下一个可用端口
+- is_port_available: 检查单个端口
+- allocate_port: 逐个分配端口（每次提交）
+- detect_conflicts: 对所有代理在线的服务器做一次同步时的冲突检测
+- regenerate_group_ports: 通过接口重新生成一个分组的远程端口
+
+使用方式（在 backend 目录下运行）:
+    python -m benchmarks.bench_ports
+    python -m benchmarks.bench_ports --sizes 1000 10000 --repeat 20
+"""
+
+import argparse
+import random
+from typing import Dict, List
+
+from benchmarks.common import (
+    API_KEY, add_common_arguments, cleanup_environment, create_api_key, create_server, measure, percentile, prepare_environment,
+    reset_database, seed_proxies, write_results,
+)
+from benchmarks.datasets import frps_proxies
+
+PORT_RANGE = (10000, 65535)
+
+
+def run(sizes: List[int], repeat: int = 10) -> List[Dict]:
+    from fastapi.testclient import TestClient
+
+    from app.database import SessionLocal
+    from app.main import app
+    from app.models.proxy import Proxy
+    from app.services.port_service import PortService
+
+    client = TestClient(app)
+    results = []
+    for size in sizes:
+        reset_database()
+        server_id = create_server()
+        seed_proxies(server_id, size)
+        create_api_key()
+        rng = random.Random(size)
+
+        def record(case: str, samples: List[float], **extra) -> None:
+            result = {
+                "suite": "ports",
+                "case": case,
+                "size": size,
+                "seconds": round(min(samples), 5),
+                "p50_ms": round(percentile(samples, 50) * 1000, 3),
+                "p95_ms": round(percentile(samples, 95) * 1000, 3),
+                **extra,
+            }
+            results.append(result)
+            print(f"ports {size:>7} 代理  {case:<24} p50 {result['p50_ms']:>10.3f}ms  p95 {result['p95_ms']:>10.3f}ms")
+
+        db = SessionLocal()
+        try:
+            service = PortService(db)
+            _, samples, port = measure(lambda: service.get_next_available_port(server_id, *PORT_RANGE), repeat)
+            record("next_available_port", samples, port=port)
+
+            _, samples, _ = measure(
+                lambda: service.is_port_available(server_id, rng.randint(*PORT_RANGE)), repeat * 10
+            )
+            record("is_port_available", samples)
+
+            next_port = iter(range(PORT_RANGE[1], PORT_RANGE[0], -1))
+            _, samples, _ = measure(
+                lambda: service.allocate_port(server_id, next(next_port), "bench_allocation"), repeat
+            )
+            record("allocate_port", samples)
+
+            # 冲突检测只检查数据库中在线的代理，先把所有代理标记为在线
+            db.query(Proxy).filter(Proxy.frps_server_id == server_id).update(
+                {Proxy.status: "online"}, synchronize_session=False
+            )
+            db.commit()
+            active = [proxy for proxies in frps_proxies(size, offline_ratio=0.0).values() for proxy in proxies]
+            _, samples, conflicts = measure(lambda: service.detect_conflicts(server_id, active), max(1, repeat // 5))
+            record("detect_conflicts", samples, conflicts=len(conflicts))
+        finally:
+            db.close()
+
+        headers = {"Authorization": f"Bearer {API_KEY}"}
+
+        def regenerate():
+            response = client.post(
+                "/api/groups/group7/regenerate-ports", params={"frps_server_id": server_id}, headers=headers
+            )
+            if response.status_code != 200:
+                raise RuntimeError(f"重新生成端口失败: {response.status_code} {response.text[:200]}")
+            return response
+
+        _, samples, _ = measure(regenerate, max(1, repeat // 5))
+        record("regenerate_group_ports", samples, group_size=size // 50)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端口分配和冲突检测性能测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="代理数量")
+    parser.add_argument("--repeat", type=int, default=10, help="每项重复次数")
+    add_common_arguments(parser)
+    args = parser.parse_args()
+
+    prepare_environment(args.database_url, args.verbose)
+    try:
+        results = run(args.sizes, args.repeat)
+    finally:
+        cleanup_environment()
+    write_results("ports", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+frpc 配置渲染性能测试
+
+向临时数据库写入 N 个代理（平均分布在 50 个分组中），测量：
+- group_ini / group_toml: 按分组生成配置（包括数据库查询），每次调用的耗时
+- render_all_ini / render_all_toml: 一次取出所有分组后逐组渲染（不访问数据库）
+- bundle_zip / bundle_zip_parallel: 批量导出全部分组的 zip 归档（单进程 / 多进程渲染）
+
+使用方式（在 backend 目录下运行）:
+    python -m benchmarks.bench_render
+    python -m benchmarks.bench_render --sizes 1000 10000 --repeat 5
+"""
+
+import argparse
+from typing import Dict, List
+
+from benchmarks.common import (
+    add_common_arguments, cleanup_environment, create_server, measure, percentile, prepare_environment,
+    reset_database, seed_proxies, write_results,
+)
+
+
+def run(sizes: List[int], repeat: int = 3) -> List[Dict]:
+    from app.config import get_settings
+    from app.database import SessionLocal
+    from app.models.frps_server import FrpsServer
+    from app.services.config_bundle_service import ConfigBundleService
+    from app.services.frpc_config_service import FrpcConfigService
+
+    workers = get_settings().config_bundle_workers
+    results = []
+    for size in sizes:
+        reset_database()
+        server_id = create_server()
+        seed_proxies(server_id, size)
+
+        db = SessionLocal()
+        try:
+            server = db.get(FrpsServer, server_id)
+            bundle_service = ConfigBundleService(db)
+            groups = bundle_service.load_groups(server)
+            snapshot = ConfigBundleService.server_snapshot(server)
+            config_service = FrpcConfigService(db)
+
+            def record(case: str, best: float, samples: List[float], **extra) -> None:
+                result = {
+                    "suite": "render",
+                    "case": case,
+                    "size": size,
+                    "groups": len(groups),
+                    "seconds": round(best, 4),
+                    "p50_ms": round(percentile(samples, 50) * 1000, 3),
+                    **extra,
+                }
+                results.append(result)
+                print(f"render {size:>7} 代理  {case:<22}{best:>9.4f}s  p50 {result['p50_ms']:>9.3f}ms")
+
+            for format in ("ini", "toml"):
+                group_name = groups[0][0]
+                best, samples, content = measure(
+                    lambda: config_service.generate_config_for_group(group_name, server_id, format=format),
+                    repeat * 10
+                )
+                record(f"group_{format}", best, samples, bytes=len(content))
+
+                def render_all():
+                    return sum(
+                        len(config_service.render_config(snapshot, proxies, name, name, format))
+                        for name, proxies in groups
+                    )
+                best, samples, total_bytes = measure(render_all, repeat)
+                record(f"render_all_{format}", best, samples, bytes=total_bytes)
+
+            for case, bundle_workers in (("bundle_zip", 0), ("bundle_zip_parallel", workers)):
+                best, samples, total_bytes = measure(
+                    lambda: sum(len(chunk) for chunk in bundle_service.iter_bundle(
+                        snapshot, groups, archive="zip", workers=bundle_workers
+                    )),
+                    repeat
+                )
+                record(case, best, samples, bytes=total_bytes, workers=bundle_workers)
+        finally:
+            db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="frpc 配置渲染性能测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="代理数量")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数（取最快一次）")
+    add_common_arguments(parser)
+    args = parser.parse_args()
+
+    prepare_environment(args.database_url, args.verbose)
+    try:
+        results = run(args.sizes, args.repeat)
+    finally:
+        cleanup_environment()
+    write_results("render", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
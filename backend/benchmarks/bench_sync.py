@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+定时同步性能测试
+
+启动本地模拟 frps 面板（benchmarks.fake_frps），把总代理数平均分到 N 个服务器，
+按定时任务的实际路径（scheduler.sync_all_servers）依次测量：
+- initial: 首次同步，全部代理都是新发现的
+- unchanged_precheck: 代理没有变化，serverinfo 预检查命中，跳过拉取代理列表
+- unchanged_full: 代理没有变化，清空预检查快照后完整拉取和比对
+- churn: 按比例切换代理在线状态后同步
+
+每一步同时记录同步各阶段（fetch / traffic / diff / conflicts / write）的累计耗时。
+
+使用方式（在 backend 目录下运行）:
+    python -m benchmarks.bench_sync
+    python -m benchmarks.bench_sync --sizes 1000 10000 --servers 4 --latency-ms 20 --failure-rate 0.01
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from benchmarks.common import add_common_arguments, cleanup_environment, prepare_environment, reset_database, write_results
+from benchmarks.datasets import split_counts
+from benchmarks.fake_frps import FakeFrpsServer, build_servers
+
+SYNC_PHASES = ("fetch", "traffic", "diff", "conflicts", "write")
+
+
+def _phase_totals(server_names: List[str]) -> Dict[str, float]:
+    """读取各阶段耗时直方图的累计值（所有服务器之和）"""
+    from prometheus_client import REGISTRY
+
+    totals = {}
+    for phase in SYNC_PHASES:
+        totals[phase] = sum(
+            REGISTRY.get_sample_value(
+                "frp_agent_sync_phase_seconds_sum", {"server": name, "phase": phase}
+            ) or 0.0
+            for name in server_names
+        )
+    return totals
+
+
+def run(
+    sizes: List[int],
+    servers: int = 1,
+    latency_ms: float = 0.0,
+    failure_rate: float = 0.0,
+    churn_ratio: float = 0.1,
+    port: int = 17500
+) -> List[Dict]:
+    from app import frps_client
+    from app.database import SessionLocal
+    from app.models.frps_server import FrpsServer
+    from app.models.proxy import Proxy
+    from app.scheduler import sync_all_servers
+
+    results = []
+    for size in sizes:
+        reset_database()
+        states = build_servers(split_counts(size, servers), latency_ms, failure_rate)
+        server_names = [f"bench-s{index}" for index in range(servers)]
+
+        with FakeFrpsServer(states, port=port) as fake:
+            db = SessionLocal()
+            for index, name in enumerate(server_names):
+                db.add(FrpsServer(
+                    name=name,
+                    server_addr="127.0.0.1",
+                    server_port=7000,
+                    api_base_url=fake.api_base_url(index),
+                    auth_username="admin",
+                    auth_password="admin",
+                    is_active=True
+                ))
+            db.commit()
+            db.close()
+
+            def step(case: str, **extra) -> None:
+                requests_before = sum(state.requests for state in states)
+                phases_before = _phase_totals(server_names)
+                start = time.perf_counter()
+                asyncio.run(sync_all_servers())
+                elapsed = time.perf_counter() - start
+                phases_after = _phase_totals(server_names)
+                result = {
+                    "suite": "sync",
+                    "case": case,
+                    "size": size,
+                    "servers": servers,
+                    "latency_ms": latency_ms,
+                    "failure_rate": failure_rate,
+                    "seconds": round(elapsed, 4),
+                    "proxies_per_second": round(size / elapsed, 1) if elapsed else None,
+                    "frps_requests": sum(state.requests for state in states) - requests_before,
+                    "phases": {
+                        phase: round(phases_after[phase] - phases_before[phase], 4) for phase in SYNC_PHASES
+                    },
+                    **extra,
+                }
+                results.append(result)
+                print(
+                    f"sync  {size:>7} 代理 / {servers} 服务器  {case:<20}{elapsed:>9.3f}s"
+                    f"{result['proxies_per_second'] or 0:>12.0f} 代理/秒  请求 {result['frps_requests']}"
+                )
+
+            step("initial")
+            step("unchanged_precheck")
+            frps_client._snapshots.clear()
+            step("unchanged_full")
+            changed = sum(state.churn(churn_ratio) for state in states)
+            step("churn", changed=changed)
+
+            db = SessionLocal()
+            stored = db.query(Proxy).count()
+            db.close()
+            if failure_rate == 0 and stored != size:
+                raise RuntimeError(f"同步后数据库中有 {stored} 个代理，应为 {size}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="定时同步性能测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="总代理数量")
+    parser.add_argument("--servers", type=int, default=1, help="服务器数量（代理平均分配）")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="模拟 frps 每个请求的延迟")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="模拟 frps 请求失败的比例")
+    parser.add_argument("--churn", type=float, default=0.1, help="churn 步骤切换在线状态的代理比例")
+    parser.add_argument("--port", type=int, default=17500, help="模拟 frps 面板监听端口")
+    add_common_arguments(parser)
+    args = parser.parse_args()
+
+    prepare_environment(args.database_url, args.verbose)
+    try:
+        results = run(args.sizes, args.servers, args.latency_ms, args.failure_rate, args.churn, args.port)
+    finally:
+        cleanup_environment()
+    write_results("sync", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
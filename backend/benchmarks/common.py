@@ -0,0 +1,235 @@
+"""基准测试公共工具
+
+- prepare_environment(): 在导入 app 之前把数据库和数据目录指向临时目录，避免影响本地数据
+- reset_database(): 每个场景开始前重建空数据库，并清空进程内缓存
+- create_server() / seed_proxies() / create_api_key(): 准备测试数据
+- measure() / percentile(): 计时
+- write_results(): 把结果连同提交号、Python 和 SQLite 版本写入 JSON，供 compare 对比
+"""
+import json
+import logging
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# 接口测试使用的 API Key（create_api_key() 写入数据库）
+API_KEY = "bench-api-key"
+
+_workdir: Optional[str] = None
+_pgserver = None
+
+
+def prepare_environment(database_url: Optional[str] = None, verbose: bool = False) -> str:
+    """设置基准测试使用的数据库和数据目录（必须在导入 app 模块之前调用，重复调用无效）
+
+    Args:
+        database_url: 使用指定的数据库，不传则在临时目录中创建 SQLite 数据库；
+            传 "pgserver" 时在临时目录中启动内嵌的 PostgreSQL（需要 pip install pgserver）
+        verbose: 保留 app 的 INFO 日志（默认只输出错误，避免逐条代理日志影响计时）
+
+    Returns:
+        临时工作目录
+    """
+    global _workdir
+    if _workdir is not None:
+        return _workdir
+    if "app.config" in sys.modules:
+        raise RuntimeError("prepare_environment() 必须在导入 app 模块之前调用")
+
+    _workdir = tempfile.mkdtemp(prefix="frp-agent-bench-")
+    if database_url == "pgserver":
+        database_url = _start_pgserver(os.path.join(_workdir, "pgdata"))
+    os.environ["DATABASE_URL"] = database_url or f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+    os.environ["TEMP_CONFIG_DIR"] = os.path.join(_workdir, "temp_configs")
+    os.environ["IMPORT_JOB_DIR"] = os.path.join(_workdir, "import_jobs")
+    os.environ.setdefault("METRICS_ENABLED", "false")
+
+    logging.basicConfig(level=logging.INFO if verbose else logging.WARNING)
+    if not verbose:
+        # 同步时每个代理上线/下线都会记日志，这里只保留错误
+        logging.getLogger("app").setLevel(logging.ERROR)
+    return _workdir
+
+
+def _start_pgserver(data_dir: str) -> str:
+    """启动内嵌 PostgreSQL，返回连接 URL"""
+    global _pgserver
+    try:
+        import pgserver
+    except ImportError:
+        raise RuntimeError("使用 --database-url pgserver 需要先安装: pip install pgserver")
+    _pgserver = pgserver.get_server(data_dir, cleanup_mode="stop")
+    return _pgserver.get_uri()
+
+
+def cleanup_environment() -> None:
+    """停止内嵌 PostgreSQL 并删除临时工作目录"""
+    if _pgserver is not None:
+        _pgserver.cleanup()
+    if _workdir is not None:
+        shutil.rmtree(_workdir, ignore_errors=True)
+
+
+def reset_database() -> None:
+    """清空数据库并重建表、搜索索引，同时清空同步相关的进程内缓存"""
+    from sqlalchemy import MetaData
+
+    from app import frps_client
+    from app.database import engine, init_db, read_engine
+    from app.services import traffic_service
+    from app.services.search_service import init_search_index
+
+    if engine.dialect.name == "sqlite" and engine.url.database:
+        engine.dispose()
+        read_engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            path = engine.url.database + suffix
+            if os.path.exists(path):
+                os.remove(path)
+    else:
+        # 反射删除所有表（包括按月创建的历史分区表）
+        metadata = MetaData()
+        metadata.reflect(bind=engine)
+        metadata.drop_all(bind=engine)
+
+    init_db()
+    init_search_index(engine)
+    frps_client._snapshots.clear()
+    traffic_service._last_counters.clear()
+
+
+def create_server(name: str = "bench", api_base_url: str = "http://127.0.0.1:17500/s0/api") -> int:
+    """创建一个 frps 服务器记录，返回 ID"""
+    from app.database import SessionLocal
+    from app.models.frps_server import FrpsServer
+
+    db = SessionLocal()
+    try:
+        server = FrpsServer(
+            name=name,
+            server_addr="127.0.0.1",
+            server_port=7000,
+            api_base_url=api_base_url,
+            auth_username="admin",
+            auth_password="admin",
+            is_active=True
+        )
+        db.add(server)
+        db.commit()
+        return server.id
+    finally:
+        db.close()
+
+
+def create_api_key() -> None:
+    """写入基准测试使用的 API Key"""
+    from app.auth import hash_api_key
+    from app.database import SessionLocal
+    from app.models.api_key import ApiKey
+
+    db = SessionLocal()
+    try:
+        db.add(ApiKey(key=hash_api_key(API_KEY), description="benchmark", is_active=True))
+        db.commit()
+    finally:
+        db.close()
+
+
+def seed_proxies(frps_server_id: int, count: int, batch_size: int = 5000) -> None:
+    """通过导入服务写入 count 个代理（与正常导入一样维护统计计数和搜索索引）"""
+    from app.database import SessionLocal
+    from app.services.import_service import ProxyImportService
+
+    from benchmarks.datasets import proxy_configs
+
+    configs = proxy_configs(count)
+    db = SessionLocal()
+    try:
+        service = ProxyImportService(db)
+        state = service.prepare(frps_server_id)
+        for i in range(0, len(configs), batch_size):
+            service.import_batch(state, configs[i:i + batch_size])
+    finally:
+        db.close()
+
+
+def measure(func: Callable[[], Any], repeat: int = 1) -> Tuple[float, List[float], Any]:
+    """执行 repeat 次，返回最快一次耗时（秒）、所有耗时和最后一次的结果"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return min(samples), samples, result
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """最近秩百分位数"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def environment_info() -> Dict[str, Any]:
+    """当前提交和运行环境"""
+    def git(*args: str) -> Optional[str]:
+        try:
+            return subprocess.check_output(
+                ["git", *args], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL, text=True
+            ).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sqlite": sqlite3.sqlite_version,
+        "database": os.environ.get("DATABASE_URL", "").split("://")[0],
+    }
+
+
+def write_results(suite: str, results: List[Dict[str, Any]], output: Optional[str] = None) -> str:
+    """写入 JSON 结果文件，默认保存到 benchmarks/results/{suite}-{commit}-{时间}.json
+
+    每条结果用 suite + case + 参数（size、servers 等）标识，数值字段供 compare 对比。
+    """
+    info = environment_info()
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{suite}-{info['commit'] or 'nogit'}-{stamp}.json")
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"meta": info, "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {output}")
+    return output
+
+
+def add_common_arguments(parser) -> None:
+    """所有基准测试共用的命令行参数"""
+    parser.add_argument("--output", help="结果 JSON 路径（默认 benchmarks/results/ 下按提交号命名）")
+    parser.add_argument(
+        "--database-url", help="使用指定数据库（默认临时 SQLite 数据库，会被清空；pgserver 表示内嵌 PostgreSQL）"
+    )
+    parser.add_argument("--verbose", action="store_true", help="输出 app 的 INFO 日志")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+对比两次基准测试结果
+
+按 suite + case + 参数（size、servers 等）匹配两个结果文件中的条目，
+比较耗时指标（seconds，没有时使用 p50_ms），变慢超过阈值的条目标记为回归。
+存在回归时退出码为 1，可以在 CI 中使用。
+
+使用方式（在 backend 目录下运行）:
+    python -m benchmarks.compare base.json new.json
+    python -m benchmarks.compare base.json new.json --threshold 20
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Optional, Tuple
+
+# 标识一条结果的参数（其余数值字段都是测量值）
+KEY_FIELDS = ("suite", "case", "size", "servers", "latency_ms", "failure_rate", "batch_size", "workers", "readers")
+METRICS = ("seconds", "p50_ms")
+
+
+def load(path: str) -> Tuple[Dict, Dict[Tuple, Dict]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    entries = {}
+    for result in data.get("results", []):
+        key = tuple((field, result.get(field)) for field in KEY_FIELDS if field in result)
+        entries[key] = result
+    return data.get("meta", {}), entries
+
+
+def metric(result: Dict) -> Tuple[Optional[str], Optional[float]]:
+    for name in METRICS:
+        if result.get(name) is not None:
+            return name, result[name]
+    return None, None
+
+
+def describe(key: Tuple) -> str:
+    values = dict(key)
+    extra = " ".join(
+        f"{field}={values[field]}" for field in KEY_FIELDS[3:] if values.get(field) not in (None, 0, 0.0)
+    )
+    return f"{values.get('suite')}/{values.get('case')} size={values.get('size')}" + (f" {extra}" if extra else "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比两次基准测试结果")
+    parser.add_argument("base", help="基准结果 JSON")
+    parser.add_argument("new", help="新结果 JSON")
+    parser.add_argument("--threshold", type=float, default=10.0, help="变慢超过该百分比视为回归")
+    args = parser.parse_args()
+
+    base_meta, base = load(args.base)
+    new_meta, new = load(args.new)
+    print(f"基准: {base_meta.get('commit')}（{base_meta.get('timestamp')}）  新: {new_meta.get('commit')}（{new_meta.get('timestamp')}）")
+
+    regressions = 0
+    for key, new_result in new.items():
+        if key not in base:
+            print(f"  新增    {describe(key)}")
+            continue
+        name, new_value = metric(new_result)
+        _, base_value = metric(base[key])
+        if name is None or base_value in (None, 0):
+            continue
+        change = (new_value - base_value) / base_value * 100
+        flag = "  "
+        if change > args.threshold:
+            flag = "回归"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "提升"
+        print(f"  {flag}  {describe(key):<60}{name:>8} {base_value:>12.4f} -> {new_value:>12.4f}  {change:>+7.1f}%")
+    for key in base:
+        if key not in new:
+            print(f"  缺失    {describe(key)}")
+
+    if regressions:
+        print(f"{regressions} 项变慢超过 {args.threshold}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""基准测试数据集生成
+
+所有生成器都是确定性的（相同参数生成相同内容），便于在不同提交之间对比结果。
+"""
+import random
+from typing import Dict, List
+
+# 代理平均分布到的分组数；类型分布为每 4 个代理中 1 个 http，其余 tcp
+GROUP_COUNT = 50
+
+
+def proxy_name(index: int, groups: int = GROUP_COUNT) -> str:
+    """第 index 个代理的名称（分组_名称，可解析出分组）"""
+    return f"group{index % groups}_proxy{index}"
+
+
+def generate_ini(count: int) -> str:
+    """生成包含 count 个代理的 INI 配置"""
+    lines = ["[common]", "server_addr = 127.0.0.1", "server_port = 7000", "token = bench", ""]
+    for i in range(count):
+        lines.append(f"[group{i % GROUP_COUNT}_proxy{i}]")
+        if i % 4 == 0:
+            lines.append("type = http")
+            lines.append(f"local_port = {8000 + i % 1000}")
+            lines.append(f"custom_domains = p{i}.example.com")
+        else:
+            lines.append("type = tcp")
+            lines.append("local_ip = 127.0.0.1")
+            lines.append(f"local_port = {22 + i % 100}")
+            lines.append(f"remote_port = {10000 + i}")
+        lines.append("use_encryption = true")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def generate_toml(count: int) -> str:
+    """生成包含 count 个代理的 TOML 配置"""
+    lines = ['serverAddr = "127.0.0.1"', "serverPort = 7000", 'auth.token = "bench"', ""]
+    for i in range(count):
+        lines.append("[[proxies]]")
+        lines.append(f'name = "group{i % GROUP_COUNT}_proxy{i}"')
+        if i % 4 == 0:
+            lines.append('type = "http"')
+            lines.append(f"localPort = {8000 + i % 1000}")
+            lines.append(f'customDomains = ["p{i}.example.com"]')
+        else:
+            lines.append('type = "tcp"')
+            lines.append('localIP = "127.0.0.1"')
+            lines.append(f"localPort = {22 + i % 100}")
+            lines.append(f"remotePort = {10000 + i}")
+        lines.append("transport.useEncryption = true")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def proxy_configs(count: int, start_port: int = 10000) -> List[Dict]:
+    """生成 ConfigParser 解析结果格式的代理配置（用于导入）"""
+    configs = []
+    for i in range(count):
+        is_http = i % 4 == 0
+        configs.append({
+            "name": proxy_name(i),
+            "proxy_type": "http" if is_http else "tcp",
+            "local_ip": "127.0.0.1",
+            "local_port": 8000 + i % 1000 if is_http else 22 + i % 100,
+            "remote_port": None if is_http else start_port + i,
+            "custom_domains": f"p{i}.example.com" if is_http else None,
+        })
+    return configs
+
+
+def frps_proxies(
+    count: int,
+    start_port: int = 10000,
+    offline_ratio: float = 0.1,
+    seed: int = 0
+) -> Dict[str, List[Dict]]:
+    """生成 frps 面板 /api/proxy/{type} 返回的代理列表（按类型分组）
+
+    Args:
+        count: 代理数量
+        start_port: tcp 代理的起始远程端口
+        offline_ratio: 离线代理比例
+        seed: 随机种子（决定哪些代理离线和流量数值）
+    """
+    rng = random.Random(seed)
+    result: Dict[str, List[Dict]] = {"tcp": [], "udp": [], "http": [], "https": []}
+    for i in range(count):
+        proxy_type = "http" if i % 4 == 0 else "tcp"
+        conf = {"type": proxy_type, "localIP": "127.0.0.1"}
+        if proxy_type == "tcp":
+            conf["remotePort"] = start_port + i
+        else:
+            conf["customDomains"] = [f"p{i}.example.com"]
+        online = rng.random() >= offline_ratio
+        result[proxy_type].append({
+            "name": proxy_name(i),
+            "conf": conf,
+            "clientVersion": "0.52.3",
+            "todayTrafficIn": rng.randint(0, 10 ** 9) if online else 0,
+            "todayTrafficOut": rng.randint(0, 10 ** 9) if online else 0,
+            "curConns": rng.randint(0, 20) if online else 0,
+            "lastStartTime": "01-01 00:00:00",
+            "lastCloseTime": "" if online else "01-01 01:00:00",
+            "status": "online" if online else "offline",
+        })
+    return result
+
+
+def split_counts(total: int, parts: int) -> List[int]:
+    """把 total 尽量平均地分给 parts 份"""
+    base, extra = divmod(total, parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+本地 frps 管理面板替身
+
+在一个端口上模拟多个 frps 服务器的管理 API：
+    /s{n}/api/serverinfo
+    /s{n}/api/proxy/{tcp|udp|http|https}
+每个服务器的代理数、响应延迟和失败率都可配置，代理列表预先序列化，
+保证替身本身不成为瓶颈。既可以在基准测试中以线程方式启动，也可以单独运行，
+把本地 frp-agent 的服务器 api_base_url 指向 http://127.0.0.1:{port}/s{n}/api 做手工测试。
+
+使用方式（在 backend 目录下运行）:
+    python -m benchmarks.fake_frps --servers 2 --proxies 10000 --latency-ms 50 --failure-rate 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Response
+
+from benchmarks.datasets import frps_proxies
+
+PROXY_TYPES = ("tcp", "udp", "http", "https")
+
+
+class FakeServerState:
+    """单个模拟 frps 服务器的代理列表和行为参数"""
+
+    def __init__(
+        self,
+        proxy_count: int,
+        start_port: int = 10000,
+        latency_ms: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0
+    ):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.proxies = frps_proxies(proxy_count, start_port=start_port, seed=seed)
+        self.requests = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self.payloads: Dict[str, bytes] = {}
+        self.server_info: bytes = b""
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        """重新序列化代理列表和 serverinfo（代理变化后调用）"""
+        self.payloads = {
+            proxy_type: json.dumps({"proxies": self.proxies.get(proxy_type, [])}).encode()
+            for proxy_type in PROXY_TYPES
+        }
+        all_proxies = [proxy for proxies in self.proxies.values() for proxy in proxies]
+        online = [proxy for proxy in all_proxies if proxy["status"] == "online"]
+        self.server_info = json.dumps({
+            "version": "0.52.3",
+            "totalTrafficIn": sum(proxy["todayTrafficIn"] for proxy in all_proxies),
+            "totalTrafficOut": sum(proxy["todayTrafficOut"] for proxy in all_proxies),
+            "curConns": sum(proxy["curConns"] for proxy in all_proxies),
+            "clientCounts": len(online),
+            "proxyTypeCount": {proxy_type: len(self.proxies.get(proxy_type, [])) for proxy_type in PROXY_TYPES},
+        }).encode()
+
+    def churn(self, ratio: float) -> int:
+        """随机切换 ratio 比例代理的在线状态并增加流量，返回切换的代理数"""
+        all_proxies = [proxy for proxies in self.proxies.values() for proxy in proxies]
+        changed = self._rng.sample(all_proxies, int(len(all_proxies) * ratio)) if all_proxies else []
+        for proxy in changed:
+            proxy["status"] = "offline" if proxy["status"] == "online" else "online"
+        for proxy in all_proxies:
+            if proxy["status"] == "online":
+                proxy["todayTrafficIn"] += self._rng.randint(0, 10 ** 6)
+                proxy["todayTrafficOut"] += self._rng.randint(0, 10 ** 6)
+        self._rebuild()
+        return len(changed)
+
+    async def respond(self, payload: bytes) -> Response:
+        self.requests += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            self.failures += 1
+            raise HTTPException(status_code=503, detail="simulated failure")
+        return Response(content=payload, media_type="application/json")
+
+
+def create_app(servers: List[FakeServerState]) -> FastAPI:
+    """创建模拟多个 frps 服务器的应用，服务器编号从 0 开始"""
+    app = FastAPI()
+
+    def get_state(server: int) -> FakeServerState:
+        if server < 0 or server >= len(servers):
+            raise HTTPException(status_code=404, detail="unknown server")
+        return servers[server]
+
+    @app.get("/s{server}/api/serverinfo")
+    async def server_info(server: int):
+        state = get_state(server)
+        return await state.respond(state.server_info)
+
+    @app.get("/s{server}/api/proxy/{proxy_type}")
+    async def proxy_list(server: int, proxy_type: str):
+        state = get_state(server)
+        if proxy_type not in PROXY_TYPES:
+            raise HTTPException(status_code=404, detail="unknown proxy type")
+        return await state.respond(state.payloads[proxy_type])
+
+    return app
+
+
+class FakeFrpsServer:
+    """在后台线程中运行的模拟 frps 面板"""
+
+    def __init__(self, servers: List[FakeServerState], host: str = "127.0.0.1", port: int = 17500):
+        self.servers = servers
+        self.host = host
+        self.port = port
+        config = uvicorn.Config(create_app(servers), host=host, port=port, log_level="error", access_log=False)
+        self._server = uvicorn.Server(config)
+        self._thread: Optional[threading.Thread] = None
+
+    def api_base_url(self, index: int) -> str:
+        return f"http://{self.host}:{self.port}/s{index}/api"
+
+    def start(self) -> "FakeFrpsServer":
+        self._thread = threading.Thread(target=self._server.run, name="fake-frps", daemon=True)
+        self._thread.start()
+        deadline = time.time() + 10
+        while not self._server.started:
+            if time.time() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"模拟 frps 面板启动失败（端口 {self.port}）")
+            time.sleep(0.05)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def __enter__(self) -> "FakeFrpsServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def build_servers(
+    counts: List[int],
+    latency_ms: float = 0.0,
+    failure_rate: float = 0.0
+) -> List[FakeServerState]:
+    """按每个服务器的代理数创建状态（各服务器的远程端口区间互不重叠）"""
+    servers = []
+    start_port = 10000
+    for index, count in enumerate(counts):
+        servers.append(FakeServerState(count, start_port, latency_ms, failure_rate, seed=index))
+        start_port += count
+    return servers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地 frps 管理面板替身")
+    parser.add_argument("--servers", type=int, default=1, help="模拟的服务器数量")
+    parser.add_argument("--proxies", type=int, default=1000, help="每个服务器的代理数量")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="每个请求的额外延迟")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="请求失败（返回 503）的比例")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=17500)
+    args = parser.parse_args()
+
+    servers = build_servers([args.proxies] * args.servers, args.latency_ms, args.failure_rate)
+    for index in range(args.servers):
+        print(f"服务器 s{index}: http://{args.host}:{args.port}/s{index}/api （{args.proxies} 个代理）")
+    uvicorn.run(create_app(servers), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+运行全部基准测试并把结果写入同一个 JSON 文件
+
+使用方式（在 backend 目录下运行）:
+    python -m benchmarks.run_all                      # 1k / 10k / 50k 代理
+    python -m benchmarks.run_all --quick              # 只跑 1k 代理，用于快速检查
+    python -m benchmarks.run_all --suites sync api --sizes 10000 --servers 4
+
+在两个提交上分别运行后，用 compare 对比：
+    python -m benchmarks.compare benchmarks/results/all-<旧>.json benchmarks/results/all-<新>.json
+"""
+
+import argparse
+
+from benchmarks.common import add_common_arguments, cleanup_environment, prepare_environment, write_results
+
+SUITES = ("sync", "render", "import", "api", "ports", "concurrency")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="运行全部基准测试")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES), help="要运行的测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="代理数量")
+    parser.add_argument("--quick", action="store_true", help="只使用 1000 个代理")
+    parser.add_argument("--servers", type=int, default=1, help="sync: 服务器数量")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="sync: 模拟 frps 请求延迟")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="sync: 模拟 frps 请求失败比例")
+    parser.add_argument("--repeat", type=int, default=3, help="render / ports: 重复次数")
+    parser.add_argument("--requests", type=int, default=100, help="api: 每个用例的请求次数")
+    parser.add_argument("--duration", type=float, default=15.0, help="concurrency: 每个场景持续秒数")
+    add_common_arguments(parser)
+    args = parser.parse_args()
+    sizes = [1000] if args.quick else args.sizes
+
+    prepare_environment(args.database_url, args.verbose)
+    from benchmarks import bench_api, bench_concurrency, bench_import, bench_ports, bench_render, bench_sync
+
+    results = []
+    try:
+        for suite in args.suites:
+            print(f"== {suite} ==")
+            if suite == "sync":
+                results += bench_sync.run(sizes, args.servers, args.latency_ms, args.failure_rate)
+            elif suite == "render":
+                results += bench_render.run(sizes, args.repeat)
+            elif suite == "import":
+                results += bench_import.run(sizes)
+            elif suite == "api":
+                results += bench_api.run(sizes, args.requests)
+            elif suite == "ports":
+                results += bench_ports.run(sizes, args.repeat)
+            elif suite == "concurrency":
+                # 同步冲突检测在大数据量下很慢，只用 1 万以内的数据量；SQLite 参数在导入时确定，每组参数在子进程中运行
+                concurrency_sizes = [size for size in sizes if size <= 10000]
+                if concurrency_sizes:
+                    results += bench_concurrency.run_isolated(
+                        concurrency_sizes, duration=args.duration, database_url=args.database_url
+                    )
+    finally:
+        cleanup_environment()
+    write_results("all", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
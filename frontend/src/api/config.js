@@ -15,14 +15,44 @@ export const configApi = {
     })
   },
   
+  // 流式导入配置（大文件，响应为 NDJSON 进度事件）
+  importConfigStream(formData) {
+    return api.post('/config/import/stream', formData, {
+      headers: {
+        'Content-Type': 'multipart/form-data'
+      },
+      responseType: 'text'
+    })
+  },
+
+  // 创建后台导入任务（大文件）
+  createImportJob(formData) {
+    return api.post('/config/import/jobs', formData, {
+      headers: {
+        'Content-Type': 'multipart/form-data'
+      }
+    })
+  },
+
+  // 查询后台导入任务
+  getImportJob(jobId) {
+    return api.get(`/config/import/jobs/${jobId}`)
+  },
+
+  // 最近的后台导入任务
+  getImportJobs(params) {
+    return api.get('/config/import/jobs', { params })
+  },
+
   // 导入配置（文本）
   importConfigText(data) {
     return api.post('/config/import/text', data)
   },
   
   // 导入配置（直接，推荐）
-  importConfigDirect(format, serverName, content) {
+  importConfigDirect(format, serverName, content, params = {}) {
     return api.post(`/config/import/${format}/${serverName}`, content, {
+      params,
       headers: {
         'Content-Type': 'text/plain'
       }
@@ -0,0 +1,63 @@
+// 实时事件订阅（Server-Sent Events）
+// EventSource 无法设置认证头，这里用 fetch 读取事件流
+const baseURL = import.meta.env.VITE_API_BASE_URL || '/api'
+
+export const eventsApi = {
+  // 订阅代理状态变化、新发现的代理和端口冲突事件
+  // params: { frps_server_id, group_name }，onEvent(type, data)；
+  // 连接失败或服务端关闭事件流时调用 onError(error)；返回取消订阅的函数
+  subscribe(params = {}, onEvent, onError) {
+    const controller = new AbortController()
+    const query = new URLSearchParams(
+      Object.entries(params).filter(([, value]) => value !== undefined && value !== null && value !== '')
+    ).toString()
+    const headers = {}
+    const token = localStorage.getItem('auth_token')
+    if (token) {
+      headers.Authorization = `Basic ${token}`
+    }
+
+    const run = async () => {
+      const response = await fetch(`${baseURL}/events${query ? `?${query}` : ''}`, {
+        headers,
+        signal: controller.signal
+      })
+      if (!response.ok) {
+        throw new Error(`订阅事件失败: ${response.status}`)
+      }
+
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      while (true) {
+        const { value, done } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+
+        let index
+        while ((index = buffer.indexOf('\n\n')) >= 0) {
+          const block = buffer.slice(0, index)
+          buffer = buffer.slice(index + 2)
+          let type = 'message'
+          let data = ''
+          for (const line of block.split('\n')) {
+            if (line.startsWith('event: ')) type = line.slice(7)
+            else if (line.startsWith('data: ')) data += line.slice(6)
+          }
+          if (data) {
+            onEvent(type, JSON.parse(data))
+          }
+        }
+      }
+      throw new Error('事件流已断开')
+    }
+
+    run().catch((error) => {
+      if (error.name !== 'AbortError' && onError) {
+        onError(error)
+      }
+    })
+
+    return () => controller.abort()
+  }
+}
@@ -0,0 +1,18 @@
+import api from './index'
+
+export const statsApi = {
+  // 获取各服务器的代理统计（总数/在线/离线/端口数/按类型）
+  getStats(params = {}) {
+    return api.get('/stats', { params })
+  },
+
+  // 获取单个分组的代理统计
+  getGroupStats(groupName, params = {}) {
+    return api.get(`/stats/groups/${encodeURIComponent(groupName)}`, { params })
+  },
+
+  // 从代理记录全量重建统计
+  rebuildStats(params = {}) {
+    return api.post('/stats/rebuild', null, { params })
+  }
+}
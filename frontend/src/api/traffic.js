@@ -0,0 +1,28 @@
+import api from './index'
+
+export const trafficApi = {
+  // 获取时间窗口内流量或连接数最高的代理
+  getTopProxies(params = {}) {
+    return api.get('/traffic/top', { params })
+  },
+
+  // 获取时间窗口内各分组的流量合计
+  getGroupTraffic(params = {}) {
+    return api.get('/traffic/groups', { params })
+  },
+
+  // 获取时间窗口内的平均每秒流量和平均并发连接数
+  getRates(params = {}) {
+    return api.get('/traffic/rates', { params })
+  },
+
+  // 获取单个代理的流量时间序列
+  getProxySeries(params = {}) {
+    return api.get('/traffic/series', { params })
+  },
+
+  // 获取服务器全局指标（总流量、连接数、客户端数）
+  getServerMetrics(params = {}) {
+    return api.get('/traffic/server', { params })
+  }
+}
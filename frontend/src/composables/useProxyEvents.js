@@ -0,0 +1,65 @@
+import { onMounted, onBeforeUnmount, watch } from 'vue'
+import { eventsApi } from '@/api/events'
+
+// 连接断开后重新订阅的间隔（毫秒）
+const RECONNECT_DELAY = 5000
+
+/**
+ * 订阅代理实时事件（/api/events）的 composable
+ * 组件挂载时订阅、卸载时取消；过滤参数变化时重新订阅，连接断开后自动重连
+ *
+ * @param {Function} getParams 返回订阅参数 { frps_server_id, group_name }，返回 null 时不订阅
+ * @param {Function} onEvent 收到事件时调用 onEvent(type, data)
+ */
+export function useProxyEvents(getParams, onEvent) {
+  let unsubscribe = null
+  let reconnectTimer = null
+  let active = false
+
+  const stop = () => {
+    clearTimeout(reconnectTimer)
+    reconnectTimer = null
+    if (unsubscribe) {
+      unsubscribe()
+      unsubscribe = null
+    }
+  }
+
+  const start = () => {
+    stop()
+    const params = getParams()
+    if (!active || params === null) return
+
+    unsubscribe = eventsApi.subscribe(params, onEvent, (error) => {
+      console.warn('实时事件连接断开，稍后重连:', error.message)
+      unsubscribe = null
+      reconnectTimer = setTimeout(start, RECONNECT_DELAY)
+    })
+  }
+
+  watch(getParams, start, { deep: true })
+
+  onMounted(() => {
+    active = true
+    start()
+  })
+
+  onBeforeUnmount(() => {
+    active = false
+    stop()
+  })
+}
+
+/**
+ * 合并短时间内的多次调用，只在最后一次调用 wait 毫秒后执行一次
+ * 同步一次可能产生大量事件，用于把它们合并为一次重新加载
+ */
+export function debounce(fn, wait) {
+  let timer = null
+  const debounced = (...args) => {
+    clearTimeout(timer)
+    timer = setTimeout(() => fn(...args), wait)
+  }
+  debounced.cancel = () => clearTimeout(timer)
+  return debounced
+}
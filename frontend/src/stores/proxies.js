@@ -115,6 +115,16 @@ export const useProxiesStore = defineStore('proxies', {
       this.stats.portCount = ports.size
     },
     
+    // 按实时事件更新当前页中代理的状态，代理不在当前页时返回 false
+    applyStatusEvent(event) {
+      const proxy = this.proxies.find(p => p.name === event.proxy_name)
+      if (!proxy) return false
+      proxy.status = event.new_status
+      if (event.remote_port) proxy.remote_port = event.remote_port
+      this.updateStats()
+      return true
+    },
+    
     // 设置过滤器
     setFilters(filters) {
       this.filters = { ...this.filters, ...filters }